@@ -5,14 +5,16 @@ YouXin Workshop - Digital Content Creation Platform for Caring Minds
 """
 import os
 import sys
+import time
 import argparse
 import logging
 import subprocess
 from pathlib import Path
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from scripts.core.content_pipeline import ContentPipeline
-from scripts.cli.menu_handler import MenuHandler
-from scripts.cli.menu_router import MenuRouter
+
+if TYPE_CHECKING:
+    from scripts.core.content_pipeline import ContentPipeline
 
 # 加载环境变量
 load_dotenv()
@@ -32,17 +34,67 @@ def main():
     parser.add_argument("-v", "--verbose", 
                        action="store_true",
                        help="显示详细日志")
+    parser.add_argument("--no-ai-cache",
+                       action="store_true",
+                       help="绕过AI响应缓存，强制重新调用API")
+    parser.add_argument("--batch",
+                       nargs="*",
+                       metavar="DRAFT",
+                       help="批量发布草稿（不指定文件时处理所有有效草稿）")
+    parser.add_argument("--platforms",
+                       help="批量发布的目标平台，多个平台用逗号分隔（默认所有启用平台）")
+    parser.add_argument("--workers",
+                       type=int,
+                       help="批量发布的最大并发数")
+    parser.add_argument("--tier",
+                       choices=["free", "experience", "monthly", "quarterly", "yearly"],
+                       help="批量发布的会员分级")
+    parser.add_argument("--validate-site",
+                       action="store_true",
+                       help="并发验证 _posts 和 _drafts 下的所有文章并输出JSON报告（有错误时退出码为1）")
+    parser.add_argument("--profile-startup",
+                       action="store_true",
+                       help="显示启动到主菜单的导入耗时分布")
+    parser.add_argument("--startup-check",
+                       action="store_true",
+                       help=argparse.SUPPRESS)
     args = parser.parse_args()
     
+    if args.profile_startup:
+        profile_startup()
+        return
+    
+    if args.validate_site:
+        from scripts.core.validators.site_validator import main as validate_site
+        sys.exit(validate_site(["--workers", str(args.workers)] if args.workers else []))
+    
+    if args.no_ai_cache:
+        os.environ["AI_CACHE_BYPASS"] = "1"
+    
+    # 重量级模块（Gemini SDK、微信发布、内容变现等）由ContentPipeline在首次使用时加载
+    phase_start = time.perf_counter()
+    from scripts.core.content_pipeline import ContentPipeline
+    from scripts.cli.menu_handler import MenuHandler
+    from scripts.cli.menu_router import MenuRouter
+    import_seconds = time.perf_counter() - phase_start
+    
     # 初始化一次，避免重复日志
+    phase_start = time.perf_counter()
     pipeline = ContentPipeline("config/pipeline_config.yml", verbose=args.verbose)
     
+    if args.batch is not None:
+        sys.exit(run_batch_publish(pipeline, args))
+    
     # 初始化菜单处理器和路由器
     menu_handler = MenuHandler(pipeline)
     menu_router = MenuRouter(pipeline)
+    init_seconds = time.perf_counter() - phase_start
+    
+    if args.startup_check:
+        print(f"STARTUP import={import_seconds:.3f} init={init_seconds:.3f}")
+        return
     
     # 记录用户会话开始
-    import time
     session_id = int(time.time() * 1000) % 100000  # 简短的会话 ID
     pipeline.log(f"===== 用户会话开始 [{session_id}] =====", level="info", force=True)
     
@@ -196,7 +248,6 @@ def main():
         if not isinstance(draft, Path):
             pipeline.log(f"错误：无效的草稿类型 {type(draft)}", level="error", force=True)
             print(f"\n❌ 内部错误：草稿路径类型不正确")
-            import time
             time.sleep(2)  # 暂停让用户看到错误信息
             continue
         
@@ -256,15 +307,81 @@ def main():
                 print(f"请检查日志了解详情")
 
                 # 暂停让用户看到错误信息
-                import time
                 time.sleep(3)
         except Exception as e:
             pipeline.log(f"❌ 发布过程中发生错误: {str(e)}", level="error", force=True)
             print(f"\n❌ 发布过程中发生错误: {str(e)}")
-            import time
             time.sleep(3)
 
 
+def profile_startup(top: int = 15) -> None:
+    """以 -X importtime 运行一次启动流程（到主菜单前），按顶层模块汇总导入耗时"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--startup-check"],
+        capture_output=True,
+        text=True
+    )
+    total_seconds = time.perf_counter() - start
+    
+    # importtime输出格式: "import time: self [us] | cumulative | imported package"
+    # 缩进表示嵌套层级，只统计由启动代码直接触发的最外层导入
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if name.startswith(" ") and not name.startswith("  "):
+            modules.append((int(parts[1]), name.strip()))
+    
+    phases = next((line.split()[1:] for line in result.stdout.splitlines() if line.startswith("STARTUP ")), None)
+    if result.returncode != 0 or phases is None:
+        print(f"❌ 启动失败 (退出码 {result.returncode})")
+        print("\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))[-2000:])
+        return
+    
+    print(f"⏱️  启动到主菜单总耗时: {total_seconds:.2f}s（含解释器启动）")
+    for phase in phases:
+        name, seconds = phase.split("=")
+        label = {"import": "模块导入", "init": "管道和菜单初始化"}.get(name, name)
+        print(f"   {label}: {float(seconds):.3f}s")
+    
+    print(f"\n📦 导入耗时最多的模块 (前{top}):")
+    for cumulative_us, name in sorted(modules, reverse=True)[:top]:
+        print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def run_batch_publish(pipeline: "ContentPipeline", args: argparse.Namespace) -> int:
+    """非交互式批量发布草稿，返回退出码（草稿不存在或有草稿发布失败时为1）"""
+    draft_paths = [Path(d) for d in args.batch] if args.batch else pipeline.list_drafts()
+    missing = [d for d in draft_paths if not d.exists()]
+    if missing:
+        print(f"❌ 草稿文件不存在: {', '.join(str(d) for d in missing)}")
+        return 1
+    if not draft_paths:
+        print("📝 没有找到可发布的草稿")
+        return 0
+    
+    if args.platforms:
+        platforms = [p.strip() for p in args.platforms.split(",") if p.strip()]
+    else:
+        platforms = [name for name, config in pipeline.config["platforms"].items()
+                     if config.get("enabled", False)]
+    
+    print(f"🚀 批量发布 {len(draft_paths)} 篇草稿到: {', '.join(platforms)}")
+    summary = pipeline.process_drafts_batch(
+        draft_paths,
+        platforms,
+        member_tier=args.tier,
+        max_workers=args.workers,
+    )
+    pipeline.display_batch_summary(summary)
+    return 1 if summary["failed"] else 0
+
+
 def run_shell_command(cmd, description="Command", timeout=300, check_result=True):
     """
     运行shell命令的辅助函数
@@ -279,6 +396,7 @@ def run_shell_command(cmd, description="Command", timeout=300, check_result=True
         subprocess.CompletedProcess对象
     """
     # 临时导入，避免循环依赖
+    from scripts.core.content_pipeline import ContentPipeline
     pipeline = ContentPipeline("config/pipeline_config.yml", verbose=False)
     
     try:
@@ -1308,13 +1308,15 @@ GPT-4和Claude等模型在理解能力、推理能力方面有了显著提升...
         options = [
             "1.1 发布新草稿",
             "1.2 重新发布已发布文章", 
-            "1.3 查看发布历史"
+            "1.3 查看发布历史",
+            "1.4 批量发布草稿"
         ]
         
         handlers = [
             self._publish_new_draft,
             self._republish_article,
-            self._view_publish_history
+            self._view_publish_history,
+            self._batch_publish_drafts
         ]
         
         return self.create_menu_loop_with_path(menu_title, menu_description, options, handlers, "1")
@@ -1376,6 +1378,54 @@ GPT-4和Claude等模型在理解能力、推理能力方面有了显著提升...
             time.sleep(2)  # 暂停2秒让用户看到错误信息
             return None
     
+    def _batch_publish_drafts(self) -> Optional[str]:
+        """批量并发发布多个草稿"""
+        self.log_action("智能发布：开始批量发布草稿")
+        
+        drafts = self.pipeline.list_drafts()
+        if not drafts:
+            print("📝 没有找到可发布的草稿")
+            self.pause_for_user()
+            return None
+        
+        print("\n可批量发布的草稿：")
+        for i, draft in enumerate(drafts, 1):
+            print(f"{i}. {draft.name}{self.pipeline.analyze_draft_status(draft)}")
+        self.pipeline.draft_cache.save()
+        
+        selection = input("\n请选择草稿 (多个用逗号分隔，a=全部，0退出): ").strip().lower()
+        if selection in ['', '0']:
+            return None
+        if selection == 'a':
+            selected = drafts
+        else:
+            selected = []
+            for sel in selection.split(","):
+                sel = sel.strip()
+                if sel.isdigit() and 1 <= int(sel) <= len(drafts):
+                    selected.append(drafts[int(sel) - 1])
+                elif sel:
+                    print(f"无效选择: {sel}")
+        if not selected:
+            print("❌ 未选择任何草稿")
+            self.pause_for_user()
+            return None
+        
+        platforms = self.pipeline.select_platforms()
+        if not platforms:
+            return None
+        member_tier = self.pipeline.select_member_tier()
+        
+        if not self.confirm_operation(f"确认批量发布 {len(selected)} 篇草稿到 {', '.join(platforms)}？"):
+            self.display_operation_cancelled()
+            return None
+        
+        summary = self.pipeline.process_drafts_batch(selected, platforms, member_tier=member_tier)
+        self.pipeline.display_batch_summary(summary)
+        self.log_action(f"批量发布完成: 成功{len(summary['succeeded'])}篇, 失败{len(summary['failed'])}篇")
+        self.pause_for_user()
+        return None
+    
     def _view_publish_history(self) -> Optional[str]:
         """查看发布历史"""
         print("\n📋 发布历史记录")
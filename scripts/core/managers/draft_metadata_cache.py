@@ -0,0 +1,181 @@
+"""
+草稿元数据缓存模块
+按文件路径+修改时间+大小缓存草稿的Front Matter解析结果和派生检查结果，
+草稿列表、状态分析和问题检查共用一份缓存，并持久化到磁盘供下次会话复用
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import frontmatter
+
+# 缓存格式版本，条目结构变化时递增使旧缓存失效
+CACHE_VERSION = 1
+
+# Front Matter块（用于计算正文起始偏移）
+FRONT_MATTER_PATTERN = re.compile(r'\A---[ \t]*\r?\n.*?^---[ \t]*(?:\r?\n|\Z)', re.DOTALL | re.MULTILINE)
+
+
+def _json_safe(value: Any) -> Any:
+    """将Front Matter值转换为可JSON序列化的形式（日期等转为字符串）"""
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class DraftMetadataCache:
+    """草稿元数据缓存 - 文件未修改时直接返回解析结果，无需重新读取和解析"""
+
+    def __init__(self, cache_file: str = ".build/cache/draft_metadata.json",
+                 fix_front_matter: Optional[Callable[[str], str]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初始化草稿元数据缓存
+
+        Args:
+            cache_file: 持久化缓存文件路径
+            fix_front_matter: Front Matter解析失败时的修复函数（返回修复后的内容）
+            logger: 日志记录器
+        """
+        self.cache_file = Path(cache_file)
+        self.fix_front_matter = fix_front_matter
+        self.logger = logger or logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """首次访问时从磁盘加载缓存"""
+        if self._entries is not None:
+            return self._entries
+        entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                entries = data.get("entries", {})
+        except (FileNotFoundError, json.JSONDecodeError, OSError, AttributeError):
+            pass
+        self._entries = entries
+        return entries
+
+    def _parse(self, content: str) -> Dict[str, Any]:
+        """解析草稿内容，返回Front Matter相关字段"""
+        entry: Dict[str, Any] = {
+            "has_front_matter": content.startswith('---'),
+            "metadata": None,
+            "body_offset": 0,
+            "parse_error": None,
+            "fixed": False,
+        }
+        if not entry["has_front_matter"]:
+            return entry
+
+        match = FRONT_MATTER_PATTERN.match(content)
+        if match:
+            entry["body_offset"] = match.end()
+
+        try:
+            entry["metadata"] = _json_safe(frontmatter.loads(content).metadata)
+        except Exception as e:
+            entry["parse_error"] = str(e)
+            if self.fix_front_matter:
+                try:
+                    fixed_content = self.fix_front_matter(content)
+                    entry["metadata"] = _json_safe(frontmatter.loads(fixed_content).metadata)
+                    entry["fixed"] = True
+                except Exception:
+                    pass
+        return entry
+
+    def get(self, path: Path,
+            fields: Optional[Dict[str, Callable[[str, Dict[str, Any]], Any]]] = None) -> Dict[str, Any]:
+        """
+        获取草稿元数据，文件修改后自动重新解析
+
+        Args:
+            path: 草稿文件路径
+            fields: 额外的派生字段及其计算函数 {字段名: f(content, entry)}，
+                缓存中缺失时读取文件计算一次并写回缓存
+
+        Returns:
+            缓存条目（has_front_matter/metadata/body_offset/parse_error/fixed及请求的派生字段）
+
+        Raises:
+            OSError: 文件无法读取
+        """
+        path = Path(path)
+        stat = path.stat()
+        key = str(path.resolve())
+        fields = fields or {}
+
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+                missing = [name for name in fields if name not in entry]
+                if not missing:
+                    self.hits += 1
+                    return entry
+            else:
+                entry = None
+                missing = list(fields)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        if entry is None:
+            self.misses += 1
+            entry = self._parse(content)
+            entry["mtime_ns"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+        else:
+            entry = dict(entry)
+        for name in missing:
+            entry[name] = _json_safe(fields[name](content, entry))
+
+        with self._lock:
+            self._entries[key] = entry
+            self._dirty = True
+        return entry
+
+    def retain(self, paths) -> None:
+        """只保留指定路径的条目（清理已删除或已发布草稿的缓存）"""
+        keep = {str(Path(p).resolve()) for p in paths}
+        with self._lock:
+            entries = self._load()
+            stale = [key for key in entries if key not in keep]
+            for key in stale:
+                del entries[key]
+            if stale:
+                self._dirty = True
+
+    def save(self) -> None:
+        """有变化时原子写入缓存文件"""
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            data = {"version": CACHE_VERSION, "entries": self._entries}
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_file.parent, suffix=".tmp")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_file)
+                self._dirty = False
+            except OSError as e:
+                self.logger.warning(f"写入草稿元数据缓存失败: {e}")
@@ -5,25 +5,87 @@ AI处理模块
 import logging
 import frontmatter
 # Path在未来可能需要
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
 from google.generativeai.generative_models import GenerativeModel
 from google.api_core.exceptions import ResourceExhausted
+from .ai_response_cache import AIResponseCache
+from .streaming_generation import stream_generate
 
 
 class AIProcessor:
     """AI处理器 - 负责AI相关的所有操作"""
     
-    def __init__(self, model: GenerativeModel, logger: Optional[logging.Logger] = None):
+    # 提示词模板版本，修改对应提示词时递增以使旧缓存失效
+    PROMPT_VERSIONS = {
+        "polish": 1,
+        "excerpt": 1,
+        "categories": 1,
+    }
+    
+    # 流式润色时输出超过原文的倍数即视为失控，提前中止
+    POLISH_ABORT_RATIO = 3
+    
+    def __init__(self, model: GenerativeModel, logger: Optional[logging.Logger] = None,
+                 cache: Optional[AIResponseCache] = None, stream: bool = False):
         """
         初始化AI处理器
         
         Args:
             model: Google Gemini模型实例
             logger: 日志记录器
+            cache: AI响应缓存（为None时不缓存）
+            stream: 长文本生成（润色）是否使用流式响应
         """
         self.model = model
         self.logger = logger or logging.getLogger(__name__)
         self.api_available = model is not None
+        self.cache = cache
+        self.stream = stream
+    
+    def _generate_text(self, template: str, prompt: str, stream: bool = False,
+                       on_chunk: Optional[Callable[[str, int], None]] = None,
+                       should_abort: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        调用模型生成文本，优先读取响应缓存
+        
+        Args:
+            template: 提示词模板名称（见 PROMPT_VERSIONS）
+            prompt: 完整提示词
+            stream: 是否流式生成（截断时续写，只缓存完整的结果）
+            on_chunk: 流式生成时每收到一块文本的回调 on_chunk(本块文本, 已生成总字数)
+            should_abort: 流式生成时判断是否提前中止的回调
+            
+        Returns:
+            响应文本，响应为空或流式生成被中止时返回None
+        """
+        cache_key = None
+        if self.cache and self.cache.enabled:
+            model_name = getattr(self.model, "model_name", "unknown")
+            cache_key = AIResponseCache.make_key(template, self.PROMPT_VERSIONS[template], model_name, prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.log(f"♻️ 命中AI响应缓存: {template}", level="debug")
+                return cached
+        
+        if stream:
+            # 只在达到最大输出长度时续写；润色结果不一定以总结性句子结尾
+            result = stream_generate(self.model, prompt, on_chunk=on_chunk, should_abort=should_abort,
+                                     require_complete_ending=False, logger=self.logger)
+            if result.aborted or not result.text:
+                return None
+            text = result.text
+            if not result.complete:
+                self.log(f"⚠️ AI生成内容可能不完整（{result.finish_reason or '结尾不完整'}），不写入缓存", level="warning")
+                return text
+        else:
+            response = self.model.generate_content(prompt)
+            if not (response and response.text):
+                return None
+            text = response.text
+        
+        if cache_key:
+            self.cache.set(cache_key, text, {"template": template, "model": getattr(self.model, "model_name", "unknown")})
+        return text
     
     def log(self, message: str, level: str = "info", force: bool = False) -> None:
         """
@@ -40,12 +102,14 @@ class AIProcessor:
             if force:
                 print(f"[{level.upper()}] {message}")
     
-    def polish_content(self, content: str) -> Optional[str]:
+    def polish_content(self, content: str,
+                       on_chunk: Optional[Callable[[str, int], None]] = None) -> Optional[str]:
         """
         使用AI润色文章内容
         
         Args:
             content: 原始内容
+            on_chunk: 流式生成时的进度回调 on_chunk(本块文本, 已生成总字数)
             
         Returns:
             润色后的内容，失败时返回原内容
@@ -85,11 +149,15 @@ class AIProcessor:
             {content_text}
             """
             
-            # 调用API
-            response = self.model.generate_content(prompt)
+            # 调用API（相同内容优先使用缓存）
+            max_chars = len(content_text) * self.POLISH_ABORT_RATIO
+            response_text = self._generate_text(
+                "polish", prompt, stream=self.stream, on_chunk=on_chunk,
+                should_abort=lambda text: len(text) > max_chars
+            )
             
-            if response and response.text:
-                polished_text = self.clean_ai_generated_content(response.text)
+            if response_text:
+                polished_text = self.clean_ai_generated_content(response_text)
                 
                 # 重新构建完整内容
                 post.content = polished_text
@@ -135,10 +203,10 @@ class AIProcessor:
             {content[:1000]}...
             """
             
-            response = self.model.generate_content(prompt)
+            response_text = self._generate_text("excerpt", prompt)
             
-            if response and response.text:
-                excerpt = response.text.strip()
+            if response_text:
+                excerpt = response_text.strip()
                 # 确保长度合适
                 if len(excerpt) > 100:
                     excerpt = excerpt[:97] + "..."
@@ -185,12 +253,12 @@ class AIProcessor:
             {content[:1500]}
             """
             
-            response = self.model.generate_content(prompt)
+            response_text = self._generate_text("categories", prompt)
             
-            if response and response.text:
+            if response_text:
                 import json
                 try:
-                    result = json.loads(response.text.strip())
+                    result = json.loads(response_text.strip())
                     categories = result.get('categories', [])
                     tags = result.get('tags', [])
                     
@@ -0,0 +1,77 @@
+"""
+AI响应缓存模块
+按提示词模板版本、模型名称和输入内容哈希缓存LLM响应，避免重复调用API
+"""
+import hashlib
+import json
+from typing import Optional, Dict, Any
+
+from .content_addressed_cache import ContentAddressedCache
+
+
+class AIResponseCache(ContentAddressedCache):
+    """AI响应磁盘缓存 - 每个响应一个JSON文件，支持容量和过期淘汰"""
+
+    SUFFIX = ".json"
+    LABEL = "AI响应缓存"
+    DEFAULT_DIR = ".build/cache/ai_responses"
+    DEFAULT_MAX_SIZE_MB = 50
+    DEFAULT_MAX_AGE_DAYS = 30
+    # 命令行 --no-ai-cache 或环境变量 AI_CACHE_BYPASS=1 时绕过缓存
+    BYPASS_ENV_VAR = "AI_CACHE_BYPASS"
+
+    @staticmethod
+    def make_key(template: str, template_version: int, model_name: str, text: str) -> str:
+        """
+        生成缓存键
+
+        Args:
+            template: 提示词模板名称
+            template_version: 提示词模板版本（修改提示词时递增，使旧缓存失效）
+            model_name: 模型名称
+            text: 输入文本（通常为完整提示词）
+
+        Returns:
+            缓存键（sha256十六进制）
+        """
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        raw = f"{template}:v{template_version}|{model_name}|{text_hash}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的响应文本
+
+        Returns:
+            缓存的响应文本，未命中或已过期时返回None
+        """
+        if not self.enabled:
+            return None
+
+        data = self._load(key)
+        try:
+            entry = json.loads(data) if data is not None else None
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            entry = None
+        if not isinstance(entry, dict):
+            self._count(hit=False)
+            return None
+
+        self._count(hit=True)
+        return entry.get("text")
+
+    def set(self, key: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        写入响应文本（原子写入，支持并发）
+
+        Args:
+            key: 缓存键
+            text: 响应文本
+            metadata: 附加元数据（模板名、模型名等，便于排查）
+        """
+        if not self.enabled or not text:
+            return
+
+        entry = dict(metadata or {})
+        entry["text"] = text
+        self._store(key, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
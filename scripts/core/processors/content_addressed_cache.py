@@ -0,0 +1,190 @@
+"""
+内容寻址磁盘缓存基类
+每个条目一个文件（文件名即缓存键），原子写入，按总大小做LRU淘汰，可选按保留天数过期。
+条目文件的修改时间即写入时间，是判断过期的唯一依据；命中时只更新访问时间，用于LRU淘汰。
+子类只负责缓存键的构造和条目内容的序列化（AI响应为JSON文本，TTS为音频字节）
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ContentAddressedCache:
+    """内容寻址磁盘缓存基类"""
+
+    SUFFIX = ".bin"                     # 条目文件后缀
+    LABEL = "缓存"                      # 日志中的缓存名称
+    DEFAULT_DIR = ".build/cache/misc"
+    DEFAULT_MAX_SIZE_MB: float = 100
+    DEFAULT_MAX_AGE_DAYS: Optional[float] = None   # None表示不过期，只按容量淘汰
+    BYPASS_ENV_VAR: Optional[str] = None           # 设为1/true/yes时绕过缓存
+    EVICT_EVERY_WRITES = 20             # 每写入多少个条目检查一次容量
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None, *,
+                 max_age_days: Optional[float] = None, enabled: bool = True,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录（默认 DEFAULT_DIR）
+            max_size_mb: 缓存总大小上限（MB），超出时按最久未使用淘汰
+            max_age_days: 条目最长保留天数（默认 DEFAULT_MAX_AGE_DAYS，0表示不过期）
+            enabled: 是否启用缓存（False时所有读写直接跳过）
+            logger: 日志记录器
+        """
+        if max_age_days is None:
+            max_age_days = self.DEFAULT_MAX_AGE_DAYS
+        self.cache_dir = Path(cache_dir or self.DEFAULT_DIR)
+        self.max_size_bytes = int((self.DEFAULT_MAX_SIZE_MB if max_size_mb is None else max_size_mb) * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 3600 if max_age_days else None
+        self.enabled = enabled
+        self.logger = logger or logging.getLogger(type(self).__module__)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.evict()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], bypass: bool = False,
+                    logger: Optional[logging.Logger] = None):
+        """
+        根据配置段（dir/max_size_mb/max_age_days/enabled）创建缓存实例
+
+        Args:
+            config: 缓存配置段
+            bypass: 是否绕过缓存（也可通过 BYPASS_ENV_VAR 环境变量）
+            logger: 日志记录器
+        """
+        if cls.BYPASS_ENV_VAR:
+            bypass = bypass or os.getenv(cls.BYPASS_ENV_VAR, "").lower() in ("1", "true", "yes")
+        return cls(
+            cache_dir=config.get("dir", cls.DEFAULT_DIR),
+            max_size_mb=config.get("max_size_mb", cls.DEFAULT_MAX_SIZE_MB),
+            max_age_days=config.get("max_age_days", cls.DEFAULT_MAX_AGE_DAYS),
+            enabled=config.get("enabled", True) and not bypass,
+            logger=logger,
+        )
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    def _count(self, hit: bool) -> None:
+        """记录一次命中或未命中"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _is_expired(self, written_at: float, now: float) -> bool:
+        """按写入时间（条目文件的修改时间）判断是否过期"""
+        return self.max_age_seconds is not None and now - written_at > self.max_age_seconds
+
+    def _load(self, key: str) -> Optional[bytes]:
+        """
+        读取条目的原始字节并更新访问时间（供LRU淘汰使用，保留修改时间即写入时间）
+
+        Returns:
+            条目字节，缓存禁用、条目不存在或已过期时返回None（命中统计由子类在解析后记录）
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path_for(key)
+        try:
+            stat = path.stat()
+            now = time.time()
+            if self._is_expired(stat.st_mtime, now):
+                path.unlink(missing_ok=True)
+                return None
+            data = path.read_bytes()
+        except OSError:
+            return None
+
+        try:
+            os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+        except OSError:
+            pass
+        return data
+
+    def _store(self, key: str, data: bytes) -> None:
+        """原子写入条目（先写临时文件再替换，支持并发写入同一键）"""
+        if not self.enabled or not data:
+            return
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path_for(key))
+        except OSError as e:
+            self.logger.warning(f"写入{self.LABEL}失败: {e}")
+            return
+
+        # 每写入一定数量后检查一次容量，避免每次写入都扫描目录
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % self.EVICT_EVERY_WRITES == 0
+        if should_evict:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path, float]]:
+        """所有条目的 (访问时间, 大小, 路径, 写入时间)"""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path, stat.st_mtime))
+        return entries
+
+    def evict(self) -> int:
+        """
+        淘汰过期条目，并在总大小超限时按最久未使用淘汰
+
+        Returns:
+            删除的条目数
+        """
+        if not self.enabled:
+            return 0
+
+        with self._lock:
+            entries = []
+            removed = 0
+            now = time.time()
+            for accessed_at, size, path, written_at in self._entries():
+                if self._is_expired(written_at, now):
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                else:
+                    entries.append((accessed_at, size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            if total_size > self.max_size_bytes:
+                for _, size, path in sorted(entries):
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                    total_size -= size
+                    if total_size <= self.max_size_bytes:
+                        break
+
+            if removed:
+                self.logger.debug(f"{self.LABEL}淘汰 {removed} 个条目")
+            return removed
+
+    def clear(self) -> None:
+        """清空缓存"""
+        for _, _, path, _ in self._entries():
+            path.unlink(missing_ok=True)
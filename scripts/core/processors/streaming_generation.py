@@ -0,0 +1,161 @@
+"""
+流式生成模块
+逐块消费Gemini的流式响应并实时回调输出进度，
+生成过程中检测截断：达到最大输出长度时从中断处续写，而不是整篇重新生成；
+调用方判断输出已无价值时可提前中止，避免继续消耗token；
+用户按Ctrl+C时抛出 StreamInterrupted（携带已生成的部分文本），调用方不会把它当作普通失败继续执行
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+# 续写提示词：只补全剩余部分，不重复已输出内容
+CONTINUE_PROMPT = "上面的内容在中途被截断了。请从中断处直接继续写完，不要重复已输出的内容，也不要添加任何说明。"
+
+# 结尾特征（标点或常见的总结性词语）
+ENDING_INDICATORS = (
+    '？', '。', '！',  # 中文标点
+    '?', '.', '!',     # 英文标点
+    '思考', '总结', '结论', '展望', '未来',
+    '问题', '挑战', '机遇', '发展'
+)
+SENTENCE_END_PUNCTUATION = ('。', '？', '！', '.', '?', '!')
+
+
+def has_complete_ending(content: str) -> bool:
+    """检查文章是否有完整的结尾"""
+    content = content.strip()
+    if not content:
+        return False
+
+    # 最后5行需包含结尾标识，且最后一行看起来是完整的句子
+    lines = content.split('\n')
+    last_lines = '\n'.join(lines[-5:])
+    has_ending_word = any(indicator in last_lines for indicator in ENDING_INDICATORS)
+
+    last_line = lines[-1].strip()
+    is_complete_sentence = len(last_line) > 10 and any(punct in last_line for punct in SENTENCE_END_PUNCTUATION)
+
+    return has_ending_word and is_complete_sentence
+
+
+@dataclass
+class StreamResult:
+    """流式生成结果"""
+    text: str = ""
+    finish_reason: Optional[str] = None   # 最后一次请求的结束原因（STOP/MAX_TOKENS/SAFETY等）
+    complete: bool = False                # 未中止、未截断且结尾完整
+    aborted: bool = False                 # 被should_abort回调提前中止
+    continuations: int = 0                # 续写次数
+
+    @property
+    def truncated(self) -> bool:
+        """是否因达到最大输出长度而截断"""
+        return self.finish_reason == "MAX_TOKENS"
+
+
+class StreamInterrupted(KeyboardInterrupt):
+    """用户按Ctrl+C中断了流式生成（仍是KeyboardInterrupt，未捕获时照常终止程序）"""
+
+    def __init__(self, result: StreamResult):
+        super().__init__(f"流式生成被用户中断（已生成 {len(result.text)} 字）")
+        self.result = result
+
+
+def _chunk_text(chunk: Any) -> str:
+    """读取响应块文本（被安全过滤或没有内容的块访问text会抛出ValueError）"""
+    try:
+        return chunk.text or ""
+    except (ValueError, AttributeError, IndexError):
+        return ""
+
+
+def _finish_reason(chunk: Any) -> Optional[str]:
+    """读取响应块的结束原因名称（中间块没有结束原因）"""
+    try:
+        reason = chunk.candidates[0].finish_reason
+    except (AttributeError, IndexError, TypeError):
+        return None
+    if not reason:
+        return None
+    return getattr(reason, "name", str(reason))
+
+
+def stream_generate(model: Any, prompt: str, *,
+                    on_chunk: Optional[Callable[[str, int], None]] = None,
+                    should_abort: Optional[Callable[[str], bool]] = None,
+                    max_continuations: int = 1,
+                    require_complete_ending: bool = True,
+                    logger: Optional[logging.Logger] = None,
+                    **generate_kwargs) -> StreamResult:
+    """
+    流式调用模型生成文本
+
+    Args:
+        model: Gemini模型实例
+        prompt: 提示词
+        on_chunk: 每收到一块文本时调用 on_chunk(本块文本, 已生成总字数)
+        should_abort: 每收到一块文本后以已生成的全文调用，返回True时立即中止
+        max_continuations: 截断时最多续写的次数
+        require_complete_ending: 是否用 has_complete_ending 判断结尾完整（短文本/JSON输出应关闭）；
+            只有响应没有给出结束原因时才据此续写，正常结束（STOP）的内容不会被续写
+        logger: 日志记录器
+        **generate_kwargs: 透传给 generate_content 的参数（generation_config、safety_settings等）
+
+    Returns:
+        StreamResult
+
+    Raises:
+        StreamInterrupted: 用户按Ctrl+C中断生成，result 中保存已生成的部分文本
+    """
+    logger = logger or logging.getLogger(__name__)
+    result = StreamResult()
+    text = ""
+    contents: Any = prompt
+
+    try:
+        while True:
+            result.finish_reason = None
+            for chunk in model.generate_content(contents, stream=True, **generate_kwargs):
+                result.finish_reason = _finish_reason(chunk) or result.finish_reason
+                piece = _chunk_text(chunk)
+                if not piece:
+                    continue
+                text += piece
+                if on_chunk:
+                    on_chunk(piece, len(text))
+                if should_abort and should_abort(text):
+                    result.aborted = True
+                    break
+
+            if result.aborted or not text.strip():
+                break
+            # 只有确认被截断（或未返回结束原因且结尾不完整）时才续写，避免在已完成的内容后追加
+            incomplete = result.truncated or (
+                result.finish_reason is None and require_complete_ending and not has_complete_ending(text)
+            )
+            if not incomplete or result.continuations >= max_continuations:
+                break
+
+            # 在已生成内容的基础上续写，只为缺失的部分消耗token
+            result.continuations += 1
+            logger.info(f"生成内容不完整（{result.finish_reason or '结尾不完整'}），从中断处续写"
+                        f"（第{result.continuations}次）")
+            contents = [
+                {"role": "user", "parts": [prompt]},
+                {"role": "model", "parts": [text]},
+                {"role": "user", "parts": [CONTINUE_PROMPT]},
+            ]
+    except KeyboardInterrupt:
+        result.text = text
+        result.aborted = True
+        logger.warning(f"流式生成被用户中断（已生成 {len(text)} 字）")
+        raise StreamInterrupted(result)
+
+    if result.aborted:
+        logger.warning(f"流式生成已提前中止（已生成 {len(text)} 字）")
+
+    result.text = text
+    result.complete = (not result.aborted and bool(text.strip()) and not result.truncated
+                       and (not require_complete_ending or has_complete_ending(text)))
+    return result
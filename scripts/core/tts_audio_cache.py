@@ -0,0 +1,127 @@
+"""
+TTS音频缓存模块
+按引擎、声音、模型、声音参数和规范化文本缓存合成的音频片段，
+修改播客脚本后重新生成时只需为改动的句子调用TTS服务
+"""
+import argparse
+import hashlib
+import json
+import re
+from typing import Optional, Dict, Any
+
+try:
+    from scripts.core.processors.content_addressed_cache import ContentAddressedCache
+except ImportError:
+    from processors.content_addressed_cache import ContentAddressedCache  # type: ignore  # 直接运行本文件时
+
+
+class TTSAudioCache(ContentAddressedCache):
+    """TTS音频片段磁盘缓存 - 内容寻址，按总大小做LRU淘汰"""
+
+    SUFFIX = ".audio"
+    LABEL = "TTS音频缓存"
+    DEFAULT_DIR = ".build/cache/tts_audio"
+    DEFAULT_MAX_SIZE_MB = 500
+    BYPASS_ENV_VAR = "TTS_CACHE_BYPASS"
+
+    def __init__(self, *args, **kwargs):
+        """参数同 ContentAddressedCache，另外统计本次运行从缓存读取的音频字节数"""
+        super().__init__(*args, **kwargs)
+        self.bytes_saved = 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """规范化文本：合并空白，去除首尾空白，避免排版差异导致缓存失效"""
+        return re.sub(r'\s+', ' ', text).strip()
+
+    @classmethod
+    def make_key(cls, engine: str, voice_id: str, model_id: str,
+                 voice_settings: Optional[Dict[str, Any]], text: str) -> str:
+        """
+        生成缓存键
+
+        Args:
+            engine: TTS引擎名称（elevenlabs、gtts等）
+            voice_id: 声音ID（gTTS为语言代码）
+            model_id: 模型ID
+            voice_settings: 声音参数
+            text: 合成文本
+
+        Returns:
+            缓存键（sha256十六进制）
+        """
+        raw = json.dumps({
+            "engine": engine,
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "voice_settings": voice_settings or {},
+            "text": cls.normalize_text(text),
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        读取缓存的音频数据
+
+        Returns:
+            音频字节，未命中时返回None
+        """
+        if not self.enabled:
+            return None
+
+        data = self._load(key)
+        self._count(hit=data is not None)
+        if data is not None:
+            with self._lock:
+                self.bytes_saved += len(data)
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """写入音频数据（原子写入，支持并发）"""
+        self._store(key, data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        sizes = [size for _, size, _, _ in self._entries()]
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(sizes),
+            "total_size_mb": sum(sizes) / (1024 * 1024),
+            "max_size_mb": self.max_size_bytes / (1024 * 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_mb": self.bytes_saved / (1024 * 1024),
+        }
+
+    def format_stats(self) -> str:
+        """生成缓存统计报告"""
+        stats = self.get_stats()
+        return (
+            f"💾 TTS缓存: {stats['entries']} 个片段, "
+            f"{stats['total_size_mb']:.1f}/{stats['max_size_mb']:.0f} MB, "
+            f"本次命中 {stats['hits']} / 未命中 {stats['misses']} "
+            f"(命中率 {stats['hit_rate']:.0%}, 节省 {stats['saved_mb']:.1f} MB)"
+        )
+
+
+def main():
+    """命令行入口：查看或清理TTS音频缓存"""
+    parser = argparse.ArgumentParser(description='TTS音频缓存管理')
+    parser.add_argument('--dir', default='.build/cache/tts_audio', help='缓存目录')
+    parser.add_argument('--stats', action='store_true', help='显示缓存统计')
+    parser.add_argument('--clear', action='store_true', help='清空缓存')
+
+    args = parser.parse_args()
+    cache = TTSAudioCache(cache_dir=args.dir)
+
+    if args.clear:
+        cache.clear()
+        print("🗑️ TTS音频缓存已清空")
+    else:
+        print(cache.format_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 提供统一的内容验证和质量检查功能
 """
 
+from typing import TYPE_CHECKING
+
 from .content_validator import (
     ContentValidator,
     ValidationResult,
@@ -11,6 +13,8 @@ from .content_validator import (
     ValidationSummary,
     ValidatorRegistry,
     CompositeValidator,
+    ParsedDocument,
+    parse_document,
     validator_registry
 )
 
@@ -18,6 +22,10 @@ from .frontmatter_validator import FrontMatterValidator
 from .image_validator import ImageValidator  
 from .structure_validator import StructureValidator
 from .quality_validator import QualityValidator
+from .text_analysis import TextModel, analyze_text
+
+if TYPE_CHECKING:
+    from .site_validator import SiteValidator
 
 __all__ = [
     'ContentValidator',
@@ -27,9 +35,22 @@ __all__ = [
     'ValidationSummary',
     'ValidatorRegistry',
     'CompositeValidator',
+    'ParsedDocument',
+    'parse_document',
     'validator_registry',
     'FrontMatterValidator',
     'ImageValidator',
     'StructureValidator', 
-    'QualityValidator'
-]
\ No newline at end of file
+    'QualityValidator',
+    'SiteValidator',
+    'TextModel',
+    'analyze_text'
+]
+
+
+def __getattr__(name):
+    # SiteValidator延迟导入，避免 python -m scripts.core.validators.site_validator 时模块被重复导入
+    if name == 'SiteValidator':
+        from .site_validator import SiteValidator
+        return SiteValidator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
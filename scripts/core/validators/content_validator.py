@@ -4,11 +4,14 @@
 """
 import logging
 from abc import ABC, abstractmethod
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+import frontmatter
+
 
 class ValidationSeverity(Enum):
     """验证问题严重级别"""
@@ -46,11 +49,62 @@ class ValidationRule:
     description: str
     severity: ValidationSeverity
     enabled: bool = True
+
+
+@dataclass(frozen=True)
+class ParsedDocument:
+    """解析后的文档 - 同一内容只解析一次，所有验证器共用"""
+    content: str
+    body: str
+    has_frontmatter: bool
+    
+    @cached_property
+    def _frontmatter_result(self) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+        """首次访问时解析YAML（只需要正文的验证器不付出解析开销）"""
+        if not self.has_frontmatter:
+            return None, None
+        try:
+            return frontmatter.loads(self.content).metadata, None
+        except Exception as e:
+            return None, e
+    
+    @property
+    def frontmatter(self) -> Optional[Dict[str, Any]]:
+        """Front Matter字段（不存在或解析失败时为None）"""
+        return self._frontmatter_result[0]
+    
+    @property
+    def frontmatter_error(self) -> Optional[Exception]:
+        """Front Matter解析错误"""
+        return self._frontmatter_result[1]
+
+
+@lru_cache(maxsize=32)
+def parse_document(content: str) -> ParsedDocument:
+    """
+    解析文档的Front Matter和正文（按内容缓存，多个验证器验证同一文档时只解析一次）
+    
+    Args:
+        content: 文档完整内容
+        
+    Returns:
+        ParsedDocument（Front Matter在首次访问时解析，失败时frontmatter为None并记录frontmatter_error）
+    """
+    has_frontmatter = content.strip().startswith('---')
+    body = content
+    if has_frontmatter:
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            body = parts[2].strip()
+    return ParsedDocument(content, body, has_frontmatter)
     
     
 class ContentValidator(ABC):
     """内容验证器抽象基类"""
     
+    # 验证规则版本，修改规则逻辑时递增，使全站验证缓存失效
+    VERSION = 1
+    
     def __init__(self, logger: Optional[logging.Logger] = None):
         self.logger = logger or logging.getLogger(__name__)
         self.rules: List[ValidationRule] = []
@@ -80,6 +134,21 @@ class ContentValidator(ABC):
                 location=str(file_path)
             )]
     
+    @property
+    def version_key(self) -> str:
+        """验证器版本标识（验证器版本或禁用的规则变化时改变）"""
+        disabled = ",".join(sorted(rule.name for rule in self.rules if not rule.enabled))
+        return f"{type(self).__name__}:{self.VERSION}:{disabled}"
+    
+    def dependencies(self, content: str) -> Dict[str, Any]:
+        """
+        验证结果依赖的外部文件状态（全站验证缓存的一部分）
+        
+        Returns:
+            {文件路径: [修改时间, 大小]}，文件不存在时值为None；只依赖内容本身的验证器返回空字典
+        """
+        return {}
+    
     def get_rule(self, rule_name: str) -> Optional[ValidationRule]:
         """获取指定规则"""
         return next((rule for rule in self.rules if rule.name == rule_name), None)
@@ -202,6 +271,14 @@ class ValidatorRegistry:
         """列出所有验证器"""
         return list(self._validators.keys())
     
+    def validators(self) -> Dict[str, ContentValidator]:
+        """获取所有已注册的验证器（名称到实例的映射副本）"""
+        return dict(self._validators)
+    
+    def versions(self) -> Dict[str, str]:
+        """获取所有验证器的版本标识"""
+        return {name: validator.version_key for name, validator in self._validators.items()}
+    
     def validate_with_all(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> ValidationSummary:
         """使用所有验证器验证内容"""
         all_results = []
@@ -10,7 +10,8 @@ from .content_validator import (
     ContentValidator,
     ValidationResult,
     ValidationSeverity,
-    ValidationRule
+    ValidationRule,
+    parse_document
 )
 
 
@@ -91,15 +92,14 @@ class FrontMatterValidator(ContentValidator):
             ))
             return results
         
-        # 解析Front Matter
-        try:
-            post = frontmatter.loads(content)
-            fm_data = post.metadata
-        except Exception as e:
+        # 解析Front Matter（与其他验证器共用同一次解析）
+        document = parse_document(content)
+        fm_data = document.frontmatter
+        if document.frontmatter_error is not None:
             results.append(ValidationResult(
                 rule_name="frontmatter_format",
                 severity=ValidationSeverity.ERROR,
-                message=f"Front Matter格式错误: {str(e)}",
+                message=f"Front Matter格式错误: {str(document.frontmatter_error)}",
                 suggestion="检查YAML格式是否正确，确保引号配对、缩进正确"
             ))
             # 尝试修复并重新解析
@@ -118,6 +118,8 @@ class FrontMatterValidator(ContentValidator):
                     return results
             else:
                 return results
+        if fm_data is None:
+            return results
         
         # 检查必需字段
         missing_fields = [field for field in self.required_fields if field not in fm_data or not fm_data[field]]
@@ -64,8 +64,31 @@ class ImageValidator(ContentValidator):
     def validate_content(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> List[ValidationResult]:
         """验证图片相关问题"""
         results = []
+        found_images = self._find_images(content)
         
-        # 查找所有图片引用
+        # 验证每个图片
+        for img in found_images:
+            img_results = self._validate_single_image(img)
+            results.extend(img_results)
+        
+        # 检查是否使用了正确的Jekyll baseurl
+        if not self._uses_jekyll_baseurl(content):
+            has_relative_paths = any(
+                not img['url'].startswith(('http', 'https', '//')) 
+                for img in found_images
+            )
+            if has_relative_paths:
+                results.append(ValidationResult(
+                    rule_name="liquid_syntax",
+                    severity=ValidationSeverity.WARNING,
+                    message="建议使用Jekyll baseurl语法",
+                    suggestion="使用 {{ site.baseurl }}/assets/images/... 格式确保部署兼容性"
+                ))
+        
+        return results
+    
+    def _find_images(self, content: str) -> List[Dict[str, Any]]:
+        """查找所有图片引用"""
         image_patterns = [
             r'!\[([^\]]*)\]\(([^)]+)\)',  # Markdown语法: ![alt](url)
             r'<img[^>]+src=["\'](([^"\']+))["\'][^>]*>',  # HTML img标签
@@ -93,26 +116,7 @@ class ImageValidator(ContentValidator):
                     'end': match.end()
                 })
         
-        # 验证每个图片
-        for img in found_images:
-            img_results = self._validate_single_image(img)
-            results.extend(img_results)
-        
-        # 检查是否使用了正确的Jekyll baseurl
-        if not self._uses_jekyll_baseurl(content):
-            has_relative_paths = any(
-                not img['url'].startswith(('http', 'https', '//')) 
-                for img in found_images
-            )
-            if has_relative_paths:
-                results.append(ValidationResult(
-                    rule_name="liquid_syntax",
-                    severity=ValidationSeverity.WARNING,
-                    message="建议使用Jekyll baseurl语法",
-                    suggestion="使用 {{ site.baseurl }}/assets/images/... 格式确保部署兼容性"
-                ))
-        
-        return results
+        return found_images
     
     def _validate_single_image(self, img_info: Dict[str, str]) -> List[ValidationResult]:
         """验证单个图片"""
@@ -177,6 +181,23 @@ class ImageValidator(ContentValidator):
         
         return results
     
+    def dependencies(self, content: str) -> Dict[str, Any]:
+        """引用的本地图片文件状态（存在性和大小检查依赖这些文件）"""
+        deps: Dict[str, Any] = {}
+        for img in self._find_images(content):
+            url = img['url']
+            if self._is_windows_path(url) or self._is_external_url(url) or url.startswith('{{'):
+                continue
+            local_path = self._resolve_local_path(url)
+            if not local_path:
+                continue
+            try:
+                stat = local_path.stat()
+                deps[local_path.as_posix()] = [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                deps[local_path.as_posix()] = None
+        return deps
+    
     def _is_windows_path(self, path: str) -> bool:
         """检查是否是Windows路径"""
         return bool(re.match(r'^[a-zA-Z]:[/\\]', path))
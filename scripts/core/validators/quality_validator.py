@@ -2,7 +2,6 @@
 内容质量验证器
 检查内容的质量、可读性和完整性
 """
-import re
 from typing import Dict, Any, List, Optional
 from collections import Counter
 
@@ -10,8 +9,10 @@ from .content_validator import (
     ContentValidator,
     ValidationResult,
     ValidationSeverity,
-    ValidationRule
+    ValidationRule,
+    parse_document
 )
+from .text_analysis import TextModel, analyze_text
 
 
 class QualityValidator(ContentValidator):
@@ -71,97 +72,55 @@ class QualityValidator(ContentValidator):
         """验证内容质量"""
         results = []
         
-        # 提取正文内容
-        body_content = self._extract_body_content(content)
+        # 提取正文内容并构建分析模型（与结构验证器共用）
+        text = analyze_text(self._extract_body_content(content))
         
         # 检查字数和可读性
-        word_stats = self._analyze_word_statistics(body_content)
-        readability_results = self._check_readability(body_content, word_stats)
+        word_stats = self._analyze_word_statistics(text)
+        readability_results = self._check_readability(text, word_stats)
         results.extend(readability_results)
         
         # 检查句子长度
-        sentence_results = self._check_sentence_length(body_content)
+        sentence_results = self._check_sentence_length(text)
         results.extend(sentence_results)
         
         # 检查内容重复
-        repetition_results = self._check_repetition(body_content)
+        repetition_results = self._check_repetition(text)
         results.extend(repetition_results)
         
         # 检查内容完整性
-        completeness_results = self._check_completeness(content)
+        completeness_results = self._check_completeness(text)
         results.extend(completeness_results)
         
         # 检查格式一致性
-        formatting_results = self._check_formatting_consistency(body_content)
+        formatting_results = self._check_formatting_consistency(text)
         results.extend(formatting_results)
         
         # 检查语言质量
-        language_results = self._check_language_quality(body_content)
+        language_results = self._check_language_quality(text)
         results.extend(language_results)
         
         # 检查技术术语
-        tech_results = self._check_technical_terms(body_content)
+        tech_results = self._check_technical_terms(text)
         results.extend(tech_results)
         
         # 检查行动号召
-        cta_results = self._check_call_to_action(body_content)
+        cta_results = self._check_call_to_action(text)
         results.extend(cta_results)
         
         return results
     
     def _extract_body_content(self, content: str) -> str:
         """提取正文内容"""
-        if content.strip().startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                return parts[2].strip()
-        return content
+        return parse_document(content).body
     
-    def _analyze_word_statistics(self, content: str) -> Dict[str, Any]:
+    def _analyze_word_statistics(self, text: TextModel) -> Dict[str, Any]:
         """分析文字统计信息"""
-        # 清理内容
-        clean_text = self._clean_text_for_analysis(content)
-        
-        # 中文字符统计
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', clean_text))
-        
-        # 英文单词统计
-        english_words = len(re.findall(r'\b[a-zA-Z]+\b', clean_text))
-        
-        # 句子统计
-        sentences = re.split(r'[.!?。！？]+', clean_text)
-        sentence_count = len([s for s in sentences if s.strip()])
-        
-        # 段落统计
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-        paragraph_count = len(paragraphs)
-        
-        return {
-            'chinese_chars': chinese_chars,
-            'english_words': english_words,
-            'total_words': chinese_chars + english_words,
-            'sentence_count': sentence_count,
-            'paragraph_count': paragraph_count,
-            'clean_text': clean_text
-        }
+        stats: Dict[str, Any] = dict(text.word_stats)
+        stats['clean_text'] = text.analysis_text
+        return stats
     
-    def _clean_text_for_analysis(self, content: str) -> str:
-        """清理文本用于分析"""
-        # 移除Markdown语法
-        clean = re.sub(r'```.*?```', '', content, flags=re.DOTALL)  # 代码块
-        clean = re.sub(r'`[^`]*`', '', clean)                       # 内联代码
-        clean = re.sub(r'!\[[^\]]*\]\([^)]*\)', '', clean)          # 图片
-        clean = re.sub(r'\[[^\]]*\]\([^)]*\)', '', clean)           # 链接
-        clean = re.sub(r'^#+\s*', '', clean, flags=re.MULTILINE)    # 标题
-        clean = re.sub(r'^\s*[-*+]\s*', '', clean, flags=re.MULTILINE)  # 列表
-        clean = re.sub(r'^\s*>\s*', '', clean, flags=re.MULTILINE)  # 引用
-        clean = re.sub(r'\*\*([^*]*)\*\*', r'\1', clean)           # 粗体
-        clean = re.sub(r'\*([^*]*)\*', r'\1', clean)               # 斜体
-        clean = re.sub(r'~~([^~]*)~~', r'\1', clean)               # 删除线
-        
-        return clean
-    
-    def _check_readability(self, content: str, stats: Dict[str, Any]) -> List[ValidationResult]:
+    def _check_readability(self, text: TextModel, stats: Dict[str, Any]) -> List[ValidationResult]:
         """检查可读性"""
         results = []
         
@@ -213,16 +172,12 @@ class QualityValidator(ContentValidator):
         
         return results
     
-    def _check_sentence_length(self, content: str) -> List[ValidationResult]:
+    def _check_sentence_length(self, text: TextModel) -> List[ValidationResult]:
         """检查句子长度"""
         results = []
-        
-        # 分割句子
-        sentences = re.split(r'[.!?。！？]+', content)
         long_sentences = []
         
-        for sentence in sentences:
-            sentence = sentence.strip()
+        for sentence in text.sentences:
             if len(sentence) > 100:  # 超过100字符的句子
                 long_sentences.append(sentence[:50] + "...")
         
@@ -236,13 +191,12 @@ class QualityValidator(ContentValidator):
         
         return results
     
-    def _check_repetition(self, content: str) -> List[ValidationResult]:
+    def _check_repetition(self, text: TextModel) -> List[ValidationResult]:
         """检查内容重复"""
         results = []
         
         # 检查词语重复
-        words = re.findall(r'[\u4e00-\u9fff]+|\b[a-zA-Z]+\b', content.lower())
-        word_counts = Counter(words)
+        word_counts = Counter(text.word_tokens)
         
         # 找出高频词（排除常见词）
         common_words = {'的', '了', '是', '在', '和', '有', '一', '这', '我', '们', '你', '他', '她', '它',
@@ -260,8 +214,7 @@ class QualityValidator(ContentValidator):
             ))
         
         # 检查句子重复
-        sentences = [s.strip() for s in re.split(r'[.!?。！？]+', content) if s.strip()]
-        sentence_counts = Counter(sentences)
+        sentence_counts = Counter(text.sentences)
         repeated_sentences = [(s, c) for s, c in sentence_counts.items() if c > 1 and len(s) > 10]
         
         if repeated_sentences:
@@ -274,17 +227,17 @@ class QualityValidator(ContentValidator):
         
         return results
     
-    def _check_completeness(self, content: str) -> List[ValidationResult]:
+    def _check_completeness(self, text: TextModel) -> List[ValidationResult]:
         """检查内容完整性"""
         results = []
         
         # 检查是否有结论
-        body_content = self._extract_body_content(content)
+        body_content = text.body
         
         conclusion_indicators = ['总结', '结论', '综上', '最后', '总的来说', '总而言之', 
                                'conclusion', 'summary', 'in conclusion', 'to summarize']
         
-        has_conclusion = any(indicator in body_content.lower() for indicator in conclusion_indicators)
+        has_conclusion = any(indicator in text.lower for indicator in conclusion_indicators)
         
         if not has_conclusion and len(body_content) > 500:
             results.append(ValidationResult(
@@ -295,7 +248,7 @@ class QualityValidator(ContentValidator):
             ))
         
         # 检查是否有引言
-        first_paragraph = body_content.split('\n\n')[0] if '\n\n' in body_content else body_content[:200]
+        first_paragraph = text.paragraphs[0] if '\n\n' in body_content else body_content[:200]
         intro_indicators = ['本文', '本篇', '这篇文章', '今天', '我们将', '让我们', 
                            'this article', 'in this post', 'today we']
         
@@ -311,26 +264,23 @@ class QualityValidator(ContentValidator):
         
         return results
     
-    def _check_formatting_consistency(self, content: str) -> List[ValidationResult]:
+    def _check_formatting_consistency(self, text: TextModel) -> List[ValidationResult]:
         """检查格式一致性"""
         results = []
         
         # 检查列表标记一致性
-        list_markers = re.findall(r'^(\s*)([-*+])\s', content, re.MULTILINE)
-        if list_markers:
-            markers = [marker[1] for marker in list_markers]
-            unique_markers = set(markers)
+        if text.list_markers:
+            unique_markers = set(text.list_markers)
             if len(unique_markers) > 1:
                 results.append(ValidationResult(
                     rule_name="formatting_consistency",
                     severity=ValidationSeverity.INFO,
-                    message=f"使用了多种列表标记: {', '.join(unique_markers)}",
+                    message=f"使用了多种列表标记: {', '.join(sorted(unique_markers))}",
                     suggestion="建议在整篇文章中使用一致的列表标记"
                 ))
         
         # 检查强调标记一致性
-        bold_single = len(re.findall(r'\*[^*]+\*(?!\*)', content))
-        bold_double = len(re.findall(r'\*\*[^*]+\*\*', content))
+        bold_single, bold_double = text.emphasis_counts
         
         if bold_single > 0 and bold_double > 0:
             results.append(ValidationResult(
@@ -342,7 +292,7 @@ class QualityValidator(ContentValidator):
         
         return results
     
-    def _check_language_quality(self, content: str) -> List[ValidationResult]:
+    def _check_language_quality(self, text: TextModel) -> List[ValidationResult]:
         """检查语言质量"""
         results = []
         
@@ -350,17 +300,15 @@ class QualityValidator(ContentValidator):
         issues = []
         
         # 检查重复标点
-        if re.search(r'[。！？]{2,}', content):
+        if text.has_repeated_punctuation:
             issues.append("重复标点符号")
         
         # 检查空格使用（中英文之间）
-        if re.search(r'[\u4e00-\u9fff][a-zA-Z]|[a-zA-Z][\u4e00-\u9fff]', content):
-            space_issues = len(re.findall(r'[\u4e00-\u9fff][a-zA-Z]|[a-zA-Z][\u4e00-\u9fff]', content))
-            if space_issues > 3:  # 允许少量不规范
-                issues.append("中英文之间缺少空格")
+        if text.cjk_latin_adjacent_count > 3:  # 允许少量不规范
+            issues.append("中英文之间缺少空格")
         
         # 检查全角半角混用
-        if re.search(r'[，。！？].*[,\.!?]|[,\.!?].*[，。！？]', content):
+        if text.has_mixed_punctuation:
             issues.append("全角半角标点混用")
         
         if issues:
@@ -373,13 +321,12 @@ class QualityValidator(ContentValidator):
         
         return results
     
-    def _check_technical_terms(self, content: str) -> List[ValidationResult]:
+    def _check_technical_terms(self, text: TextModel) -> List[ValidationResult]:
         """检查技术术语使用"""
         results = []
         
         # 检查是否定义了专业术语
-        tech_terms = re.findall(r'\b[A-Z]{2,}\b|\b[A-Z][a-z]*[A-Z][A-Za-z]*\b', content)
-        unique_terms = list(set(term for term in tech_terms if len(term) > 2))
+        unique_terms = list(set(term for term in text.tech_terms if len(term) > 2))
         
         if len(unique_terms) > 5:
             results.append(ValidationResult(
@@ -391,7 +338,7 @@ class QualityValidator(ContentValidator):
         
         return results
     
-    def _check_call_to_action(self, content: str) -> List[ValidationResult]:
+    def _check_call_to_action(self, text: TextModel) -> List[ValidationResult]:
         """检查行动号召"""
         results = []
         
@@ -401,9 +348,9 @@ class QualityValidator(ContentValidator):
                          'follow', 'subscribe', 'share', 'comment', 'like', 
                          'bookmark', 'contact', 'learn more', 'visit', 'download']
         
-        has_cta = any(indicator in content.lower() for indicator in cta_indicators)
+        has_cta = any(indicator in text.lower for indicator in cta_indicators)
         
-        if not has_cta and len(content) > 800:
+        if not has_cta and len(text.body) > 800:
             results.append(ValidationResult(
                 rule_name="call_to_action",
                 severity=ValidationSeverity.INFO,
@@ -0,0 +1,262 @@
+"""
+全站内容验证
+使用进程池并发验证 _posts 和 _drafts 下的所有文章，
+内容哈希、验证器版本和引用的本地文件（如图片）均未变化的文件直接复用上次的验证结果
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .content_validator import (
+    ContentValidator,
+    ValidationResult,
+    ValidationSeverity,
+    ValidationSummary,
+    ValidatorRegistry,
+    validator_registry
+)
+
+DEFAULT_SITE_PATHS = ("_posts", "_drafts")
+DEFAULT_CACHE_FILE = ".build/cache/site_validation.json"
+
+# 缓存格式版本，结果结构变化时递增
+CACHE_VERSION = 2
+
+# 工作进程中的验证器（由进程池初始化函数设置，每个进程只反序列化一次）
+_worker_validators: Dict[str, ContentValidator] = {}
+
+
+def _result_to_dict(validator_name: str, result: ValidationResult) -> Dict[str, Any]:
+    """将验证结果转换为可JSON序列化的字典"""
+    return {
+        "validator": validator_name,
+        "rule": result.rule_name,
+        "severity": result.severity.value,
+        "message": result.message,
+        "location": result.location,
+        "suggestion": result.suggestion,
+    }
+
+
+def _validate_document(validators: Dict[str, ContentValidator], path: str, content: str) -> List[Dict[str, Any]]:
+    """使用所有验证器验证单个文档（各验证器共用同一次Front Matter/正文解析）"""
+    results = []
+    for name, validator in validators.items():
+        try:
+            for result in validator.validate_content(content):
+                if not result.location:
+                    result.location = path
+                results.append(_result_to_dict(name, result))
+        except Exception as e:
+            results.append(_result_to_dict(name, ValidationResult(
+                rule_name=f"{type(validator).__name__.lower()}_error",
+                severity=ValidationSeverity.ERROR,
+                message=f"验证器执行失败: {str(e)}",
+                location=path
+            )))
+    return results
+
+
+def _dependencies(validators: Dict[str, ContentValidator], content: str) -> Dict[str, Any]:
+    """收集验证结果依赖的外部文件状态"""
+    deps: Dict[str, Any] = {}
+    for validator in validators.values():
+        try:
+            deps.update(validator.dependencies(content))
+        except Exception:
+            continue
+    return deps
+
+
+def _init_worker(validators: Dict[str, ContentValidator]) -> None:
+    """进程池初始化：保存验证器实例"""
+    global _worker_validators
+    _worker_validators = validators
+
+
+def _validate_in_worker(task: Tuple[str, str]) -> Tuple[str, List[Dict[str, Any]]]:
+    """在工作进程中验证单个文档"""
+    path, content = task
+    return path, _validate_document(_worker_validators, path, content)
+
+
+class SiteValidator:
+    """全站验证器 - 基于ValidatorRegistry批量验证站点所有文章"""
+
+    def __init__(self, registry: Optional[ValidatorRegistry] = None,
+                 cache_file: Optional[str] = DEFAULT_CACHE_FILE,
+                 workers: Optional[int] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初始化全站验证器
+
+        Args:
+            registry: 验证器注册表（默认使用全局注册表）
+            cache_file: 验证结果缓存文件（None表示不使用缓存）
+            workers: 进程池大小（默认CPU核数，1表示在当前进程中验证）
+            logger: 日志记录器
+        """
+        self.registry = registry or validator_registry
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.workers = workers or os.cpu_count() or 1
+        self.logger = logger or logging.getLogger(__name__)
+
+    @staticmethod
+    def collect_files(paths: Iterable[str]) -> List[Path]:
+        """收集待验证的Markdown文件（目录只取顶层*.md，不含归档子目录）"""
+        files = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                files.extend(sorted(path.glob("*.md")))
+            elif path.is_file():
+                files.append(path)
+        return files
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """加载上次的验证结果"""
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                return data.get("entries", {})
+        except (FileNotFoundError, json.JSONDecodeError, OSError, AttributeError):
+            pass
+        return {}
+
+    def _save_cache(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """原子写入验证结果缓存"""
+        if not self.cache_file:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_file.parent, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            self.logger.warning(f"写入全站验证缓存失败: {e}")
+
+    def validate(self, paths: Iterable[str] = DEFAULT_SITE_PATHS) -> Dict[str, Any]:
+        """
+        验证所有文章并生成报告
+
+        Args:
+            paths: 待验证的目录或文件
+
+        Returns:
+            机器可读的验证报告（可直接序列化为JSON）
+        """
+        validators = self.registry.validators()
+        versions = self.registry.versions()
+        cached = self._load_cache()
+        entries: Dict[str, Dict[str, Any]] = {}
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        tasks: List[Tuple[str, str]] = []
+        hashes: Dict[str, str] = {}
+        dependencies: Dict[str, Dict[str, Any]] = {}
+
+        for file_path in self.collect_files(paths):
+            path = file_path.as_posix()
+            try:
+                raw = file_path.read_bytes()
+                content = raw.decode('utf-8')
+            except (OSError, UnicodeDecodeError) as e:
+                results[path] = [_result_to_dict("file", ValidationResult(
+                    rule_name="file_read",
+                    severity=ValidationSeverity.CRITICAL,
+                    message=f"文件读取失败: {str(e)}",
+                    location=path
+                ))]
+                continue
+
+            content_hash = hashlib.sha256(raw).hexdigest()
+            deps = _dependencies(validators, content)
+            entry = cached.get(path)
+            if (entry and entry.get("hash") == content_hash and entry.get("validators") == versions
+                    and entry.get("dependencies") == deps):
+                entries[path] = entry
+                results[path] = entry["results"]
+            else:
+                hashes[path] = content_hash
+                dependencies[path] = deps
+                tasks.append((path, content))
+
+        if len(tasks) > 1 and self.workers > 1:
+            workers = min(self.workers, len(tasks))
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(validators,)) as executor:
+                validated = list(executor.map(_validate_in_worker, tasks, chunksize=chunksize))
+        else:
+            validated = [(path, _validate_document(validators, path, content)) for path, content in tasks]
+
+        for path, file_results in validated:
+            results[path] = file_results
+            entries[path] = {"hash": hashes[path], "validators": versions,
+                             "dependencies": dependencies[path], "results": file_results}
+
+        self._save_cache(entries)
+
+        counts = {severity.value: 0 for severity in ValidationSeverity}
+        for file_results in results.values():
+            for result in file_results:
+                counts[result["severity"]] += 1
+
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "validators": versions,
+            "files": len(results),
+            "validated": len(validated),
+            "skipped": len(results) - len(validated),
+            "counts": counts,
+            "has_errors": bool(counts["error"] or counts["critical"]),
+            "results": {path: file_results for path, file_results in sorted(results.items()) if file_results},
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，返回退出码（存在达到阈值的问题时为1，可用于发布前检查）"""
+    parser = argparse.ArgumentParser(description="全站内容验证")
+    parser.add_argument("paths", nargs="*", default=list(DEFAULT_SITE_PATHS),
+                        help="待验证的目录或文件（默认: _posts _drafts）")
+    parser.add_argument("--workers", type=int, help="并发进程数（默认CPU核数）")
+    parser.add_argument("--output", help="JSON报告输出文件（默认输出到标准输出）")
+    parser.add_argument("--no-cache", action="store_true", help="忽略上次的验证结果，重新验证所有文件")
+    parser.add_argument("--fail-on", choices=["error", "warning", "never"], default="error",
+                        help="达到该级别时返回非零退出码（默认: error）")
+    args = parser.parse_args(argv)
+
+    validator = SiteValidator(cache_file=None if args.no_cache else DEFAULT_CACHE_FILE, workers=args.workers)
+    report = validator.validate(args.paths)
+    report_json = json.dumps(report, ensure_ascii=False, indent=2)
+
+    if args.output:
+        Path(args.output).write_text(report_json, encoding='utf-8')
+        summary = ValidationSummary([
+            ValidationResult(r["rule"], ValidationSeverity(r["severity"]), r["message"], r["location"])
+            for file_results in report["results"].values() for r in file_results
+        ])
+        print(summary.format_summary())
+        print(f"📄 验证 {report['validated']} 个文件，跳过未变化的 {report['skipped']} 个，报告: {args.output}")
+    else:
+        print(report_json)
+
+    if args.fail_on == "never":
+        return 0
+    if args.fail_on == "warning":
+        return 1 if report["has_errors"] or report["counts"]["warning"] else 0
+    return 1 if report["has_errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
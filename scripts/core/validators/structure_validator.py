@@ -2,14 +2,21 @@
 文档结构验证器
 检查Markdown文档的结构和格式问题
 """
-import re
 from typing import Dict, Any, List, Optional
 
 from .content_validator import (
     ContentValidator,
     ValidationResult,
     ValidationSeverity,
-    ValidationRule
+    ValidationRule,
+    parse_document
+)
+from .text_analysis import (
+    BULLET_NO_SPACE_PATTERN,
+    ORDERED_NO_SPACE_PATTERN,
+    QUOTE_SPACED_PATTERN,
+    TextModel,
+    analyze_text
 )
 
 
@@ -70,8 +77,8 @@ class StructureValidator(ContentValidator):
         """验证文档结构"""
         results = []
         
-        # 分离Front Matter和正文内容
-        body_content = self._extract_body_content(content)
+        # 分离Front Matter和正文内容，构建分析模型（与质量验证器共用）
+        text = analyze_text(self._extract_body_content(content))
         
         # 检查<!-- more -->标签
         if '<!-- more -->' not in content:
@@ -83,7 +90,7 @@ class StructureValidator(ContentValidator):
             ))
         
         # 检查内容长度
-        clean_content = self._clean_content_for_length_check(body_content)
+        clean_content = self._clean_content_for_length_check(text)
         content_length = len(clean_content.strip())
         
         if content_length < 300:
@@ -102,71 +109,47 @@ class StructureValidator(ContentValidator):
             ))
         
         # 检查标题层级
-        heading_issues = self._check_heading_hierarchy(body_content)
+        heading_issues = self._check_heading_hierarchy(text)
         results.extend(heading_issues)
         
         # 检查段落结构
-        paragraph_issues = self._check_paragraph_structure(body_content)
+        paragraph_issues = self._check_paragraph_structure(text)
         results.extend(paragraph_issues)
         
         # 检查列表格式
-        list_issues = self._check_list_formatting(body_content)
+        list_issues = self._check_list_formatting(text)
         results.extend(list_issues)
         
         # 检查代码块格式
-        code_issues = self._check_code_blocks(body_content)
+        code_issues = self._check_code_blocks(text)
         results.extend(code_issues)
         
         # 检查链接格式
-        link_issues = self._check_link_format(body_content)
+        link_issues = self._check_link_format(text)
         results.extend(link_issues)
         
         # 检查引用块格式
-        quote_issues = self._check_quote_blocks(body_content)
+        quote_issues = self._check_quote_blocks(text)
         results.extend(quote_issues)
         
         # 检查表格格式
-        table_issues = self._check_table_format(body_content)
+        table_issues = self._check_table_format(text)
         results.extend(table_issues)
         
         return results
     
     def _extract_body_content(self, content: str) -> str:
         """提取正文内容，排除Front Matter"""
-        if content.strip().startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                return parts[2].strip()
-        return content
+        return parse_document(content).body
     
-    def _clean_content_for_length_check(self, content: str) -> str:
+    def _clean_content_for_length_check(self, text: TextModel) -> str:
         """清理内容用于长度检查"""
-        # 移除Markdown语法标记
-        clean = re.sub(r'!\[[^\]]*\]\([^)]*\)', '', content)  # 图片
-        clean = re.sub(r'\[[^\]]*\]\([^)]*\)', '', clean)     # 链接
-        clean = re.sub(r'`[^`]*`', '', clean)                 # 内联代码
-        clean = re.sub(r'```[^`]*```', '', clean, flags=re.DOTALL)  # 代码块
-        clean = re.sub(r'^#+\s*', '', clean, flags=re.MULTILINE)    # 标题
-        clean = re.sub(r'^\s*[-*+]\s*', '', clean, flags=re.MULTILINE)  # 列表
-        clean = re.sub(r'^\s*>\s*', '', clean, flags=re.MULTILINE)      # 引用
-        clean = re.sub(r'\*\*([^*]*)\*\*', r'\1', clean)     # 粗体
-        clean = re.sub(r'\*([^*]*)\*', r'\1', clean)         # 斜体
-        clean = re.sub(r'~~([^~]*)~~', r'\1', clean)         # 删除线
-        
-        return clean
+        return text.length_text
     
-    def _check_heading_hierarchy(self, content: str) -> List[ValidationResult]:
+    def _check_heading_hierarchy(self, text: TextModel) -> List[ValidationResult]:
         """检查标题层级结构"""
         results = []
-        heading_pattern = r'^(#{1,6})\s+(.*)$'
-        headings = []
-        
-        for line_num, line in enumerate(content.split('\n'), 1):
-            match = re.match(heading_pattern, line.strip())
-            if match:
-                level = len(match.group(1))
-                text = match.group(2).strip()
-                headings.append((level, text, line_num))
+        headings = text.headings
         
         if not headings:
             results.append(ValidationResult(
@@ -201,10 +184,10 @@ class StructureValidator(ContentValidator):
         
         return results
     
-    def _check_paragraph_structure(self, content: str) -> List[ValidationResult]:
+    def _check_paragraph_structure(self, text: TextModel) -> List[ValidationResult]:
         """检查段落结构"""
         results = []
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+        paragraphs = text.paragraphs
         
         # 检查是否有段落
         if len(paragraphs) < 2:
@@ -227,18 +210,15 @@ class StructureValidator(ContentValidator):
         
         return results
     
-    def _check_list_formatting(self, content: str) -> List[ValidationResult]:
+    def _check_list_formatting(self, text: TextModel) -> List[ValidationResult]:
         """检查列表格式"""
         results = []
-        lines = content.split('\n')
         
-        for line_num, line in enumerate(lines, 1):
-            stripped = line.strip()
-            
+        for line_num, stripped, ordered in text.list_items:
             # 检查列表项格式
-            if re.match(r'^[-*+]\s', stripped):
+            if not ordered:
                 # 检查列表项后是否有空格
-                if re.match(r'^[-*+][^\s]', stripped):
+                if BULLET_NO_SPACE_PATTERN.match(stripped):
                     results.append(ValidationResult(
                         rule_name="list_formatting",
                         severity=ValidationSeverity.INFO,
@@ -247,8 +227,8 @@ class StructureValidator(ContentValidator):
                     ))
             
             # 检查有序列表格式
-            elif re.match(r'^\d+\.', stripped):
-                if re.match(r'^\d+\.[^\s]', stripped):
+            else:
+                if ORDERED_NO_SPACE_PATTERN.match(stripped):
                     results.append(ValidationResult(
                         rule_name="list_formatting",
                         severity=ValidationSeverity.INFO,
@@ -258,15 +238,13 @@ class StructureValidator(ContentValidator):
         
         return results
     
-    def _check_code_blocks(self, content: str) -> List[ValidationResult]:
+    def _check_code_blocks(self, text: TextModel) -> List[ValidationResult]:
         """检查代码块格式"""
         results = []
+        code_marks = text.code_marks
         
         # 检查代码块配对
-        code_block_pattern = r'```'
-        code_blocks = list(re.finditer(code_block_pattern, content))
-        
-        if len(code_blocks) % 2 != 0:
+        if code_marks['fences'] % 2 != 0:
             results.append(ValidationResult(
                 rule_name="code_blocks",
                 severity=ValidationSeverity.ERROR,
@@ -275,11 +253,7 @@ class StructureValidator(ContentValidator):
             ))
         
         # 检查内联代码
-        inline_code_pattern = r'`[^`\n]*`'
-        single_backticks = re.findall(r'`', content)
-        inline_codes = re.findall(inline_code_pattern, content)
-        
-        if len(single_backticks) != len(inline_codes) * 2:
+        if code_marks['backticks'] != code_marks['inline_codes'] * 2:
             # 可能有未配对的内联代码标记
             results.append(ValidationResult(
                 rule_name="code_blocks",
@@ -290,15 +264,12 @@ class StructureValidator(ContentValidator):
         
         return results
     
-    def _check_link_format(self, content: str) -> List[ValidationResult]:
+    def _check_link_format(self, text: TextModel) -> List[ValidationResult]:
         """检查链接格式"""
         results = []
         
         # 检查Markdown链接格式
-        link_pattern = r'\[([^\]]*)\]\(([^)]*)\)'
-        links = re.findall(link_pattern, content)
-        
-        for link_text, link_url in links:
+        for link_text, link_url in text.links:
             if not link_text.strip():
                 results.append(ValidationResult(
                     rule_name="link_format",
@@ -316,8 +287,7 @@ class StructureValidator(ContentValidator):
                 ))
         
         # 检查可能的裸URL
-        url_pattern = r'https?://[^\s<>"]+[^\s<>"\.]'
-        bare_urls = re.findall(url_pattern, content)
+        bare_urls = text.bare_urls
         
         if bare_urls:
             results.append(ValidationResult(
@@ -329,65 +299,34 @@ class StructureValidator(ContentValidator):
         
         return results
     
-    def _check_quote_blocks(self, content: str) -> List[ValidationResult]:
+    def _check_quote_blocks(self, text: TextModel) -> List[ValidationResult]:
         """检查引用块格式"""
         results = []
-        lines = content.split('\n')
         
-        in_quote = False
-        quote_start = None
-        
-        for line_num, line in enumerate(lines, 1):
-            stripped = line.strip()
-            
-            if stripped.startswith('>'):
-                if not in_quote:
-                    in_quote = True
-                    quote_start = line_num
-                    
-                # 检查引用格式
-                if not re.match(r'^>\s+', stripped) and len(stripped) > 1:
-                    results.append(ValidationResult(
-                        rule_name="quote_blocks",
-                        severity=ValidationSeverity.INFO,
-                        message=f"引用块格式不规范 (行{line_num})",
-                        suggestion="引用标记>后应该加空格"
-                    ))
-            else:
-                if in_quote:
-                    in_quote = False
-                    quote_start = None
+        for line_num, stripped in text.quote_lines:
+            # 检查引用格式
+            if not QUOTE_SPACED_PATTERN.match(stripped) and len(stripped) > 1:
+                results.append(ValidationResult(
+                    rule_name="quote_blocks",
+                    severity=ValidationSeverity.INFO,
+                    message=f"引用块格式不规范 (行{line_num})",
+                    suggestion="引用标记>后应该加空格"
+                ))
         
         return results
     
-    def _check_table_format(self, content: str) -> List[ValidationResult]:
+    def _check_table_format(self, text: TextModel) -> List[ValidationResult]:
         """检查表格格式"""
         results = []
-        lines = content.split('\n')
         
-        in_table = False
-        table_start = None
-        
-        for line_num, line in enumerate(lines, 1):
-            stripped = line.strip()
-            
-            # 检查是否是表格行
-            if '|' in stripped and stripped.count('|') >= 2:
-                if not in_table:
-                    in_table = True
-                    table_start = line_num
-                
-                # 检查表格格式
-                if not stripped.startswith('|') or not stripped.endswith('|'):
-                    results.append(ValidationResult(
-                        rule_name="table_format",
-                        severity=ValidationSeverity.INFO,
-                        message=f"表格行格式不规范 (行{line_num})",
-                        suggestion="表格行应该以|开始和结束"
-                    ))
-            else:
-                if in_table:
-                    in_table = False
-                    table_start = None
+        for line_num, stripped in text.table_rows:
+            # 检查表格格式
+            if not stripped.startswith('|') or not stripped.endswith('|'):
+                results.append(ValidationResult(
+                    rule_name="table_format",
+                    severity=ValidationSeverity.INFO,
+                    message=f"表格行格式不规范 (行{line_num})",
+                    suggestion="表格行应该以|开始和结束"
+                ))
         
         return results
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+正文文本分析模型
+预编译所有正则，按正文内容缓存分析结果：逐行扫描一次得到标题、列表、引用和表格行，
+链接、图片、代码标记、句子和中英文词数等统计只计算一次，供质量和结构验证器共用
+"""
+import re
+from functools import cached_property, lru_cache
+from typing import Dict, List, Tuple
+
+# 行级结构
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*)$')
+BULLET_ITEM_PATTERN = re.compile(r'^[-*+]\s')
+BULLET_NO_SPACE_PATTERN = re.compile(r'^[-*+][^\s]')
+ORDERED_ITEM_PATTERN = re.compile(r'^\d+\.')
+ORDERED_NO_SPACE_PATTERN = re.compile(r'^\d+\.[^\s]')
+QUOTE_SPACED_PATTERN = re.compile(r'^>\s+')
+LIST_MARKER_PATTERN = re.compile(r'^(\s*)([-*+])\s', re.MULTILINE)
+
+# 行内元素
+LINK_PATTERN = re.compile(r'\[([^\]]*)\]\(([^)]*)\)')
+IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)]*)\)')
+INLINE_CODE_PATTERN = re.compile(r'`[^`\n]*`')
+BARE_URL_PATTERN = re.compile(r'https?://[^\s<>"]+[^\s<>"\.]')
+ITALIC_PATTERN = re.compile(r'\*[^*]+\*(?!\*)')
+BOLD_PATTERN = re.compile(r'\*\*[^*]+\*\*')
+# 技术术语：全大写缩写或驼峰词（对已切分出的英文单词整体匹配）
+TECH_TERM_PATTERN = re.compile(r'[A-Z]{2,}|[A-Z][a-z]*[A-Z][A-Za-z]*')
+
+# 文字统计：一次扫描同时得到中文词串和英文单词
+WORD_TOKEN_PATTERN = re.compile(r'([\u4e00-\u9fff]+)|\b([a-zA-Z]+)\b')
+CJK_LATIN_ADJACENT_PATTERN = re.compile(r'[\u4e00-\u9fff][a-zA-Z]|[a-zA-Z][\u4e00-\u9fff]')
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?。！？]+')
+REPEATED_PUNCTUATION_PATTERN = re.compile(r'[。！？]{2,}')
+FULLWIDTH_PUNCTUATION = frozenset('，。！？')
+HALFWIDTH_PUNCTUATION = frozenset(',.!?')
+
+# 质量分析用的清理规则（代码块先于内联代码移除）
+ANALYSIS_CLEANUP = (
+    (re.compile(r'```.*?```', re.DOTALL), ''),             # 代码块
+    (re.compile(r'`[^`]*`'), ''),                          # 内联代码
+    (re.compile(r'!\[[^\]]*\]\([^)]*\)'), ''),             # 图片
+    (re.compile(r'\[[^\]]*\]\([^)]*\)'), ''),              # 链接
+    (re.compile(r'^#+\s*', re.MULTILINE), ''),             # 标题
+    (re.compile(r'^\s*[-*+]\s*', re.MULTILINE), ''),       # 列表
+    (re.compile(r'^\s*>\s*', re.MULTILINE), ''),           # 引用
+    (re.compile(r'\*\*([^*]*)\*\*'), r'\1'),               # 粗体
+    (re.compile(r'\*([^*]*)\*'), r'\1'),                   # 斜体
+    (re.compile(r'~~([^~]*)~~'), r'\1'),                   # 删除线
+)
+
+# 长度检查用的清理规则（图片和链接先于代码移除）
+LENGTH_CLEANUP = (
+    (re.compile(r'!\[[^\]]*\]\([^)]*\)'), ''),             # 图片
+    (re.compile(r'\[[^\]]*\]\([^)]*\)'), ''),              # 链接
+    (re.compile(r'`[^`]*`'), ''),                          # 内联代码
+    (re.compile(r'```[^`]*```', re.DOTALL), ''),           # 代码块
+    (re.compile(r'^#+\s*', re.MULTILINE), ''),             # 标题
+    (re.compile(r'^\s*[-*+]\s*', re.MULTILINE), ''),       # 列表
+    (re.compile(r'^\s*>\s*', re.MULTILINE), ''),           # 引用
+    (re.compile(r'\*\*([^*]*)\*\*'), r'\1'),               # 粗体
+    (re.compile(r'\*([^*]*)\*'), r'\1'),                   # 斜体
+    (re.compile(r'~~([^~]*)~~'), r'\1'),                   # 删除线
+)
+
+
+def _apply_cleanup(text: str, rules) -> str:
+    for pattern, replacement in rules:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    """切分中文词串和英文单词，返回 (中文词串, 英文单词) 元组，每个元组只有一项非空"""
+    return WORD_TOKEN_PATTERN.findall(text)
+
+
+def _split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_SPLIT_PATTERN.split(text) if s.strip()]
+
+
+class TextModel:
+    """正文分析模型 - 各项结果在首次访问时计算并缓存"""
+
+    def __init__(self, body: str):
+        self.body = body
+        self.headings: List[Tuple[int, str, int]] = []
+        self.list_items: List[Tuple[int, str, bool]] = []
+        self.quote_lines: List[Tuple[int, str]] = []
+        self.table_rows: List[Tuple[int, str]] = []
+        self._scan_lines()
+
+    def _scan_lines(self) -> None:
+        """逐行扫描一次，收集标题、列表项、引用行和表格行（行号从1开始）"""
+        for line_num, line in enumerate(self.lines, 1):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            first = stripped[0]
+            if first == '#':
+                match = HEADING_PATTERN.match(stripped)
+                if match:
+                    self.headings.append((len(match.group(1)), match.group(2).strip(), line_num))
+            elif first in '-*+':
+                if BULLET_ITEM_PATTERN.match(stripped):
+                    self.list_items.append((line_num, stripped, False))
+            elif first.isdigit():
+                if ORDERED_ITEM_PATTERN.match(stripped):
+                    self.list_items.append((line_num, stripped, True))
+            elif first == '>':
+                self.quote_lines.append((line_num, stripped))
+            if '|' in stripped and stripped.count('|') >= 2:
+                self.table_rows.append((line_num, stripped))
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.body.split('\n')
+
+    @cached_property
+    def lower(self) -> str:
+        return self.body.lower()
+
+    @cached_property
+    def paragraphs(self) -> List[str]:
+        """按空行分隔的段落（去除首尾空白，忽略空段落）"""
+        return [p.strip() for p in self.body.split('\n\n') if p.strip()]
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """按中英文句末标点切分的非空句子"""
+        return _split_sentences(self.body)
+
+    @cached_property
+    def links(self) -> List[Tuple[str, str]]:
+        """Markdown链接 (文本, URL)，图片也会匹配"""
+        return LINK_PATTERN.findall(self.body)
+
+    @cached_property
+    def images(self) -> List[Tuple[str, str]]:
+        """Markdown图片 (alt, URL)"""
+        return IMAGE_PATTERN.findall(self.body)
+
+    @cached_property
+    def bare_urls(self) -> List[str]:
+        return BARE_URL_PATTERN.findall(self.body)
+
+    @cached_property
+    def code_marks(self) -> Dict[str, int]:
+        """代码标记统计：```围栏数、反引号总数、内联代码数"""
+        return {
+            'fences': self.body.count('```'),
+            'backticks': self.body.count('`'),
+            'inline_codes': len(INLINE_CODE_PATTERN.findall(self.body)),
+        }
+
+    @cached_property
+    def list_markers(self) -> List[str]:
+        """无序列表使用的标记符号（-、*、+）"""
+        return [marker for _, marker in LIST_MARKER_PATTERN.findall(self.body)]
+
+    @cached_property
+    def emphasis_counts(self) -> Tuple[int, int]:
+        """(单星号强调数, 双星号强调数)"""
+        return len(ITALIC_PATTERN.findall(self.body)), len(BOLD_PATTERN.findall(self.body))
+
+    @cached_property
+    def tokens(self) -> List[Tuple[str, str]]:
+        """正文的中文词串和英文单词"""
+        return _tokenize(self.body)
+
+    @cached_property
+    def tech_terms(self) -> List[str]:
+        """全大写缩写和驼峰形式的英文单词"""
+        return [word for _, word in self.tokens if word and TECH_TERM_PATTERN.fullmatch(word)]
+
+    @cached_property
+    def word_tokens(self) -> List[str]:
+        """小写的中文词串和英文单词"""
+        return [cjk or word.lower() for cjk, word in self.tokens]
+
+    @cached_property
+    def analysis_text(self) -> str:
+        """移除Markdown语法后的文本（用于字数和句子统计）"""
+        return _apply_cleanup(self.body, ANALYSIS_CLEANUP)
+
+    @cached_property
+    def length_text(self) -> str:
+        """移除Markdown语法后的文本（用于内容长度检查）"""
+        return _apply_cleanup(self.body, LENGTH_CLEANUP)
+
+    @cached_property
+    def word_stats(self) -> Dict[str, int]:
+        """中文字数、英文词数、句子数和段落数"""
+        clean_text = self.analysis_text
+        chinese_chars = 0
+        english_words = 0
+        for cjk, word in _tokenize(clean_text):
+            if cjk:
+                chinese_chars += len(cjk)
+            else:
+                english_words += 1
+        return {
+            'chinese_chars': chinese_chars,
+            'english_words': english_words,
+            'total_words': chinese_chars + english_words,
+            'sentence_count': len(_split_sentences(clean_text)),
+            'paragraph_count': len(self.paragraphs),
+        }
+
+    @cached_property
+    def has_repeated_punctuation(self) -> bool:
+        return REPEATED_PUNCTUATION_PATTERN.search(self.body) is not None
+
+    @cached_property
+    def cjk_latin_adjacent_count(self) -> int:
+        """中英文字符直接相邻（缺少空格）的次数"""
+        return len(CJK_LATIN_ADJACENT_PATTERN.findall(self.body))
+
+    @cached_property
+    def has_mixed_punctuation(self) -> bool:
+        """是否有同一行内混用全角和半角句读标点"""
+        return any(
+            not FULLWIDTH_PUNCTUATION.isdisjoint(line) and not HALFWIDTH_PUNCTUATION.isdisjoint(line)
+            for line in self.lines
+        )
+
+
+@lru_cache(maxsize=32)
+def analyze_text(body: str) -> TextModel:
+    """
+    分析正文（按内容缓存，多个验证器分析同一正文时只构建一次模型）
+
+    Args:
+        body: 不含Front Matter的正文
+
+    Returns:
+        TextModel
+    """
+    return TextModel(body)
@@ -10,6 +10,8 @@ from typing import Optional, Dict, Any, TYPE_CHECKING
 from pathlib import Path
 from dotenv import load_dotenv
 
+from .processors.streaming_generation import stream_generate
+
 if TYPE_CHECKING:
     from google.generativeai.generative_models import GenerativeModel
 
@@ -116,6 +118,27 @@ class WechatPublisher:
             self.logger.error(f"Request for access_token failed: {e}")
             return None
 
+    def _generate_streaming(self, prompt: str) -> str:
+        """Generates text with a streaming response, showing progress and continuing if truncated.
+
+        Raises:
+            RuntimeError: If generation returned no text
+            StreamInterrupted: If the user pressed Ctrl+C during generation
+        """
+        result = stream_generate(
+            self.model,
+            prompt,
+            on_chunk=lambda piece, total: print(f"\r     ⏳ 已生成 {total} 字", end="", flush=True),
+            require_complete_ending=False,  # plain-text output; only continue when truncated by the token limit
+            logger=self.logger,
+        )
+        print()
+        if not result.text.strip():
+            raise RuntimeError(f"empty response (finish reason: {result.finish_reason})")
+        if not result.complete:
+            self.logger.warning(f"AI output may be truncated (finish reason: {result.finish_reason}).")
+        return result.text
+
     def _transform_for_wechat(self, markdown_content: str, is_guide_mode: bool = False) -> str:
         """Transforms markdown content into WeChat-ready plain text.
 
@@ -160,8 +183,7 @@ IMPORTANT FORMATTING RULES:
 
 {markdown_content}"""
         try:
-            response = self.model.generate_content(summarize_prompt)
-            rewritten_content = response.text
+            rewritten_content = self._generate_streaming(summarize_prompt)
             self.logger.info("Content successfully rewritten by AI.")
             print("     ✅ AI内容优化完成")
         except Exception as e:
@@ -199,8 +221,7 @@ Here is the content to optimize:
 ---
 {rewritten_content}"""
         try:
-            response = self.model.generate_content(format_prompt)
-            final_content = response.text
+            final_content = self._generate_streaming(format_prompt)
             self.logger.info("Content successfully optimized by AI.")
             print("     ✅ 移动端优化完成")
         except Exception as e:
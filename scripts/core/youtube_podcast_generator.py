@@ -4,14 +4,19 @@ YouTube播客生成器
 将英文YouTube视频转换为中文播客和导读文章，用于英语学习
 """
 
+import io
 import os
 import re
 import json
+import time
+import wave
+import threading
 import requests
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, cast
 import logging
 from dotenv import load_dotenv
 
@@ -48,6 +53,18 @@ try:
 except ImportError:
     MARKDOWN_AUDIO_TOOLS_AVAILABLE = False
 
+# TTS音频片段缓存
+try:
+    from scripts.core.tts_audio_cache import TTSAudioCache
+except ImportError:
+    from tts_audio_cache import TTSAudioCache  # type: ignore  # 直接运行本文件时
+
+# Gemini流式生成（长脚本实时显示进度，截断时续写）
+try:
+    from scripts.core.processors.streaming_generation import stream_generate
+except ImportError:
+    from processors.streaming_generation import stream_generate  # type: ignore  # 直接运行本文件时
+
 # MoviePy动态导入
 try:
     import moviepy.editor  # type: ignore
@@ -57,6 +74,57 @@ except ImportError:
     MOVIEPY_AVAILABLE = False
 
 
+# 语音音频处理链：
+# - highpass=100: 高通滤波器，去除100Hz以下的低频噪音
+# - lowpass=7000: 低通滤波器，去除7kHz以上的高频，适合语音
+# - compand: 动态压缩，平衡音量
+# - volume=1.8: 增加音量
+# - loudnorm: 标准化响度，符合播放标准
+VOICE_AUDIO_FILTER = (
+    "highpass=f=100,"
+    "lowpass=f=7000,"
+    "compand=attacks=0.05:decays=0.2:points=-80/-80|-62/-62|-26/-26|-15/-15|-10/-8|0/-7,"
+    "volume=1.8,"
+    "loudnorm=I=-18:LRA=7:TP=-2"
+)
+
+# 静态图片视频渲染预设（仅使用libx264软件编码，不依赖特定硬件加速）
+STILL_IMAGE_RENDER_PRESETS = {
+    'fast': {'preset': 'ultrafast', 'crf': 30, 'fps': 1, 'audio_bitrate': '96k'},
+    'balanced': {'preset': 'veryfast', 'crf': 28, 'fps': 1, 'audio_bitrate': '96k'},
+    'quality': {'preset': 'medium', 'crf': 23, 'fps': 2, 'audio_bitrate': '128k'},
+}
+
+
+class TokenBucket:
+    """令牌桶限流器 - 控制并发TTS请求的平均速率，允许短时突发"""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 令牌桶容量（允许的突发请求数）
+        """
+        self.rate = max(rate, 0.01)
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """获取一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 class YouTubePodcastGenerator:
     """YouTube播客生成器类"""
     
@@ -73,6 +141,9 @@ class YouTubePodcastGenerator:
         self.setup_logging()
         self.setup_apis()
         
+        # TTS音频片段缓存（环境变量 TTS_CACHE_BYPASS=1 可临时绕过）
+        self.tts_cache = TTSAudioCache.from_config(self.config.get('tts_cache', {}))
+        
         # 文件路径配置
         self.audio_dir = "assets/audio"
         self.image_dir = "assets/images/posts"
@@ -725,10 +796,19 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
         """
         
         try:
-            response = self.gemini_model.generate_content(prompt)
-            script = response.text
+            result = stream_generate(
+                self.gemini_model,
+                prompt,
+                on_chunk=lambda piece, total: print(f"\r   ⏳ 播客脚本已生成 {total} 字", end="", flush=True),
+                require_complete_ending=False,  # 对话脚本只在被截断时续写
+            )
+            print()
+            if result.aborted or not result.text.strip():
+                raise RuntimeError("生成已中止" if result.aborted else f"响应为空（{result.finish_reason}）")
+            if not result.complete:
+                self._log(f"⚠️ 播客脚本可能不完整（{result.finish_reason or '结尾不完整'}）", "warning")
             self._log("播客脚本生成成功")
-            return script
+            return result.text
         except Exception as e:
             self._log(f"播客脚本生成失败: {e}")
             # 根据目标语言生成备用脚本
@@ -907,6 +987,18 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
         
         # 优先使用第一个可用的语音ID
         voice_id = available_voice_ids[0]
+        model_id = "eleven_multilingual_v2"
+        
+        # 命中缓存时直接写出，不再调用API
+        cache_key = self.tts_cache.make_key(
+            "elevenlabs", voice_id, model_id, self._voice_settings_to_dict(voice_settings), text
+        )
+        cached_audio = self.tts_cache.get(cache_key)
+        if cached_audio:
+            with open(output_path, 'wb') as f:
+                f.write(cached_audio)
+            self._log(f"✅ ElevenLabs单人音频命中缓存: {output_path}")
+            return True
         
         try:
             # 使用正确的ElevenLabs API调用方式
@@ -914,7 +1006,7 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
                 audio_generator = self.elevenlabs_client.text_to_speech.convert(
                     voice_id=voice_id,
                     text=text,
-                    model_id="eleven_multilingual_v2",
+                    model_id=model_id,
                     voice_settings=voice_settings
                 )
             else:
@@ -924,7 +1016,7 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
                     audio_generator = generate(
                         text=text,
                         voice=Voice(voice_id=voice_id),
-                        model="eleven_multilingual_v2"
+                        model=model_id
                     )
                 except ImportError:
                     raise RuntimeError("ElevenLabs generate功能不可用，请检查库版本")
@@ -933,9 +1025,10 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
             raise RuntimeError("ElevenLabs API方法不兼容，请检查库版本")
         
         # 保存音频文件
+        audio_data = b''.join(chunk for chunk in audio_generator)
         with open(output_path, 'wb') as f:
-            for chunk in audio_generator:
-                f.write(chunk)
+            f.write(audio_data)
+        self.tts_cache.set(cache_key, audio_data)
         
         self._log(f"✅ ElevenLabs单人音频生成成功: {output_path}")
         return True
@@ -964,60 +1057,14 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
             model_id = api_settings.get('model_id', 'eleven_multilingual_v2')
             self._log(f"🤖 使用模型: {model_id}")
             
-            # 生成每个对话片段的音频
-            audio_segments = []
-            total_segments = len(dialogue_segments)
-            self._log(f"🎤 开始生成 {total_segments} 个对话片段...")
-            
-            for i, (speaker, segment_text) in enumerate(dialogue_segments):
-                # 只显示关键进度点，减少日志冗余
-                if i == 0 or i == total_segments - 1 or (i + 1) % 5 == 0:
-                    progress = f"{i+1}/{total_segments}"
-                    self._log(f"   🎤 生成对话片段 {progress}: {segment_text[:30]}...")
-                elif i % 10 == 0:  # 每10个显示一次简化进度
-                    self._log(f"   📊 进度: {i+1}/{total_segments} ({(i+1)*100//total_segments}%)")
-                
-                # 根据说话者选择声音配置
-                voice_settings = self._get_speaker_settings(speaker, voice_config, language)
-                voice_id = self._get_speaker_voice_id(speaker, voice_config, language)
-                
-                try:
-                    # 使用正确的ElevenLabs API调用方式
-                    if self.elevenlabs_client and hasattr(self.elevenlabs_client, 'text_to_speech'):
-                        audio_generator = self.elevenlabs_client.text_to_speech.convert(
-                            voice_id=voice_id,
-                            text=segment_text,
-                            model_id="eleven_multilingual_v2",
-                            voice_settings=voice_settings
-                        )
-                    else:
-                        # 使用兼容的API方法
-                        try:
-                            from elevenlabs import generate, Voice  # type: ignore
-                            audio_generator = generate(
-                                text=segment_text,
-                                voice=Voice(voice_id=voice_id),
-                                model="eleven_multilingual_v2"
-                            )
-                        except ImportError:
-                            raise RuntimeError("ElevenLabs generate功能不可用，请检查库版本")
-                except (AttributeError, ImportError):
-                    # 如果API方法不可用，抛出错误
-                    raise RuntimeError("ElevenLabs API方法不兼容，请检查库版本")
-                
-                # 收集音频数据
-                audio_data = b''.join(chunk for chunk in audio_generator)
-                audio_segments.append(audio_data)
-                
-                # 避免API限流
-                import time
-                time.sleep(0.5)
+            # 并发生成每个对话片段的音频（按原顺序重组）
+            audio_segments = self._synthesize_dialogue_segments(
+                dialogue_segments, voice_config, language, model_id
+            )
             
-            # 合并音频片段
+            # 流式合并音频片段并直接写入输出文件
             if MARKDOWN_AUDIO_TOOLS_AVAILABLE:
-                combined_audio = self._merge_dialogue_segments(audio_segments)
-                if combined_audio:
-                    combined_audio.export(output_path, format="wav")
+                if self._merge_dialogue_segments_to_file(audio_segments, output_path):
                     self._log(f"✅ 双人对话音频生成成功: {output_path}")
                     return True
                 else:
@@ -1032,6 +1079,124 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
             self._log("🔄 切换到单人模式")
             return self._generate_single_speaker_audio(text, output_path)
     
+    def _synthesize_elevenlabs_segment(self, voice_id: str, text: str, model_id: str,
+                                       voice_settings) -> bytes:
+        """调用ElevenLabs合成单个片段，返回完整音频数据"""
+        try:
+            # 使用正确的ElevenLabs API调用方式
+            if self.elevenlabs_client and hasattr(self.elevenlabs_client, 'text_to_speech'):
+                audio_generator = self.elevenlabs_client.text_to_speech.convert(
+                    voice_id=voice_id,
+                    text=text,
+                    model_id=model_id,
+                    voice_settings=voice_settings
+                )
+            else:
+                # 使用兼容的API方法
+                try:
+                    from elevenlabs import generate, Voice  # type: ignore
+                    audio_generator = generate(
+                        text=text,
+                        voice=Voice(voice_id=voice_id),
+                        model=model_id
+                    )
+                except ImportError:
+                    raise RuntimeError("ElevenLabs generate功能不可用，请检查库版本")
+        except (AttributeError, ImportError):
+            # 如果API方法不可用，抛出错误
+            raise RuntimeError("ElevenLabs API方法不兼容，请检查库版本")
+        
+        # 收集音频数据
+        return b''.join(chunk for chunk in audio_generator)
+    
+    def _synthesize_dialogue_segments(self, dialogue_segments: List[Tuple[str, str]],
+                                      voice_config: Dict[str, Any], language: str,
+                                      model_id: str) -> List[bytes]:
+        """并发合成所有对话片段
+        
+        并发数和令牌桶速率来自声音配置的 rate_limits 段（按ElevenLabs订阅计划设置），
+        每个片段独立重试，结果按原对话顺序返回。任一片段重试耗尽时抛出异常。
+        """
+        rate_limits = voice_config.get('rate_limits', {})
+        max_workers = max(1, int(rate_limits.get('max_concurrent_requests', 2)))
+        max_retries = max(0, int(rate_limits.get('max_retries', 3)))
+        backoff = float(rate_limits.get('retry_backoff_seconds', 1.0))
+        bucket = TokenBucket(
+            rate=float(rate_limits.get('requests_per_second', 2.0)),
+            capacity=float(rate_limits.get('burst', max_workers))
+        )
+        
+        # 每个说话者的声音配置只解析一次
+        speaker_voices = {}
+        for speaker in {speaker for speaker, _ in dialogue_segments}:
+            speaker_voices[speaker] = (
+                self._get_speaker_voice_id(speaker, voice_config, language),
+                self._get_speaker_settings(speaker, voice_config, language)
+            )
+        
+        def synthesize(index: int) -> bytes:
+            speaker, segment_text = dialogue_segments[index]
+            voice_id, voice_settings = speaker_voices[speaker]
+            
+            # 未修改的句子直接复用缓存音频，不占用API配额
+            cache_key = self.tts_cache.make_key(
+                "elevenlabs", voice_id, model_id, self._voice_settings_to_dict(voice_settings), segment_text
+            )
+            cached_audio = self.tts_cache.get(cache_key)
+            if cached_audio:
+                return cached_audio
+            
+            for attempt in range(max_retries + 1):
+                bucket.acquire()
+                try:
+                    audio_data = self._synthesize_elevenlabs_segment(voice_id, segment_text, model_id, voice_settings)
+                    self.tts_cache.set(cache_key, audio_data)
+                    return audio_data
+                except RuntimeError:
+                    # API不兼容等错误重试无意义
+                    raise
+                except Exception as e:
+                    if attempt >= max_retries:
+                        raise
+                    delay = backoff * (2 ** attempt)
+                    self._log(f"   ⚠️ 片段 {index + 1} 生成失败，{delay:.1f}秒后重试: {e}", "warning")
+                    time.sleep(delay)
+            raise RuntimeError(f"片段 {index + 1} 生成失败")
+        
+        total_segments = len(dialogue_segments)
+        self._log(f"🎤 开始生成 {total_segments} 个对话片段（并发数: {max_workers}）...")
+        
+        audio_segments: List[Optional[bytes]] = [None] * total_segments
+        completed = 0
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="elevenlabs-tts") as executor:
+            futures = {executor.submit(synthesize, i): i for i in range(total_segments)}
+            try:
+                for future in as_completed(futures):
+                    audio_segments[futures[future]] = future.result()
+                    completed += 1
+                    # 只显示关键进度点，减少日志冗余
+                    if completed == total_segments or completed % 10 == 0:
+                        self._log(f"   📊 进度: {completed}/{total_segments} ({completed*100//total_segments}%)")
+            except Exception:
+                for pending in futures:
+                    pending.cancel()
+                raise
+        
+        if self.tts_cache.enabled:
+            self._log(self.tts_cache.format_stats())
+        return [segment for segment in audio_segments if segment is not None]
+    
+    @staticmethod
+    def _voice_settings_to_dict(voice_settings) -> Dict[str, Any]:
+        """将VoiceSettings转换为字典，用于生成缓存键"""
+        if voice_settings is None:
+            return {}
+        if hasattr(voice_settings, 'model_dump'):
+            return voice_settings.model_dump()
+        if hasattr(voice_settings, 'dict'):
+            return voice_settings.dict()
+        return dict(vars(voice_settings))
+    
     def _load_voice_config(self) -> Dict[str, Any]:
         """加载声音配置"""
         # 优先使用Pro账户配置
@@ -1214,30 +1379,102 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
         return combination.get(speaker_key, {}).get('voice_id', 
             "21m00Tcm4TlvDq8ikWAM" if speaker == 'A' else "TxGEqnHWrfWFTfGW9XjX")
     
-    def _merge_dialogue_segments(self, audio_segments: List[bytes]):
-        """合并对话音频片段"""
-        try:
-            from pydub import AudioSegment
-            import io
-        except ImportError:
-            self._log("pydub未安装，无法合并音频片段")
-            return None
+    def _iter_dialogue_audio(self, audio_segments: List[bytes], pause_ms: int = 600):
+        """逐个解码对话片段，按首个片段的采样参数统一格式，片段之间插入停顿
         
-        combined_audio = AudioSegment.empty()
+        每个片段只解码一次，调用方按顺序消费即可，不需要累积拼接
+        """
+        from pydub import AudioSegment
         
-        for i, audio_data in enumerate(audio_segments):
+        first = None
+        pause = None
+        for audio_data in audio_segments:
             # 将bytes数据转换为AudioSegment
-            audio_io = io.BytesIO(audio_data)
-            segment = AudioSegment.from_file(audio_io, format="mp3")
+            segment = AudioSegment.from_file(io.BytesIO(audio_data), format="mp3")
+            if first is None:
+                first = segment
+                pause = (AudioSegment.silent(duration=pause_ms, frame_rate=segment.frame_rate)
+                         .set_channels(segment.channels)
+                         .set_sample_width(segment.sample_width))
+            else:
+                segment = (segment.set_frame_rate(first.frame_rate)
+                           .set_channels(first.channels)
+                           .set_sample_width(first.sample_width))
+                # 添加适当的停顿
+                yield pause
+            yield segment
+    
+    def _merge_dialogue_segments_to_file(self, audio_segments: List[bytes], output_path: str,
+                                         pause_ms: int = 600) -> bool:
+        """流式合并对话音频片段并写入输出文件
+        
+        PCM帧按顺序直接写入输出容器，内存占用只取决于单个片段。
+        输出格式由扩展名决定：.wav 直接写入，.mp3/.m4a/.aac 通过ffmpeg管道一次编码完成。
+        结果先写入临时文件，成功后再替换目标文件。
+        """
+        output = Path(output_path)
+        temp_output = output.with_name(f"{output.stem}.part{output.suffix}")
+        suffix = output.suffix.lower()
+        writer = None
+        encoder = None
+        
+        try:
+            for part in self._iter_dialogue_audio(audio_segments, pause_ms):
+                if writer is None and encoder is None:
+                    if suffix in ('.mp3', '.m4a', '.aac'):
+                        encoder = self._open_pcm_encoder(
+                            str(temp_output), part.frame_rate, part.channels, part.sample_width
+                        )
+                    else:
+                        writer = wave.open(str(temp_output), 'wb')
+                        writer.setnchannels(part.channels)
+                        writer.setsampwidth(part.sample_width)
+                        writer.setframerate(part.frame_rate)
+                
+                frames = cast(bytes, part.raw_data)  # pydub未标注类型，解码后的片段总有PCM数据
+                if encoder is not None:
+                    encoder.stdin.write(frames)
+                else:
+                    writer.writeframes(frames)
             
-            # 添加适当的停顿
-            if i > 0:
-                pause = AudioSegment.silent(duration=600)  # 0.6秒停顿
-                combined_audio += pause
+            if writer is None and encoder is None:
+                self._log("⚠️ 没有可合并的音频片段")
+                return False
             
-            combined_audio += segment
-        
-        return combined_audio
+            if encoder is not None:
+                encoder.stdin.close()
+                if encoder.wait() != 0:
+                    raise RuntimeError(f"ffmpeg编码失败: {encoder.stderr.read().decode(errors='ignore')[:200]}")
+            else:
+                writer.close()
+            
+            os.replace(temp_output, output)
+            return True
+            
+        except ImportError:
+            self._log("pydub未安装，无法合并音频片段")
+            return False
+        except Exception as e:
+            self._log(f"❌ 音频片段合并失败: {e}")
+            if encoder is not None and encoder.poll() is None:
+                encoder.kill()
+            if writer is not None:
+                writer.close()
+            temp_output.unlink(missing_ok=True)
+            return False
+    
+    def _open_pcm_encoder(self, output_path: str, frame_rate: int, channels: int,
+                          sample_width: int) -> subprocess.Popen:
+        """启动从标准输入读取PCM并编码为目标格式的ffmpeg进程"""
+        pcm_format = {1: 'u8', 2: 's16le', 3: 's24le', 4: 's32le'}[sample_width]
+        codec = ['-codec:a', 'libmp3lame', '-b:a', '128k'] if output_path.endswith('.mp3') \
+            else ['-codec:a', 'aac', '-b:a', '128k']
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', pcm_format, '-ar', str(frame_rate), '-ac', str(channels), '-i', 'pipe:0',
+            *codec, output_path
+        ]
+        return subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
     def _generate_gtts_audio(self, text: str, output_path: str) -> bool:
         """使用Google Text-to-Speech生成高质量音频并加速"""
@@ -1261,12 +1498,20 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
                         elif self.current_target_language.startswith('ko'):
                             lang_code = 'ko'
                     
+                    # 保存到临时文件（缓存原始合成结果，加速处理仍在之后进行）
+                    temp_path = output_path.replace('.wav', '_temp.mp3')
+                    cache_key = self.tts_cache.make_key("gtts", lang_code, "gtts", {"slow": False}, text)
+                    cached_audio = self.tts_cache.get(cache_key)
+                    if cached_audio:
+                        with open(temp_path, 'wb') as f:
+                            f.write(cached_audio)
+                        self._log("Google TTS命中缓存")
+                        break
+                    
                     # 创建gTTS对象
                     tts = gTTS(text=text, lang=lang_code, slow=False)
-                    
-                    # 保存到临时文件
-                    temp_path = output_path.replace('.wav', '_temp.mp3')
                     tts.save(temp_path)
+                    self.tts_cache.set(cache_key, Path(temp_path).read_bytes())
                     break  # 成功则退出重试循环
                     
                 except Exception as e:
@@ -1706,14 +1951,20 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
             self._log(f"缩略图下载失败: {e}")
             return ""
     
-    def create_audio_video(self, audio_path: str, thumbnail_path: str, output_path: str) -> bool:
+    def create_audio_video(self, audio_path: str, thumbnail_path: str, output_path: str,
+                           preset: str = "balanced", progress_callback=None) -> bool:
         """
         将音频和缩略图合成为视频文件，用于YouTube上传
         
+        一次ffmpeg调用完成音频处理链、单次AAC编码和静态图片视频编码，
+        视频使用 -tune stillimage 和低帧率，编码耗时主要取决于音频长度。
+        
         Args:
             audio_path: 音频文件路径
             thumbnail_path: 缩略图路径
             output_path: 输出视频路径
+            preset: 渲染预设名称，见 STILL_IMAGE_RENDER_PRESETS
+            progress_callback: 进度回调，参数为 0-1 之间的完成比例
             
         Returns:
             是否成功生成视频
@@ -1729,35 +1980,19 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
                 self._log(f"缩略图不存在: {thumbnail_path}")
                 return False
             
-            self._log("开始生成音频视频文件")
-            
-            # 第一步：音频预处理和压缩优化
-            optimized_audio_path = self._optimize_audio_for_video(audio_path)
-            if not optimized_audio_path:
-                self._log("音频优化失败，使用原始音频")
-                optimized_audio_path = audio_path
+            self._log(f"开始生成音频视频文件（预设: {preset}）")
             
-            # 使用ffmpeg将音频和图片合成视频
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',  # -y 覆盖输出文件
-                '-loop', '1',  # 循环图片
-                '-i', thumbnail_path,  # 输入图片
-                '-i', optimized_audio_path,  # 输入优化后的音频
-                '-c:v', 'libx264',  # 视频编码
-                '-c:a', 'aac',  # 音频编码 (会重新编码优化过的音频)
-                '-b:a', '96k',  # 降低音频比特率以进一步压缩
-                '-pix_fmt', 'yuv420p',  # 像素格式
-                '-shortest',  # 以最短的输入为准
-                output_path
-            ]
-            
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=300)
+            ffmpeg_cmd = self._build_still_image_video_cmd(audio_path, thumbnail_path, output_path, preset)
+            duration = self._probe_media_duration(audio_path)
+            returncode, stderr = self._run_ffmpeg_with_progress(
+                ffmpeg_cmd, duration, timeout=1800, progress_callback=progress_callback
+            )
             
-            if result.returncode == 0:
+            if returncode == 0:
                 self._log(f"✅ 音频视频生成成功: {output_path}")
                 return True
             else:
-                self._log(f"ffmpeg错误: {result.stderr}")
+                self._log(f"ffmpeg错误: {stderr}")
                 # 尝试备用方案 - 使用moviepy
                 return self._create_audio_video_fallback(audio_path, thumbnail_path, output_path)
                 
@@ -1771,137 +2006,103 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
             self._log(f"音频视频生成失败: {e}")
             return False
     
-    def _create_audio_video_without_optimization(self, audio_path: str, thumbnail_path: str, output_path: str) -> bool:
-        """
-        将已优化的音频和缩略图合成为视频文件，不进行重复优化
-        
-        Args:
-            audio_path: 已优化的音频文件路径
-            thumbnail_path: 缩略图路径
-            output_path: 输出视频路径
-            
-        Returns:
-            是否成功生成视频
-        """
+    def _build_still_image_video_cmd(self, audio_path: str, thumbnail_path: str, output_path: str,
+                                     preset: str = "balanced") -> List[str]:
+        """构建单次调用的静态图片视频渲染命令"""
+        if preset not in STILL_IMAGE_RENDER_PRESETS:
+            self._log(f"未知渲染预设 {preset}，使用 balanced", "warning")
+            preset = "balanced"
+        settings = STILL_IMAGE_RENDER_PRESETS[preset]
+        fps = str(settings['fps'])
+        
+        return [
+            'ffmpeg', '-y',  # -y 覆盖输出文件
+            '-loglevel', 'error', '-nostats',
+            '-progress', 'pipe:1',  # 进度信息输出到标准输出
+            '-loop', '1', '-framerate', fps,  # 循环图片，低帧率输入
+            '-i', thumbnail_path,  # 输入图片
+            '-i', audio_path,  # 输入原始音频
+            '-map', '0:v', '-map', '1:a',
+            '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2',  # yuv420p要求宽高为偶数
+            '-c:v', 'libx264',  # 视频编码
+            '-tune', 'stillimage',
+            '-preset', settings['preset'],
+            '-crf', str(settings['crf']),
+            '-r', fps,
+            '-pix_fmt', 'yuv420p',  # 像素格式
+            '-af', VOICE_AUDIO_FILTER,  # 音频处理链，与编码在同一次调用中完成
+            '-c:a', 'aac',  # 音频只编码一次
+            '-b:a', settings['audio_bitrate'],
+            '-ar', '44100',
+            '-ac', '2',
+            '-shortest',  # 以最短的输入为准
+            '-movflags', '+faststart',
+            output_path
+        ]
+    
+    def _probe_media_duration(self, media_path: str) -> Optional[float]:
+        """使用ffprobe获取媒体时长（秒），失败返回None"""
         try:
-            # 检查文件是否存在
-            if not os.path.exists(audio_path):
-                self._log(f"音频文件不存在: {audio_path}")
-                return False
-                
-            if not os.path.exists(thumbnail_path):
-                self._log(f"缩略图不存在: {thumbnail_path}")
-                return False
-            
-            self._log("开始生成音频视频文件（使用已优化音频）")
-            
-            # 直接使用已优化的音频，不再重复优化
-            # 使用ffmpeg将音频和图片合成视频
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',  # -y 覆盖输出文件
-                '-loop', '1',  # 循环图片
-                '-i', thumbnail_path,  # 输入图片
-                '-i', audio_path,  # 输入已优化的音频
-                '-c:v', 'libx264',  # 视频编码
-                '-c:a', 'copy',  # 音频直接复制，不重新编码
-                '-pix_fmt', 'yuv420p',  # 像素格式
-                '-shortest',  # 以最短的输入为准
-                output_path
-            ]
-            
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=300)
-            
-            if result.returncode == 0:
-                self._log(f"✅ 音频视频生成成功: {output_path}")
-                return True
-            else:
-                self._log(f"ffmpeg错误: {result.stderr}")
-                # 尝试备用方案 - 使用moviepy
-                return self._create_audio_video_fallback(audio_path, thumbnail_path, output_path)
-                
-        except subprocess.TimeoutExpired:
-            self._log("ffmpeg执行超时，尝试备用方案")
-            return self._create_audio_video_fallback(audio_path, thumbnail_path, output_path)
-        except FileNotFoundError:
-            self._log("ffmpeg未安装，使用备用方案")
-            return self._create_audio_video_fallback(audio_path, thumbnail_path, output_path)
-        except Exception as e:
-            self._log(f"音频视频生成失败: {e}")
-            return False
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                 '-of', 'default=noprint_wrappers=1:nokey=1', media_path],
+                capture_output=True, text=True, timeout=30
+            )
+            return float(result.stdout.strip()) if result.returncode == 0 else None
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            return None
     
-    def _optimize_audio_for_video(self, audio_path: str) -> Optional[str]:
-        """
-        优化音频文件以减小视频大小
-        使用高质量音频压缩参数，包含音频处理链
+    @staticmethod
+    def _parse_ffmpeg_progress(line: str, duration: Optional[float]) -> Optional[float]:
+        """解析 -progress 输出的一行，返回完成比例；不是进度时间行时返回None"""
+        key, _, value = line.strip().partition('=')
+        if key == 'progress' and value == 'end':
+            return 1.0
+        # out_time_us 和 out_time_ms 的单位都是微秒
+        if key in ('out_time_us', 'out_time_ms') and duration:
+            try:
+                return min(1.0, max(0.0, int(value) / 1_000_000 / duration))
+            except ValueError:
+                return None
+        return None
+    
+    def _run_ffmpeg_with_progress(self, cmd: List[str], duration: Optional[float], timeout: int,
+                                  progress_callback=None) -> Tuple[int, str]:
+        """执行带 -progress pipe:1 的ffmpeg命令，解析进度并回调
         
-        Args:
-            audio_path: 原始音频文件路径
-            
         Returns:
-            优化后的音频文件路径，失败返回None
+            (返回码, 错误输出)
         """
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        timed_out = threading.Event()
+        
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.start()
+        last_reported = -1
         try:
-            # 生成优化后的音频文件路径
-            path_obj = Path(audio_path)
-            optimized_filename = f"{path_obj.stem}_optimized.mp3"
-            optimized_path = path_obj.parent / optimized_filename
-            
-            self._log(f"🔄 开始优化音频文件: {audio_path}")
-            
-            # 使用专业的音频压缩命令
-            # 音频处理链说明：
-            # - highpass=100: 高通滤波器，去除100Hz以下的低频噪音
-            # - lowpass=7000: 低通滤波器，去除7kHz以上的高频，适合语音
-            # - compand: 动态压缩，平衡音量
-            # - volume=1.8: 增加音量
-            # - loudnorm: 标准化响度，符合播放标准
-            audio_filter = (
-                "highpass=f=100,"
-                "lowpass=f=7000,"
-                "compand=attacks=0.05:decays=0.2:points=-80/-80|-62/-62|-26/-26|-15/-15|-10/-8|0/-7,"
-                "volume=1.8,"
-                "loudnorm=I=-18:LRA=7:TP=-2"
-            )
-            
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',  # 覆盖输出文件
-                '-i', audio_path,  # 输入文件
-                '-af', audio_filter,  # 音频滤镜链
-                '-codec:a', 'libmp3lame',  # MP3编码器
-                '-b:a', '96k',  # 96kbps比特率，适合语音
-                '-ar', '44100',  # 采样率
-                '-ac', '2',  # 双声道
-                str(optimized_path)
-            ]
-            
-            self._log("执行音频优化命令...")
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, timeout=300)
-            
-            if result.returncode == 0 and optimized_path.exists():
-                # 检查文件大小压缩效果
-                original_size = Path(audio_path).stat().st_size
-                optimized_size = optimized_path.stat().st_size
-                compression_ratio = (1 - optimized_size / original_size) * 100
-                
-                self._log(f"✅ 音频优化成功:")
-                self._log(f"   原始大小: {original_size / 1024 / 1024:.1f}MB")
-                self._log(f"   优化大小: {optimized_size / 1024 / 1024:.1f}MB")
-                self._log(f"   压缩率: {compression_ratio:.1f}%")
-                
-                return str(optimized_path)
-            else:
-                self._log(f"音频优化失败: {result.stderr}")
-                return None
-                
-        except subprocess.TimeoutExpired:
-            self._log("音频优化超时")
-            return None
-        except FileNotFoundError:
-            self._log("ffmpeg未找到，跳过音频优化")
-            return None
-        except Exception as e:
-            self._log(f"音频优化异常: {e}")
-            return None
+            for line in process.stdout:
+                fraction = self._parse_ffmpeg_progress(line, duration)
+                if fraction is None:
+                    continue
+                if progress_callback:
+                    progress_callback(fraction)
+                # 每10%记录一次日志
+                percent = int(fraction * 10) * 10
+                if percent > last_reported:
+                    last_reported = percent
+                    self._log(f"   🎬 渲染进度: {percent}%")
+            stderr = process.stderr.read()
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+        
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return returncode, stderr
     
     def _create_audio_video_fallback(self, audio_path: str, thumbnail_path: str, output_path: str) -> bool:
         """使用moviepy作为备用方案生成音频视频"""
@@ -2259,27 +2460,23 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
             return {'success': False, 'cancelled': True, 'message': '用户取消操作'}
         
         try:
-            # 4. 优化音频
-            self._log("优化音频文件...")
-            print("\n🎵 正在优化音频文件...")
-            optimized_audio = self._optimize_audio_for_video(audio_file)
-            if not optimized_audio:
-                self._log("音频优化失败，使用原始音频")
-                optimized_audio = audio_file
-            
-            # 5. 生成视频文件
+            # 4. 生成视频文件（音频优化与视频编码在同一次ffmpeg调用中完成）
             self._log("生成视频文件...")
             print("\n🎬 正在生成视频文件...")
             audio_name = Path(audio_file).stem
             video_path = f".tmp/videos/{audio_name}.mp4"
             Path(video_path).parent.mkdir(parents=True, exist_ok=True)
             
-            success = self._create_audio_video_without_optimization(optimized_audio, cover_image, video_path)
+            success = self.create_audio_video(
+                audio_file, cover_image, video_path,
+                progress_callback=lambda fraction: print(f"\r   进度: {fraction:.0%}", end="", flush=True)
+            )
+            print()
             if not success:
                 self._log("视频生成失败")
                 return {'success': False, 'cancelled': False, 'message': '视频生成失败'}
             
-            # 6. 上传到YouTube
+            # 5. 上传到YouTube
             self._log("上传到YouTube...")
             
             # 构造video_info和content_guide以兼容现有上传方法
@@ -2313,11 +2510,9 @@ YouTube 동영상 "{video_info['title']}"에 대한 {podcast_minutes}분간의 
                 youtube_url = f"https://www.youtube.com/watch?v={youtube_video_id}"
                 self._log(f"✅ 上传成功! YouTube链接: {youtube_url}")
                 
-                # 7. 清理临时文件
+                # 6. 清理临时文件
                 try:
                     Path(video_path).unlink()
-                    if optimized_audio != audio_file:
-                        Path(optimized_audio).unlink()
                 except:
                     pass
                 
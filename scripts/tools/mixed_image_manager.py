@@ -523,7 +523,10 @@ class MixedImageManager:
                         replacements[original_markdown] = new_markdown
                         processed_count += 1
                         
-                        print(f"  ✅ {i:02d}. {Path(cache_path).name} -> OneDrive")
+                        if upload_result.get('reused'):
+                            print(f"  ♻️ {i:02d}. {Path(cache_path).name} -> 复用已上传图片")
+                        else:
+                            print(f"  ✅ {i:02d}. {Path(cache_path).name} -> OneDrive")
                     else:
                         logger.error(f"Failed to upload {cache_path}: {upload_result.get('error')}")
                         
@@ -562,6 +565,20 @@ class MixedImageManager:
             # 使用现有的processor逻辑
             processor = self.onedrive_manager.processor
             
+            # 上传前先按文件哈希查重，已上传过的图片直接复用链接，不再调用Graph API
+            file_hash = None
+            if processor.index:
+                file_hash, existing = processor.index.lookup_file(cache_path)
+                if existing:
+                    return {
+                        'success': True,
+                        'reused': True,
+                        'onedrive_file_id': existing.onedrive_file_id,
+                        'remote_path': existing.onedrive_path,
+                        'direct_link': existing.embed_url,
+                        'embed_url': existing.embed_url
+                    }
+            
             # 生成远程路径
             cache_file = Path(cache_path)
             now = datetime.now()
@@ -591,7 +608,8 @@ class MixedImageManager:
                     article_title=article_title,
                     onedrive_file_id=upload_result['id'],
                     image_index=index,
-                    processing_notes=f"Mixed workflow upload from cache"
+                    processing_notes=f"Mixed workflow upload from cache",
+                    file_hash=file_hash or None
                 )
             
             return {
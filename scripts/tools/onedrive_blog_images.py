@@ -18,11 +18,14 @@ import argparse
 import webbrowser
 import subprocess
 import platform
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs, urlencode
 import requests
+from requests.adapters import HTTPAdapter
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import threading
 from dotenv import load_dotenv
@@ -127,6 +130,8 @@ class OneDriveAuthManager:
         self.config = config['auth']
         self.token_file = Path("config/onedrive_tokens.json")
         self.tokens = self._load_tokens()
+        # 并发上传时避免多个线程同时刷新令牌
+        self._token_lock = threading.Lock()
         
     def _load_tokens(self) -> Dict:
         """加载已保存的令牌"""
@@ -218,12 +223,20 @@ class OneDriveAuthManager:
         if not self.tokens:
             raise Exception("No tokens available. Please run authentication first.")
         
-        # 检查令牌是否即将过期（提前5分钟刷新）
-        if time.time() > (self.tokens.get('expires_at', 0) - 300):
-            logger.info("Token expired or expiring soon, refreshing...")
+        with self._token_lock:
+            # 检查令牌是否即将过期（提前5分钟刷新）
+            if time.time() > (self.tokens.get('expires_at', 0) - 300):
+                logger.info("Token expired or expiring soon, refreshing...")
+                return self.refresh_access_token()
+            
+            return self.tokens['access_token']
+    
+    def refresh_rejected_token(self, rejected_token: str) -> str:
+        """服务器拒绝令牌（401）后刷新；其他线程已刷新过时直接返回新令牌"""
+        with self._token_lock:
+            if self.tokens.get('access_token') != rejected_token:
+                return self.tokens['access_token']
             return self.refresh_access_token()
-        
-        return self.tokens['access_token']
     
     def authenticate_interactive(self):
         """交互式OAuth认证流程"""
@@ -276,18 +289,85 @@ class OneDriveAuthManager:
         raise Exception("Authentication failed: No code received")
 
 
+class UploadSessionStore:
+    """大文件上传会话的断点续传状态，持久化在图片索引旁边"""
+    
+    def __init__(self, state_file: str = "_data/onedrive_upload_sessions.json"):
+        self.state_file = Path(state_file)
+        self._lock = threading.Lock()
+        self.sessions: Dict[str, Dict] = self._load()
+    
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load upload sessions: {e}")
+        return {}
+    
+    def _save(self):
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.state_file.with_suffix('.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.sessions, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"Failed to save upload sessions: {e}")
+    
+    @staticmethod
+    def make_key(local_path: str, remote_path: str) -> str:
+        return f"{Path(local_path).resolve()}|{remote_path}"
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self.sessions.get(key)
+    
+    def put(self, key: str, session: Dict):
+        with self._lock:
+            self.sessions[key] = session
+            self._save()
+    
+    def remove(self, key: str):
+        with self._lock:
+            if self.sessions.pop(key, None) is not None:
+                self._save()
+
+
 class OneDriveUploadManager:
     """OneDrive文件上传管理器"""
     
+    # Graph API简单上传上限为4MB，更大的文件需使用上传会话
+    SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024
+    # 上传会话的分块大小必须是320KiB的整数倍
+    CHUNK_ALIGNMENT = 320 * 1024
+    
     def __init__(self, auth_manager: OneDriveAuthManager, config: Dict):
         self.auth = auth_manager
         self.config = config
         self.api_base = "https://graph.microsoft.com/v1.0"
         
+        # 共享Session复用keep-alive连接，连接池大小与并发上传数一致
+        pool_size = config.get('processing', {}).get('max_concurrent_uploads', 4)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        
+        # 本次运行中已确认存在的文件夹，避免每次上传都逐级GET检查
+        self._folder_cache: Dict[str, Dict] = {}
+        self._folder_lock = threading.Lock()
+        
+        # 大文件分块上传的断点续传状态
+        self.session_store = UploadSessionStore(
+            config.get('processing', {}).get('upload_session_state_file', "_data/onedrive_upload_sessions.json")
+        )
+        
     def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         """发起Graph API请求"""
+        access_token = self.auth.get_valid_access_token()
         headers = {
-            'Authorization': f'Bearer {self.auth.get_valid_access_token()}',
+            'Authorization': f'Bearer {access_token}',
             'Content-Type': 'application/json'
         }
         
@@ -296,18 +376,28 @@ class OneDriveUploadManager:
             del kwargs['headers']
         
         url = f"{self.api_base}{endpoint}"
-        response = requests.request(method, url, headers=headers, **kwargs)
+        response = self.session.request(method, url, headers=headers, **kwargs)
         
         if response.status_code == 401:
             # 令牌可能过期，尝试刷新后重试
             logger.info("Received 401, refreshing token and retrying...")
-            headers['Authorization'] = f'Bearer {self.auth.refresh_access_token()}'
-            response = requests.request(method, url, headers=headers, **kwargs)
+            headers['Authorization'] = f'Bearer {self.auth.refresh_rejected_token(access_token)}'
+            response = self.session.request(method, url, headers=headers, **kwargs)
         
         return response
     
     def create_folder(self, folder_path: str) -> Dict:
-        """创建文件夹（如果不存在）"""
+        """创建文件夹（如果不存在），结果在本次运行中缓存"""
+        with self._folder_lock:
+            if folder_path not in self._folder_cache:
+                folder_info = self._create_folder_uncached(folder_path)
+                if not folder_info:
+                    return folder_info
+                self._folder_cache[folder_path] = folder_info
+            return self._folder_cache[folder_path]
+    
+    def _create_folder_uncached(self, folder_path: str) -> Dict:
+        """逐级检查并创建文件夹"""
         try:
             # 先尝试获取文件夹
             response = self._make_request('GET', f"/me/drive/root:/{folder_path}")
@@ -347,14 +437,24 @@ class OneDriveUploadManager:
         response = self._make_request('GET', f"/me/drive/root:/{folder_path}")
         return response.json() if response.status_code == 200 else {}
     
-    def upload_file(self, local_path: str, remote_path: str) -> Dict:
-        """上传文件到OneDrive"""
+    def upload_file(self, local_path: str, remote_path: str,
+                    progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """上传文件到OneDrive
+        
+        小于4MB的文件直接上传，更大的文件使用可断点续传的分块上传会话。
+        
+        Args:
+            local_path: 本地文件路径
+            remote_path: OneDrive目标路径
+            progress_callback: 进度回调，参数为 (已上传字节数, 总字节数)
+        """
         local_file = Path(local_path)
         if not local_file.exists():
             raise FileNotFoundError(f"Local file not found: {local_path}")
         
         file_size = local_file.stat().st_size
-        max_size = self.config['processing']['max_file_size_mb'] * 1024 * 1024
+        processing = self.config['processing']
+        max_size = processing.get('max_upload_size_mb', processing['max_file_size_mb']) * 1024 * 1024
         
         if file_size > max_size:
             raise ValueError(f"File too large: {file_size / (1024*1024):.1f}MB > {max_size / (1024*1024)}MB")
@@ -364,6 +464,9 @@ class OneDriveUploadManager:
         if folder_path:
             self.create_folder(folder_path)
         
+        if file_size > self.SIMPLE_UPLOAD_LIMIT:
+            return self._upload_large_file(local_file, remote_path, file_size, progress_callback)
+        
         # 上传文件
         with open(local_file, 'rb') as file_data:
             headers = {'Content-Type': 'application/octet-stream'}
@@ -376,10 +479,150 @@ class OneDriveUploadManager:
         
         if response.status_code in [200, 201]:
             logger.info(f"Successfully uploaded: {local_path} -> {remote_path}")
+            if progress_callback:
+                progress_callback(file_size, file_size)
             return response.json()
         else:
             raise Exception(f"Upload failed: {response.text}")
     
+    def _chunk_size(self) -> int:
+        """配置的分块大小，向下对齐到320KiB"""
+        chunk_mb = self.config['processing'].get('upload_chunk_size_mb', 5)
+        chunk_size = int(chunk_mb * 1024 * 1024) // self.CHUNK_ALIGNMENT * self.CHUNK_ALIGNMENT
+        return max(chunk_size, self.CHUNK_ALIGNMENT)
+    
+    def _create_upload_session(self, remote_path: str) -> Dict:
+        """创建上传会话"""
+        response = self._make_request(
+            'POST',
+            f"/me/drive/root:/{remote_path}:/createUploadSession",
+            json={"item": {"@microsoft.graph.conflictBehavior": "replace"}}
+        )
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Failed to create upload session: {response.text}")
+        return response.json()
+    
+    def _query_next_offset(self, upload_url: str, default: Optional[int] = None) -> Optional[int]:
+        """查询上传会话的下一个待上传字节位置
+
+        Returns:
+            下一个待上传的字节位置；会话已失效（404/410）时返回None；
+            网络错误或服务端临时错误时返回default，由调用方稍后重试
+        """
+        # uploadUrl 自带鉴权信息，不能附加Authorization头
+        try:
+            response = self.session.get(upload_url, timeout=30)
+        except requests.RequestException as e:
+            logger.warning(f"Failed to query upload session status, will retry later: {e}")
+            return default
+        if response.status_code in (404, 410):
+            return None
+        if response.status_code != 200:
+            logger.warning(f"Upload session status query returned {response.status_code}, will retry later")
+            return default
+        ranges = response.json().get('nextExpectedRanges') or []
+        if not ranges:
+            return None
+        return int(ranges[0].split('-')[0])
+    
+    def _upload_large_file(self, local_file: Path, remote_path: str, file_size: int,
+                           progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """通过上传会话分块上传大文件，会话失效时重新创建（次数受 upload_max_session_restarts 限制）"""
+        max_restarts = self.config['processing'].get('upload_max_session_restarts', 2)
+        for restart in range(max_restarts + 1):
+            if restart:
+                logger.warning(f"Upload session for {local_file.name} expired, "
+                               f"restarting from scratch ({restart}/{max_restarts})")
+            result = self._upload_with_session(local_file, remote_path, file_size, progress_callback)
+            if result is not None:
+                return result
+        raise Exception(f"Chunked upload failed: upload session expired {max_restarts + 1} times")
+    
+    def _upload_with_session(self, local_file: Path, remote_path: str, file_size: int,
+                             progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[Dict]:
+        """在一个上传会话内分块上传，支持从上次确认的字节位置续传
+
+        Returns:
+            上传完成后的文件信息；会话失效时返回None（已清除保存的会话）
+        """
+        key = UploadSessionStore.make_key(str(local_file), remote_path)
+        file_mtime = local_file.stat().st_mtime
+        chunk_size = self._chunk_size()
+        max_retries = self.config['processing'].get('upload_max_retries', 3)
+        
+        # 尝试恢复未完成的会话（文件未修改且会话仍有效）
+        offset = 0
+        saved = self.session_store.get(key)
+        upload_url = None
+        if saved and saved.get('file_size') == file_size and saved.get('file_mtime') == file_mtime:
+            resumed_offset = self._query_next_offset(saved['upload_url'], default=saved.get('offset', 0))
+            if resumed_offset is not None:
+                upload_url = saved['upload_url']
+                offset = resumed_offset
+                logger.info(f"Resuming upload of {local_file.name} at {offset}/{file_size} bytes")
+        
+        if not upload_url:
+            upload_session = self._create_upload_session(remote_path)
+            upload_url = upload_session['uploadUrl']
+            self.session_store.put(key, {
+                'upload_url': upload_url,
+                'remote_path': remote_path,
+                'file_size': file_size,
+                'file_mtime': file_mtime,
+                'expiration': upload_session.get('expirationDateTime'),
+                'offset': 0
+            })
+        
+        retries = 0
+        with open(local_file, 'rb') as f:
+            while True:
+                f.seek(offset)
+                chunk = f.read(chunk_size)
+                end = offset + len(chunk) - 1
+                headers = {
+                    'Content-Length': str(len(chunk)),
+                    'Content-Range': f"bytes {offset}-{end}/{file_size}"
+                }
+                
+                try:
+                    response = self.session.put(upload_url, data=chunk, headers=headers, timeout=120)
+                except requests.RequestException as e:
+                    response = None
+                    error = str(e)
+                else:
+                    error = response.text
+                
+                if response is not None and response.status_code in [200, 201]:
+                    # 最后一个分块上传完成
+                    self.session_store.remove(key)
+                    if progress_callback:
+                        progress_callback(file_size, file_size)
+                    logger.info(f"Successfully uploaded: {local_file} -> {remote_path}")
+                    return response.json()
+                
+                if response is not None and response.status_code == 202:
+                    ranges = response.json().get('nextExpectedRanges') or [f"{end + 1}-"]
+                    offset = int(ranges[0].split('-')[0])
+                    retries = 0
+                    saved = self.session_store.get(key) or {}
+                    saved['offset'] = offset
+                    self.session_store.put(key, saved)
+                    if progress_callback:
+                        progress_callback(offset, file_size)
+                    continue
+                
+                # 失败：重新向服务器确认已接收的位置后重试（查询失败时按原位置重试）
+                retries += 1
+                if retries > max_retries:
+                    raise Exception(f"Chunked upload failed after {max_retries} retries: {error}")
+                logger.warning(f"Chunk upload failed ({error[:200]}), retry {retries}/{max_retries}")
+                time.sleep(2 ** retries)
+                confirmed_offset = self._query_next_offset(upload_url, default=offset)
+                if confirmed_offset is None:
+                    self.session_store.remove(key)
+                    return None
+                offset = confirmed_offset
+    
     def get_sharing_link(self, item_id: str, link_type: str = 'view') -> str:
         """获取文件的分享链接"""
         share_data = {
@@ -746,6 +989,33 @@ class MarkdownImageProcessor:
         
         return f"{self.config['onedrive']['base_folder']}/{folder_path}/{filename}"
     
+    def _upload_image(self, local_path: str, article_title: str,
+                      index: int) -> Tuple[str, str, Dict, str, str]:
+        """上传单张图片并获取分享链接（在工作线程中执行）
+        
+        Returns:
+            (local_path, remote_path, upload_result, share_link, embed_link)
+        """
+        # 生成远程路径
+        remote_path = self._generate_remote_path(local_path, article_title, index)
+        
+        # 上传文件
+        logger.info(f"Uploading {local_path} to OneDrive...")
+        upload_result = self.uploader.upload_file(local_path, remote_path)
+        
+        # 获取view+anonymous分享链接
+        try:
+            share_link = self.uploader.get_direct_image_url(upload_result['id'])
+            embed_link = share_link  # 直接使用view+anonymous链接，不进行embed转换
+            logger.info(f"Using view+anonymous sharing URL: {share_link[:100]}...")
+        except Exception as e:
+            logger.warning(f"Failed to get sharing link: {e}")
+            # 如果主要方法失败，回退到基础分享链接
+            share_link = self.uploader.get_sharing_link(upload_result['id'])
+            embed_link = share_link  # 不进行embed转换，保持原始分享链接
+        
+        return local_path, remote_path, upload_result, share_link, embed_link
+    
     def process_article(self, article_path: str) -> Dict:
         """处理文章中的所有图片"""
         try:
@@ -769,39 +1039,67 @@ class MarkdownImageProcessor:
             
             logger.info(f"Found {len(local_images)} local images in {article_path}")
             
-            # 处理每个图片
+            # 上传前先计算哈希（仅本地I/O）：索引中已有的图片直接复用链接，
+            # 同一文章内重复引用的图片只上传一次
+            uploads = {}
+            file_hashes = {}
+            to_upload = {}
+            duplicates = {}
+            first_by_hash = {}
+            for i, (_, _, img_path) in enumerate(local_images, 1):
+                local_path = self._resolve_local_path(img_path, article_path)
+                if not local_path:
+                    logger.warning(f"Could not resolve local path: {img_path}")
+                    continue
+                
+                file_hash, existing = self.index.lookup_file(local_path) if self.index else ("", None)
+                file_hashes[i] = file_hash
+                if existing:
+                    logger.info(f"♻️ Reusing existing upload for {Path(local_path).name}: {existing.onedrive_path}")
+                    uploads[i] = (local_path, existing.onedrive_path,
+                                  {'id': existing.onedrive_file_id, 'reused': True},
+                                  existing.onedrive_url, existing.embed_url)
+                elif file_hash and file_hash in first_by_hash:
+                    duplicates[i] = first_by_hash[file_hash]
+                else:
+                    if file_hash:
+                        first_by_hash[file_hash] = i
+                    to_upload[i] = local_path
+            
+            # 并发上传剩余图片（仅网络操作），索引记录和本地文件处理在主线程中按顺序完成
+            max_workers = max(1, self.config['processing'].get('max_concurrent_uploads', 4))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="onedrive-upload") as executor:
+                futures = {
+                    executor.submit(self._upload_image, local_path, article_title, i): i
+                    for i, local_path in to_upload.items()
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        uploads[i] = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to process image {local_images[i - 1][2]}: {e}")
+            
+            for i, first in duplicates.items():
+                if first in uploads:
+                    _, remote_path, upload_result, share_link, embed_link = uploads[first]
+                    local_path = self._resolve_local_path(local_images[i - 1][2], article_path)
+                    uploads[i] = (local_path, remote_path, dict(upload_result, reused=True),
+                                  share_link, embed_link)
+            
             replacements = {}
             processed_count = 0
             
-            for i, (full_match, alt_text, img_path) in enumerate(local_images, 1):
-                try:
-                    # 解析本地路径
-                    local_path = self._resolve_local_path(img_path, article_path)
-                    if not local_path:
-                        logger.warning(f"Could not resolve local path: {img_path}")
+            # 索引记录批量写入，整篇文章处理完后统一保存一次
+            index_batch = self.index.batch() if self.index else nullcontext()
+            with index_batch:
+                for i, (full_match, alt_text, img_path) in enumerate(local_images, 1):
+                    if i not in uploads:
                         continue
-                    
-                    # 生成远程路径
-                    remote_path = self._generate_remote_path(local_path, article_title, i)
-                    
-                    # 上传文件
-                    logger.info(f"Uploading {local_path} to OneDrive...")
-                    upload_result = self.uploader.upload_file(local_path, remote_path)
-                    
-                    # 获取view+anonymous分享链接
-                    share_link = None
-                    try:
-                        share_link = self.uploader.get_direct_image_url(upload_result['id'])
-                        embed_link = share_link  # 直接使用view+anonymous链接，不进行embed转换
-                        logger.info(f"Using view+anonymous sharing URL: {share_link[:100]}...")
-                    except Exception as e:
-                        logger.warning(f"Failed to get sharing link: {e}")
-                        # 如果主要方法失败，回退到基础分享链接
-                        share_link = self.uploader.get_sharing_link(upload_result['id'])
-                        embed_link = share_link  # 不进行embed转换，保持原始分享链接
-                    
-                    # 添加到索引记录
-                    if self.index:
+                    local_path, remote_path, upload_result, share_link, embed_link = uploads[i]
+                
+                    # 添加到索引记录（复用已有上传的图片无需重复记录）
+                    if self.index and not upload_result.get('reused'):
                         try:
                             self.index.add_record(
                                 local_path=local_path,
@@ -812,11 +1110,12 @@ class MarkdownImageProcessor:
                                 article_title=article_title,
                                 onedrive_file_id=upload_result['id'],
                                 image_index=i,
-                                processing_notes=f"Uploaded from {img_path}"
+                                processing_notes=f"Uploaded from {img_path}",
+                                file_hash=file_hashes.get(i) or None
                             )
                         except Exception as e:
                             logger.warning(f"Failed to add image to index: {e}")
-                    
+                
                     # 记录替换 - 根据图片类型使用不同格式
                     if alt_text.startswith("header_"):
                         # Front matter 字段使用 YAML 格式
@@ -829,27 +1128,24 @@ class MarkdownImageProcessor:
                     else:
                         # 正文图片使用 Markdown 格式
                         new_link = f"![{alt_text}]({embed_link})"
-                    
+                
                     replacements[full_match] = new_link
                     processed_count += 1
-                    
+                
                     # 处理本地文件（备份到项目临时目录，可选删除）
                     self._handle_local_file_after_upload(local_path, remote_path)
-                    
+                
                     logger.info(f"✅ Processed image {i}/{len(local_images)}: {Path(local_path).name}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process image {img_path}: {e}")
-                    continue
             
-            # 应用替换
+            # 一次性应用所有替换，并通过临时文件原子写回，避免中途失败留下半更新的文章
             if replacements:
                 for old_link, new_link in replacements.items():
                     content = content.replace(old_link, new_link)
                 
-                # 写回文件
-                with open(article_file, 'w', encoding='utf-8') as f:
+                temp_file = article_file.with_name(f".{article_file.name}.tmp")
+                with open(temp_file, 'w', encoding='utf-8') as f:
                     f.write(content)
+                os.replace(temp_file, article_file)
                 
                 logger.info(f"✅ Updated {article_path} with {len(replacements)} new links")
             
@@ -5,16 +5,30 @@ OneDrive博客图片索引管理系统
 """
 
 import json
+import bisect
 import hashlib
+import mmap
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Iterator, Tuple
+from dataclasses import dataclass, asdict, fields
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
+# 哈希计算的读取缓冲区大小，超过阈值的大文件改用mmap
+HASH_BUFFER_SIZE = 1024 * 1024
+HASH_MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# 存储模式：未显式指定时由环境变量选择，所有使用默认构造的调用方（上传、下载、菜单）保持一致
+STORAGE_ENV_VAR = "ONEDRIVE_IMAGE_INDEX_STORAGE"
+STORAGE_MODES = ("json", "sqlite")
+
 @dataclass
 class ImageRecord:
     """图片记录数据结构"""
@@ -42,18 +56,56 @@ class ImageRecord:
 
 
 class OneDriveImageIndex:
-    """OneDrive图片索引管理器"""
+    """OneDrive图片索引管理器
+
+    记录保存在 self.records 中，同时维护按哈希、文章、日期的二级索引，
+    查询和插入不随记录数增长而变慢。存储支持两种模式：
+    - json: 兼容现有 _data/onedrive_image_index.json（其他工具直接读取此文件）
+    - sqlite: 逐条写入的SQLite数据库，适合大型图库；数据库为空时自动从JSON迁移（auto_migrate=False 时跳过）
+    未传入 storage 时读取环境变量 ONEDRIVE_IMAGE_INDEX_STORAGE（默认json）。
+    批量添加时使用 batch() 上下文，退出时统一提交一次。
+    """
     
-    def __init__(self, index_file: str = "_data/onedrive_image_index.json"):
+    def __init__(self, index_file: str = "_data/onedrive_image_index.json", storage: Optional[str] = None,
+                 auto_migrate: bool = True):
         self.index_file = Path(index_file)
         self.index_file.parent.mkdir(exist_ok=True, parents=True)
+        self.storage = (storage or os.getenv(STORAGE_ENV_VAR) or "json").strip().lower()
+        if self.storage not in STORAGE_MODES:
+            raise ValueError(f"不支持的索引存储模式: {self.storage}（可选: {', '.join(STORAGE_MODES)}）")
+        self.db_file = self.index_file.with_suffix('.db')
         self.records: Dict[str, ImageRecord] = {}
+        
+        # 二级索引
+        self._by_hash: Dict[str, str] = {}
+        self._by_article: Dict[str, List[str]] = {}
+        self._by_date: List[tuple] = []
+        
+        # 批量提交状态
+        self._batch_depth = 0
+        self._dirty = False
+        self._pending_keys: List[str] = []
+        
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.storage == "sqlite":
+            self._conn = sqlite3.connect(self.db_file)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
         self._load_index()
+        
+        # 首次切换到SQLite时自动导入现有JSON索引
+        if auto_migrate and self._conn is not None and not self.records and self.index_file.exists():
+            self.migrate_from_json()
     
     def _load_index(self):
         """加载索引文件"""
         try:
-            if self.index_file.exists():
+            if self._conn is not None:
+                rows = self._conn.execute("SELECT key, data FROM records").fetchall()
+                self.records = {key: ImageRecord(**json.loads(data)) for key, data in rows}
+                print(f"📖 加载了 {len(self.records)} 条图片记录")
+            elif self.index_file.exists():
                 with open(self.index_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     self.records = {
@@ -66,24 +118,116 @@ class OneDriveImageIndex:
         except Exception as e:
             print(f"⚠️ 索引文件加载失败: {e}")
             self.records = {}
+        self._rebuild_indexes()
+    
+    def _rebuild_indexes(self):
+        """根据 self.records 重建二级索引"""
+        self._by_hash = {}
+        self._by_article = {}
+        self._by_date = []
+        for key, record in self.records.items():
+            self._index_record(key, record, keep_sorted=False)
+        self._by_date.sort()
+    
+    def _index_record(self, key: str, record: ImageRecord, keep_sorted: bool = True):
+        """将单条记录加入二级索引"""
+        # 同一哈希保留最早的记录，与原先线性扫描的结果一致
+        self._by_hash.setdefault(record.file_hash, key)
+        self._by_article.setdefault(Path(record.article_file).stem, []).append(key)
+        if keep_sorted:
+            bisect.insort(self._by_date, (record.article_date, key))
+        else:
+            self._by_date.append((record.article_date, key))
+    
+    @contextmanager
+    def batch(self) -> Iterator["OneDriveImageIndex"]:
+        """批量操作上下文：期间的修改在退出时一次性保存"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._save_index()
+    
+    def _mark_dirty(self, key: Optional[str] = None):
+        """记录修改，非批量模式下立即保存"""
+        self._dirty = True
+        if key:
+            self._pending_keys.append(key)
+        if self._batch_depth == 0:
+            self._save_index()
     
     def _save_index(self):
         """保存索引文件"""
         try:
-            data = {key: asdict(record) for key, record in self.records.items()}
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            if self._conn is not None:
+                # SQLite模式只写入变更的记录
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO records (key, data) VALUES (?, ?)",
+                        [(key, json.dumps(asdict(self.records[key]), ensure_ascii=False))
+                         for key in self._pending_keys if key in self.records]
+                    )
+                    removed = [(key,) for key in self._pending_keys if key not in self.records]
+                    if removed:
+                        self._conn.executemany("DELETE FROM records WHERE key = ?", removed)
+            else:
+                # 先写临时文件再原子替换，中途失败不会留下截断的索引
+                data = {key: asdict(record) for key, record in self.records.items()}
+                fd, tmp_path = tempfile.mkstemp(dir=self.index_file.parent, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, indent=2, ensure_ascii=False)
+                    os.replace(tmp_path, self.index_file)
+                except BaseException:
+                    Path(tmp_path).unlink(missing_ok=True)
+                    raise
+            self._dirty = False
+            self._pending_keys = []
             print(f"💾 已保存 {len(self.records)} 条图片记录")
         except Exception as e:
             print(f"❌ 索引文件保存失败: {e}")
     
+    def migrate_from_json(self, json_file: Optional[str] = None) -> int:
+        """将JSON索引迁移到SQLite存储
+
+        Args:
+            json_file: JSON索引文件路径，默认为 index_file
+
+        Returns:
+            迁移的记录数
+        """
+        if self._conn is None:
+            raise ValueError("migrate_from_json 仅适用于 sqlite 存储模式")
+        
+        source = Path(json_file) if json_file else self.index_file
+        with open(source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        known_fields = {field.name for field in fields(ImageRecord)}
+        with self.batch():
+            for key, record in data.items():
+                record = ImageRecord(**{k: v for k, v in record.items() if k in known_fields})
+                self.records[key] = record
+                self._pending_keys.append(key)
+            self._dirty = True
+        self._rebuild_indexes()
+        print(f"✅ 已迁移 {len(data)} 条记录到 {self.db_file}")
+        return len(data)
+    
     def _calculate_file_hash(self, file_path: str) -> str:
         """计算文件MD5哈希值"""
         try:
             hash_md5 = hashlib.md5()
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
+                file_size = Path(file_path).stat().st_size
+                if file_size >= HASH_MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        hash_md5.update(mapped)
+                else:
+                    for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+                        hash_md5.update(chunk)
             return hash_md5.hexdigest()
         except Exception as e:
             print(f"⚠️ 文件哈希计算失败 {file_path}: {e}")
@@ -98,11 +242,15 @@ class OneDriveImageIndex:
                    article_title: str,
                    onedrive_file_id: str,
                    image_index: int = 1,
-                   processing_notes: Optional[str] = None) -> str:
-        """添加图片记录"""
+                   processing_notes: Optional[str] = None,
+                   file_hash: Optional[str] = None) -> str:
+        """添加图片记录
+        
+        file_hash 为上传前已计算的哈希值，传入时不再重复读取文件
+        """
         
         # 生成记录键值
-        file_hash = self._calculate_file_hash(local_path)
+        file_hash = file_hash or self._calculate_file_hash(local_path)
         record_key = f"{Path(article_file).stem}_{image_index:02d}_{file_hash[:8]}"
         
         # 检查重复文件
@@ -138,7 +286,8 @@ class OneDriveImageIndex:
         
         # 保存记录
         self.records[record_key] = record
-        self._save_index()
+        self._index_record(record_key, record)
+        self._mark_dirty(record_key)
         
         print(f"✅ 已添加图片记录: {record_key}")
         return embed_url
@@ -156,28 +305,37 @@ class OneDriveImageIndex:
     
     def is_duplicate_file(self, file_hash: str) -> bool:
         """检查是否为重复文件"""
-        return any(record.file_hash == file_hash for record in self.records.values())
+        return file_hash in self._by_hash
     
     def find_by_hash(self, file_hash: str) -> Optional[ImageRecord]:
         """根据哈希值查找记录"""
-        for record in self.records.values():
-            if record.file_hash == file_hash:
-                return record
-        return None
+        key = self._by_hash.get(file_hash)
+        return self.records.get(key) if key else None
+    
+    def lookup_file(self, file_path: str) -> Tuple[str, Optional[ImageRecord]]:
+        """上传前查重：计算本地文件哈希并查找已上传的记录
+        
+        Returns:
+            (文件哈希, 已存在的记录或None)
+        """
+        file_hash = self._calculate_file_hash(file_path)
+        return file_hash, (self.find_by_hash(file_hash) if file_hash else None)
     
     def find_by_article(self, article_file: str) -> List[ImageRecord]:
         """查找文章相关的所有图片"""
         article_stem = Path(article_file).stem
-        return [record for record in self.records.values() 
-                if Path(record.article_file).stem == article_stem]
+        return [self.records[key] for key in self._by_article.get(article_stem, [])]
     
     def find_by_date_range(self, start_date: str, end_date: str) -> List[ImageRecord]:
         """查找日期范围内的图片"""
+        # 日期索引已排序，二分定位范围起点
+        start = bisect.bisect_left(self._by_date, (start_date,))
         results = []
-        for record in self.records.values():
-            if start_date <= record.article_date <= end_date:
-                results.append(record)
-        return sorted(results, key=lambda x: x.article_date)
+        for article_date, key in self._by_date[start:]:
+            if article_date > end_date:
+                break
+            results.append(self.records[key])
+        return results
     
     def get_statistics(self) -> Dict:
         """获取图片统计信息"""
@@ -239,9 +397,11 @@ class OneDriveImageIndex:
         
         for key in to_remove:
             del self.records[key]
+            self._pending_keys.append(key)
         
         if to_remove:
-            self._save_index()
+            self._rebuild_indexes()
+            self._mark_dirty()
             print(f"🧹 已清理 {len(to_remove)} 条无效记录")
         
         return len(to_remove)
@@ -265,11 +425,20 @@ def main():
     parser.add_argument('--cleanup', action='store_true', help='清理无效记录')
     parser.add_argument('--article', help='查看指定文章的图片')
     parser.add_argument('--date-range', nargs=2, help='查看日期范围内的图片 (开始日期 结束日期)')
+    parser.add_argument('--storage', choices=STORAGE_MODES,
+                        help=f'索引存储模式（默认读取环境变量 {STORAGE_ENV_VAR}，未设置时为json）')
+    parser.add_argument('--migrate-sqlite', action='store_true', help='将JSON索引迁移到SQLite存储')
     
     args = parser.parse_args()
     
+    if args.migrate_sqlite:
+        # 显式迁移，不再经过构造时的自动导入
+        index = OneDriveImageIndex(storage='sqlite', auto_migrate=False)
+        index.migrate_from_json()
+        return
+    
     # 创建索引管理器
-    index = OneDriveImageIndex()
+    index = OneDriveImageIndex(storage=args.storage)
     
     if args.stats:
         stats = index.get_statistics()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+内容验证器性能基准
+逐篇计时 QualityValidator 和 StructureValidator 的单文档验证耗时，
+并可保存/对比验证结果，确保优化前后输出一致
+
+用法:
+    python benchmark_validators.py
+    python benchmark_validators.py _posts --repeat 10 --dump .tmp/validator_results.json
+    python benchmark_validators.py --compare .tmp/validator_results.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.core.validators import QualityValidator, StructureValidator
+from scripts.core.validators import content_validator
+
+
+def clear_parse_caches() -> None:
+    """清空按内容缓存的解析结果，保证每次计时都包含完整的解析和分析"""
+    content_validator.parse_document.cache_clear()
+    text_analysis = sys.modules.get("scripts.core.validators.text_analysis")
+    if text_analysis is not None:
+        text_analysis.analyze_text.cache_clear()
+
+
+def load_corpus(paths: List[str]) -> List[Tuple[str, str]]:
+    """读取待验证的Markdown文件，返回 (路径, 内容) 列表"""
+    corpus = []
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.md")) if path.is_dir() else [path]
+        for file_path in files:
+            corpus.append((file_path.as_posix(), file_path.read_text(encoding='utf-8')))
+    return corpus
+
+
+def time_validation(validators, content: str, repeat: int) -> Tuple[float, List[List[str]]]:
+    """N次中的最佳验证耗时（毫秒）及验证结果"""
+    best = float('inf')
+    results = []
+    for _ in range(repeat):
+        clear_parse_caches()
+        start = time.perf_counter()
+        results = [validator.validate_content(content) for validator in validators]
+        best = min(best, time.perf_counter() - start)
+    flat = [[r.rule_name, r.severity.value, r.message] for group in results for r in group]
+    return best * 1000, flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="内容验证器性能基准")
+    parser.add_argument("paths", nargs="*", default=["_posts", "_drafts"], help="待验证的目录或文件")
+    parser.add_argument("--repeat", type=int, default=5, help="每篇文章运行次数（取最佳耗时）")
+    parser.add_argument("--dump", help="保存验证结果到JSON文件")
+    parser.add_argument("--compare", help="与之前保存的验证结果对比")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.paths)
+    if not corpus:
+        print("❌ 没有找到Markdown文件")
+        sys.exit(1)
+
+    validators = [QualityValidator(), StructureValidator()]
+    all_results: Dict[str, List[List[str]]] = {}
+    total_ms = 0.0
+
+    print(f"{'文章':<64} {'KB':>7} {'耗时(ms)':>10}")
+    print("-" * 84)
+    for path, content in corpus:
+        elapsed_ms, results = time_validation(validators, content, args.repeat)
+        total_ms += elapsed_ms
+        all_results[path] = results
+        print(f"{Path(path).name[:64]:<64} {len(content.encode('utf-8')) / 1024:>7.1f} {elapsed_ms:>10.2f}")
+
+    print("-" * 84)
+    print(f"共 {len(corpus)} 篇，总耗时 {total_ms:.1f}ms，平均 {total_ms / len(corpus):.2f}ms/篇")
+
+    if args.dump:
+        Path(args.dump).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.dump).write_text(json.dumps(all_results, ensure_ascii=False, indent=1), encoding='utf-8')
+        print(f"📄 验证结果已保存: {args.dump}")
+
+    if args.compare:
+        expected = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        mismatches = [path for path in all_results if all_results[path] != expected.get(path)]
+        if mismatches:
+            print(f"❌ {len(mismatches)} 篇文章的验证结果与基准不一致:")
+            for path in mismatches:
+                print(f"   {path}")
+            sys.exit(1)
+        print("✅ 验证结果与基准一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ Modules:
     jekyll_to_wp: Migrate Jekyll markdown posts to WordPress
     gridea_html_to_wp: Migrate Gridea static HTML to WordPress
     generate_redirects: Generate 301 redirect rules
+    migration_journal: Checkpoint journal for resumable migration runs
 """
 
 __version__ = "1.0.0"
@@ -8,6 +8,7 @@ Includes:
 - Buy Me A Coffee image fix
 - Gutenberg format conversion
 - Correct category mapping
+- Complete (paginated, locally cached) duplicate detection
 
 Usage:
     python batch_migrate_gridea.py --dry-run
@@ -20,19 +21,23 @@ import sys
 import re
 import json
 import argparse
+import html
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup, Tag
 
 # Add parent path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from scripts.tools.wordpress_migration.gutenberg_converter import GutenbergConverter, ConversionOptions
+from scripts.tools.wordpress_migration.migration_journal import MigrationJournal
 
 logging.basicConfig(
     level=logging.INFO,
@@ -40,6 +45,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Only the fields duplicate detection needs, so each page stays small
+EXISTING_POST_FIELDS = 'id,slug,title,modified'
+EXISTING_POSTS_PER_PAGE = 100
+
 
 # Category mapping based on content analysis
 CATEGORY_MAPPING = {
@@ -118,15 +127,23 @@ class MigrationResult:
     wp_id: Optional[int] = None
     wp_url: Optional[str] = None
     error: Optional[str] = None
+    skipped: bool = False
 
 
 class EnhancedGrideaMigrator:
     """Enhanced Gridea to WordPress migrator with all improvements"""
 
-    def __init__(self, wp_url: str, wp_user: str, wp_password: str, dry_run: bool = False):
+    def __init__(self, wp_url: str, wp_user: str, wp_password: str, dry_run: bool = False,
+                 journal_file: Optional[str] = "batch_migration_journal.jsonl", force: bool = False,
+                 posts_cache_file: Optional[str] = "batch_existing_posts.json",
+                 refresh_existing: bool = False, fetch_workers: int = 4):
         self.wp_url = wp_url
         self.session = requests.Session()
         self.session.auth = (wp_user, wp_password)
+        # Keep enough pooled connections for the concurrent page sweep
+        adapter = HTTPAdapter(pool_connections=max(fetch_workers, 1), pool_maxsize=max(fetch_workers, 1))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.api_base = f"{wp_url}/wp-json/wp/v2"
         self.dry_run = dry_run
 
@@ -139,22 +156,159 @@ class EnhancedGrideaMigrator:
 
         # Cache
         self.category_cache: Dict[str, int] = {}
-        self.existing_slugs: set = set()
+        # Existing WordPress posts: slug -> {id, title, modified}, plus a title index
+        self.existing_posts: Dict[str, dict] = {}
+        self.existing_titles: Dict[str, int] = {}
+        self._existing_loaded = False
+        self.posts_cache_file = Path(posts_cache_file) if posts_cache_file else None
+        self.refresh_existing = refresh_existing
+        self.fetch_workers = max(fetch_workers, 1)
+        self._posts_etag: Optional[str] = None
 
         # Stats
         self.results: List[MigrationResult] = []
 
+        # Checkpoint journal for resumable runs
+        self.journal = MigrationJournal(journal_file) if journal_file else None
+        self.force = force
+
+    @staticmethod
+    def _normalize_title(title: str) -> str:
+        """Normalize a title for duplicate matching (REST titles are HTML-escaped)"""
+        return re.sub(r'\s+', ' ', html.unescape(title)).strip().lower()
+
+    def _index_post(self, slug: str, post_id: int, title: str, modified: str = ''):
+        """Add a post to the slug and title indexes"""
+        self.existing_posts[slug] = {'id': post_id, 'title': title, 'modified': modified}
+        if title:
+            self.existing_titles[self._normalize_title(title)] = post_id
+
+    def _fetch_posts_page(self, page: int, extra_params: Optional[dict] = None,
+                          headers: Optional[dict] = None) -> requests.Response:
+        params = {
+            'per_page': EXISTING_POSTS_PER_PAGE,
+            'page': page,
+            'status': 'publish',
+            'orderby': 'id',
+            'order': 'asc',
+            '_fields': EXISTING_POST_FIELDS,
+        }
+        params.update(extra_params or {})
+        return self.session.get(f"{self.api_base}/posts", params=params, headers=headers or {}, timeout=30)
+
+    def _fetch_all_posts(self, extra_params: Optional[dict] = None,
+                         etag: Optional[str] = None) -> Tuple[Optional[List[dict]], Optional[str]]:
+        """
+        Fetch every page of posts: page 1 first for X-WP-TotalPages, the rest concurrently.
+
+        Returns (posts, etag); posts is None when the server answered 304 Not Modified.
+        Raises RuntimeError if any page fails, so a partial index is never trusted.
+        """
+        response = self._fetch_posts_page(1, extra_params, {'If-None-Match': etag} if etag else None)
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to list posts: {response.status_code} - {response.text[:200]}")
+
+        posts = list(response.json())
+        total_pages = int(response.headers.get('X-WP-TotalPages', 1) or 1)
+        new_etag = response.headers.get('ETag')
+
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=min(self.fetch_workers, total_pages - 1)) as executor:
+                futures = {
+                    executor.submit(self._fetch_posts_page, page, extra_params): page
+                    for page in range(2, total_pages + 1)
+                }
+                for future in as_completed(futures):
+                    page_response = future.result()
+                    if page_response.status_code != 200:
+                        raise RuntimeError(
+                            f"Failed to list posts page {futures[future]}: {page_response.status_code}")
+                    posts.extend(page_response.json())
+
+        logger.info(f"Fetched {len(posts)} posts from {total_pages} page(s)")
+        return posts, new_etag
+
+    def _load_posts_cache(self) -> Optional[dict]:
+        if not self.posts_cache_file or self.refresh_existing or not self.posts_cache_file.exists():
+            return None
+        try:
+            with open(self.posts_cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable posts cache {self.posts_cache_file}: {e}")
+            return None
+        # A cache built against another site is useless
+        return cache if cache.get('wp_url') == self.wp_url else None
+
+    def save_posts_cache(self, etag: Optional[str] = None):
+        """Atomically write the existing-post index to the local cache"""
+        if not self.posts_cache_file or not self._existing_loaded:
+            return
+        # WordPress compares modified_after against the site-local post_modified column
+        modified = [p['modified'] for p in self.existing_posts.values() if p.get('modified')]
+        cache = {
+            'wp_url': self.wp_url,
+            'fetched_at': datetime.now().isoformat(),
+            'etag': etag if etag is not None else self._posts_etag,
+            'max_modified': max(modified) if modified else None,
+            'posts': self.existing_posts,
+        }
+        temp_file = self.posts_cache_file.with_name(f".{self.posts_cache_file.name}.tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(temp_file, self.posts_cache_file)
+
     def load_existing_posts(self):
-        """Load existing posts to avoid duplicates"""
+        """
+        Load all existing posts to avoid duplicates.
+
+        With a local cache only posts modified since the newest cached post are
+        fetched; otherwise one full paginated sweep is made. The stored ETag
+        belongs to the full listing, so it is only sent as If-None-Match when
+        that same full query is repeated, never with modified_after. Posts
+        deleted in WordPress stay in the cache until --refresh-existing forces
+        a full sweep. Dry runs never write the cache.
+        """
         logger.info("Loading existing posts...")
-        response = self.session.get(
-            f"{self.api_base}/posts",
-            params={'per_page': 100, 'status': 'publish'}
-        )
-        if response.status_code == 200:
-            for post in response.json():
-                self.existing_slugs.add(post['slug'])
-        logger.info(f"Found {len(self.existing_slugs)} existing posts")
+        self.existing_posts.clear()
+        self.existing_titles.clear()
+        self._posts_etag = None
+
+        cache = self._load_posts_cache()
+        if cache:
+            for slug, post in cache.get('posts', {}).items():
+                self._index_post(slug, post['id'], post.get('title', ''), post.get('modified', ''))
+
+            if cache.get('max_modified'):
+                extra_params = {'orderby': 'modified', 'modified_after': cache['max_modified']}
+                posts, _ = self._fetch_all_posts(extra_params)
+                logger.info(f"Refreshed {len(posts or [])} post(s) modified since {cache['max_modified']}")
+                # Any change makes the full-listing ETag stale
+                self._posts_etag = None if posts else cache.get('etag')
+            else:
+                posts, self._posts_etag = self._fetch_all_posts(etag=cache.get('etag'))
+                if posts is None:
+                    logger.info("Existing posts cache is current (304 Not Modified)")
+        else:
+            posts, self._posts_etag = self._fetch_all_posts()
+
+        for post in posts or []:
+            title = post.get('title', {})
+            title = title.get('rendered', '') if isinstance(title, dict) else str(title)
+            self._index_post(post['slug'], post['id'], title, post.get('modified', ''))
+
+        self._existing_loaded = True
+        if not self.dry_run:
+            self.save_posts_cache()
+        logger.info(f"Found {len(self.existing_posts)} existing posts")
+
+    def find_existing_post(self, slug: str, title: str) -> Optional[int]:
+        """Return the ID of an existing post with the same slug or title"""
+        if slug in self.existing_posts:
+            return self.existing_posts[slug]['id']
+        return self.existing_titles.get(self._normalize_title(title)) if title else None
 
     def get_category_id(self, slug: str) -> Optional[int]:
         """Get category ID by slug"""
@@ -294,18 +448,24 @@ class EnhancedGrideaMigrator:
 
         return gutenberg
 
-    def migrate_post(self, post_data: dict) -> MigrationResult:
-        """Migrate a single post to WordPress"""
+    def migrate_post(self, post_data: dict, existing_wp_id: Optional[int] = None) -> MigrationResult:
+        """Migrate a single post to WordPress (or update existing_wp_id from the journal in place)"""
         folder = post_data['folder']
         title = post_data['title']
 
         # Generate slug
         slug = self.generate_slug(folder, title)
 
+        # Existing posts are only needed for sources the journal does not know about
+        if not existing_wp_id and not self._existing_loaded:
+            self.load_existing_posts()
+
         # Check if already exists
-        if slug in self.existing_slugs:
-            logger.info(f"  Skipping (already exists): {slug}")
-            return MigrationResult(folder, title, False, error="Already exists")
+        duplicate_id = None if existing_wp_id else self.find_existing_post(slug, title)
+        if duplicate_id:
+            # Journaled as migrated with its ID, so later runs skip it without another REST sweep
+            logger.info(f"  Skipping (already exists as ID={duplicate_id}): {slug}")
+            return MigrationResult(folder, title, True, wp_id=duplicate_id, skipped=True)
 
         # Determine category
         category_slug = self.determine_category(folder, post_data['tags'])
@@ -334,11 +494,23 @@ class EnhancedGrideaMigrator:
         }
 
         try:
-            response = self.session.post(f"{self.api_base}/posts", json=post_payload)
+            response = None
+            if existing_wp_id:
+                response = self.session.post(f"{self.api_base}/posts/{existing_wp_id}", json=post_payload)
+                if response.status_code == 404:
+                    logger.warning(f"  Journaled post {existing_wp_id} no longer exists, creating a new one")
+                    response = None
+
+            if response is None:
+                response = self.session.post(f"{self.api_base}/posts", json=post_payload)
 
-            if response.status_code == 201:
+            if response.status_code in (200, 201):
                 result = response.json()
-                logger.info(f"  Created: ID={result['id']}, URL={result['link']}")
+                action = "Updated" if response.status_code == 200 else "Created"
+                logger.info(f"  {action}: ID={result['id']}, URL={result['link']}")
+                if self._existing_loaded:
+                    # No modified date: the cache refresh cursor only advances on server sweeps
+                    self._index_post(slug, result['id'], title)
                 return MigrationResult(
                     folder, title, True,
                     wp_id=result['id'],
@@ -372,27 +544,54 @@ class EnhancedGrideaMigrator:
 
         logger.info(f"Found {len(posts)} posts to migrate")
 
-        # Load existing posts
-        self.load_existing_posts()
-
-        # Migrate each post
+        # Migrate each post (existing posts are loaded lazily on the first post not in the journal)
         for i, post_path in enumerate(posts, 1):
             logger.info(f"\n[{i}/{len(posts)}] Processing: {post_path.parent.name}")
 
+            # Skip posts that are unchanged since the last successful run, without any REST call
+            source = post_path.parent.name
+            content_hash = MigrationJournal.hash_file(post_path)
+            entry = self.journal.get(source) if self.journal else None
+            if entry and not self.force and self.journal.is_unchanged(source, content_hash):
+                logger.info(f"  Unchanged since last migration (WP ID: {entry.get('wp_id')}), skipping")
+                self.results.append(MigrationResult(source, "", True, wp_id=entry.get('wp_id'), skipped=True))
+                continue
+
             post_data = self.extract_post(post_path)
             if not post_data:
                 self.results.append(MigrationResult(post_path.parent.name, "", False, error="Extract failed"))
                 continue
 
-            result = self.migrate_post(post_data)
+            existing_wp_id = entry.get('wp_id') if entry else None
+            if not existing_wp_id and not self._existing_loaded:
+                try:
+                    self.load_existing_posts()
+                except (RuntimeError, requests.RequestException) as e:
+                    # Journal entries are flushed per post, so a rerun resumes from here
+                    logger.error(f"Cannot verify existing posts, aborting: {e}")
+                    break
+
+            result = self.migrate_post(post_data, existing_wp_id=existing_wp_id)
             self.results.append(result)
 
+            if self.journal and not self.dry_run:
+                if result.success:
+                    self.journal.record(source, content_hash, 'migrated', wp_id=result.wp_id)
+                else:
+                    self.journal.record(source, content_hash, 'failed', error=result.error)
+
+        if self.journal and not self.dry_run:
+            self.journal.compact()
+        if not self.dry_run:
+            self.save_posts_cache()
+
         # Print summary
         self.print_summary()
 
     def print_summary(self):
         """Print migration summary"""
-        success = sum(1 for r in self.results if r.success)
+        success = sum(1 for r in self.results if r.success and not r.skipped)
+        skipped = sum(1 for r in self.results if r.skipped)
         failed = sum(1 for r in self.results if not r.success)
 
         logger.info("\n" + "=" * 50)
@@ -400,6 +599,7 @@ class EnhancedGrideaMigrator:
         logger.info("=" * 50)
         logger.info(f"Total: {len(self.results)}")
         logger.info(f"Success: {success}")
+        logger.info(f"Skipped (unchanged or already exists): {skipped}")
         logger.info(f"Failed: {failed}")
 
         if failed > 0:
@@ -416,7 +616,8 @@ class EnhancedGrideaMigrator:
                 'success': r.success,
                 'wp_id': r.wp_id,
                 'wp_url': r.wp_url,
-                'error': r.error
+                'error': r.error,
+                'skipped': r.skipped
             } for r in self.results], f, indent=2, ensure_ascii=False, default=str)
         logger.info("\nResults saved to: batch_migration_results.json")
 
@@ -426,13 +627,25 @@ def main():
     parser.add_argument('--source', default='/home/wuxia/projects/zhurong2020.github.io/post')
     parser.add_argument('--dry-run', action='store_true')
     parser.add_argument('--limit', type=int)
+    parser.add_argument('--journal', default='batch_migration_journal.jsonl',
+                        help='Checkpoint journal for resumable runs')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-push posts even if unchanged since the last run')
+    parser.add_argument('--posts-cache', default='batch_existing_posts.json',
+                        help='Local cache of existing WordPress posts for duplicate checks')
+    parser.add_argument('--refresh-existing', action='store_true',
+                        help='Ignore the posts cache and re-fetch every existing post')
     args = parser.parse_args()
 
     migrator = EnhancedGrideaMigrator(
         wp_url=os.getenv('WP_URL', 'https://www.arong.eu.org'),
         wp_user=os.getenv('WP_USER', 'arong'),
         wp_password=os.getenv('WP_APP_PASSWORD', ''),
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        journal_file=args.journal,
+        force=args.force,
+        posts_cache_file=args.posts_cache,
+        refresh_existing=args.refresh_existing
     )
 
     # Exclude already migrated posts (from DEDUPLICATED-ARTICLES-REGISTRY.md)
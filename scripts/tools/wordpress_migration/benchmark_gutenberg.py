@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Gutenberg Converter Benchmark
+
+Renders Jekyll posts to HTML the way jekyll_to_wp.py does, then times
+GutenbergConverter per post with the html.parser and lxml backends and
+checks that both produce identical output.
+
+Usage:
+    python benchmark_gutenberg.py --source _posts/
+    python benchmark_gutenberg.py --source _posts/ --repeat 10 --limit 5
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+# Add parent path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from scripts.tools.wordpress_migration.gutenberg_converter import (
+    LXML_AVAILABLE,
+    ConversionOptions,
+    GutenbergConverter
+)
+from scripts.tools.wordpress_migration.jekyll_to_wp import JekyllToWordPress, MigrationConfig
+
+
+def load_corpus(source_dir: str, limit: int = 0) -> List[Tuple[str, str]]:
+    """Render every post in source_dir to HTML, returning (name, html) pairs"""
+    migrator = JekyllToWordPress(MigrationConfig(journal_file=None))
+    corpus = []
+    for post_path in migrator.find_posts(source_dir):
+        post = migrator.parse_jekyll_post(post_path)
+        if post:
+            corpus.append((post_path.name, migrator.convert_markdown_to_html(post.content)))
+        if limit and len(corpus) >= limit:
+            break
+    return corpus
+
+
+def time_conversion(converter: GutenbergConverter, html: str, repeat: int) -> Tuple[float, str]:
+    """Best-of-N conversion time in milliseconds, plus the converted content"""
+    best = float('inf')
+    result = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result, _ = converter.convert(html)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GutenbergConverter backends')
+    parser.add_argument('--source', default='_posts/', help='Jekyll posts directory')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per post (best time is reported)')
+    parser.add_argument('--limit', type=int, default=0, help='Only benchmark the first N posts')
+    args = parser.parse_args()
+
+    if not LXML_AVAILABLE:
+        print("lxml is not installed: pip install lxml")
+        sys.exit(1)
+
+    corpus = load_corpus(args.source, args.limit)
+    if not corpus:
+        print(f"No posts found in {args.source}")
+        sys.exit(1)
+
+    soup_converter = GutenbergConverter(ConversionOptions(backend='html.parser'))
+    lxml_converter = GutenbergConverter(ConversionOptions(backend='lxml'))
+
+    print(f"{'Post':<60} {'KB':>7} {'html.parser':>12} {'lxml':>9} {'Speedup':>8}  Same")
+    print("-" * 106)
+
+    soup_total = lxml_total = 0.0
+    mismatches = []
+    for name, html in corpus:
+        soup_ms, soup_result = time_conversion(soup_converter, html, args.repeat)
+        lxml_ms, lxml_result = time_conversion(lxml_converter, html, args.repeat)
+        soup_total += soup_ms
+        lxml_total += lxml_ms
+        same = soup_result == lxml_result
+        if not same:
+            mismatches.append(name)
+        print(f"{name[:60]:<60} {len(html) / 1024:>7.1f} {soup_ms:>10.2f}ms {lxml_ms:>7.2f}ms "
+              f"{soup_ms / lxml_ms:>7.1f}x  {'yes' if same else 'NO'}")
+
+    print("-" * 106)
+    count = len(corpus)
+    print(f"{'Mean per post':<60} {'':>7} {soup_total / count:>10.2f}ms {lxml_total / count:>7.2f}ms "
+          f"{soup_total / lxml_total:>7.1f}x")
+
+    if mismatches:
+        print(f"\n{len(mismatches)} post(s) convert differently: {', '.join(mismatches)}")
+        sys.exit(1)
+    print(f"\nAll {count} posts convert identically with both backends")
+
+
+if __name__ == '__main__':
+    main()
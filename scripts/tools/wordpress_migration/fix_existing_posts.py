@@ -15,6 +15,9 @@ Usage:
     python fix_existing_posts.py --all --dry-run
     python fix_existing_posts.py --all
 
+    # Tune the pipeline (conversion processes / concurrent updates / parser backend)
+    python fix_existing_posts.py --all --convert-workers 8 --http-workers 4 --backend lxml
+
 Environment variables:
     WP_URL          - WordPress site URL (default: https://www.arong.eu.org)
     WP_USER         - WordPress username
@@ -29,7 +32,9 @@ import sys
 import json
 import argparse
 import logging
-from typing import Optional, List, Dict, Any
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, Optional, List, Dict, Any, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -40,6 +45,7 @@ from requests.auth import HTTPBasicAuth
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from gutenberg_converter import (
+    BACKENDS,
     convert_html_to_gutenberg_with_stats,
     ConversionOptions,
     ConversionStats
@@ -69,6 +75,20 @@ class FixConfig:
     fix_all: bool = False
     show_preview: bool = True
     preview_length: int = 500
+    convert_workers: Optional[int] = None  # Conversion processes (default: CPU count)
+    http_workers: int = 4  # Concurrent post updates
+    per_page: int = 100
+    backend: str = 'html.parser'  # Gutenberg converter backend ('lxml' is faster)
+
+
+def _convert_post_content(post_id: int, content: str,
+                          options: ConversionOptions) -> Tuple[int, Optional[str], Optional[ConversionStats], Optional[str]]:
+    """Convert one post body in a worker process; returns (post_id, content, stats, error)"""
+    try:
+        gutenberg_content, conv_stats = convert_html_to_gutenberg_with_stats(content, options)
+        return post_id, gutenberg_content, conv_stats, None
+    except Exception as e:
+        return post_id, None, None, f"{type(e).__name__}: {e}"
 
 
 class GutenbergFixer:
@@ -95,7 +115,8 @@ class GutenbergFixer:
             preserve_code_language=True,
             convert_codehilite=True,
             handle_mathjax=True,
-            preserve_more_tag=True
+            preserve_more_tag=True,
+            backend=config.backend
         )
 
     def get_post(self, post_id: int) -> Optional[Dict[str, Any]]:
@@ -113,23 +134,23 @@ class GutenbergFixer:
             logger.error(f"Error fetching post {post_id}: {e}")
         return None
 
-    def get_all_posts(self) -> List[Dict[str, Any]]:
-        """Fetch all posts that need Gutenberg conversion"""
-        posts = []
+    def iter_post_pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yield pages of posts with raw content, fetching each page only when requested"""
         page = 1
-        per_page = 100
+        total_pages = None
 
         logger.info("Scanning all posts...")
 
-        while True:
+        while total_pages is None or page <= total_pages:
             try:
                 response = self.session.get(
                     f"{self.api_base}/posts",
                     params={
-                        'per_page': per_page,
+                        'per_page': self.config.per_page,
                         'page': page,
                         'context': 'edit',
-                        'status': 'publish,draft,pending,private'
+                        'status': 'publish,draft,pending,private',
+                        '_fields': 'id,title,content'
                     }
                 )
 
@@ -144,20 +165,27 @@ class GutenbergFixer:
                 if not batch:
                     break
 
-                # Filter: only posts without Gutenberg blocks
-                for post in batch:
-                    content = post.get('content', {}).get('raw', '')
-                    if self._needs_conversion(content):
-                        posts.append(post)
-                    else:
-                        logger.debug(f"Skipping post {post['id']}: already has Gutenberg blocks")
+                if total_pages is None and response.headers.get('X-WP-TotalPages'):
+                    total_pages = int(response.headers['X-WP-TotalPages'])
 
+                yield batch
                 page += 1
 
             except Exception as e:
                 logger.error(f"Error fetching posts page {page}: {e}")
                 break
 
+    def get_all_posts(self) -> List[Dict[str, Any]]:
+        """Fetch all posts that need Gutenberg conversion"""
+        posts = []
+        for batch in self.iter_post_pages():
+            # Filter: only posts without Gutenberg blocks
+            for post in batch:
+                content = post.get('content', {}).get('raw', '')
+                if self._needs_conversion(content):
+                    posts.append(post)
+                else:
+                    logger.debug(f"Skipping post {post['id']}: already has Gutenberg blocks")
         return posts
 
     def _needs_conversion(self, content: str) -> bool:
@@ -274,16 +302,100 @@ class GutenbergFixer:
 
         elif self.config.fix_all:
             # Fix all posts needing conversion
-            posts = self.get_all_posts()
-            self.stats['total'] = len(posts)
-            logger.info(f"\nFound {len(posts)} post(s) needing conversion")
-
-            for i, post in enumerate(posts, 1):
-                logger.info(f"\n[{i}/{len(posts)}]")
-                self.fix_post(post)
+            self.fix_all_posts()
 
         self.print_summary()
 
+    def fix_all_posts(self):
+        """
+        Convert all posts through a producer/consumer pipeline.
+
+        Pages are fetched in this thread while earlier posts are converted in a
+        process pool (BeautifulSoup parsing is CPU-bound), and converted posts
+        are pushed by a bounded pool of HTTP workers. At most about one page of
+        raw bodies is in flight at a time, so memory stays flat on large sites.
+        """
+        convert_workers = self.config.convert_workers or os.cpu_count() or 1
+        http_workers = max(self.config.http_workers, 1)
+        max_converting = max(self.config.per_page, convert_workers * 2)
+        max_updating = http_workers * 2
+        titles: Dict[int, str] = {}
+        # Pages can shift while we fetch, so the same post may be listed twice
+        seen_ids: Set[int] = set()
+
+        logger.info(f"Pipeline: {convert_workers} conversion process(es), {http_workers} HTTP worker(s)")
+
+        with ProcessPoolExecutor(max_workers=convert_workers) as convert_pool, \
+                ThreadPoolExecutor(max_workers=http_workers) as http_pool:
+            converting: Dict[Future, int] = {}
+            updating: Dict[Future, int] = {}
+
+            def drain(max_pending_conversions: int, max_pending_updates: int):
+                # Hand finished conversions to the HTTP workers until both stages are under their bounds
+                while len(converting) > max_pending_conversions or len(updating) > max_pending_updates:
+                    done, _ = wait(set(converting) | set(updating), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in converting:
+                            self._submit_update(future, converting.pop(future), titles, http_pool, updating)
+                        else:
+                            self._record_update(future, updating.pop(future), titles)
+
+            for batch in self.iter_post_pages():
+                for post in batch:
+                    if post['id'] in seen_ids:
+                        logger.debug(f"Skipping post {post['id']}: already queued from an earlier page")
+                        continue
+                    seen_ids.add(post['id'])
+                    content = post.get('content', {}).get('raw', '')
+                    if not self._needs_conversion(content):
+                        logger.debug(f"Skipping post {post['id']}: already has Gutenberg blocks")
+                        continue
+
+                    self.stats['total'] += 1
+                    titles[post['id']] = post.get('title', {}).get('rendered', f"Post {post['id']}")
+                    try:
+                        future = convert_pool.submit(
+                            _convert_post_content, post['id'], content, self.conversion_options
+                        )
+                    except BrokenProcessPool as e:
+                        self._record_conversion_failure(post['id'], titles, f"conversion pool is broken: {e}")
+                        continue
+                    converting[future] = post['id']
+
+                # Bound the work queued ahead of the next page fetch
+                drain(max_converting, max_updating)
+
+            drain(0, 0)
+
+        logger.info(f"\nConverted {self.stats['total']} post(s) needing conversion")
+
+    def _submit_update(self, future: Future, post_id: int, titles: Dict[int, str],
+                       http_pool: ThreadPoolExecutor, updating: Dict[Future, int]):
+        """Queue the update for a finished conversion, or record its failure"""
+        try:
+            _, gutenberg_content, conv_stats, error = future.result()
+        except BrokenProcessPool as e:
+            # A crashed worker process fails its pending conversions; count them and keep going
+            error = f"conversion process died: {e}"
+        if error:
+            self._record_conversion_failure(post_id, titles, error)
+            return
+
+        logger.info(f"Converted: {titles[post_id]} (ID: {post_id}), {conv_stats}")
+        updating[http_pool.submit(self.update_post, post_id, gutenberg_content)] = post_id
+
+    def _record_conversion_failure(self, post_id: int, titles: Dict[int, str], error: str):
+        logger.error(f"Conversion error for {titles.pop(post_id)} (ID: {post_id}): {error}")
+        self.stats['failed'] += 1
+
+    def _record_update(self, future: Future, post_id: int, titles: Dict[int, str]):
+        title = titles.pop(post_id)
+        if future.result():
+            self.stats['updated'] += 1
+        else:
+            logger.error(f"Update failed: {title} (ID: {post_id})")
+            self.stats['failed'] += 1
+
     def print_summary(self):
         """Print final statistics"""
         logger.info("\n" + "=" * 60)
@@ -354,6 +466,24 @@ Environment variables:
         default=500,
         help='Length of content preview (default: 500)'
     )
+    parser.add_argument(
+        '--convert-workers',
+        type=int,
+        default=None,
+        help='Conversion processes for --all (default: CPU count)'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=BACKENDS,
+        default='html.parser',
+        help='Gutenberg converter backend; lxml is faster (default: html.parser)'
+    )
+    parser.add_argument(
+        '--http-workers',
+        type=int,
+        default=4,
+        help='Concurrent post updates for --all (default: 4)'
+    )
     parser.add_argument(
         '--wp-url',
         default=os.getenv('WP_URL', 'https://www.arong.eu.org'),
@@ -387,7 +517,10 @@ Environment variables:
         post_ids=args.post_ids,
         fix_all=args.fix_all,
         show_preview=not args.no_preview,
-        preview_length=args.preview_length
+        preview_length=args.preview_length,
+        convert_workers=args.convert_workers,
+        http_workers=args.http_workers,
+        backend=args.backend
     )
 
     fixer = GutenbergFixer(config)
@@ -25,6 +25,11 @@ import requests
 from bs4 import BeautifulSoup, Tag
 import html2text
 
+try:
+    from .migration_journal import MigrationJournal
+except ImportError:
+    from migration_journal import MigrationJournal  # Run as a standalone script
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -47,6 +52,8 @@ class MigrationConfig:
     source_dir: str = ""
     limit: Optional[int] = None
     default_category: str = "待分类"
+    journal_file: Optional[str] = "gridea_migration_journal.jsonl"  # Checkpoint journal (None to disable)
+    force: bool = False  # Re-push posts even if unchanged since the last run
 
     # Category mapping cache
     category_map: Dict[str, int] = field(default_factory=dict)
@@ -95,6 +102,9 @@ class GrideaHtmlToWordPress:
 
         self.results: List[Dict[str, Any]] = []
 
+        # Checkpoint journal for resumable runs
+        self.journal = MigrationJournal(config.journal_file) if config.journal_file else None
+
     def extract_post_from_html(self, html_path: Path) -> Optional[GrideaPost]:
         """Extract post content and metadata from Gridea HTML file"""
         try:
@@ -324,8 +334,8 @@ class GrideaHtmlToWordPress:
 
         return None
 
-    def create_wp_post(self, post: GrideaPost) -> Optional[Dict[str, Any]]:
-        """Create a WordPress post from a Gridea post"""
+    def create_wp_post(self, post: GrideaPost, existing_wp_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Create a WordPress post from a Gridea post (or update existing_wp_id in place)"""
         logger.info(f"Processing: {post.title}")
 
         # Get default category
@@ -365,14 +375,26 @@ class GrideaHtmlToWordPress:
             return {'dry_run': True, 'title': post.title}
 
         try:
-            response = self.session.post(
-                f"{self.api_base}/posts",
-                json=post_data
-            )
-
-            if response.status_code == 201:
+            response = None
+            if existing_wp_id:
+                response = self.session.post(
+                    f"{self.api_base}/posts/{existing_wp_id}",
+                    json=post_data
+                )
+                if response.status_code == 404:
+                    logger.warning(f"  Journaled post {existing_wp_id} no longer exists, creating a new one")
+                    response = None
+
+            if response is None:
+                response = self.session.post(
+                    f"{self.api_base}/posts",
+                    json=post_data
+                )
+
+            if response.status_code in (200, 201):
                 result = response.json()
-                logger.info(f"  Created post ID: {result['id']}")
+                action = "Updated" if response.status_code == 200 else "Created"
+                logger.info(f"  {action} post ID: {result['id']}")
                 return {
                     'success': True,
                     'wp_id': result['id'],
@@ -423,6 +445,15 @@ class GrideaHtmlToWordPress:
         for i, post_path in enumerate(posts, 1):
             logger.info(f"\n[{i}/{len(posts)}] Processing: {post_path.parent.name}")
 
+            # Skip posts that are unchanged since the last successful run, without any REST call
+            source = post_path.parent.name
+            content_hash = MigrationJournal.hash_file(post_path)
+            entry = self.journal.get(source) if self.journal else None
+            if entry and not self.config.force and self.journal.is_unchanged(source, content_hash):
+                logger.info(f"  Unchanged since last migration (WP ID: {entry.get('wp_id')}), skipping")
+                self.stats['skipped'] += 1
+                continue
+
             post = self.extract_post_from_html(post_path)
             if not post:
                 self.stats['failed'] += 1
@@ -434,7 +465,13 @@ class GrideaHtmlToWordPress:
                 self.stats['skipped'] += 1
                 continue
 
-            result = self.create_wp_post(post)
+            result = self.create_wp_post(post, existing_wp_id=entry.get('wp_id') if entry else None)
+
+            if self.journal and result and not self.config.dry_run:
+                if result.get('success'):
+                    self.journal.record(source, content_hash, 'migrated', wp_id=result['wp_id'])
+                else:
+                    self.journal.record(source, content_hash, 'failed', error=result.get('error'))
 
             if result:
                 if result.get('success') or result.get('dry_run'):
@@ -445,6 +482,8 @@ class GrideaHtmlToWordPress:
             else:
                 self.stats['failed'] += 1
 
+        if self.journal and not self.config.dry_run:
+            self.journal.compact()
         self.print_summary()
 
     def print_summary(self):
@@ -509,6 +548,18 @@ Environment Variables:
         help='Default category for migrated posts (default: 待分类)'
     )
 
+    parser.add_argument(
+        '--journal',
+        default='gridea_migration_journal.jsonl',
+        help='Checkpoint journal for resumable runs (default: gridea_migration_journal.jsonl)'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-push posts even if unchanged since the last run'
+    )
+
     parser.add_argument('--wp-url', help='WordPress site URL')
     parser.add_argument('--wp-user', help='WordPress username')
     parser.add_argument('--wp-password', help='WordPress app password')
@@ -522,7 +573,9 @@ Environment Variables:
         dry_run=args.dry_run,
         source_dir=args.source,
         limit=args.limit,
-        default_category=args.default_category
+        default_category=args.default_category,
+        journal_file=args.journal,
+        force=args.force
     )
 
     if not args.dry_run and not config.wp_url:
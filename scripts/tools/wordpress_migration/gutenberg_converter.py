@@ -10,6 +10,9 @@ Usage:
     html = "<h2>Title</h2><p>Content</p>"
     gutenberg = convert_html_to_gutenberg(html)
 
+    # Faster lxml backend (optional dependency, same output for well-formed HTML)
+    gutenberg = convert_html_to_gutenberg(html, ConversionOptions(backend='lxml'))
+
 Author: YouXin Workshop
 Date: 2025-12-30
 """
@@ -17,14 +20,83 @@ Date: 2025-12-30
 import re
 import json
 import logging
+from html import escape as escape_html
+from html.entities import html5 as _HTML5_ENTITIES
+from html.parser import HTMLParser
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 
 from bs4 import BeautifulSoup, Tag
 from bs4.element import NavigableString
 
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+BACKENDS = ('html.parser', 'lxml')
+
+_HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+_MATHJAX_RE = re.compile(r'<script[^>]*>.*?MathJax.*?</script>', re.DOTALL | re.IGNORECASE)
+_MATHJAX_HINT_RE = re.compile(r'mathjax', re.IGNORECASE)
+_PROTECTED_KEY_RE = re.compile(r'%%(?:PROTECTED_MATHJAX_\d+|MORE_TAG)%%')
+
+# BeautifulSoup serialization rules, mirrored by the lxml backend so both backends emit identical markup
+_VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer'
+})
+_CDATA_LIST_ATTRIBUTES = {
+    '*': {'class', 'accesskey', 'dropzone'},
+    'a': {'rel', 'rev'}, 'link': {'rel', 'rev'}, 'td': {'headers'}, 'th': {'headers'},
+    'form': {'accept-charset'}, 'object': {'archive'}, 'area': {'rel'}, 'icon': {'sizes'},
+    'iframe': {'sandbox'}, 'output': {'for'},
+}
+_RAW_TEXT_ELEMENTS = frozenset({'script', 'style'})
+_PRESERVE_WHITESPACE_ELEMENTS = frozenset({'pre', 'textarea'})
+_ASCII_SPACES = ' \n\t\x0c\r'
+# A start tag repeating an attribute (html.parser keeps the last value, libxml2 the first)
+_DUPLICATE_ATTRIBUTE_RE = re.compile(
+    r'<[a-zA-Z][^<>]*?\s([a-zA-Z_:][-\w:.]*)\s*=[^<>]*\s\1\s*=[^<>]*>', re.IGNORECASE
+)
+# Markup libxml2 builds a different tree for than html.parser, so documents using it go to html.parser:
+# form controls (boolean attributes become name="name", <textarea> is raw text, <option> nesting)
+_LIBXML2_DIVERGENT_RE = re.compile(
+    r'<(?:textarea|select|option)(?=[\s/>])'
+    r'|<[a-zA-Z][^<>]*?\s(?:checked|compact|declare|defer|disabled|ismap|multiple|nohref|noresize|noshade'
+    r'|nowrap|readonly|selected)(?=[\s/>])',
+    re.IGNORECASE
+)
+# Elements whose end tag may be omitted: libxml2 closes them implicitly, html.parser nests them
+_OPTIONAL_END_TAG_RE = re.compile(
+    r'<(/?)(p|li|dt|dd|tr|td|th|thead|tbody|tfoot|colgroup|caption|optgroup|rb|rt|rtc|rp)(?=[\s/>])',
+    re.IGNORECASE
+)
+# A named character reference (libxml2 keeps the ';' of one it does not know)
+_ENTITY_REF_RE = re.compile(r'&([a-zA-Z][a-zA-Z0-9]*;)')
+# Strings directly inside these are not plain NavigableStrings, so get_text() skips them
+_NON_TEXT_CONTAINERS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+_TABLE_STYLE_TAGS = frozenset({'table', 'th', 'td', 'tr', 'thead', 'tbody'})
+_KNOWN_CODE_LANGUAGES = frozenset({
+    'python', 'javascript', 'js', 'bash', 'shell', 'json', 'html', 'css', 'sql', 'yaml', 'xml',
+    'markdown', 'md', 'java', 'c', 'cpp', 'csharp', 'go', 'rust', 'ruby', 'php'
+})
+
+
+def _escape_xml(text: str) -> str:
+    """Escape &, < and > (BeautifulSoup's minimal formatter)"""
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
 
 @dataclass
 class ConversionStats:
@@ -61,6 +133,7 @@ class ConversionOptions:
     convert_codehilite: bool = True
     handle_mathjax: bool = True
     preserve_more_tag: bool = True
+    backend: str = 'html.parser'  # 'html.parser' or 'lxml' (faster, needs lxml installed)
 
 
 class GutenbergConverter:
@@ -88,6 +161,13 @@ class GutenbergConverter:
         self.options = options or ConversionOptions()
         self.stats = ConversionStats()
 
+        if self.options.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{self.options.backend}', expected one of {BACKENDS}")
+        self.backend = self.options.backend
+        if self.backend == 'lxml' and not LXML_AVAILABLE:
+            logger.warning("lxml is not installed, falling back to the html.parser backend")
+            self.backend = 'html.parser'
+
     def convert(self, html: str) -> Tuple[str, ConversionStats]:
         """
         Convert HTML to Gutenberg block format.
@@ -106,7 +186,21 @@ class GutenbergConverter:
         # Pre-process: Protect special content
         html, protected = self._protect_special_content(html)
 
-        # Parse HTML
+        blocks = _LxmlBlockEmitter(self).emit(html) if self.backend == 'lxml' else None
+        if blocks is None:
+            blocks = self._convert_soup(html)
+
+        # Join blocks with double newlines
+        result = '\n\n'.join(filter(None, blocks))
+
+        # Restore protected content
+        if protected:
+            result = self._restore_special_content(result, protected)
+
+        return result, self.stats
+
+    def _convert_soup(self, html: str) -> List[str]:
+        """Convert with BeautifulSoup's html.parser (reference backend)"""
         soup = BeautifulSoup(html, 'html.parser')
 
         # Process top-level elements
@@ -127,21 +221,15 @@ class GutenbergConverter:
                 if block:
                     blocks.append(block)
 
-        # Join blocks with double newlines
-        result = '\n\n'.join(filter(None, blocks))
-
-        # Restore protected content
-        result = self._restore_special_content(result, protected)
-
-        return result, self.stats
+        return blocks
 
     def _protect_special_content(self, html: str) -> Tuple[str, Dict[str, str]]:
         """Protect content that shouldn't be parsed (MathJax, LaTeX, etc.)"""
         protected: Dict[str, str] = {}
         counter = 0
 
-        # Protect MathJax scripts
-        if self.options.handle_mathjax:
+        # Protect MathJax scripts (the cheap scan skips the backtracking regex for most posts)
+        if self.options.handle_mathjax and _MATHJAX_HINT_RE.search(html):
             def save_mathjax(match: re.Match) -> str:
                 nonlocal counter
                 key = f'%%PROTECTED_MATHJAX_{counter}%%'
@@ -150,32 +238,27 @@ class GutenbergConverter:
                 return key
 
             # Script tags with MathJax content
-            html = re.sub(
-                r'<script[^>]*>.*?MathJax.*?</script>',
-                save_mathjax, html, flags=re.DOTALL | re.IGNORECASE
-            )
+            html = _MATHJAX_RE.sub(save_mathjax, html)
 
         # Protect <!--more--> tag
-        if self.options.preserve_more_tag:
+        if self.options.preserve_more_tag and '<!--more-->' in html:
             html = html.replace('<!--more-->', '%%MORE_TAG%%')
             protected['%%MORE_TAG%%'] = '<!--more-->'
 
         return html, protected
 
     def _restore_special_content(self, html: str, protected: Dict[str, str]) -> str:
-        """Restore protected content"""
+        """Restore protected content in a single pass"""
+        replacements: Dict[str, str] = {}
         for key, value in protected.items():
             if 'MATHJAX' in key:
                 # Wrap MathJax in HTML block
-                wrapped = f'<!-- wp:html -->\n{value}\n<!-- /wp:html -->'
+                replacements[key] = f'<!-- wp:html -->\n{value}\n<!-- /wp:html -->'
                 self.stats.html_blocks += 1
-                html = html.replace(key, wrapped)
-            elif 'MORE_TAG' in key:
-                # Keep more tag as-is
-                html = html.replace(key, value)
             else:
-                html = html.replace(key, value)
-        return html
+                # Keep more tag as-is
+                replacements[key] = value
+        return _PROTECTED_KEY_RE.sub(lambda m: replacements.get(m.group(0), m.group(0)), html)
 
     def _convert_element(self, element: Tag) -> Optional[str]:
         """Convert a single HTML element to Gutenberg block"""
@@ -233,24 +316,22 @@ class GutenbergConverter:
 
     def _convert_heading(self, element: Tag) -> str:
         """Convert heading to wp:heading block"""
-        level = int(element.name[1])
-        inner_html = self._get_inner_html(element)
+        # WordPress doesn't use the id attribute in heading blocks by default
+        return self._heading_block(element.name, self._get_inner_html(element))
 
-        # Preserve id attribute if present
-        attrs: Dict[str, Any] = {"level": level}
-        if element.get('id'):
-            # WordPress doesn't use id in heading blocks by default
-            pass
+    def _heading_block(self, tag_name: str, inner_html: str) -> str:
+        attrs: Dict[str, Any] = {"level": int(tag_name[1])}
 
         self.stats.headings += 1
 
         attrs_json = json.dumps(attrs)
-        return f'<!-- wp:heading {attrs_json} -->\n<{element.name}>{inner_html}</{element.name}>\n<!-- /wp:heading -->'
+        return f'<!-- wp:heading {attrs_json} -->\n<{tag_name}>{inner_html}</{tag_name}>\n<!-- /wp:heading -->'
 
     def _convert_paragraph(self, element: Tag) -> Optional[str]:
         """Convert paragraph to wp:paragraph block"""
-        inner_html = self._get_inner_html(element)
+        return self._paragraph_from_inner_html(self._get_inner_html(element))
 
+    def _paragraph_from_inner_html(self, inner_html: str) -> Optional[str]:
         # Skip empty paragraphs
         if not inner_html.strip():
             return None
@@ -282,37 +363,41 @@ class GutenbergConverter:
     def _convert_code_block(self, element: Tag) -> str:
         """Convert pre/code to wp:code block"""
         code_element = element.find('code')
-        language = None
 
         if code_element:
             # Get raw text, preserving whitespace
             code_content = code_element.get_text()
-            # Detect language from class (supports both 'language-xxx' and 'xxx')
-            classes = code_element.get('class') or []
-            if isinstance(classes, str):
-                classes = [classes]
-            for cls in (classes if classes else []):
-                if cls.startswith('language-'):
-                    language = cls.replace('language-', '')
-                    break
-                elif cls in ('python', 'javascript', 'js', 'bash', 'shell', 'json',
-                           'html', 'css', 'sql', 'yaml', 'xml', 'markdown', 'md',
-                           'java', 'c', 'cpp', 'csharp', 'go', 'rust', 'ruby', 'php'):
-                    language = cls
-                    break
+            code_classes = self._class_list(code_element)
         else:
             code_content = element.get_text()
+            code_classes = []
+
+        language = self._detect_code_language(code_classes, self._class_list(element))
+        return self._code_block(code_content, language)
+
+    @staticmethod
+    def _class_list(element: Tag) -> List[str]:
+        classes = element.get('class') or []
+        if isinstance(classes, str):
+            classes = [classes]
+        return classes
+
+    @staticmethod
+    def _detect_code_language(code_classes: List[str], pre_classes: List[str]) -> Optional[str]:
+        """Detect language from code classes ('language-xxx' or 'xxx'), then pre classes"""
+        for cls in code_classes:
+            if cls.startswith('language-'):
+                return cls.replace('language-', '')
+            elif cls in _KNOWN_CODE_LANGUAGES:
+                return cls
 
         # Also check pre element for language class
-        if not language:
-            pre_classes = element.get('class') or []
-            if isinstance(pre_classes, str):
-                pre_classes = [pre_classes]
-            for cls in (pre_classes if pre_classes else []):
-                if cls.startswith('language-'):
-                    language = cls.replace('language-', '')
-                    break
+        for cls in pre_classes:
+            if cls.startswith('language-'):
+                return cls.replace('language-', '')
+        return None
 
+    def _code_block(self, code_content: str, language: Optional[str] = None) -> str:
         # Escape HTML entities in code
         code_content = self._escape_code_content(code_content)
 
@@ -334,14 +419,7 @@ class GutenbergConverter:
         pre_element = element.find('pre')
         if pre_element:
             # Extract plain text from highlighted code
-            code_content = pre_element.get_text()
-            code_content = self._escape_code_content(code_content)
-
-            self.stats.code_blocks += 1
-
-            return f'''<!-- wp:code -->
-<pre class="wp-block-code"><code>{code_content}</code></pre>
-<!-- /wp:code -->'''
+            return self._code_block(pre_element.get_text())
 
         # Fallback: wrap entire div as HTML block
         return self._convert_html_block(element)
@@ -349,9 +427,9 @@ class GutenbergConverter:
     def _convert_list(self, element: Tag, ordered: bool) -> str:
         """Convert ul/ol to wp:list block"""
         # Preserve inner HTML (including nested lists)
-        inner_html = self._get_inner_html(element)
-        tag = 'ol' if ordered else 'ul'
+        return self._list_block(self._get_inner_html(element), ordered)
 
+    def _list_block(self, inner_html: str, ordered: bool) -> str:
         self.stats.lists += 1
 
         if ordered:
@@ -371,8 +449,9 @@ class GutenbergConverter:
             if isinstance(tag, Tag) and tag.has_attr('style'):
                 del tag['style']
 
-        table_html = str(element)
+        return self._table_block(str(element))
 
+    def _table_block(self, table_html: str) -> str:
         self.stats.tables += 1
 
         return f'''<!-- wp:table -->
@@ -390,8 +469,9 @@ class GutenbergConverter:
             value = str(value).replace('"', '&quot;')
             attrs_list.append(f'{key}="{value}"')
 
-        img_tag = f'<img {" ".join(attrs_list)} />'
+        return self._image_block(f'<img {" ".join(attrs_list)} />')
 
+    def _image_block(self, img_tag: str) -> str:
         self.stats.images += 1
 
         if self.options.wrap_images_in_figure:
@@ -407,18 +487,22 @@ class GutenbergConverter:
         """Convert figure (may contain image) to wp:image block"""
         img = element.find('img')
         if img:
-            self.stats.images += 1
-            return f'''<!-- wp:image -->
-{str(element)}
-<!-- /wp:image -->'''
+            return self._figure_block(str(element))
 
         # Fallback to HTML block for other figures
         return self._convert_html_block(element)
 
+    def _figure_block(self, figure_html: str) -> str:
+        self.stats.images += 1
+        return f'''<!-- wp:image -->
+{figure_html}
+<!-- /wp:image -->'''
+
     def _convert_blockquote(self, element: Tag) -> str:
         """Convert blockquote to wp:quote block"""
-        inner_html = self._get_inner_html(element)
+        return self._quote_block(self._get_inner_html(element))
 
+    def _quote_block(self, inner_html: str) -> str:
         self.stats.quotes += 1
 
         return f'''<!-- wp:quote -->
@@ -435,10 +519,13 @@ class GutenbergConverter:
 
     def _convert_html_block(self, element: Tag) -> str:
         """Wrap element in wp:html block (fallback for unsupported elements)"""
+        return self._html_block(str(element))
+
+    def _html_block(self, element_html: str) -> str:
         self.stats.html_blocks += 1
 
         return f'''<!-- wp:html -->
-{str(element)}
+{element_html}
 <!-- /wp:html -->'''
 
     def _convert_generic_div(self, element: Tag) -> Optional[str]:
@@ -481,10 +568,300 @@ class GutenbergConverter:
 
     def _escape_code_content(self, text: str) -> str:
         """Escape HTML special characters in code content"""
-        return (text
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;'))
+        return _escape_xml(text)
+
+
+class _LxmlBlockEmitter:
+    """
+    lxml backend for GutenbergConverter.
+
+    Parses with libxml2 and makes a single traversal over the top-level
+    elements, appending blocks straight into a list buffer. Serialization
+    follows BeautifulSoup's rules (sorted attributes, minimal escaping,
+    `<br/>` void tags, bare text for direct children in inner HTML) so the
+    output matches the html.parser backend for well-formed markup.
+
+    The two parsers disagree on hand-written HTML: libxml2 closes implied
+    end tags (`<p>a<p>b`, `<li>a<li>b`) where html.parser nests them, fills
+    in boolean attributes (`checked="checked"`), treats <textarea> as raw
+    text, nests <option> differently and keeps the ';' of unknown entities.
+    Documents containing any of these, or any markup libxml2 reports an
+    error for (a <pre> inside a <p>), are left to html.parser.
+    """
+
+    def __init__(self, converter: GutenbergConverter):
+        self.converter = converter
+
+    def emit(self, html: str) -> Optional[List[str]]:
+        """Return the blocks, or None if the document should be converted by html.parser"""
+        if self._diverges_from_html_parser(html):
+            return None
+        if _DUPLICATE_ATTRIBUTE_RE.search(html):
+            html = _DUPLICATE_ATTRIBUTE_RE.sub(self._dedupe_attributes, html)
+
+        parser = etree.HTMLParser(encoding='utf-8', huge_tree=True)
+        document = etree.fromstring(f'<html><body>{html}</body></html>'.encode('utf-8'), parser)
+        if len(parser.error_log):
+            return None
+        body = document.find('body') if document is not None else None
+        if body is None:
+            return []
+
+        # libxml2 only knows the HTML4 void elements and nests the content after <source>, <wbr>...
+        for element in body.iter(*_VOID_ELEMENTS):
+            if element.text or len(element):
+                self._hoist_void_content(element)
+
+        blocks: List[str] = []
+        self._emit_text(body.text, blocks, top_level=True)
+        for child in body:
+            if isinstance(child.tag, str):
+                self._emit_element(child, blocks)
+            else:
+                # Comments read as their bare text, like a top-level bs4 Comment
+                self._emit_text(child.text, blocks, top_level=True)
+            self._emit_text(child.tail, blocks, top_level=True)
+        return blocks
+
+    @staticmethod
+    def _diverges_from_html_parser(html: str) -> bool:
+        """Whether the document uses markup libxml2 parses differently from html.parser"""
+        if _LIBXML2_DIVERGENT_RE.search(html):
+            return True
+        if any(match.group(1) not in _HTML5_ENTITIES for match in _ENTITY_REF_RE.finditer(html)):
+            return True
+
+        unclosed: Dict[str, int] = {}
+        for slash, tag_name in _OPTIONAL_END_TAG_RE.findall(html):
+            tag_name = tag_name.lower()
+            unclosed[tag_name] = unclosed.get(tag_name, 0) + (-1 if slash else 1)
+        return any(unclosed.values())
+
+    @staticmethod
+    def _hoist_void_content(element):
+        """Move content libxml2 nested inside a void element back after it, where html.parser keeps it"""
+        parent = element.getparent()
+        children = list(element)
+        tail = element.tail or ''
+        element.tail = element.text
+        element.text = None
+        index = parent.index(element)
+        for offset, child in enumerate(children, 1):
+            parent.insert(index + offset, child)
+        last = children[-1] if children else element
+        last.tail = (last.tail or '') + tail or None
+
+    @staticmethod
+    def _dedupe_attributes(match: re.Match) -> str:
+        """Rewrite a start tag with repeated attributes so the last value wins, as with html.parser"""
+        tag_parser = _StartTagParser()
+        tag_parser.feed(match.group(0))
+        tag_parser.close()
+        if tag_parser.tag is None:
+            return match.group(0)
+
+        attrs: Dict[str, str] = {}
+        for key, value in tag_parser.attrs:
+            attrs[key] = value or ''
+        attrs_html = ''.join(f' {key}="{escape_html(value)}"' for key, value in attrs.items())
+        return f'<{tag_parser.tag}{attrs_html}{"/>" if tag_parser.self_closing else ">"}'
+
+    def _emit_text(self, text: Optional[str], blocks: List[str], top_level: bool = False):
+        if not text:
+            return
+        text = text.strip()
+        if top_level and text == '<!--more-->':
+            # Preserve WordPress more tag
+            blocks.append('<!--more-->')
+        elif text:
+            # Wrap orphan text in paragraph
+            block = self.converter._create_paragraph_block(text)
+            if block:
+                blocks.append(block)
+
+    def _emit_element(self, element, blocks: List[str]):
+        """Append the block(s) for one element, mirroring GutenbergConverter._convert_element"""
+        converter = self.converter
+        tag_name = element.tag
+
+        if tag_name in _HEADING_TAGS:
+            blocks.append(converter._heading_block(tag_name, self._inner_html(element)))
+        elif tag_name == 'p':
+            block = converter._paragraph_from_inner_html(self._inner_html(element))
+            if block:
+                blocks.append(block)
+        elif tag_name == 'pre':
+            code_element = next(element.iterdescendants('code'), None)
+            if code_element is not None:
+                code_content = self._text_content(code_element)
+                code_classes = self._class_list(code_element)
+            else:
+                code_content = self._text_content(element)
+                code_classes = []
+            language = converter._detect_code_language(code_classes, self._class_list(element))
+            blocks.append(converter._code_block(code_content, language))
+        elif tag_name == 'div':
+            self._emit_div(element, blocks)
+        elif tag_name in ('ul', 'ol'):
+            blocks.append(converter._list_block(self._inner_html(element), tag_name == 'ol'))
+        elif tag_name == 'table':
+            # Remove inline styles from nested table elements (Gutenberg has its own table styling)
+            for tag in element.iterdescendants(*_TABLE_STYLE_TAGS):
+                tag.attrib.pop('style', None)
+            blocks.append(converter._table_block(self._outer_html(element)))
+        elif tag_name == 'img':
+            attrs_list = []
+            for key, value in element.attrib.items():
+                if self._is_list_attribute(tag_name, key):
+                    value = ' '.join(value.split())
+                value = value.replace('"', '&quot;')
+                attrs_list.append(f'{key}="{value}"')
+            blocks.append(converter._image_block(f'<img {" ".join(attrs_list)} />'))
+        elif tag_name == 'figure' and next(element.iterdescendants('img'), None) is not None:
+            blocks.append(converter._figure_block(self._outer_html(element)))
+        elif tag_name == 'blockquote':
+            blocks.append(converter._quote_block(self._inner_html(element)))
+        elif tag_name == 'hr':
+            blocks.append(converter._convert_separator())
+        else:
+            # Scripts and everything else: wrap in HTML block
+            blocks.append(converter._html_block(self._outer_html(element)))
+
+    def _emit_div(self, element, blocks: List[str]):
+        converter = self.converter
+        classes = self._class_list(element)
+
+        if 'codehilite' in classes:
+            pre_element = next(element.iterdescendants('pre'), None)
+            if pre_element is not None:
+                blocks.append(converter._code_block(self._text_content(pre_element)))
+            else:
+                blocks.append(converter._html_block(self._outer_html(element)))
+            return
+
+        # Video containers, ASCII art or monospace content
+        style = element.get('style') or ''
+        if 'video-container' in classes or 'monospace' in style or 'pre' in style:
+            blocks.append(converter._html_block(self._outer_html(element)))
+            return
+
+        # Default: process children as separate blocks
+        self._emit_text(element.text, blocks)
+        for child in element:
+            if isinstance(child.tag, str):
+                self._emit_element(child, blocks)
+            else:
+                self._emit_text(child.text, blocks)
+            self._emit_text(child.tail, blocks)
+
+    @staticmethod
+    def _class_list(element) -> List[str]:
+        return str(element.get('class') or '').split()
+
+    @staticmethod
+    def _is_list_attribute(tag_name: str, key: str) -> bool:
+        return key in _CDATA_LIST_ATTRIBUTES['*'] or key in _CDATA_LIST_ATTRIBUTES.get(tag_name, ())
+
+    @staticmethod
+    def _string(text: Optional[str], preserve_whitespace: bool) -> str:
+        """A text node as BeautifulSoup stores it: whitespace-only strings collapse to one character"""
+        if not text:
+            return ''
+        if not preserve_whitespace and text[0] in _ASCII_SPACES and not text.strip(_ASCII_SPACES):
+            return '\n' if '\n' in text else ' '
+        return text
+
+    def _inner_html(self, element) -> str:
+        """Inner HTML the way GutenbergConverter._get_inner_html builds it (direct strings unescaped)"""
+        preserve = element.tag in _PRESERVE_WHITESPACE_ELEMENTS
+        buffer = [self._string(element.text, preserve)]
+        for child in element:
+            if isinstance(child.tag, str):
+                self._serialize(child, buffer, preserve)
+            else:
+                buffer.append(self._string(child.text, preserve))
+            buffer.append(self._string(child.tail, preserve))
+        return ''.join(buffer)
+
+    def _outer_html(self, element) -> str:
+        buffer: List[str] = []
+        self._serialize(element, buffer)
+        return ''.join(buffer)
+
+    def _serialize(self, element, buffer: List[str], preserve_whitespace: bool = False):
+        """Append the element's markup as str(Tag) renders it"""
+        tag_name = element.tag
+        if not isinstance(tag_name, str):
+            buffer.append(f'<!--{self._string(element.text, preserve_whitespace)}-->')
+            return
+
+        buffer.append(f'<{tag_name}')
+        for key, value in sorted(element.attrib.items()):
+            if self._is_list_attribute(tag_name, key):
+                value = ' '.join(value.split())
+            value = _escape_xml(value)
+            quote = '"'
+            if '"' in value:
+                if "'" in value:
+                    value = value.replace('"', '&quot;')
+                else:
+                    quote = "'"
+            buffer.append(f' {key}={quote}{value}{quote}')
+
+        if tag_name in _VOID_ELEMENTS and not element.text and not len(element):
+            buffer.append('/>')
+            return
+
+        buffer.append('>')
+        raw_text = tag_name in _RAW_TEXT_ELEMENTS
+        preserve_whitespace = preserve_whitespace or tag_name in _PRESERVE_WHITESPACE_ELEMENTS
+        if element.text:
+            text = self._string(element.text, preserve_whitespace)
+            buffer.append(text if raw_text else _escape_xml(text))
+        for child in element:
+            self._serialize(child, buffer, preserve_whitespace)
+            if child.tail:
+                tail = self._string(child.tail, preserve_whitespace)
+                buffer.append(tail if raw_text else _escape_xml(tail))
+        buffer.append(f'</{tag_name}>')
+
+    def _text_content(self, element) -> str:
+        """
+        Descendant text the way Tag.get_text() collects it (comments and script text skipped).
+
+        Only used inside <pre>, where whitespace is preserved verbatim.
+        """
+        buffer: List[str] = []
+        self._collect_text(element, buffer)
+        return ''.join(buffer)
+
+    def _collect_text(self, element, buffer: List[str]):
+        is_text_container = element.tag not in _NON_TEXT_CONTAINERS
+        if element.text and is_text_container:
+            buffer.append(element.text)
+        for child in element:
+            if isinstance(child.tag, str):
+                self._collect_text(child, buffer)
+            if child.tail and is_text_container:
+                buffer.append(child.tail)
+
+
+class _StartTagParser(HTMLParser):
+    """Parses a single start tag with the same attribute rules as html.parser"""
+
+    def __init__(self):
+        super().__init__()
+        self.tag: Optional[str] = None
+        self.attrs: List[Tuple[str, Optional[str]]] = []
+        self.self_closing = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.tag is None:
+            self.tag, self.attrs = tag, attrs
+
+    def handle_startendtag(self, tag, attrs):
+        if self.tag is None:
+            self.tag, self.attrs, self.self_closing = tag, attrs, True
 
 
 def convert_html_to_gutenberg(
@@ -8,6 +8,7 @@ Handles front matter parsing, category/tag mapping, and featured images.
 Usage:
     python jekyll_to_wp.py --source _posts/ --dry-run
     python jekyll_to_wp.py --source _posts/ --batch-size 10
+    python jekyll_to_wp.py --source _posts/ --workers 8
 """
 
 import os
@@ -15,17 +16,21 @@ import sys
 import json
 import argparse
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 
 import requests
+from requests.adapters import HTTPAdapter
 import frontmatter
 import markdown
 
 # Import Gutenberg converter
 from .gutenberg_converter import convert_html_to_gutenberg, ConversionOptions
+from .migration_journal import MigrationJournal
 
 # Configure logging
 logging.basicConfig(
@@ -49,6 +54,9 @@ class MigrationConfig:
     batch_size: int = 10
     source_dir: str = "_posts/"
     limit: Optional[int] = None
+    workers: int = 4  # Concurrent post migrations sharing one keep-alive session
+    journal_file: Optional[str] = "migration_journal.jsonl"  # Checkpoint journal (None to disable)
+    force: bool = False  # Re-push posts even if unchanged since the last run
 
     # Category mapping: Jekyll category name -> WordPress category ID
     category_map: Dict[str, int] = field(default_factory=dict)
@@ -76,6 +84,15 @@ class JekyllPost:
     raw_front_matter: Dict[str, Any] = field(default_factory=dict)
 
 
+# Map Chinese category names to slugs
+CATEGORY_SLUGS = {
+    '认知升级': 'cognitive-upgrade',
+    '技术赋能': 'tech-empowerment',
+    '全球视野': 'global-perspective',
+    '投资理财': 'investment-finance',
+}
+
+
 class JekyllToWordPress:
     """Main migration class"""
 
@@ -86,6 +103,23 @@ class JekyllToWordPress:
         if config.wp_user and config.wp_app_password:
             self.session.auth = (config.wp_user, config.wp_app_password)
 
+        # Keep-alive connection pool sized for the worker count
+        pool_size = max(config.workers, 1) * 2
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Separate session for downloading remote images (never send WP credentials)
+        self.download_session = requests.Session()
+        self.download_session.mount('https://', HTTPAdapter(pool_maxsize=pool_size))
+        self.download_session.mount('http://', HTTPAdapter(pool_maxsize=pool_size))
+
+        # Term caches shared by all workers, filled by prefetch_terms()
+        self._category_by_slug: Dict[str, int] = {}
+        self._tag_by_name: Dict[str, int] = {}
+        self._term_lock = threading.Lock()
+        self._terms_prefetched = False
+
         self.api_base = f"{config.wp_url}/wp-json/wp/v2"
         self.acf_api = f"{config.wp_url}/wp-json/acf/v3"
 
@@ -100,6 +134,9 @@ class JekyllToWordPress:
         # Migration results
         self.results: List[Dict[str, Any]] = []
 
+        # Checkpoint journal for resumable runs
+        self.journal = MigrationJournal(config.journal_file) if config.journal_file else None
+
     def parse_jekyll_post(self, file_path: Path) -> Optional[JekyllPost]:
         """Parse a Jekyll markdown file and extract all metadata"""
         try:
@@ -206,20 +243,24 @@ class JekyllToWordPress:
         if category_name in self.config.category_map:
             return self.config.category_map[category_name]
 
-        # Map Chinese category names to slugs
-        category_slugs = {
-            '认知升级': 'cognitive-upgrade',
-            '技术赋能': 'tech-empowerment',
-            '全球视野': 'global-perspective',
-            '投资理财': 'investment-finance',
-        }
+        slug = CATEGORY_SLUGS.get(category_name, category_name.lower().replace(' ', '-'))
 
-        slug = category_slugs.get(category_name, category_name.lower().replace(' ', '-'))
+        if slug in self._category_by_slug:
+            self.config.category_map[category_name] = self._category_by_slug[slug]
+            return self._category_by_slug[slug]
 
         if self.config.dry_run:
             logger.info(f"  [DRY RUN] Would look up/create category: {category_name} (slug: {slug})")
             return None
 
+        # Serialize lookups that miss the cache so concurrent workers never create the same term twice
+        with self._term_lock:
+            if category_name in self.config.category_map:
+                return self.config.category_map[category_name]
+            return self._lookup_or_create_category(category_name, slug)
+
+    def _lookup_or_create_category(self, category_name: str, slug: str) -> Optional[int]:
+        """Look up a category by slug via REST, creating it if missing"""
         try:
             # Search for existing category
             response = self.session.get(
@@ -241,6 +282,7 @@ class JekyllToWordPress:
             if response.status_code == 201:
                 cat_id = response.json()['id']
                 self.config.category_map[category_name] = cat_id
+                self._category_by_slug[slug] = cat_id
                 logger.info(f"  Created category: {category_name} (ID: {cat_id})")
                 return cat_id
 
@@ -254,10 +296,21 @@ class JekyllToWordPress:
         if tag_name in self.config.tag_cache:
             return self.config.tag_cache[tag_name]
 
+        if tag_name.lower() in self._tag_by_name:
+            self.config.tag_cache[tag_name] = self._tag_by_name[tag_name.lower()]
+            return self._tag_by_name[tag_name.lower()]
+
         if self.config.dry_run:
             logger.info(f"  [DRY RUN] Would look up/create tag: {tag_name}")
             return None
 
+        with self._term_lock:
+            if tag_name in self.config.tag_cache:
+                return self.config.tag_cache[tag_name]
+            return self._lookup_or_create_tag(tag_name)
+
+    def _lookup_or_create_tag(self, tag_name: str) -> Optional[int]:
+        """Look up a tag by exact name via REST, creating it if missing"""
         try:
             # Search for existing tag
             response = self.session.get(
@@ -281,6 +334,7 @@ class JekyllToWordPress:
             if response.status_code == 201:
                 tag_id = response.json()['id']
                 self.config.tag_cache[tag_name] = tag_id
+                self._tag_by_name[tag_name.lower()] = tag_id
                 logger.info(f"  Created tag: {tag_name} (ID: {tag_id})")
                 return tag_id
 
@@ -289,6 +343,42 @@ class JekyllToWordPress:
 
         return None
 
+    def _fetch_all_terms(self, taxonomy: str) -> List[Dict[str, Any]]:
+        """Fetch every term of a taxonomy, following X-WP-TotalPages"""
+        terms: List[Dict[str, Any]] = []
+        page, total_pages = 1, 1
+        while page <= total_pages:
+            response = self.session.get(
+                f"{self.api_base}/{taxonomy}",
+                params={'per_page': 100, 'page': page, '_fields': 'id,name,slug'},
+                timeout=30
+            )
+            if response.status_code != 200:
+                logger.warning(f"Failed to fetch {taxonomy} page {page}: {response.status_code}")
+                break
+            terms.extend(response.json())
+            total_pages = int(response.headers.get('X-WP-TotalPages', 1))
+            page += 1
+        return terms
+
+    def prefetch_terms(self):
+        """Load all existing categories and tags into the shared caches in bulk (once per run)"""
+        if self.config.dry_run:
+            return
+
+        with self._term_lock:
+            if self._terms_prefetched:
+                return
+            self._terms_prefetched = True
+            try:
+                for term in self._fetch_all_terms('categories'):
+                    self._category_by_slug[term['slug']] = term['id']
+                for term in self._fetch_all_terms('tags'):
+                    self._tag_by_name.setdefault(term['name'].lower(), term['id'])
+                logger.info(f"Prefetched {len(self._category_by_slug)} categories and {len(self._tag_by_name)} tags")
+            except Exception as e:
+                logger.warning(f"Term prefetch failed, falling back to per-post lookups: {e}")
+
     def upload_media(self, image_url: str, title: str = "") -> Optional[int]:
         """Upload image to WordPress media library or return existing media ID"""
         if not image_url:
@@ -306,7 +396,7 @@ class JekyllToWordPress:
 
         try:
             # Download image
-            response = requests.get(image_url, timeout=30)
+            response = self.download_session.get(image_url, timeout=30)
             if response.status_code != 200:
                 logger.warning(f"  Failed to download image: {image_url}")
                 return None
@@ -322,7 +412,8 @@ class JekyllToWordPress:
             upload_response = self.session.post(
                 f"{self.api_base}/media",
                 files={'file': (filename, response.content, content_type)},
-                data={'title': title or filename}
+                data={'title': title or filename},
+                timeout=120
             )
 
             if upload_response.status_code == 201:
@@ -489,9 +580,15 @@ if (!window.MathJax) {
 
         return html
 
-    def create_wp_post(self, post: JekyllPost) -> Optional[Dict[str, Any]]:
-        """Create a WordPress post from a Jekyll post"""
+    def create_wp_post(self, post: JekyllPost, existing_wp_id: Optional[int] = None,
+                       media_ids: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Create a WordPress post from a Jekyll post
+
+        If existing_wp_id is given (from the checkpoint journal) the post is updated in place.
+        media_ids maps image URLs to already-uploaded media IDs so they are not uploaded again.
+        """
         logger.info(f"Processing: {post.title}")
+        media_ids = dict(media_ids or {})
 
         # Get category IDs
         category_ids = []
@@ -510,7 +607,9 @@ if (!window.MathJax) {
         # Handle featured image
         featured_media_id = None
         if post.header_image:
-            featured_media_id = self.upload_media(post.header_image, post.title)
+            featured_media_id = media_ids.get(post.header_image) or self.upload_media(post.header_image, post.title)
+            if featured_media_id:
+                media_ids[post.header_image] = featured_media_id
 
         # Convert content to HTML, then to Gutenberg format
         html_content = self.convert_markdown_to_html(post.content)
@@ -565,17 +664,29 @@ if (!window.MathJax) {
             return {'dry_run': True, 'title': post.title}
 
         try:
-            response = self.session.post(
-                f"{self.api_base}/posts",
-                json=post_data
-            )
-
-            if response.status_code == 201:
+            response = None
+            if existing_wp_id:
+                response = self.session.post(
+                    f"{self.api_base}/posts/{existing_wp_id}",
+                    json=post_data
+                )
+                if response.status_code == 404:
+                    logger.warning(f"  Journaled post {existing_wp_id} no longer exists, creating a new one")
+                    response = None
+
+            if response is None:
+                response = self.session.post(
+                    f"{self.api_base}/posts",
+                    json=post_data
+                )
+
+            if response.status_code in (200, 201):
                 result = response.json()
                 wp_post_id = result['id']
                 wp_url = result.get('link', '')
 
-                logger.info(f"  Created post ID: {wp_post_id}")
+                action = "Updated" if response.status_code == 200 else "Created"
+                logger.info(f"  {action} post ID: {wp_post_id}")
                 logger.info(f"  URL: {wp_url}")
 
                 # Update ACF fields if member_tier exists
@@ -587,7 +698,9 @@ if (!window.MathJax) {
                     'wp_id': wp_post_id,
                     'wp_url': wp_url,
                     'jekyll_file': str(post.file_path),
-                    'title': post.title
+                    'title': post.title,
+                    'updated': response.status_code == 200,
+                    'media_ids': media_ids
                 }
             else:
                 logger.error(f"  Failed to create post: {response.status_code}")
@@ -670,30 +783,73 @@ if (!window.MathJax) {
             posts = posts[:self.config.limit]
 
         self.stats['total'] = len(posts)
-        logger.info(f"Found {len(posts)} posts to migrate")
+        logger.info(f"Found {len(posts)} posts to migrate ({self.config.workers} workers)")
+
+        # Posts are migrated concurrently; results are recorded on this thread as they finish
+        with ThreadPoolExecutor(max_workers=max(self.config.workers, 1),
+                                thread_name_prefix="wp-migrate") as executor:
+            futures = {executor.submit(self.migrate_post, post_path): post_path for post_path in posts}
+            for i, future in enumerate(as_completed(futures), 1):
+                post_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"  Unexpected error migrating {post_path.name}: {e}")
+                    result = {'success': False, 'error': str(e), 'jekyll_file': str(post_path)}
+
+                if result:
+                    if result.get('skipped'):
+                        self.stats['skipped'] += 1
+                    elif result.get('success') or result.get('dry_run'):
+                        self.stats['success'] += 1
+                    else:
+                        self.stats['failed'] += 1
+                    self.results.append(result)
+                else:
+                    self.stats['failed'] += 1
+                logger.info(f"[{i}/{len(posts)}] Finished: {post_path.name}")
 
-        for i, post_path in enumerate(posts, 1):
-            logger.info(f"\n[{i}/{len(posts)}] Processing: {post_path.name}")
+        if self.journal and not self.config.dry_run:
+            self.journal.compact()
+        self.print_summary()
 
-            # Parse Jekyll post
-            post = self.parse_jekyll_post(post_path)
-            if not post:
-                self.stats['failed'] += 1
-                continue
+    def migrate_post(self, post_path: Path) -> Optional[Dict[str, Any]]:
+        """Parse and migrate a single post (runs on a worker thread)"""
+        logger.info(f"Processing: {post_path.name}")
+
+        # Skip posts that are unchanged since the last successful run, without any REST call.
+        # Entries are keyed by the resolved path so runs from different working directories
+        # (or with a relative vs absolute --source) share the same checkpoint.
+        source = str(post_path.resolve())
+        content_hash = MigrationJournal.hash_file(post_path)
+        entry = self.journal.get(source) if self.journal else None
+        if entry and not self.config.force and self.journal.is_unchanged(source, content_hash):
+            logger.info(f"  Unchanged since last migration (WP ID: {entry.get('wp_id')}), skipping")
+            return {'skipped': True, 'jekyll_file': source, 'wp_id': entry.get('wp_id')}
+
+        # Parse Jekyll post
+        post = self.parse_jekyll_post(post_path)
+        if not post:
+            return None
 
-            # Create WordPress post
-            result = self.create_wp_post(post)
+        # Terms are prefetched on the first post that actually needs pushing
+        self.prefetch_terms()
 
-            if result:
-                if result.get('success') or result.get('dry_run'):
-                    self.stats['success'] += 1
-                else:
-                    self.stats['failed'] += 1
-                self.results.append(result)
+        # Create WordPress post (or update the journaled one if the source changed)
+        result = self.create_wp_post(
+            post,
+            existing_wp_id=entry.get('wp_id') if entry else None,
+            media_ids=entry.get('media_ids') if entry else None
+        )
+
+        if self.journal and result and not self.config.dry_run:
+            if result.get('success'):
+                self.journal.record(source, content_hash, 'migrated',
+                                    wp_id=result['wp_id'], media_ids=result.get('media_ids'))
             else:
-                self.stats['failed'] += 1
+                self.journal.record(source, content_hash, 'failed', error=result.get('error'))
 
-        self.print_summary()
+        return result
 
     def print_summary(self):
         """Print migration summary"""
@@ -739,6 +895,9 @@ Examples:
     # Full migration with batch processing
     python jekyll_to_wp.py --source _posts/ --batch-size 10
 
+    # Full migration with 8 concurrent workers
+    python jekyll_to_wp.py --source _posts/ --workers 8
+
 Environment Variables:
     WP_URL          WordPress site URL (e.g., https://arong.eu.org)
     WP_USER         WordPress username
@@ -771,6 +930,25 @@ Environment Variables:
         help='Number of posts to process in each batch (default: 10)'
     )
 
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=4,
+        help='Number of posts to migrate concurrently (default: 4)'
+    )
+
+    parser.add_argument(
+        '--journal',
+        default='migration_journal.jsonl',
+        help='Checkpoint journal for resumable runs (default: migration_journal.jsonl)'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-push posts even if unchanged since the last run'
+    )
+
     parser.add_argument(
         '--wp-url',
         help='WordPress site URL (overrides WP_URL env var)'
@@ -803,6 +981,9 @@ Environment Variables:
     config.batch_size = args.batch_size
     config.source_dir = args.source
     config.limit = args.limit
+    config.workers = args.workers
+    config.journal_file = args.journal
+    config.force = args.force
 
     # Validate config (skip for dry run)
     if not args.dry_run:
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Migration Checkpoint Journal
+
+Persistent, append-only record of which source files have been migrated to
+WordPress. Each line is a JSON entry keyed by source (file path or Gridea
+folder) holding the content hash, WordPress post ID, media IDs and status.
+Entries are flushed as soon as a post finishes, so an interrupted run can be
+resumed: unchanged posts are skipped without any REST round-trip and changed
+posts update their existing WordPress post instead of creating a duplicate.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationJournal:
+    """Append-only JSON-lines checkpoint journal (last entry per source wins)"""
+
+    def __init__(self, journal_file: str):
+        self.journal_file = Path(journal_file)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Replay the journal into memory, ignoring a torn last line"""
+        if not self.journal_file.exists():
+            return
+
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.entries[entry['source']] = entry
+        logger.info(f"Loaded {len(self.entries)} journal entries from {self.journal_file}")
+
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        """SHA-256 of a source file's bytes"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        """Return the latest entry for a source, if any"""
+        return self.entries.get(source)
+
+    def is_unchanged(self, source: str, content_hash: str) -> bool:
+        """True if the source was migrated successfully with the same content"""
+        entry = self.entries.get(source)
+        return bool(entry and entry.get('status') == 'migrated' and entry.get('content_hash') == content_hash)
+
+    def record(self, source: str, content_hash: str, status: str,
+               wp_id: Optional[int] = None, media_ids: Optional[Dict[str, int]] = None,
+               error: Optional[str] = None):
+        """Append an entry and flush it to disk immediately"""
+        previous = self.entries.get(source, {})
+        entry = {
+            'source': source,
+            'content_hash': content_hash,
+            'status': status,
+            # Keep the known post/media IDs when a later attempt fails
+            'wp_id': wp_id if wp_id is not None else previous.get('wp_id'),
+            'media_ids': media_ids if media_ids is not None else previous.get('media_ids', {}),
+            'updated_at': datetime.now().isoformat(),
+        }
+        if error:
+            entry['error'] = error[:200]
+
+        with self._lock:
+            self.entries[source] = entry
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact(self):
+        """Rewrite the journal with only the latest entry per source"""
+        with self._lock:
+            if not self.entries:
+                return
+            temp_file = self.journal_file.with_name(f".{self.journal_file.name}.tmp")
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            os.replace(temp_file, self.journal_file)
@@ -6,4 +6,5 @@
 - github_release_manager: GitHub发布管理
 - package_creator: 包创建器
 - reward_system_manager: 奖励系统管理
+- reward_queue: 奖励请求的持久化队列
 """
\ No newline at end of file
@@ -6,12 +6,16 @@
 import os
 import smtplib
 import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import logging
 from dataclasses import dataclass
 import json
@@ -29,15 +33,52 @@ class EmailRecord:
     attempt_count: int = 1
 
 
+class _DisconnectedBeforeData(smtplib.SMTPServerDisconnected):
+    """连接在DATA命令之前断开：邮件确定未发送，可以安全地重连重试"""
+
+
+class _SendRateLimiter:
+    """线程安全的发送速率限制（相邻两封邮件的最小间隔）"""
+    
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """阻塞直到允许发送下一封邮件"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
 class EmailSender:
     """邮件发送管理器"""
     
     def __init__(self, smtp_server: str, smtp_port: int, 
-                 sender_email: str, sender_password: str):
+                 sender_email: str, sender_password: str,
+                 max_connections: int = 2, rate_per_second: float = 5.0,
+                 max_messages_per_connection: int = 100, smtp_timeout: float = 30.0):
+        """
+        Args:
+            max_connections: 批量发送时同时保持的SMTP连接数
+            rate_per_second: 批量发送的速率上限（封/秒，0为不限制）
+            max_messages_per_connection: 单个连接发送多少封后重新建立连接
+            smtp_timeout: SMTP连接超时（秒）
+        """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.sender_password = sender_password
+        self.max_connections = max(1, max_connections)
+        self.rate_per_second = rate_per_second
+        self.max_messages_per_connection = max(1, max_messages_per_connection)
+        self.smtp_timeout = smtp_timeout
         
         # 设置日志
         self.logger = logging.getLogger(__name__)
@@ -46,6 +87,12 @@ class EmailSender:
         self.records_file = Path("_data/email_records.json")
         self.records_file.parent.mkdir(exist_ok=True)
         
+        # 邮件记录的内存缓存及已发送索引 (recipient, article_title)
+        self._records: Optional[List[Dict]] = None
+        self._records_mtime: Optional[float] = None
+        self._sent_index: Set[Tuple[str, str]] = set()
+        self._records_lock = threading.Lock()
+        
         # 邮件模板
         self.setup_templates()
     
@@ -256,6 +303,249 @@ class EmailSender:
         except Exception as e:
             self.logger.error(f"保存邮件记录失败: {e}")
     
+    def _get_records_mtime(self) -> Optional[float]:
+        try:
+            return self.records_file.stat().st_mtime
+        except OSError:
+            return None
+    
+    def _ensure_records_loaded(self) -> List[Dict]:
+        """加载邮件记录到内存并建立已发送索引（文件被外部修改时重新加载）"""
+        mtime = self._get_records_mtime()
+        if self._records is None or mtime != self._records_mtime:
+            self._records = self._load_email_records()
+            self._records_mtime = mtime
+            self._sent_index = {
+                (record["recipient"], record["article_title"])
+                for record in self._records if record.get("status") == "sent"
+            }
+        return self._records
+    
+    def is_already_sent(self, recipient_email: str, article_title: str) -> bool:
+        """检查该用户是否已收到此文章的资料包"""
+        with self._records_lock:
+            self._ensure_records_loaded()
+            return (recipient_email, article_title) in self._sent_index
+    
+    def _flush_records(self, new_records: List[Dict]) -> None:
+        """将本批次的发送记录一次性写入文件"""
+        if not new_records:
+            return
+        with self._records_lock:
+            records = self._ensure_records_loaded()
+            records.extend(new_records)
+            for record in new_records:
+                self._sent_index.add((record["recipient"], record["article_title"]))
+            self._save_email_records(records)
+            self._records_mtime = self._get_records_mtime()
+    
+    def _build_message(self, recipient_email: str, article_title: str,
+                       download_url: str, user_name: Optional[str] = None) -> MIMEMultipart:
+        """根据模板生成邮件"""
+        send_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
+        subject = f"📦 《{article_title}》完整资料包 - 感谢您的支持！"
+        
+        # 格式化模板
+        html_content = self.html_template.format(
+            article_title=article_title,
+            send_time=send_time,
+            download_url=download_url,
+            user_name=user_name or "尊敬的读者"
+        )
+        
+        text_content = self.text_template.format(
+            article_title=article_title,
+            send_time=send_time,
+            download_url=download_url
+        )
+        
+        # 创建邮件
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = f"有心言者 <{self.sender_email}>"
+        message["To"] = recipient_email
+        
+        # 添加内容
+        message.attach(MIMEText(text_content, "plain", "utf-8"))
+        message.attach(MIMEText(html_content, "html", "utf-8"))
+        return message
+    
+    def _open_connection(self) -> smtplib.SMTP:
+        """建立已认证的SMTP连接"""
+        context = ssl.create_default_context()
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.smtp_timeout)
+        try:
+            server.starttls(context=context)
+            server.login(self.sender_email, self.sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    @staticmethod
+    def _close_connection(server: Optional[smtplib.SMTP]) -> None:
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    def _send_message(self, server: smtplib.SMTP, recipient_email: str, message: str) -> None:
+        """
+        在已有连接上发送一封邮件
+        
+        与 smtplib.SMTP.sendmail 相同的 MAIL/RCPT/DATA 流程，但分步执行，
+        以便区分连接断开时邮件是否可能已经送达。
+        
+        Raises:
+            _DisconnectedBeforeData: DATA之前连接断开，邮件未发送
+            smtplib.SMTPServerDisconnected: DATA阶段连接断开，邮件可能已送达
+        """
+        def reset():
+            try:
+                server.rset()
+            except smtplib.SMTPServerDisconnected:
+                pass
+        
+        try:
+            server.ehlo_or_helo_if_needed()
+            code, resp = server.mail(self.sender_email)
+            if code != 250:
+                reset()
+                raise smtplib.SMTPSenderRefused(code, resp, self.sender_email)
+            code, resp = server.rcpt(recipient_email)
+            if code not in (250, 251):
+                reset()
+                raise smtplib.SMTPRecipientsRefused({recipient_email: (code, resp)})
+        except _DisconnectedBeforeData:
+            raise
+        except smtplib.SMTPServerDisconnected as e:
+            raise _DisconnectedBeforeData(str(e)) from e
+        
+        code, resp = server.data(message)
+        if code != 250:
+            reset()
+            raise smtplib.SMTPDataError(code, resp)
+    
+    def send_reward_packages(self, requests: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        批量发送奖励内容包邮件
+        
+        复用少量已认证的SMTP连接发送整批邮件，按 (收件人, 文章) 的内存索引去重，
+        按配置限速，所有发送记录在结束时一次性写入。
+        
+        Args:
+            requests: 请求列表，每项包含 recipient_email、article_title、download_url，
+                      可选 user_name
+            
+        Returns:
+            与请求顺序一致的 (success, message) 列表
+        """
+        results: List[Optional[Tuple[bool, str]]] = [None] * len(requests)
+        work: Queue = Queue()
+        queued: Set[Tuple[str, str]] = set()
+        
+        for index, request in enumerate(requests):
+            key = (request["recipient_email"], request["article_title"])
+            if key in queued or self.is_already_sent(*key):
+                results[index] = (True, "该用户已收到此文章的资料包")
+            else:
+                queued.add(key)
+                work.put((index, request))
+        
+        new_records: List[Dict] = []
+        records_lock = threading.Lock()
+        rate_limiter = _SendRateLimiter(self.rate_per_second)
+        auth_failed = threading.Event()
+        
+        def worker():
+            server = None
+            sent_on_connection = 0
+            try:
+                while not auth_failed.is_set():
+                    try:
+                        index, request = work.get_nowait()
+                    except Empty:
+                        return
+                    
+                    recipient_email = request["recipient_email"]
+                    article_title = request["article_title"]
+                    try:
+                        message = self._build_message(
+                            recipient_email, article_title,
+                            request["download_url"], request.get("user_name")
+                        ).as_string()
+                        
+                        # 邮件内容发出前连接断开（如空闲连接被服务器关闭）时重连并重试一次；
+                        # DATA阶段断开时邮件可能已送达，不自动重发以免重复
+                        for attempt in range(2):
+                            if server is None or sent_on_connection >= self.max_messages_per_connection:
+                                self._close_connection(server)
+                                server = None
+                                server = self._open_connection()
+                                sent_on_connection = 0
+                            rate_limiter.acquire()
+                            try:
+                                self._send_message(server, recipient_email, message)
+                                sent_on_connection += 1
+                                break
+                            except _DisconnectedBeforeData:
+                                self._close_connection(server)
+                                server = None
+                                if attempt:
+                                    raise
+                        
+                        with records_lock:
+                            new_records.append({
+                                "recipient": recipient_email,
+                                "article_title": article_title,
+                                "download_url": request["download_url"],
+                                "sent_at": datetime.now().isoformat(),
+                                "status": "sent",
+                                "attempt_count": 1,
+                                "user_name": request.get("user_name")
+                            })
+                        self.logger.info(f"邮件发送成功: {recipient_email} - {article_title}")
+                        results[index] = (True, "邮件发送成功")
+                    
+                    except smtplib.SMTPAuthenticationError:
+                        error_msg = "SMTP认证失败，请检查邮箱密码"
+                        self.logger.error(error_msg)
+                        results[index] = (False, error_msg)
+                        auth_failed.set()
+                    except smtplib.SMTPServerDisconnected as e:
+                        if isinstance(e, _DisconnectedBeforeData):
+                            error_msg = f"SMTP连接断开，邮件未发送: {e}"
+                        else:
+                            error_msg = f"SMTP连接在发送过程中断开，邮件可能已送达，未自动重发: {e}"
+                        self.logger.error(f"{error_msg} ({recipient_email} - {article_title})")
+                        results[index] = (False, error_msg)
+                        self._close_connection(server)
+                        server = None
+                    except smtplib.SMTPException as e:
+                        error_msg = f"SMTP错误: {e}"
+                        self.logger.error(error_msg)
+                        results[index] = (False, error_msg)
+                    except Exception as e:
+                        error_msg = f"发送邮件时发生错误: {e}"
+                        self.logger.error(error_msg)
+                        results[index] = (False, error_msg)
+            finally:
+                self._close_connection(server)
+        
+        workers = min(self.max_connections, work.qsize())
+        if workers:
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for _ in range(workers):
+                        executor.submit(worker)
+            finally:
+                self._flush_records(new_records)
+        
+        # 认证失败后不再尝试剩余邮件
+        return [result or (False, "SMTP认证失败，请检查邮箱密码") for result in results]
+    
     def send_reward_package(self, recipient_email: str, article_title: str, 
                           download_url: str, user_name: Optional[str] = None) -> Tuple[bool, str]:
         """
@@ -270,83 +560,12 @@ class EmailSender:
         Returns:
             (success, message)
         """
-        try:
-            # 检查是否已发送过
-            records = self._load_email_records()
-            for record in records:
-                if (record["recipient"] == recipient_email and 
-                    record["article_title"] == article_title and
-                    record["status"] == "sent"):
-                    return True, "该用户已收到此文章的资料包"
-            
-            # 准备邮件内容
-            send_time = datetime.now().strftime("%Y年%m月%d日 %H:%M")
-            subject = f"📦 《{article_title}》完整资料包 - 感谢您的支持！"
-            
-            # 格式化模板
-            html_content = self.html_template.format(
-                article_title=article_title,
-                send_time=send_time,
-                download_url=download_url,
-                user_name=user_name or "尊敬的读者"
-            )
-            
-            text_content = self.text_template.format(
-                article_title=article_title,
-                send_time=send_time,
-                download_url=download_url
-            )
-            
-            # 创建邮件
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"有心言者 <{self.sender_email}>"
-            message["To"] = recipient_email
-            
-            # 添加内容
-            text_part = MIMEText(text_content, "plain", "utf-8")
-            html_part = MIMEText(html_content, "html", "utf-8")
-            
-            message.attach(text_part)
-            message.attach(html_part)
-            
-            # 发送邮件
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.sender_email, self.sender_password)
-                text = message.as_string()
-                server.sendmail(self.sender_email, recipient_email, text)
-            
-            # 记录发送结果
-            email_record = {
-                "recipient": recipient_email,
-                "article_title": article_title,
-                "download_url": download_url,
-                "sent_at": datetime.now().isoformat(),
-                "status": "sent",
-                "attempt_count": 1,
-                "user_name": user_name
-            }
-            
-            records.append(email_record)
-            self._save_email_records(records)
-            
-            self.logger.info(f"邮件发送成功: {recipient_email} - {article_title}")
-            return True, "邮件发送成功"
-            
-        except smtplib.SMTPAuthenticationError:
-            error_msg = "SMTP认证失败，请检查邮箱密码"
-            self.logger.error(error_msg)
-            return False, error_msg
-        except smtplib.SMTPException as e:
-            error_msg = f"SMTP错误: {e}"
-            self.logger.error(error_msg)
-            return False, error_msg
-        except Exception as e:
-            error_msg = f"发送邮件时发生错误: {e}"
-            self.logger.error(error_msg)
-            return False, error_msg
+        return self.send_reward_packages([{
+            "recipient_email": recipient_email,
+            "article_title": article_title,
+            "download_url": download_url,
+            "user_name": user_name
+        }])[0]
     
     def get_send_records(self, article_title: Optional[str] = None) -> List[Dict]:
         """获取发送记录"""
@@ -404,7 +623,12 @@ def create_email_sender() -> EmailSender:
     if not sender_email or not sender_password:
         raise ValueError("请在.env文件中设置GMAIL_USER和GMAIL_APP_PASSWORD")
     
-    return EmailSender(smtp_server, smtp_port, sender_email, sender_password)
+    return EmailSender(
+        smtp_server, smtp_port, sender_email, sender_password,
+        max_connections=int(os.getenv("SMTP_MAX_CONNECTIONS", "2")),
+        rate_per_second=float(os.getenv("SMTP_RATE_LIMIT", "5")),
+        max_messages_per_connection=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+    )
 
 
 if __name__ == "__main__":
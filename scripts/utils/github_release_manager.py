@@ -14,6 +14,9 @@ import logging
 from dataclasses import dataclass
 import base64
 
+# 下载统计同步时每页的Release数量（GitHub上限为100）
+RELEASES_PER_PAGE = 100
+
 
 @dataclass
 class ReleaseInfo:
@@ -49,6 +52,12 @@ class GitHubReleaseManager:
         # Token状态缓存文件
         self.token_cache_file = self.data_file.parent / "github_token_status.json"
         
+        # 下载统计同步状态（每页的ETag和摘要）及下载量时间序列
+        self.sync_state_file = self.data_file.parent / "github_release_sync.json"
+        self.download_history_file = self.data_file.parent / "github_release_downloads.json"
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
         # 检查token状态
         self._check_token_status()
         
@@ -431,36 +440,126 @@ class GitHubReleaseManager:
             self.logger.error(f"删除Release失败: {e}")
             return False
     
-    def update_download_stats(self) -> None:
-        """更新下载统计"""
+    def _load_json_file(self, path: Path, default):
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                self.logger.warning(f"无法加载 {path}，将重新创建")
+        return default
+    
+    def _save_json_file(self, path: Path, data) -> None:
+        """原子写入JSON文件"""
+        temp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    
+    def _fetch_release_pages(self, sync_state: Dict) -> Dict[str, int]:
+        """
+        分页获取所有Release的下载次数
+        
+        每页带上次的ETag发送If-None-Match，未变化的页面返回304（不消耗速率配额），
+        直接使用缓存的摘要。
+        
+        Returns:
+            tag_name -> 下载次数
+        """
+        pages = sync_state.setdefault("pages", {})
+        downloads: Dict[str, int] = {}
+        url: Optional[str] = f"{self.base_url}/releases?per_page={RELEASES_PER_PAGE}&page=1"
+        seen_urls = []
+        unchanged = 0
+        
+        while url:
+            seen_urls.append(url)
+            cached = pages.get(url)
+            headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+            response = self.session.get(url, headers=headers, timeout=30)
+            
+            if response.status_code == 304 and cached:
+                unchanged += 1
+                page_downloads = cached["downloads"]
+                next_url = cached.get("next")
+            elif response.status_code == 200:
+                page_downloads = {
+                    release["tag_name"]: sum(asset["download_count"] for asset in release.get("assets", []))
+                    for release in response.json()
+                }
+                next_url = response.links.get("next", {}).get("url")
+                pages[url] = {
+                    "etag": response.headers.get("ETag"),
+                    "downloads": page_downloads,
+                    "next": next_url
+                }
+            else:
+                raise RuntimeError(f"获取Release列表失败: {response.status_code} - {response.text[:200]}")
+            
+            downloads.update(page_downloads)
+            url = next_url
+        
+        # 删除已不存在的页面缓存（Release减少后页数变少）
+        for stale_url in set(pages) - set(seen_urls):
+            del pages[stale_url]
+        
+        self.logger.info(f"同步 {len(seen_urls)} 页Release，其中 {unchanged} 页未变化")
+        return downloads
+    
+    def update_download_stats(self) -> Dict:
+        """
+        增量更新下载统计
+        
+        只有下载次数变化的Release会写回数据文件并追加到下载量时间序列。
+        
+        Returns:
+            {"changed": 变化的Release数, "total_downloads": 总下载次数}
+        """
         try:
-            # 从GitHub API获取最新统计
-            response = requests.get(
-                f"{self.base_url}/releases",
-                headers=self.headers
-            )
+            sync_state = self._load_json_file(self.sync_state_file, {})
+            downloads = self._fetch_release_pages(sync_state)
             
-            if response.status_code == 200:
-                github_releases = response.json()
-                data = self._load_release_data()
-                
-                total_downloads = 0
-                for release in github_releases:
-                    tag_name = release["tag_name"]
-                    if tag_name in data["releases"]:
-                        # 统计所有资产的下载次数
-                        downloads = sum(asset["download_count"] for asset in release.get("assets", []))
-                        data["releases"][tag_name]["download_count"] = downloads
-                        total_downloads += downloads
-                
+            data = self._load_release_data()
+            history = self._load_json_file(self.download_history_file, {})
+            now = datetime.now().isoformat()
+            
+            articles_by_tag = {release["tag_name"]: release for release in data["articles"].values()}
+            changed = 0
+            total_downloads = 0
+            for tag_name, release in data["releases"].items():
+                if tag_name not in downloads:
+                    total_downloads += release.get("download_count", 0)
+                    continue
+                count = downloads[tag_name]
+                total_downloads += count
+                series = history.setdefault(tag_name, [])
+                if release.get("download_count") != count or not series:
+                    release["download_count"] = count
+                    if tag_name in articles_by_tag:
+                        articles_by_tag[tag_name]["download_count"] = count
+                    series.append({"time": now, "download_count": count})
+                    changed += 1
+            
+            if changed or data["stats"].get("total_downloads") != total_downloads:
                 data["stats"]["total_downloads"] = total_downloads
-                data["stats"]["last_updated"] = datetime.now().isoformat()
-                
+                data["stats"]["last_updated"] = now
                 self._save_release_data(data)
-                self.logger.info(f"统计更新完成，总下载次数: {total_downloads}")
-                
+                self._save_json_file(self.download_history_file, history)
+            
+            sync_state["last_synced"] = now
+            self._save_json_file(self.sync_state_file, sync_state)
+            
+            self.logger.info(f"统计更新完成，{changed} 个Release有变化，总下载次数: {total_downloads}")
+            return {"changed": changed, "total_downloads": total_downloads}
+            
         except Exception as e:
             self.logger.error(f"更新统计失败: {e}")
+            return {"changed": 0, "error": str(e)}
+    
+    def get_download_history(self, tag_name: str) -> List[Dict]:
+        """获取Release的下载量时间序列（仅记录发生变化的时间点）"""
+        history = self._load_json_file(self.download_history_file, {})
+        return history.get(tag_name, [])
     
     def get_stats(self) -> Dict:
         """获取统计信息"""
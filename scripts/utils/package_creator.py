@@ -5,10 +5,13 @@
 
 import os
 import re
+import hashlib
 import zipfile
 import tempfile
+import threading
 import requests
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -16,6 +19,7 @@ import logging
 import json
 import frontmatter
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 import markdown2
 from weasyprint import HTML, CSS
 from weasyprint.text.fonts import FontConfiguration
@@ -26,11 +30,146 @@ logging.getLogger('fontTools').setLevel(logging.ERROR)
 logging.getLogger('fontTools.subset').setLevel(logging.ERROR)
 logging.getLogger('fontTools.ttLib').setLevel(logging.ERROR)
 
+# 图片下载的流式读取块大小
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 已压缩的图片格式在ZIP中直接存储，避免重复压缩
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
+
+# PDF模板版本，修改 _prepare_html_for_pdf 的版式时递增以使渲染缓存失效
+PDF_TEMPLATE_VERSION = 1
+
+# PDF样式
+PDF_CSS = """
+@page {
+    size: A4;
+    margin: 2cm;
+}
+
+body {
+    font-family: "Noto Sans CJK SC", "Source Han Sans CN", "PingFang SC", "Microsoft YaHei", "SimHei", "DejaVu Sans", "Liberation Sans", "Arial", sans-serif;
+    line-height: 1.6;
+    color: #333;
+    font-size: 14px;
+}
+
+h1 {
+    color: #2c3e50;
+    border-bottom: 3px solid #3498db;
+    padding-bottom: 10px;
+    margin-bottom: 30px;
+    font-size: 24px;
+}
+
+h2 {
+    color: #34495e;
+    margin-top: 30px;
+    margin-bottom: 15px;
+    font-size: 20px;
+}
+
+h3 {
+    color: #7f8c8d;
+    margin-top: 25px;
+    margin-bottom: 12px;
+    font-size: 16px;
+}
+
+p {
+    margin-bottom: 12px;
+    text-align: justify;
+}
+
+ul, ol {
+    margin-bottom: 15px;
+    padding-left: 25px;
+}
+
+li {
+    margin-bottom: 5px;
+}
+
+blockquote {
+    border-left: 4px solid #3498db;
+    margin: 20px 0;
+    padding: 10px 20px;
+    background-color: #f8f9fa;
+    font-style: italic;
+}
+
+code {
+    background-color: #f1f2f6;
+    padding: 2px 4px;
+    border-radius: 3px;
+    font-family: "Noto Sans Mono CJK SC", "Source Han Sans CN", "Consolas", "DejaVu Sans Mono", "Liberation Mono", monospace;
+}
+
+pre {
+    background-color: #f8f9fa;
+    border: 1px solid #e9ecef;
+    border-radius: 4px;
+    padding: 15px;
+    margin: 15px 0;
+    overflow-x: auto;
+}
+
+img {
+    max-width: 100%;
+    height: auto;
+    margin: 15px 0;
+    border-radius: 5px;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+}
+
+.article-meta {
+    color: #7f8c8d;
+    font-size: 12px;
+    margin-bottom: 30px;
+    padding: 15px;
+    background-color: #f8f9fa;
+    border-radius: 5px;
+}
+
+.footer {
+    margin-top: 40px;
+    padding-top: 20px;
+    border-top: 1px solid #e9ecef;
+    font-size: 12px;
+    color: #7f8c8d;
+    text-align: center;
+}
+"""
+
+# 中文字体CSS - 使用系统已有字体
+CHINESE_FONT_CSS = """
+@font-face {
+    font-family: 'ChineseFont';
+    src: local('DejaVu Sans'), local('Liberation Sans'), local('Arial Unicode MS');
+    unicode-range: U+4E00-9FFF, U+3400-4DBF, U+20000-2A6DF, U+2A700-2B73F, U+2B740-2B81F, U+2B820-2CEAF;
+}
+
+body, p, h1, h2, h3, h4, h5, h6, li, td, th, div, span {
+    font-family: 'ChineseFont', 'DejaVu Sans', 'Liberation Sans', 'Arial', sans-serif !important;
+}
+
+/* 为中文字符强制使用特定字体 */
+.chinese-text {
+    font-family: 'DejaVu Sans', 'Liberation Sans', 'Arial Unicode MS', sans-serif;
+    font-size: 14px;
+    line-height: 1.8;
+}
+"""
+
 
 class PackageCreator:
     """内容包创建器"""
     
-    def __init__(self):
+    def __init__(self, download_workers: int = 8, per_host_limit: int = 4):
+        """
+        Args:
+            download_workers: 并发下载图片的线程数
+            per_host_limit: 同一主机的最大并发下载数
+        """
         self.logger = logging.getLogger(__name__)
         
         # 项目路径
@@ -38,6 +177,26 @@ class PackageCreator:
         self.output_dir = self.project_root / ".tmp/output/packages"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # 图片下载共享的连接池
+        self.download_workers = max(1, download_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.download_workers, pool_maxsize=self.download_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # PDF渲染缓存：按文章内容、模板/CSS版本和图片集合的哈希保存已渲染的PDF
+        self.pdf_cache_dir = self.project_root / ".tmp/output/pdf_cache"
+        self.pdf_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.pdf_cache_index_file = self.pdf_cache_dir / "index.json"
+        self._pdf_cache_index = self._load_pdf_cache_index()
+        
+        # 字体配置和样式表在多次渲染间共享，避免每篇文章重复加载字体
+        self._font_config = None
+        self._stylesheet = None
+        
         # 资料清单模板
         self.resource_list_template = """# 📦 资料包清单
 
@@ -116,34 +275,49 @@ class PackageCreator:
             
             self.logger.info(f"开始创建内容包: {article_title}")
             
-            # 创建临时工作目录
+            # 临时目录只存放下载的图片，PDF来自渲染缓存，文本文件直接写入ZIP
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_path = Path(temp_dir)
+                cancel_downloads = threading.Event()
                 
-                # 1. 生成PDF
-                pdf_success, pdf_path = self._create_pdf(post, temp_path, article_title)
-                if not pdf_success:
-                    return False, {"error": "PDF生成失败"}
-                
-                # 2. 收集图片
-                images_info = []
-                if include_images:
-                    images_info = self._collect_images(post.content, temp_path)
+                with ThreadPoolExecutor(max_workers=1) as background:
+                    # 1. 后台下载图片，与PDF渲染并行
+                    images_future = None
+                    if include_images:
+                        images_future = background.submit(
+                            self._collect_images, post.content, temp_path, cancel_downloads
+                        )
+                    
+                    # 2. 生成PDF
+                    pdf_success, pdf_path = self._create_pdf(post, article_title)
+                    if not pdf_success:
+                        cancel_downloads.set()
+                        return False, {"error": "PDF生成失败"}
+                    
+                    images_info = images_future.result() if images_future else []
                 
                 # 3. 提取链接
                 links_info = []
+                text_files = {}
                 if include_links:
                     links_info = self._extract_links(post.content)
-                    self._create_links_file(links_info, temp_path)
+                    links_content = self._create_links_file(links_info)
+                    if links_content:
+                        text_files["链接汇总.txt"] = links_content
                 
                 # 4. 生成资料清单
-                self._create_resource_list(
-                    article_title, article_date, images_info, links_info, temp_path, post.content
+                text_files["资料清单.md"] = self._create_resource_list(
+                    article_title, article_date, images_info, links_info, post.content
                 )
                 
                 # 5. 创建ZIP文件
+                files: List[Tuple[str, Path]] = [
+                    (f"images/{img['filename']}", Path(img['local_path'])) for img in images_info
+                ]
+                if pdf_path:
+                    files.insert(0, (f"{self._safe_filename(article_title)}.pdf", pdf_path))
                 package_success, package_path = self._create_zip_package(
-                    temp_path, article_title, article_date
+                    files, text_files, article_title, article_date
                 )
                 
                 if package_success and package_path:
@@ -169,147 +343,96 @@ class PackageCreator:
             self.logger.error(error_msg)
             return False, {"error": error_msg}
     
-    def _create_pdf(self, post: frontmatter.Post, temp_path: Path, 
-                   title: str) -> Tuple[bool, Optional[Path]]:
-        """生成PDF文件"""
+    def create_packages(self, article_paths: List[str], include_images: bool = True,
+                        include_links: bool = True) -> List[Tuple[bool, Dict]]:
+        """
+        批量创建内容包
+        
+        所有文章共享同一个字体配置和样式表，未修改的文章直接使用缓存的PDF。
+        
+        Returns:
+            与 article_paths 顺序一致的 (success, result_info) 列表
+        """
+        return [self.create_package(path, include_images, include_links) for path in article_paths]
+    
+    def _pdf_cache_key(self, post: frontmatter.Post, title: str) -> str:
+        """根据文章内容、元信息、模板/CSS版本和图片集合计算缓存键"""
+        image_urls = sorted(url for _, url in re.findall(r'!\[([^\]]*)\]\(([^)]+)\)', post.content))
+        meta = {key: str(post.metadata.get(key, '')) for key in ('date', 'categories', 'tags')}
+        digest = hashlib.sha256()
+        for part in (str(PDF_TEMPLATE_VERSION), PDF_CSS, CHINESE_FONT_CSS, title,
+                     json.dumps(meta, ensure_ascii=False, sort_keys=True), post.content,
+                     "\n".join(image_urls)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    def _load_pdf_cache_index(self) -> Dict[str, str]:
+        """加载文章 -> 缓存键的索引"""
+        if self.pdf_cache_index_file.exists():
+            try:
+                with open(self.pdf_cache_index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {}
+    
+    def _update_pdf_cache_index(self, article_key: str, cache_key: str) -> None:
+        """记录文章的最新缓存键，并删除该文章过期的PDF"""
+        old_key = self._pdf_cache_index.get(article_key)
+        if old_key == cache_key:
+            return
+        if old_key:
+            old_pdf = self.pdf_cache_dir / f"{old_key}.pdf"
+            # 其他文章仍引用同一缓存时保留
+            if old_pdf.exists() and list(self._pdf_cache_index.values()).count(old_key) == 1:
+                old_pdf.unlink()
+        self._pdf_cache_index[article_key] = cache_key
+        
+        part_path = self.pdf_cache_index_file.with_suffix('.json.part')
         try:
-            # 准备HTML内容
-            html_content = self._prepare_html_for_pdf(post, title)
-            
-            # CSS样式
-            css_content = """
-            @page {
-                size: A4;
-                margin: 2cm;
-            }
-            
-            body {
-                font-family: "Noto Sans CJK SC", "Source Han Sans CN", "PingFang SC", "Microsoft YaHei", "SimHei", "DejaVu Sans", "Liberation Sans", "Arial", sans-serif;
-                line-height: 1.6;
-                color: #333;
-                font-size: 14px;
-            }
-            
-            h1 {
-                color: #2c3e50;
-                border-bottom: 3px solid #3498db;
-                padding-bottom: 10px;
-                margin-bottom: 30px;
-                font-size: 24px;
-            }
-            
-            h2 {
-                color: #34495e;
-                margin-top: 30px;
-                margin-bottom: 15px;
-                font-size: 20px;
-            }
-            
-            h3 {
-                color: #7f8c8d;
-                margin-top: 25px;
-                margin-bottom: 12px;
-                font-size: 16px;
-            }
-            
-            p {
-                margin-bottom: 12px;
-                text-align: justify;
-            }
-            
-            ul, ol {
-                margin-bottom: 15px;
-                padding-left: 25px;
-            }
-            
-            li {
-                margin-bottom: 5px;
-            }
-            
-            blockquote {
-                border-left: 4px solid #3498db;
-                margin: 20px 0;
-                padding: 10px 20px;
-                background-color: #f8f9fa;
-                font-style: italic;
-            }
-            
-            code {
-                background-color: #f1f2f6;
-                padding: 2px 4px;
-                border-radius: 3px;
-                font-family: "Noto Sans Mono CJK SC", "Source Han Sans CN", "Consolas", "DejaVu Sans Mono", "Liberation Mono", monospace;
-            }
-            
-            pre {
-                background-color: #f8f9fa;
-                border: 1px solid #e9ecef;
-                border-radius: 4px;
-                padding: 15px;
-                margin: 15px 0;
-                overflow-x: auto;
-            }
-            
-            img {
-                max-width: 100%;
-                height: auto;
-                margin: 15px 0;
-                border-radius: 5px;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            }
-            
-            .article-meta {
-                color: #7f8c8d;
-                font-size: 12px;
-                margin-bottom: 30px;
-                padding: 15px;
-                background-color: #f8f9fa;
-                border-radius: 5px;
-            }
-            
-            .footer {
-                margin-top: 40px;
-                padding-top: 20px;
-                border-top: 1px solid #e9ecef;
-                font-size: 12px;
-                color: #7f8c8d;
-                text-align: center;
-            }
-            """
-            
-            # 生成PDF
-            pdf_filename = f"{self._safe_filename(title)}.pdf"
-            pdf_path = temp_path / pdf_filename
-            
-            # 配置中文字体支持
-            font_config = FontConfiguration()
-            
-            # 添加中文字体CSS - 使用系统已有字体
-            chinese_font_css = """
-            @font-face {
-                font-family: 'ChineseFont';
-                src: local('DejaVu Sans'), local('Liberation Sans'), local('Arial Unicode MS');
-                unicode-range: U+4E00-9FFF, U+3400-4DBF, U+20000-2A6DF, U+2A700-2B73F, U+2B740-2B81F, U+2B820-2CEAF;
-            }
-            
-            body, p, h1, h2, h3, h4, h5, h6, li, td, th, div, span {
-                font-family: 'ChineseFont', 'DejaVu Sans', 'Liberation Sans', 'Arial', sans-serif !important;
-            }
+            with open(part_path, 'w', encoding='utf-8') as f:
+                json.dump(self._pdf_cache_index, f, ensure_ascii=False, indent=2)
+            os.replace(part_path, self.pdf_cache_index_file)
+        except OSError as e:
+            self.logger.warning(f"保存PDF缓存索引失败: {e}")
+    
+    def _get_stylesheet(self):
+        """懒加载共享的字体配置和样式表"""
+        if self._stylesheet is None:
+            self._font_config = FontConfiguration()
+            self._stylesheet = CSS(string=PDF_CSS + CHINESE_FONT_CSS, font_config=self._font_config)
+        return self._stylesheet
+    
+    def _create_pdf(self, post: frontmatter.Post, title: str) -> Tuple[bool, Optional[Path]]:
+        """生成PDF文件（文章未修改时直接返回缓存的PDF）"""
+        try:
+            cache_key = self._pdf_cache_key(post, title)
+            pdf_path = self.pdf_cache_dir / f"{cache_key}.pdf"
+            article_key = self._safe_filename(title)
             
-            /* 为中文字符强制使用特定字体 */
-            .chinese-text {
-                font-family: 'DejaVu Sans', 'Liberation Sans', 'Arial Unicode MS', sans-serif;
-                font-size: 14px;
-                line-height: 1.8;
-            }
-            """
+            if pdf_path.exists():
+                self.logger.info(f"使用缓存的PDF: {article_key}.pdf")
+                self._update_pdf_cache_index(article_key, cache_key)
+                return True, pdf_path
             
-            html_doc = HTML(string=html_content)
-            css_doc = CSS(string=css_content + chinese_font_css, font_config=font_config)
+            # 准备HTML内容
+            html_content = self._prepare_html_for_pdf(post, title)
+            stylesheet = self._get_stylesheet()
             
-            html_doc.write_pdf(str(pdf_path), stylesheets=[css_doc], font_config=font_config)
+            # 先写入临时文件，渲染完成后再放入缓存
+            part_path = pdf_path.with_name(f"{cache_key}.pdf.part")
+            try:
+                HTML(string=html_content).write_pdf(
+                    str(part_path), stylesheets=[stylesheet], font_config=self._font_config
+                )
+                os.replace(part_path, pdf_path)
+            finally:
+                if part_path.exists():
+                    part_path.unlink()
             
-            self.logger.info(f"PDF生成成功: {pdf_filename}")
+            self._update_pdf_cache_index(article_key, cache_key)
+            self.logger.info(f"PDF生成成功: {article_key}.pdf")
             return True, pdf_path
             
         except Exception as e:
@@ -385,10 +508,9 @@ class PackageCreator:
         
         return html_content
     
-    def _collect_images(self, content: str, temp_path: Path) -> List[Dict]:
-        """收集并下载文章中的图片"""
-        images_info = []
-        
+    def _collect_images(self, content: str, temp_path: Path,
+                        cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """并发下载文章中的图片，结果按图片在文章中的顺序返回"""
         # 查找所有图片链接
         image_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
         matches = re.findall(image_pattern, content)
@@ -396,36 +518,75 @@ class PackageCreator:
         images_dir = temp_path / "images"
         images_dir.mkdir(exist_ok=True)
         
-        for i, (alt_text, image_url) in enumerate(matches, 1):
-            try:
-                if image_url.startswith(('http://', 'https://')):
-                    # 下载网络图片
-                    response = requests.get(image_url, timeout=20)
-                    if response.status_code == 200:
-                        # 尝试从URL或headers获取文件扩展名
-                        ext = self._get_image_extension(image_url, response.headers)
-                        filename = f"image_{i:02d}{ext}"
-                        
-                        image_path = images_dir / filename
-                        with open(image_path, 'wb') as f:
-                            f.write(response.content)
-                        
-                        images_info.append({
-                            "filename": filename,
-                            "alt_text": alt_text,
-                            "original_url": image_url,
-                            "local_path": str(image_path),
-                            "size_kb": round(len(response.content) / 1024, 2)
-                        })
-                        
-                        self.logger.info(f"图片下载成功: {filename}")
-                    else:
+        downloads = [
+            (i, alt_text, image_url) for i, (alt_text, image_url) in enumerate(matches, 1)
+            if image_url.startswith(('http://', 'https://'))
+        ]
+        if not downloads:
+            return []
+        
+        workers = min(self.download_workers, len(downloads))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda item: self._download_image(item[0], item[1], item[2], images_dir, cancel_event),
+                downloads
+            ))
+        
+        return [info for info in results if info]
+    
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        """获取主机对应的并发限制信号量"""
+        host = urlparse(url).netloc.lower()
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(self.per_host_limit)
+            return self._host_slots[host]
+    
+    def _download_image(self, index: int, alt_text: str, image_url: str, images_dir: Path,
+                        cancel_event: Optional[threading.Event] = None) -> Optional[Dict]:
+        """流式下载单张图片并直接写入磁盘"""
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        
+        part_path = None
+        try:
+            with self._host_slot(image_url):
+                with self.session.get(image_url, timeout=20, stream=True) as response:
+                    if response.status_code != 200:
                         self.logger.warning(f"图片下载失败: {image_url}")
-                        
-            except Exception as e:
-                self.logger.warning(f"处理图片时出错: {image_url} - {e}")
+                        return None
+                    
+                    # 尝试从URL或headers获取文件扩展名
+                    ext = self._get_image_extension(image_url, response.headers)
+                    filename = f"image_{index:02d}{ext}"
+                    image_path = images_dir / filename
+                    part_path = image_path.with_name(filename + '.part')
+                    
+                    size = 0
+                    with open(part_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            if cancel_event is not None and cancel_event.is_set():
+                                return None
+                            f.write(chunk)
+                            size += len(chunk)
+            
+            part_path.replace(image_path)
+            part_path = None
+            self.logger.info(f"图片下载成功: {filename}")
+            return {
+                "filename": filename,
+                "alt_text": alt_text,
+                "original_url": image_url,
+                "local_path": str(image_path),
+                "size_kb": round(size / 1024, 2)
+            }
         
-        return images_info
+        except Exception as e:
+            self.logger.warning(f"处理图片时出错: {image_url} - {e}")
+            return None
+        finally:
+            if part_path is not None and part_path.exists():
+                part_path.unlink()
     
     def _get_image_extension(self, url: str, headers) -> str:
         """从URL或headers获取图片扩展名"""
@@ -487,10 +648,10 @@ class PackageCreator:
         
         return links_info
     
-    def _create_links_file(self, links_info: List[Dict], temp_path: Path) -> None:
-        """创建链接汇总文件"""
+    def _create_links_file(self, links_info: List[Dict]) -> Optional[str]:
+        """生成链接汇总文件内容"""
         if not links_info:
-            return
+            return None
         
         content = "# 🔗 链接汇总\n\n"
         
@@ -510,14 +671,11 @@ class PackageCreator:
         
         content += "---\n\n"
         content += f"*共计 {len(links_info)} 个链接，生成时间: {datetime.now().strftime('%Y年%m月%d日 %H:%M')}*\n"
-        
-        links_file = temp_path / "链接汇总.txt"
-        with open(links_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        return content
     
     def _create_resource_list(self, title: str, date: str, images_info: List[Dict], 
-                            links_info: List[Dict], temp_path: Path, article_content: str = "") -> None:
-        """创建资料清单文件"""
+                            links_info: List[Dict], article_content: str = "") -> str:
+        """生成资料清单文件内容"""
         # 生成图片列表
         image_list = ""
         if images_info:
@@ -558,10 +716,7 @@ class PackageCreator:
             official_links=official_links,
             additional_links=additional_links
         )
-        
-        readme_file = temp_path / "资料清单.md"
-        with open(readme_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        return content
     
     def _extract_youtube_links(self, content: str) -> str:
         """提取文章中的YouTube链接"""
@@ -610,29 +765,40 @@ class PackageCreator:
         
         return youtube_links
     
-    def _create_zip_package(self, temp_path: Path, title: str, date: str) -> Tuple[bool, Optional[Path]]:
-        """创建ZIP文件"""
+    def _create_zip_package(self, files: List[Tuple[str, Path]], text_files: Dict[str, str],
+                            title: str, date: str) -> Tuple[bool, Optional[Path]]:
+        """
+        创建ZIP文件
+        
+        Args:
+            files: (包内路径, 本地文件) 列表
+            text_files: 包内路径 -> 文本内容，直接写入ZIP
+        """
+        # 生成ZIP文件名
+        safe_title = self._safe_filename(title)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        zip_filename = f"{safe_title}_{timestamp}_package.zip"
+        zip_path = self.output_dir / zip_filename
+        part_path = zip_path.with_name(zip_filename + '.part')
+        
         try:
-            # 生成ZIP文件名
-            safe_title = self._safe_filename(title)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            zip_filename = f"{safe_title}_{timestamp}_package.zip"
-            zip_path = self.output_dir / zip_filename
-            
-            # 创建ZIP文件
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # 添加所有文件
-                for file_path in temp_path.rglob('*'):
-                    if file_path.is_file():
-                        # 计算相对路径
-                        arcname = file_path.relative_to(temp_path)
-                        zipf.write(file_path, arcname)
-            
+            # 先写入临时文件，完成后再重命名，避免留下不完整的ZIP
+            with zipfile.ZipFile(part_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for arcname, file_path in files:
+                    compress_type = (zipfile.ZIP_STORED if file_path.suffix.lower() in STORED_EXTENSIONS
+                                     else zipfile.ZIP_DEFLATED)
+                    zipf.write(file_path, arcname, compress_type=compress_type)
+                for arcname, content in text_files.items():
+                    zipf.writestr(arcname, content)
+            
+            os.replace(part_path, zip_path)
             self.logger.info(f"ZIP包创建成功: {zip_filename}")
             return True, zip_path
             
         except Exception as e:
             self.logger.error(f"创建ZIP包失败: {e}")
+            if part_path.exists():
+                part_path.unlink()
             return False, None
     
     def _safe_filename(self, filename: str) -> str:
@@ -681,23 +847,22 @@ if __name__ == "__main__":
     # 测试脚本
     import sys
     
-    if len(sys.argv) != 2:
-        print("用法: python package_creator.py <article_path>")
+    if len(sys.argv) < 2:
+        print("用法: python package_creator.py <article_path> [<article_path> ...]")
         sys.exit(1)
     
-    article_path = sys.argv[1]
+    article_paths = sys.argv[1:]
     
     try:
         creator = create_package_creator()
-        success, result = creator.create_package(article_path)
-        
-        if success:
-            print(f"✅ 内容包创建成功!")
-            print(f"文件路径: {result['package_path']}")
-            print(f"文件大小: {result['size_mb']} MB")
-            print(f"包含文件: PDF + {result['files']['images_count']}张图片 + {result['files']['links_count']}个链接")
-        else:
-            print(f"❌ 创建失败: {result.get('error', '未知错误')}")
+        for article_path, (success, result) in zip(article_paths, creator.create_packages(article_paths)):
+            if success:
+                print(f"✅ 内容包创建成功!")
+                print(f"文件路径: {result['package_path']}")
+                print(f"文件大小: {result['size_mb']} MB")
+                print(f"包含文件: PDF + {result['files']['images_count']}张图片 + {result['files']['links_count']}个链接")
+            else:
+                print(f"❌ 创建失败 {article_path}: {result.get('error', '未知错误')}")
             
     except Exception as e:
         print(f"❌ 错误: {e}")
\ No newline at end of file
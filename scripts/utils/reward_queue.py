@@ -0,0 +1,251 @@
+"""
+奖励请求队列
+基于SQLite的持久化工作队列，支持原子领取/确认，处理开销只与批次大小相关
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 领取后未确认的请求在租约到期后重新可被领取（处理进程崩溃的情况）
+DEFAULT_LEASE_SECONDS = 600
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_PROCESSED = "processed"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_email TEXT NOT NULL,
+    article_title TEXT NOT NULL,
+    wechat_user_id TEXT,
+    user_name TEXT,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    download_url TEXT,
+    result_message TEXT,
+    processed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_requests_status ON requests (status, id);
+CREATE INDEX IF NOT EXISTS idx_requests_lease ON requests (status, lease_until);
+"""
+
+
+class RewardRequestQueue:
+    """奖励请求的持久化队列
+
+    请求按状态流转：pending -> processing -> processed/failed。
+    - claim() 在写事务中原子地领取一批请求并设置租约，多个进程同时处理不会重复领取
+    - ack() 在一个事务中写回整批结果
+    - 租约过期的 processing 请求会被重新领取
+    status 上有索引，领取和统计都不需要读取全部历史记录。
+    """
+
+    def __init__(self, db_file: Path, lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(exist_ok=True, parents=True)
+        self.lease_seconds = lease_seconds
+        self.logger = logging.getLogger(__name__)
+
+        # 自动提交模式，事务由 _transaction 显式控制
+        self._conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RewardRequestQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """写事务：BEGIN IMMEDIATE 立即获取写锁，保证领取操作的原子性"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        request = dict(row)
+        request["id"] = f"{row['id']:04d}"
+        return request
+
+    def enqueue(self, user_email: str, article_title: str,
+                wechat_user_id: Optional[str] = None, user_name: Optional[str] = None) -> str:
+        """
+        添加待处理请求
+
+        Returns:
+            请求ID
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO requests (user_email, article_title, wechat_user_id, user_name, created_at, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user_email, article_title, wechat_user_id, user_name,
+                 datetime.now().isoformat(), STATUS_PENDING)
+            )
+        return f"{cursor.lastrowid:04d}"
+
+    def record(self, user_email: str, article_title: str, download_url: Optional[str],
+               success: bool, message: str = "", user_name: Optional[str] = None) -> None:
+        """记录一个未经过队列直接处理的请求（如命令行单独发送）"""
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO requests (user_email, article_title, user_name, created_at, status, "
+                "attempts, download_url, result_message, processed_at) VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)",
+                (user_email, article_title, user_name, now,
+                 STATUS_PROCESSED if success else STATUS_FAILED, download_url, message, now)
+            )
+
+    def claim(self, batch_size: int, worker: Optional[str] = None) -> List[Dict]:
+        """
+        原子地领取一批待处理请求
+
+        Args:
+            batch_size: 最多领取的请求数
+            worker: 处理者标识，默认使用进程ID
+
+        Returns:
+            领取到的请求列表（按创建顺序）
+        """
+        worker = worker or f"pid-{os.getpid()}"
+        now = time.time()
+        with self._transaction() as conn:
+            ids = [row["id"] for row in conn.execute(
+                "SELECT id FROM requests WHERE status = ? "
+                "UNION SELECT id FROM requests WHERE status = ? AND lease_until < ? "
+                "ORDER BY id LIMIT ?",
+                (STATUS_PENDING, STATUS_PROCESSING, now, batch_size)
+            )]
+            if not ids:
+                return []
+            placeholders = ",".join("?" * len(ids))
+            conn.execute(
+                f"UPDATE requests SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 "
+                f"WHERE id IN ({placeholders})",
+                (STATUS_PROCESSING, worker, now + self.lease_seconds, *ids)
+            )
+            rows = conn.execute(
+                f"SELECT * FROM requests WHERE id IN ({placeholders}) ORDER BY id", ids
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def ack(self, results: List[Tuple[str, bool, str, Optional[str]]]) -> None:
+        """
+        在一个事务中确认整批请求的处理结果
+
+        Args:
+            results: (请求ID, 是否成功, 结果消息, 下载链接) 列表
+        """
+        if not results:
+            return
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE requests SET status = ?, result_message = ?, download_url = ?, "
+                "processed_at = ?, lease_until = NULL WHERE id = ?",
+                [(STATUS_PROCESSED if success else STATUS_FAILED, message, download_url, now, int(request_id))
+                 for request_id, success, message, download_url in results]
+            )
+
+    def release(self, request_ids: List[str]) -> None:
+        """将领取但未处理的请求放回队列"""
+        if not request_ids:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE requests SET status = ?, worker = NULL, lease_until = NULL "
+                "WHERE id = ? AND status = ?",
+                [(STATUS_PENDING, int(request_id), STATUS_PROCESSING) for request_id in request_ids]
+            )
+
+    def count_by_status(self) -> Dict[str, int]:
+        """各状态的请求数"""
+        rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM requests GROUP BY status")
+        return {row["status"]: row["n"] for row in rows}
+
+    def count(self, status: str) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM requests WHERE status = ?", (status,)
+        ).fetchone()[0]
+
+    def is_empty(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM requests LIMIT 1").fetchone() is None
+
+    def migrate_from_json(self, pending_file: Path, processed_file: Path, only_if_empty: bool = False) -> int:
+        """
+        导入旧版JSON文件中的请求（pending_reward_requests.json / processed_reward_requests.json）
+
+        Args:
+            pending_file: 旧版待处理请求文件
+            processed_file: 旧版处理记录文件
+            only_if_empty: 仅在队列为空时导入（检查与导入在同一个写事务中，
+                多个进程同时首次启动时只会导入一次）
+
+        Returns:
+            导入的记录数
+        """
+        if only_if_empty and not self.is_empty():
+            return 0
+
+        def load(path: Path) -> List[Dict]:
+            if not path.exists():
+                return []
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except json.JSONDecodeError as e:
+                self.logger.error(f"读取 {path} 失败: {e}")
+                return []
+
+        pending = load(pending_file)
+        processed = load(processed_file)
+        # 已完成的请求以处理记录为准，只导入仍待处理的请求
+        rows = [
+            (r["user_email"], r["article_title"], r.get("wechat_user_id"), r.get("user_name"),
+             r.get("created_at") or datetime.now().isoformat(), STATUS_PENDING, None, None, None)
+            for r in pending if r.get("status") == STATUS_PENDING
+        ]
+        rows += [
+            (r["user_email"], r["article_title"], None, None, r["processed_at"],
+             STATUS_PROCESSED if r.get("success") else STATUS_FAILED,
+             r.get("download_url"), r.get("message", ""), r["processed_at"])
+            for r in processed
+        ]
+        if not rows:
+            return 0
+
+        # 按时间顺序插入，保持原有的处理顺序
+        rows.sort(key=lambda row: row[4])
+        with self._transaction() as conn:
+            if only_if_empty and conn.execute("SELECT 1 FROM requests LIMIT 1").fetchone():
+                return 0
+            conn.executemany(
+                "INSERT INTO requests (user_email, article_title, wechat_user_id, user_name, created_at, "
+                "status, download_url, result_message, processed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        self.logger.info(f"已从JSON导入 {len(rows)} 条奖励请求到 {self.db_file}")
+        return len(rows)
@@ -5,8 +5,8 @@
 
 import os
 import sys
-import json
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -18,6 +18,7 @@ import argparse
 from .github_release_manager import create_github_manager
 from .email_sender import create_email_sender
 from .package_creator import create_package_creator
+from .reward_queue import RewardRequestQueue, STATUS_FAILED, STATUS_PENDING, STATUS_PROCESSED
 
 
 class RewardSystemManager:
@@ -40,8 +41,13 @@ class RewardSystemManager:
         self.data_dir = self.project_root / "_data"
         self.data_dir.mkdir(exist_ok=True)
         
-        self.pending_requests_file = self.data_dir / "pending_reward_requests.json"
-        self.processed_requests_file = self.data_dir / "processed_reward_requests.json"
+        self.legacy_pending_requests_file = self.data_dir / "pending_reward_requests.json"
+        self.legacy_processed_requests_file = self.data_dir / "processed_reward_requests.json"
+        
+        # 请求队列，首次创建时导入旧版JSON文件中的请求
+        self.queue = RewardRequestQueue(self.data_dir / "reward_requests.db")
+        self.queue.migrate_from_json(self.legacy_pending_requests_file, self.legacy_processed_requests_file,
+                                     only_if_empty=True)
     
     def create_article_package(self, article_path: str, upload_to_github: bool = True) -> Tuple[bool, Dict]:
         """
@@ -155,24 +161,7 @@ class RewardSystemManager:
             是否添加成功
         """
         try:
-            # 加载现有请求
-            pending_requests = self._load_pending_requests()
-            
-            # 创建新请求
-            request = {
-                "id": f"{len(pending_requests) + 1:04d}",
-                "user_email": user_email,
-                "article_title": article_title,
-                "wechat_user_id": wechat_user_id,
-                "user_name": user_name,
-                "created_at": datetime.now().isoformat(),
-                "status": "pending"
-            }
-            
-            pending_requests.append(request)
-            
-            # 保存
-            self._save_pending_requests(pending_requests)
+            self.queue.enqueue(user_email, article_title, wechat_user_id, user_name)
             
             self.logger.info(f"添加待处理请求: {user_email} - {article_title}")
             return True
@@ -191,31 +180,53 @@ class RewardSystemManager:
         Returns:
             处理结果统计
         """
+        requests_to_process = []
         try:
-            pending_requests = self._load_pending_requests()
-            pending_requests = [r for r in pending_requests if r["status"] == "pending"]
+            # 原子领取一批请求，未确认的请求在租约到期后可被重新领取
+            requests_to_process = self.queue.claim(batch_size)
             
-            if not pending_requests:
-                return {"processed": 0, "failed": 0, "message": "没有待处理的请求"}
-            
-            # 限制批处理大小
-            requests_to_process = pending_requests[:batch_size]
+            if not requests_to_process:
+                return {"processed": 0, "failed": 0, "remaining": 0, "message": "没有待处理的请求"}
             
             processed_count = 0
             failed_count = 0
             results = []
             
+            # 每篇文章只查询一次下载链接
+            download_urls = {}
             for request in requests_to_process:
-                success, message = self.send_reward_to_user(
-                    request["user_email"],
-                    request["article_title"],
-                    request.get("user_name")
-                )
+                title = request["article_title"]
+                if title not in download_urls:
+                    try:
+                        release_info = self.github_manager.get_release_by_article(title)
+                    except Exception as e:
+                        self.logger.error(f"获取文章《{title}》的下载链接失败: {e}")
+                        release_info = None
+                    download_urls[title] = release_info["asset_url"] if release_info else None
+            
+            # 整批邮件通过复用的SMTP连接发送
+            sendable = [r for r in requests_to_process if download_urls[r["article_title"]]]
+            send_results = self.email_sender.send_reward_packages([{
+                "recipient_email": r["user_email"],
+                "article_title": r["article_title"],
+                "download_url": download_urls[r["article_title"]],
+                "user_name": r.get("user_name")
+            } for r in sendable])
+            outcomes = {id(r): outcome for r, outcome in zip(sendable, send_results)}
+            
+            acks = []
+            for request in requests_to_process:
+                download_url = download_urls[request["article_title"]]
+                if not download_url:
+                    success, message = False, f"未找到文章《{request['article_title']}》的资料包"
+                else:
+                    email_success, email_message = outcomes[id(request)]
+                    if email_success:
+                        success, message = True, f"资料包已成功发送到 {request['user_email']}"
+                    else:
+                        success, message = False, f"邮件发送失败: {email_message}"
                 
-                # 更新请求状态
-                request["status"] = "processed" if success else "failed"
-                request["processed_at"] = datetime.now().isoformat()
-                request["result_message"] = message
+                acks.append((request["id"], success, message, download_url))
                 
                 if success:
                     processed_count += 1
@@ -230,14 +241,14 @@ class RewardSystemManager:
                     "message": message
                 })
             
-            # 保存更新后的请求列表
-            self._save_pending_requests(pending_requests)
+            # 整批结果在一个事务中确认
+            self.queue.ack(acks)
             
             result = {
                 "processed": processed_count,
                 "failed": failed_count,
                 "total": len(requests_to_process),
-                "remaining": len([r for r in pending_requests if r["status"] == "pending"]),
+                "remaining": self.queue.count(STATUS_PENDING),
                 "details": results
             }
             
@@ -247,8 +258,46 @@ class RewardSystemManager:
         except Exception as e:
             error_msg = f"批量处理失败: {e}"
             self.logger.error(error_msg)
+            # 未确认的请求放回队列
+            try:
+                self.queue.release([r["id"] for r in requests_to_process])
+            except Exception as release_error:
+                self.logger.error(f"释放请求失败: {release_error}")
             return {"processed": 0, "failed": 0, "error": error_msg}
     
+    def run_worker(self, batch_size: int = 10, poll_interval: float = 30.0,
+                   max_batches: Optional[int] = None) -> Dict:
+        """
+        持续处理队列中的请求，队列为空时按间隔轮询
+        
+        Args:
+            batch_size: 每批领取的请求数
+            poll_interval: 队列为空时的等待时间（秒），0表示处理完即退出
+            max_batches: 最多处理的批次数（None为不限制）
+            
+        Returns:
+            累计处理结果统计
+        """
+        totals = {"processed": 0, "failed": 0, "batches": 0}
+        try:
+            while max_batches is None or totals["batches"] < max_batches:
+                result = self.process_pending_requests(batch_size)
+                if result.get("error"):
+                    break
+                if not result.get("total"):
+                    if poll_interval <= 0:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                totals["batches"] += 1
+                totals["processed"] += result["processed"]
+                totals["failed"] += result["failed"]
+        except KeyboardInterrupt:
+            self.logger.info("收到中断信号，停止处理")
+        
+        self.logger.info(f"处理进程结束: {totals['batches']} 批, 成功 {totals['processed']}, 失败 {totals['failed']}")
+        return totals
+    
     def get_system_stats(self) -> Dict:
         """获取系统统计信息"""
         try:
@@ -262,10 +311,9 @@ class RewardSystemManager:
             email_stats = self.email_sender.get_stats()
             
             # 请求统计
-            pending_requests = self._load_pending_requests()
-            processed_requests = self._load_processed_requests()
-            
-            pending_count = len([r for r in pending_requests if r["status"] == "pending"])
+            request_counts = self.queue.count_by_status()
+            pending_count = request_counts.get(STATUS_PENDING, 0)
+            processed_count = request_counts.get(STATUS_PROCESSED, 0) + request_counts.get(STATUS_FAILED, 0)
             
             stats = {
                 "github_releases": {
@@ -284,8 +332,8 @@ class RewardSystemManager:
                 },
                 "reward_requests": {
                     "pending": pending_count,
-                    "processed": len(processed_requests),
-                    "total": len(pending_requests) + len(processed_requests)
+                    "processed": processed_count,
+                    "total": sum(request_counts.values())
                 },
                 "last_updated": datetime.now().isoformat()
             }
@@ -296,54 +344,11 @@ class RewardSystemManager:
             self.logger.error(f"获取统计信息失败: {e}")
             return {}
     
-    def _load_pending_requests(self) -> List[Dict]:
-        """加载待处理请求"""
-        if self.pending_requests_file.exists():
-            try:
-                with open(self.pending_requests_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
-        return []
-    
-    def _save_pending_requests(self, requests: List[Dict]) -> None:
-        """保存待处理请求"""
-        try:
-            with open(self.pending_requests_file, 'w', encoding='utf-8') as f:
-                json.dump(requests, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            self.logger.error(f"保存待处理请求失败: {e}")
-    
-    def _load_processed_requests(self) -> List[Dict]:
-        """加载已处理请求"""
-        if self.processed_requests_file.exists():
-            try:
-                with open(self.processed_requests_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
-        return []
-    
     def _record_processed_request(self, user_email: str, article_title: str, 
                                  download_url: str, success: bool, message: str = "") -> None:
         """记录已处理的请求"""
         try:
-            processed_requests = self._load_processed_requests()
-            
-            record = {
-                "user_email": user_email,
-                "article_title": article_title,
-                "download_url": download_url,
-                "success": success,
-                "message": message,
-                "processed_at": datetime.now().isoformat()
-            }
-            
-            processed_requests.append(record)
-            
-            with open(self.processed_requests_file, 'w', encoding='utf-8') as f:
-                json.dump(processed_requests, f, ensure_ascii=False, indent=2)
-                
+            self.queue.record(user_email, article_title, download_url, success, message)
         except Exception as e:
             self.logger.error(f"记录处理结果失败: {e}")
 
@@ -374,6 +379,12 @@ def main():
     process_parser = subparsers.add_parser('process', help='批量处理待处理请求')
     process_parser.add_argument('--batch-size', type=int, default=10, help='批处理大小')
     
+    # 持续处理命令
+    worker_parser = subparsers.add_parser('worker', help='持续处理队列中的请求')
+    worker_parser.add_argument('--batch-size', type=int, default=10, help='批处理大小')
+    worker_parser.add_argument('--poll-interval', type=float, default=30.0,
+                               help='队列为空时的轮询间隔（秒），0表示处理完即退出')
+    
     # 统计信息命令
     subparsers.add_parser('stats', help='显示系统统计信息')
     
@@ -421,7 +432,7 @@ def main():
         elif args.command == 'process':
             result = manager.process_pending_requests(args.batch_size)
             print(f"✅ 处理完成: 成功 {result['processed']}, 失败 {result['failed']}")
-            print(f"剩余待处理: {result['remaining']}")
+            print(f"剩余待处理: {result.get('remaining', 0)}")
             
             if result.get('details'):
                 print("\n详细结果:")
@@ -429,6 +440,10 @@ def main():
                     status = "✅" if detail['success'] else "❌"
                     print(f"  {status} {detail['email']} - {detail['article']}: {detail['message']}")
         
+        elif args.command == 'worker':
+            totals = manager.run_worker(args.batch_size, args.poll_interval)
+            print(f"✅ 共处理 {totals['batches']} 批: 成功 {totals['processed']}, 失败 {totals['failed']}")
+        
         elif args.command == 'stats':
             stats = manager.get_system_stats()
             print("📊 系统统计信息:")
@@ -5,11 +5,15 @@ import unittest
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import tempfile
+import time
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from scripts.core.processors.ai_processor import AIProcessor
+from scripts.core.processors.ai_response_cache import AIResponseCache
+from scripts.core.processors.streaming_generation import StreamInterrupted, has_complete_ending, stream_generate
 
 
 class TestAIProcessor(unittest.TestCase):
@@ -258,5 +262,268 @@ class TestAIProcessor(unittest.TestCase):
         self.assertEqual(time_minutes, 1)
 
 
+
+class TestAIResponseCache(unittest.TestCase):
+    """测试AI响应缓存"""
+    
+    def setUp(self):
+        """测试初始化"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.mock_model = MagicMock()
+        self.mock_model.model_name = "models/test-model"
+        mock_response = MagicMock()
+        mock_response.text = "这是一篇关于测试的精彩文章，值得深入阅读。"
+        self.mock_model.generate_content.return_value = mock_response
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_repeated_call_uses_cache(self):
+        """测试相同输入第二次调用命中缓存"""
+        cache = AIResponseCache(self.temp_dir.name)
+        processor = AIProcessor(self.mock_model, MagicMock(), cache=cache)
+        
+        first = processor.generate_excerpt("Test content for excerpt generation")
+        second = processor.generate_excerpt("Test content for excerpt generation")
+        
+        self.assertEqual(first, second)
+        self.mock_model.generate_content.assert_called_once()
+        self.assertEqual(cache.hits, 1)
+    
+    def test_changed_input_misses_cache(self):
+        """测试输入变化时重新调用API"""
+        cache = AIResponseCache(self.temp_dir.name)
+        processor = AIProcessor(self.mock_model, MagicMock(), cache=cache)
+        
+        processor.generate_excerpt("Test content A")
+        processor.generate_excerpt("Test content B")
+        
+        self.assertEqual(self.mock_model.generate_content.call_count, 2)
+    
+    def test_key_depends_on_template_version_and_model(self):
+        """测试缓存键包含模板版本和模型名称"""
+        key = AIResponseCache.make_key("excerpt", 1, "model-a", "text")
+        self.assertNotEqual(key, AIResponseCache.make_key("excerpt", 2, "model-a", "text"))
+        self.assertNotEqual(key, AIResponseCache.make_key("excerpt", 1, "model-b", "text"))
+    
+    def test_bypass_disables_cache(self):
+        """测试绕过缓存"""
+        cache = AIResponseCache.from_config({"dir": self.temp_dir.name}, bypass=True)
+        processor = AIProcessor(self.mock_model, MagicMock(), cache=cache)
+        
+        processor.generate_excerpt("Test content")
+        processor.generate_excerpt("Test content")
+        
+        self.assertFalse(cache.enabled)
+        self.assertEqual(self.mock_model.generate_content.call_count, 2)
+    
+    def test_size_eviction(self):
+        """测试超出容量时淘汰旧条目"""
+        cache = AIResponseCache(self.temp_dir.name, max_size_mb=0.001)
+        for i in range(5):
+            cache.set(f"key{i}", "x" * 400)
+        cache.evict()
+        
+        remaining = list(cache.cache_dir.glob("*.json"))
+        self.assertLess(len(remaining), 5)
+        self.assertLessEqual(sum(p.stat().st_size for p in remaining), cache.max_size_bytes)
+    
+    def test_expiry_uses_write_time(self):
+        """测试读取和淘汰都按写入时间判断过期，命中不会延长有效期"""
+        cache = AIResponseCache(self.temp_dir.name, max_age_days=1)
+        cache.set("fresh", "新响应")
+        cache.set("stale", "旧响应")
+        day = 24 * 3600
+        for key in ("fresh", "stale"):
+            written_at = time.time() - (0.5 if key == "fresh" else 2) * day
+            os.utime(cache.cache_dir / f"{key}.json", (time.time(), written_at))
+        
+        self.assertEqual(cache.get("fresh"), "新响应")
+        self.assertAlmostEqual((cache.cache_dir / "fresh.json").stat().st_mtime, time.time() - 0.5 * day, delta=5)
+        self.assertIsNone(cache.get("stale"))
+        self.assertFalse((cache.cache_dir / "stale.json").exists())
+        
+        os.utime(cache.cache_dir / "fresh.json", (time.time(), time.time() - 2 * day))
+        self.assertEqual(cache.evict(), 1)
+        self.assertEqual(list(cache.cache_dir.glob("*.json")), [])
+    
+    def test_lru_eviction_uses_access_time(self):
+        """测试容量淘汰按最近访问时间，最近命中的条目保留"""
+        cache = AIResponseCache(self.temp_dir.name, max_size_mb=1.5 / 1024)
+        cache.set("first", "a" * 600)
+        cache.set("second", "b" * 600)
+        os.utime(cache.cache_dir / "first.json", (time.time() - 100, time.time() - 100))
+        os.utime(cache.cache_dir / "second.json", (time.time() - 50, time.time() - 50))
+        cache.get("first")
+        cache.set("third", "c" * 600)
+        
+        cache.evict()
+        
+        self.assertIsNotNone(cache.get("first"))
+        self.assertIsNone(cache.get("second"))
+
+
+def make_chunk(text, finish_reason=None):
+    """构造流式响应块（finish_reason为结束原因名称）"""
+    chunk = MagicMock()
+    chunk.text = text
+    candidate = MagicMock()
+    if finish_reason:
+        candidate.finish_reason.name = finish_reason
+    else:
+        candidate.finish_reason = 0
+    chunk.candidates = [candidate]
+    return chunk
+
+
+COMPLETE_ENDING = "这是结尾段落，我们一起思考未来的发展。"
+
+
+class TestStreamGeneration(unittest.TestCase):
+    """测试流式生成"""
+    
+    def setUp(self):
+        """测试初始化"""
+        self.mock_model = MagicMock()
+        self.mock_model.model_name = "models/test-model"
+    
+    def test_chunks_reported_incrementally(self):
+        """测试逐块回调并拼接完整文本"""
+        self.mock_model.generate_content.return_value = iter([
+            make_chunk("第一段内容。\n"), make_chunk(COMPLETE_ENDING, "STOP")
+        ])
+        on_chunk = MagicMock()
+        
+        result = stream_generate(self.mock_model, "prompt", on_chunk=on_chunk)
+        
+        self.assertEqual(result.text, "第一段内容。\n" + COMPLETE_ENDING)
+        self.assertTrue(result.complete)
+        self.assertEqual(result.finish_reason, "STOP")
+        self.assertEqual(on_chunk.call_args_list[-1][0], (COMPLETE_ENDING, len(result.text)))
+        self.assertTrue(self.mock_model.generate_content.call_args.kwargs["stream"])
+    
+    def test_truncated_output_is_continued(self):
+        """测试达到最大输出长度时从中断处续写，而不是重新生成"""
+        self.mock_model.generate_content.side_effect = [
+            iter([make_chunk("开头部分，写到一半", "MAX_TOKENS")]),
+            iter([make_chunk("的内容。\n" + COMPLETE_ENDING, "STOP")]),
+        ]
+        
+        result = stream_generate(self.mock_model, "prompt")
+        
+        self.assertEqual(result.text, "开头部分，写到一半的内容。\n" + COMPLETE_ENDING)
+        self.assertEqual(result.continuations, 1)
+        self.assertTrue(result.complete)
+        contents = self.mock_model.generate_content.call_args_list[1][0][0]
+        self.assertEqual([c["role"] for c in contents], ["user", "model", "user"])
+        self.assertEqual(contents[1]["parts"], ["开头部分，写到一半"])
+    
+    def test_continuation_limit(self):
+        """测试续写次数用完后返回不完整的结果"""
+        self.mock_model.generate_content.side_effect = lambda *args, **kwargs: iter([make_chunk("没有结尾", "MAX_TOKENS")])
+        
+        result = stream_generate(self.mock_model, "prompt", max_continuations=1)
+        
+        self.assertEqual(self.mock_model.generate_content.call_count, 2)
+        self.assertTrue(result.truncated)
+        self.assertFalse(result.complete)
+    
+    def test_should_abort_stops_consuming(self):
+        """测试回调要求中止时不再读取后续响应块"""
+        chunks = [make_chunk("a" * 10), make_chunk("b" * 10), make_chunk("c" * 10)]
+        stream = iter(chunks)
+        self.mock_model.generate_content.return_value = stream
+        
+        result = stream_generate(self.mock_model, "prompt", should_abort=lambda text: len(text) >= 20)
+        
+        self.assertTrue(result.aborted)
+        self.assertFalse(result.complete)
+        self.assertEqual(result.text, "a" * 10 + "b" * 10)
+        self.assertIs(next(stream), chunks[2])
+    
+    def test_user_interrupt_is_reraised(self):
+        """测试Ctrl+C不会被当作普通中止吞掉，而是带着已生成的部分文本重新抛出"""
+        def interrupted_stream():
+            yield make_chunk("已生成的部分")
+            raise KeyboardInterrupt
+        self.mock_model.generate_content.return_value = interrupted_stream()
+        
+        with self.assertRaises(KeyboardInterrupt) as ctx:
+            stream_generate(self.mock_model, "prompt")
+        
+        self.assertIsInstance(ctx.exception, StreamInterrupted)
+        self.assertEqual(ctx.exception.result.text, "已生成的部分")
+        self.assertTrue(ctx.exception.result.aborted)
+    
+    def test_blocked_chunk_without_text(self):
+        """测试没有文本的响应块（访问text抛出ValueError）被跳过"""
+        blocked = make_chunk(None, "SAFETY")
+        type(blocked).text = property(lambda self: (_ for _ in ()).throw(ValueError("blocked")))
+        self.mock_model.generate_content.return_value = iter([blocked])
+        
+        result = stream_generate(self.mock_model, "prompt")
+        
+        self.assertEqual(result.text, "")
+        self.assertEqual(result.finish_reason, "SAFETY")
+        self.assertFalse(result.complete)
+    
+    def test_has_complete_ending(self):
+        """测试结尾完整性检查"""
+        self.assertTrue(has_complete_ending("正文\n" + COMPLETE_ENDING))
+        self.assertFalse(has_complete_ending("正文\n写到一半"))
+        self.assertFalse(has_complete_ending(""))
+    
+    def test_processor_streams_polish_once_on_stop(self):
+        """测试流式润色：正常结束（STOP）的响应只调用一次，不续写、结果写入缓存"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = AIResponseCache(temp_dir)
+            processor = AIProcessor(self.mock_model, MagicMock(), cache=cache, stream=True)
+            self.mock_model.generate_content.side_effect = lambda *args, **kwargs: iter([make_chunk("润色后的内容", "STOP")])
+            on_chunk = MagicMock()
+            content = "---\ntitle: Test\n---\n" + "需要润色的正文内容。" * 20
+            
+            result = processor.polish_content(content, on_chunk=on_chunk)
+            
+            self.assertEqual(result, "---\ntitle: Test\n---\n\n润色后的内容")
+            self.mock_model.generate_content.assert_called_once()
+            on_chunk.assert_called_once_with("润色后的内容", len("润色后的内容"))
+            self.assertEqual(len(list(cache.cache_dir.glob("*.json"))), 1)
+    
+    def test_processor_truncated_polish_not_cached(self):
+        """测试润色被截断（续写后仍截断）时返回已生成内容但不写入缓存"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = AIResponseCache(temp_dir)
+            processor = AIProcessor(self.mock_model, MagicMock(), cache=cache, stream=True)
+            self.mock_model.generate_content.side_effect = lambda *args, **kwargs: iter([make_chunk("润色", "MAX_TOKENS")])
+            content = "---\ntitle: Test\n---\n" + "需要润色的正文内容。" * 20
+            
+            result = processor.polish_content(content)
+            
+            self.assertEqual(result, "---\ntitle: Test\n---\n\n润色润色")
+            self.assertEqual(self.mock_model.generate_content.call_count, 2)
+            self.assertEqual(list(cache.cache_dir.glob("*.json")), [])
+    
+    def test_stop_response_not_continued(self):
+        """测试正常结束但结尾不像总结句的响应不续写"""
+        self.mock_model.generate_content.return_value = iter([make_chunk("没有总结的结尾", "STOP")])
+        
+        result = stream_generate(self.mock_model, "prompt")
+        
+        self.assertEqual(result.text, "没有总结的结尾")
+        self.assertEqual(result.continuations, 0)
+        self.assertFalse(result.complete)
+        self.mock_model.generate_content.assert_called_once()
+    
+    def test_processor_runaway_polish_aborted(self):
+        """测试润色输出远超原文长度时提前中止并保留原内容"""
+        processor = AIProcessor(self.mock_model, MagicMock(), stream=True)
+        self.mock_model.generate_content.return_value = iter([make_chunk("重复" * 500)] * 10)
+        content = "---\ntitle: Test\n---\n" + "需要润色的正文内容。" * 20
+        
+        result = processor.polish_content(content)
+        
+        self.assertEqual(result, content)
+        self.mock_model.generate_content.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
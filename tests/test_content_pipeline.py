@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+测试内容处理管道
+"""
+
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.core.content_pipeline import ContentPipeline
+from scripts.core.processors.ai_processor import AIProcessor
+from scripts.core.processors.streaming_generation import StreamInterrupted
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = ContentPipeline.__new__(ContentPipeline)
+    pipeline.log = MagicMock()
+    pipeline._lazy_lock = threading.RLock()
+    pipeline._model = None
+    pipeline._ai_processor = None
+    pipeline._platform_processor = None
+    pipeline._apis_ready = False
+    pipeline._apis_error = None
+    return pipeline
+
+
+class TestLazyApis:
+    """测试Gemini模型及相关处理器的延迟初始化"""
+
+    def test_setup_runs_once_on_success(self, pipeline):
+        """测试初始化成功后各属性共用同一次初始化"""
+        model = MagicMock()
+
+        def setup():
+            pipeline._model = model
+            pipeline._ai_processor = "ai"
+
+        pipeline._setup_apis = MagicMock(side_effect=setup)
+
+        assert pipeline.model is model
+        assert pipeline.ai_processor == "ai"
+        assert pipeline._setup_apis.call_count == 1
+
+    def test_setup_failure_reraised_on_later_access(self, pipeline):
+        """测试初始化失败不会被标记为就绪，后续访问重新抛出同一异常"""
+        error = RuntimeError("配置失败")
+        pipeline._setup_apis = MagicMock(side_effect=error)
+
+        with pytest.raises(RuntimeError) as first:
+            _ = pipeline.model
+        with pytest.raises(RuntimeError) as second:
+            _ = pipeline.ai_processor
+
+        assert first.value is second.value is error
+        assert pipeline._setup_apis.call_count == 1
+        assert not pipeline._apis_ready
+
+
+class TestProcessDraftsBatch:
+    """测试批量处理草稿"""
+
+    @pytest.fixture
+    def batch_pipeline(self):
+        pipeline = ContentPipeline.__new__(ContentPipeline)
+        pipeline.config = {}
+        pipeline.log = MagicMock()
+        pipeline._draft_context = threading.local()
+        return pipeline
+
+    @pytest.fixture
+    def drafts(self, tmp_path):
+        paths = []
+        for folder in ("_drafts", "archive", "_drafts"):
+            path = tmp_path / folder / ("broken.md" if len(paths) == 2 else "same-name.md")
+            path.parent.mkdir(exist_ok=True)
+            path.write_text("---\ntitle: 测试\n---\n正文", encoding="utf-8")
+            paths.append(path)
+        return paths
+
+    def test_same_name_drafts_and_failure_collected(self, batch_pipeline, drafts):
+        """测试同名草稿结果互不覆盖，单篇出错不影响其他草稿"""
+        def process_draft(draft_path, platforms, **kwargs):
+            if draft_path.name == "broken.md":
+                raise RuntimeError("处理失败")
+            return {"success": True, "successful_platforms": platforms, "source": str(draft_path)}
+
+        batch_pipeline.process_draft = MagicMock(side_effect=process_draft)
+
+        summary = batch_pipeline.process_drafts_batch(drafts, ["github_pages"], max_workers=3)
+
+        keys = [str(path) for path in drafts]
+        assert summary["total"] == 3
+        assert list(summary["results"]) == keys
+        assert summary["succeeded"] == keys[:2]
+        assert summary["failed"] == keys[2:]
+        assert summary["results"][keys[1]]["source"] == keys[1]
+        assert summary["results"][keys[2]]["error"] == "处理失败"
+        assert summary["results"][keys[2]]["total_platforms"] == 1
+
+    def test_duplicate_draft_processed_once(self, batch_pipeline, drafts, tmp_path, monkeypatch):
+        """测试重复传入的同一草稿只处理一次"""
+        monkeypatch.chdir(tmp_path)
+        batch_pipeline.process_draft = MagicMock(return_value={"success": True})
+
+        summary = batch_pipeline.process_drafts_batch(
+            [drafts[0], Path("_drafts/same-name.md")], ["github_pages"])
+
+        assert batch_pipeline.process_draft.call_count == 1
+        assert list(summary["results"]) == [str(drafts[0])]
+
+
+class TestProcessDraftInterrupt:
+    """测试润色过程中用户中断"""
+
+    def test_user_interrupt_during_polish_stops_publishing(self, pipeline, tmp_path):
+        """测试流式润色时按Ctrl+C会终止处理，而不是用原内容继续生成和发布"""
+        def interrupted_stream(*args, **kwargs):
+            chunk = MagicMock()
+            chunk.text = "润色到一半"
+            chunk.candidates = []
+            yield chunk
+            raise KeyboardInterrupt
+
+        model = MagicMock()
+        model.generate_content.side_effect = interrupted_stream
+        pipeline._ai_processor = AIProcessor(model, MagicMock(), stream=True)
+        pipeline._apis_ready = True
+        pipeline.logger = MagicMock()
+        pipeline._generate_platform_content = MagicMock()
+        pipeline._publish_to_github_pages = MagicMock()
+        draft = tmp_path / "draft.md"
+        draft.write_text("---\ntitle: 测试\n---\n" + "需要润色的正文内容。" * 20, encoding="utf-8")
+
+        with pytest.raises(StreamInterrupted):
+            pipeline.process_draft(draft, ["github_pages"])
+
+        pipeline._generate_platform_content.assert_not_called()
+        pipeline._publish_to_github_pages.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+测试草稿元数据缓存
+"""
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.core.managers.draft_metadata_cache import DraftMetadataCache
+from scripts.core.content_pipeline import ContentPipeline
+
+DRAFT = """---
+title: 测试草稿标题足够长度
+date: 2025-01-01
+---
+正文内容
+"""
+
+
+@pytest.fixture
+def draft(tmp_path):
+    path = tmp_path / "2025-01-01-test.md"
+    path.write_text(DRAFT, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DraftMetadataCache(tmp_path / "cache" / "draft_metadata.json")
+
+
+def touch_later(path, content):
+    """写入新内容并推进修改时间，避免文件系统时间精度导致误命中"""
+    stat = path.stat()
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+class TestDraftMetadataCache:
+    """测试草稿元数据缓存"""
+
+    def test_parses_front_matter_and_body_offset(self, cache, draft):
+        """测试解析Front Matter并记录正文偏移"""
+        entry = cache.get(draft)
+
+        assert entry["metadata"] == {"title": "测试草稿标题足够长度", "date": "2025-01-01"}
+        assert DRAFT[entry["body_offset"]:] == "正文内容\n"
+        assert entry["parse_error"] is None
+
+    def test_unchanged_file_hits_cache(self, cache, draft):
+        """测试文件未修改时不重新解析，派生字段只计算一次"""
+        derive = MagicMock(return_value=["问题"])
+        cache.get(draft, {"issues": derive})
+        entry = cache.get(draft, {"issues": derive})
+
+        assert entry["issues"] == ["问题"]
+        assert derive.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_modified_file_invalidates_entry(self, cache, draft):
+        """测试文件修改后重新解析并重新计算派生字段"""
+        cache.get(draft, {"length": lambda content, entry: len(content)})
+        touch_later(draft, DRAFT.replace("测试草稿标题足够长度", "新标题"))
+        entry = cache.get(draft, {"length": lambda content, entry: len(content)})
+
+        assert entry["metadata"]["title"] == "新标题"
+        assert entry["length"] == len(draft.read_text(encoding="utf-8"))
+        assert cache.misses == 2
+
+    def test_persisted_between_sessions(self, cache, draft):
+        """测试缓存保存后新实例直接命中"""
+        cache.get(draft)
+        cache.save()
+
+        reloaded = DraftMetadataCache(cache.cache_file)
+        reloaded.get(draft)
+        assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+    def test_retain_drops_removed_drafts(self, cache, draft, tmp_path):
+        """测试清理已不存在的草稿条目"""
+        other = tmp_path / "other.md"
+        other.write_text(DRAFT, encoding="utf-8")
+        cache.get(draft)
+        cache.get(other)
+        cache.retain([draft])
+        cache.save()
+
+        reloaded = DraftMetadataCache(cache.cache_file)
+        reloaded.get(other)
+        assert reloaded.misses == 1
+
+    def test_broken_front_matter_uses_fixer(self, tmp_path):
+        """测试Front Matter解析失败时记录错误并尝试修复"""
+        path = tmp_path / "broken.md"
+        path.write_text("---\ntitle: [未闭合\ndate: 2025-01-01\n---\n正文\n", encoding="utf-8")
+        fixer = MagicMock(return_value="---\ntitle: 已修复\ndate: 2025-01-01\n---\n正文\n")
+        cache = DraftMetadataCache(tmp_path / "cache.json", fix_front_matter=fixer)
+
+        entry = cache.get(path)
+        assert entry["parse_error"]
+        assert entry["fixed"] and entry["metadata"]["title"] == "已修复"
+
+
+class TestPipelineUsesCache:
+    """测试草稿列表、状态分析和问题检查共用缓存"""
+
+    @pytest.fixture
+    def pipeline(self, tmp_path, draft):
+        pipeline = ContentPipeline.__new__(ContentPipeline)
+        pipeline.config = {"paths": {"drafts": str(tmp_path)}}
+        pipeline.draft_cache = DraftMetadataCache(tmp_path / "cache" / "draft_metadata.json")
+        pipeline.log = MagicMock()
+        pipeline._image_processor = MagicMock()
+        pipeline._image_processor.check_image_paths.return_value = []
+        return pipeline
+
+    def test_listing_and_analysis_parse_once(self, pipeline, draft):
+        """测试列表、状态分析和问题检查只读取解析一次草稿"""
+        assert pipeline.list_drafts() == [draft]
+        pipeline.analyze_draft_status(draft)
+        first = pipeline.check_draft_issues(draft)
+
+        assert pipeline.check_draft_issues(draft) == first
+        assert pipeline.draft_cache.misses == 1
+        assert pipeline._image_processor.check_image_paths.call_count == 2
+        assert pipeline.draft_cache.cache_file.exists()
+
+    def test_invalid_draft_without_front_matter(self, pipeline, tmp_path):
+        """测试缺少Front Matter的草稿不出现在有效列表中"""
+        (tmp_path / "plain.md").write_text("没有Front Matter的草稿", encoding="utf-8")
+
+        assert [d.name for d in pipeline.list_drafts()] == ["2025-01-01-test.md"]
+        assert len(pipeline.list_drafts(filter_valid=False)) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -4,8 +4,10 @@
 """
 
 import pytest
+import io
 import os
 import sys
+import wave
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -13,6 +15,8 @@ from unittest.mock import Mock, patch
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from scripts.core.tts_audio_cache import TTSAudioCache
+
 
 class TestElevenLabsIntegration:
     """测试ElevenLabs集成功能"""
@@ -119,6 +123,12 @@ class TestElevenLabsTools:
 class TestYouTubePodcastGeneratorDualVoice:
     """测试YouTube播客生成器的双人对话功能"""
     
+    @pytest.fixture
+    def config(self, tmp_path):
+        """生成器配置（TTS缓存写入临时目录，不污染 .build/cache）"""
+        return {'GEMINI_API_KEY': 'test', 'ELEVENLABS_API_KEY': 'test',
+                'tts_cache': {'dir': str(tmp_path / 'tts_cache')}}
+    
     def test_youtube_generator_imports(self):
         """测试YouTube播客生成器导入"""
         from scripts.core.youtube_podcast_generator import YouTubePodcastGenerator
@@ -135,7 +145,7 @@ class TestYouTubePodcastGeneratorDualVoice:
             '_parse_dialogue',
             '_get_speaker_settings',
             '_get_speaker_voice_id',
-            '_merge_dialogue_segments',
+            '_merge_dialogue_segments_to_file',
             '_load_voice_config',
             '_get_default_voice_config'
         ]
@@ -143,12 +153,11 @@ class TestYouTubePodcastGeneratorDualVoice:
         for method_name in methods:
             assert hasattr(YouTubePodcastGenerator, method_name), f"Method {method_name} not found"
     
-    def test_dialogue_parsing(self):
+    def test_dialogue_parsing(self, config):
         """测试对话解析功能"""
         from scripts.core.youtube_podcast_generator import YouTubePodcastGenerator
         
         # 创建一个测试实例
-        config = {'GEMINI_API_KEY': 'test', 'ELEVENLABS_API_KEY': 'test'}
         generator = YouTubePodcastGenerator(config)
         
         # 测试对话解析
@@ -165,11 +174,10 @@ class TestYouTubePodcastGeneratorDualVoice:
         assert dialogue_segments[1][0] == 'B'  # 学习导师映射到B
         assert dialogue_segments[2][0] == 'A'  # 主播助手映射到A
     
-    def test_default_voice_config(self):
+    def test_default_voice_config(self, config):
         """测试默认声音配置"""
         from scripts.core.youtube_podcast_generator import YouTubePodcastGenerator
         
-        config = {'GEMINI_API_KEY': 'test', 'ELEVENLABS_API_KEY': 'test'}
         generator = YouTubePodcastGenerator(config)
         
         default_config = generator._get_default_voice_config()
@@ -184,6 +192,102 @@ class TestYouTubePodcastGeneratorDualVoice:
         # 检查默认声音ID
         assert chinese_config['speaker_a']['voice_id'] == "21m00Tcm4TlvDq8ikWAM"
         assert chinese_config['speaker_b']['voice_id'] == "TxGEqnHWrfWFTfGW9XjX"
+    
+    def test_concurrent_segment_synthesis_keeps_order(self, config):
+        """测试并发合成保持原对话顺序并重试失败片段"""
+        from scripts.core.youtube_podcast_generator import YouTubePodcastGenerator
+        
+        generator = YouTubePodcastGenerator(config)
+        generator._get_speaker_voice_id = Mock(side_effect=lambda speaker, *_: f"voice_{speaker}")
+        generator._get_speaker_settings = Mock(return_value=None)
+        generator.tts_cache = TTSAudioCache(enabled=False)
+        
+        failures = {'3': 1}
+        
+        def fake_synthesize(voice_id, text, model_id, voice_settings):
+            if failures.get(text):
+                failures[text] -= 1
+                raise ConnectionError("temporary failure")
+            return f"{voice_id}:{text}".encode()
+        
+        generator._synthesize_elevenlabs_segment = fake_synthesize
+        segments = [('A' if i % 2 == 0 else 'B', str(i)) for i in range(8)]
+        voice_config = {'rate_limits': {'max_concurrent_requests': 4, 'requests_per_second': 100,
+                                        'retry_backoff_seconds': 0}}
+        
+        audio = generator._synthesize_dialogue_segments(segments, voice_config, 'zh-CN', 'eleven_multilingual_v2')
+        
+        assert audio == [f"voice_{speaker}:{text}".encode() for speaker, text in segments]
+        assert failures['3'] == 0
+    
+    def test_segment_cache_skips_unchanged_lines(self, config):
+        """测试修改一句后重新生成只合成改动的片段"""
+        from scripts.core.youtube_podcast_generator import YouTubePodcastGenerator
+        
+        generator = YouTubePodcastGenerator(config)
+        generator._get_speaker_voice_id = Mock(side_effect=lambda speaker, *_: f"voice_{speaker}")
+        generator._get_speaker_settings = Mock(return_value=None)
+        generator._synthesize_elevenlabs_segment = Mock(side_effect=lambda voice_id, text, *_: text.encode())
+        
+        segments = [('A', '第一句'), ('B', '第二句'), ('A', '第三句')]
+        generator._synthesize_dialogue_segments(segments, {}, 'zh-CN', 'eleven_multilingual_v2')
+        assert generator._synthesize_elevenlabs_segment.call_count == 3
+        
+        segments[1] = ('B', '修改后的第二句')
+        audio = generator._synthesize_dialogue_segments(segments, {}, 'zh-CN', 'eleven_multilingual_v2')
+        assert generator._synthesize_elevenlabs_segment.call_count == 4
+        assert audio == [text.encode() for _, text in segments]
+    
+    def test_streaming_merge_writes_wav(self, config, tmp_path):
+        """测试流式合并将片段和停顿按顺序写入WAV文件"""
+        pydub = pytest.importorskip("pydub")
+        from scripts.core.youtube_podcast_generator import YouTubePodcastGenerator
+        
+        generator = YouTubePodcastGenerator(config)
+        
+        def make_clip(duration_ms):
+            buffer = io.BytesIO()
+            pydub.AudioSegment.silent(duration=duration_ms, frame_rate=22050).export(buffer, format="wav")
+            return buffer.getvalue()
+        
+        # 测试环境不依赖ffmpeg解码mp3，片段直接使用WAV数据
+        original_from_file = pydub.AudioSegment.from_file
+        with patch.object(pydub.AudioSegment, 'from_file',
+                          side_effect=lambda data, format=None: original_from_file(data, format="wav")):
+            output_path = tmp_path / "dialogue.wav"
+            assert generator._merge_dialogue_segments_to_file(
+                [make_clip(1000), make_clip(500), make_clip(250)], str(output_path), pause_ms=600
+            )
+        
+        with wave.open(str(output_path), 'rb') as merged_file:
+            assert merged_file.getnframes() == 22050 * (1000 + 600 + 500 + 600 + 250) // 1000
+        assert not (tmp_path / "dialogue.part.wav").exists()
+
+
+class TestTTSAudioCache:
+    """测试TTS音频缓存"""
+    
+    def test_key_normalizes_whitespace(self):
+        """测试缓存键忽略空白差异，区分声音和参数"""
+        key = TTSAudioCache.make_key("elevenlabs", "v1", "m1", {"stability": 0.4}, "你好  世界\n")
+        assert key == TTSAudioCache.make_key("elevenlabs", "v1", "m1", {"stability": 0.4}, " 你好 世界")
+        assert key != TTSAudioCache.make_key("elevenlabs", "v2", "m1", {"stability": 0.4}, "你好 世界")
+        assert key != TTSAudioCache.make_key("elevenlabs", "v1", "m1", {"stability": 0.5}, "你好 世界")
+    
+    def test_lru_eviction_by_size(self, tmp_path):
+        """测试超出容量时淘汰最久未使用的片段"""
+        cache = TTSAudioCache(cache_dir=str(tmp_path), max_size_mb=1.5 / 1024)  # 1.5KB
+        cache.set("old", b"a" * 1024)
+        os.utime(tmp_path / "old.audio", (1, 1))
+        cache.set("new", b"b" * 1024)
+        
+        assert cache.evict() == 1
+        assert cache.get("old") is None
+        assert cache.get("new") == b"b" * 1024
+        
+        stats = cache.get_stats()
+        assert stats['entries'] == 1
+        assert stats['hits'] == 1 and stats['misses'] == 1
 
 
 if __name__ == "__main__":
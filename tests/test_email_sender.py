@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+测试邮件发送器的批量发送（SMTP连接复用、去重、记录一次写入）
+"""
+
+import json
+import smtplib
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.utils import email_sender as email_sender_module
+from scripts.utils.email_sender import EmailSender
+
+
+class FakeSMTP:
+    """记录连接和发送次数的SMTP替身"""
+
+    instances = []
+    disconnect_after = None
+    disconnect_in_data = False
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.closed = False
+        self.recipient = None
+        FakeSMTP.instances.append(self)
+
+    def starttls(self, context=None):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def ehlo_or_helo_if_needed(self):
+        pass
+
+    def mail(self, sender):
+        if FakeSMTP.disconnect_after is not None and len(self.sent) >= FakeSMTP.disconnect_after:
+            raise smtplib.SMTPServerDisconnected("closed")
+        return 250, b"ok"
+
+    def rcpt(self, recipient):
+        self.recipient = recipient
+        return 250, b"ok"
+
+    def data(self, message):
+        if FakeSMTP.disconnect_in_data:
+            raise smtplib.SMTPServerDisconnected("closed during DATA")
+        self.sent.append(self.recipient)
+        return 250, b"ok"
+
+    def rset(self):
+        pass
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sender(tmp_path, monkeypatch):
+    FakeSMTP.instances = []
+    FakeSMTP.disconnect_after = None
+    FakeSMTP.disconnect_in_data = False
+    monkeypatch.setattr(email_sender_module.smtplib, "SMTP", FakeSMTP)
+    monkeypatch.chdir(tmp_path)
+    return EmailSender("smtp.test", 587, "me@test", "pw",
+                       max_connections=1, rate_per_second=0)
+
+
+def make_requests(count, title="文章"):
+    return [{"recipient_email": f"user{i}@test", "article_title": title,
+             "download_url": "https://example.com/pkg.zip"} for i in range(count)]
+
+
+class TestBatchSend:
+    """测试批量发送"""
+
+    def test_single_connection_reused(self, sender, monkeypatch):
+        """测试整批邮件复用同一个SMTP连接，记录只写入一次"""
+        saves = []
+        original_save = sender._save_email_records
+        monkeypatch.setattr(sender, "_save_email_records",
+                            lambda records: (saves.append(len(records)), original_save(records)))
+
+        results = sender.send_reward_packages(make_requests(5))
+
+        assert results == [(True, "邮件发送成功")] * 5
+        assert len(FakeSMTP.instances) == 1
+        assert len(FakeSMTP.instances[0].sent) == 5
+        assert FakeSMTP.instances[0].closed
+        assert saves == [5]
+
+    def test_duplicates_skipped(self, sender):
+        """测试已发送和同批重复的请求被跳过"""
+        sender.send_reward_packages(make_requests(1))
+        requests = make_requests(2) + make_requests(1)
+
+        results = sender.send_reward_packages(requests)
+
+        assert [ok for ok, _ in results] == [True, True, True]
+        assert results[0][1] == results[2][1] == "该用户已收到此文章的资料包"
+        assert sum(len(s.sent) for s in FakeSMTP.instances) == 2
+        records = json.loads(sender.records_file.read_text(encoding="utf-8"))
+        assert len(records) == 2
+
+    def test_reconnects_after_message_limit(self, sender):
+        """测试单连接达到上限后重新建立连接"""
+        sender.max_messages_per_connection = 2
+
+        sender.send_reward_packages(make_requests(5))
+
+        assert [len(s.sent) for s in FakeSMTP.instances] == [2, 2, 1]
+
+    def test_retries_once_on_disconnect(self, sender):
+        """测试服务器断开后重连重试"""
+        FakeSMTP.disconnect_after = 3
+
+        results = sender.send_reward_packages(make_requests(4))
+
+        assert all(ok for ok, _ in results)
+        assert len(FakeSMTP.instances) == 2
+        assert FakeSMTP.instances[0].closed
+
+    def test_no_resend_after_disconnect_during_data(self, sender):
+        """测试DATA阶段断开时不自动重发（邮件可能已送达）"""
+        FakeSMTP.disconnect_in_data = True
+
+        results = sender.send_reward_packages(make_requests(1))
+
+        assert results[0][0] is False
+        assert "可能已送达" in results[0][1]
+        assert len(FakeSMTP.instances) == 1
+        assert FakeSMTP.instances[0].closed
+        assert not sender.records_file.exists()
+
+    def test_auth_failure_aborts_batch(self, sender, monkeypatch):
+        """测试认证失败时不再尝试剩余邮件"""
+        def fail_login(self, user, password):
+            raise smtplib.SMTPAuthenticationError(535, b"bad")
+        monkeypatch.setattr(FakeSMTP, "login", fail_login)
+
+        results = sender.send_reward_packages(make_requests(3))
+
+        assert results == [(False, "SMTP认证失败，请检查邮箱密码")] * 3
+        assert len(FakeSMTP.instances) == 1
+        assert not sender.records_file.exists()
+
+    def test_single_send_uses_batch(self, sender):
+        """测试单封发送接口保持原有返回值"""
+        assert sender.send_reward_package("a@test", "文章", "https://x") == (True, "邮件发送成功")
+        assert sender.send_reward_package("a@test", "文章", "https://x") == (True, "该用户已收到此文章的资料包")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+测试已有WordPress文章的Gutenberg转换流水线：分页读取、并行转换和并发更新
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def make_post(post_id, content=None):
+    return {
+        "id": post_id,
+        "title": {"rendered": f"文章 {post_id}"},
+        "content": {"raw": content if content is not None else f"<p>正文 {post_id}</p>"},
+    }
+
+
+@pytest.fixture
+def fix_module(tmp_path, monkeypatch):
+    # 脚本导入时会在当前目录创建日志文件
+    monkeypatch.chdir(tmp_path)
+    from scripts.tools.wordpress_migration import fix_existing_posts
+    return fix_existing_posts
+
+
+@pytest.fixture
+def thread_pool(fix_module, monkeypatch):
+    """用线程池代替进程池，使测试可以替换转换函数"""
+    monkeypatch.setattr(fix_module, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+
+@pytest.fixture
+def make_fixer(fix_module):
+    def factory(pages, failing_updates=()):
+        fixer = fix_module.GutenbergFixer(fix_module.FixConfig(
+            wp_url="https://example.com", wp_user="user", wp_app_password="password",
+            fix_all=True, convert_workers=1, http_workers=2, per_page=2
+        ))
+        fixer.iter_post_pages = MagicMock(return_value=iter(pages))
+        fixer.update_post = MagicMock(side_effect=lambda post_id, content: post_id not in failing_updates)
+        return fixer
+    return factory
+
+
+class TestFixAllPosts:
+    """测试GutenbergFixer.fix_all_posts"""
+
+    def test_stats_totals(self, make_fixer):
+        """测试需要转换的文章经进程池转换后全部更新，已是Gutenberg格式的文章不计入"""
+        pages = [
+            [make_post(1), make_post(2, "<!-- wp:paragraph -->\n<p>已转换</p>\n<!-- /wp:paragraph -->")],
+            [make_post(3), make_post(4, "")],
+            [make_post(5)],
+        ]
+        fixer = make_fixer(pages)
+
+        fixer.fix_all_posts()
+
+        assert fixer.stats["total"] == 3
+        assert fixer.stats["updated"] == 3
+        assert fixer.stats["failed"] == 0
+        updated = {call.args[0]: call.args[1] for call in fixer.update_post.call_args_list}
+        assert sorted(updated) == [1, 3, 5]
+        assert updated[3].startswith("<!-- wp:paragraph -->")
+
+    def test_duplicate_ids_across_pages_skipped(self, make_fixer, thread_pool):
+        """测试分页偏移导致重复出现的文章只处理一次"""
+        fixer = make_fixer([[make_post(1), make_post(2)], [make_post(2), make_post(3)]])
+
+        fixer.fix_all_posts()
+
+        assert fixer.stats["total"] == 3
+        assert sorted(call.args[0] for call in fixer.update_post.call_args_list) == [1, 2, 3]
+
+    def test_conversion_errors_counted_as_failed(self, fix_module, make_fixer, thread_pool, monkeypatch):
+        """测试转换出错和转换进程崩溃的文章计为失败，其余文章照常更新"""
+        convert = fix_module._convert_post_content
+
+        def flaky_convert(post_id, content, options):
+            if post_id == 2:
+                raise BrokenProcessPool("worker died")
+            if post_id == 3:
+                return post_id, None, None, "ValueError: bad html"
+            return convert(post_id, content, options)
+
+        monkeypatch.setattr(fix_module, "_convert_post_content", flaky_convert)
+        fixer = make_fixer([[make_post(1), make_post(2)], [make_post(3), make_post(4)]])
+
+        fixer.fix_all_posts()
+
+        assert fixer.stats["total"] == 4
+        assert fixer.stats["failed"] == 2
+        assert fixer.stats["updated"] == 2
+        assert sorted(call.args[0] for call in fixer.update_post.call_args_list) == [1, 4]
+
+    def test_failed_updates_counted(self, make_fixer, thread_pool):
+        """测试REST更新失败的文章计为失败"""
+        fixer = make_fixer([[make_post(1), make_post(2)], [make_post(3)]], failing_updates={2, 3})
+
+        fixer.fix_all_posts()
+
+        assert fixer.stats["total"] == 3
+        assert fixer.stats["updated"] == 1
+        assert fixer.stats["failed"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+测试GitHub Release下载统计的条件请求增量同步
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.utils.github_release_manager import GitHubReleaseManager
+
+PAGE_1 = "https://api.github.com/repos/u/r/releases?per_page=100&page=1"
+PAGE_2 = "https://api.github.com/repos/u/r/releases?per_page=100&page=2"
+
+
+class FakeReleasesApi:
+    """按页返回Release列表，ETag与内容对应，未变化时返回304"""
+
+    def __init__(self):
+        self.downloads = {"a": 1, "b": 2, "c": 3}
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        tags = ["a", "b"] if url == PAGE_1 else ["c"]
+        body = [{"tag_name": tag, "assets": [{"download_count": self.downloads[tag]}]} for tag in tags]
+        etag = json.dumps(body)
+        response = MagicMock()
+        self.requests.append((url, bool(headers)))
+        if headers and headers.get("If-None-Match") == etag:
+            response.status_code = 304
+            return response
+        response.status_code = 200
+        response.json.return_value = body
+        response.headers = {"ETag": etag}
+        response.links = {"next": {"url": PAGE_2}} if url == PAGE_1 else {}
+        return response
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with patch.object(GitHubReleaseManager, "_check_token_status"):
+        manager = GitHubReleaseManager("token", "u", "r")
+    data = manager._load_release_data()
+    for tag in ["a", "b", "c"]:
+        data["releases"][tag] = {"tag_name": tag, "download_count": 0}
+        data["articles"][f"文章{tag}"] = {"tag_name": tag, "download_count": 0}
+    manager._save_release_data(data)
+    manager.session.get = FakeReleasesApi().get
+    return manager
+
+
+class TestDownloadStatsSync:
+    """测试下载统计同步"""
+
+    def test_paginates_all_releases(self, manager):
+        """测试跟随Link头获取所有页面"""
+        assert manager.update_download_stats() == {"changed": 3, "total_downloads": 6}
+        assert manager.get_stats()["total_downloads"] == 6
+
+    def test_unchanged_pages_use_etag(self, manager):
+        """测试未变化的页面发送If-None-Match且不写回数据文件"""
+        api = manager.session.get.__self__
+        manager.update_download_stats()
+        mtime = manager.data_file.stat().st_mtime_ns
+
+        assert manager.update_download_stats() == {"changed": 0, "total_downloads": 6}
+        assert api.requests[-2:] == [(PAGE_1, True), (PAGE_2, True)]
+        assert manager.data_file.stat().st_mtime_ns == mtime
+
+    def test_only_changed_release_recorded(self, manager):
+        """测试只有变化的Release追加到下载量时间序列"""
+        api = manager.session.get.__self__
+        manager.update_download_stats()
+        api.downloads["c"] = 7
+
+        assert manager.update_download_stats() == {"changed": 1, "total_downloads": 10}
+        assert [p["download_count"] for p in manager.get_download_history("c")] == [3, 7]
+        assert len(manager.get_download_history("a")) == 1
+        assert manager.get_release_by_article("文章c")["download_count"] == 7
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+测试Gridea迁移的已有文章预取：分页并发获取、本地缓存、增量刷新和重复检测
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.tools.wordpress_migration.batch_migrate_gridea import EnhancedGrideaMigrator
+
+WP_URL = "https://example.com"
+
+
+def make_post(post_id, slug=None, title=None, modified="2024-01-01T00:00:00"):
+    return {
+        "id": post_id,
+        "slug": slug or f"post-{post_id}",
+        "title": {"rendered": title or f"文章 {post_id}"},
+        "modified": modified,
+    }
+
+
+def make_response(status_code=200, posts=None, total_pages=1, etag=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = posts or []
+    response.text = ""
+    response.headers = {"X-WP-TotalPages": str(total_pages)}
+    if etag:
+        response.headers["ETag"] = etag
+    return response
+
+
+class FakeSession:
+    """按页码返回预设响应的会话，记录每次请求的参数和请求头"""
+
+    def __init__(self, pages, total_pages=None, etag=None, statuses=None):
+        self.pages = pages
+        self.total_pages = total_pages or len(pages)
+        self.etag = etag
+        self.statuses = statuses or {}
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        params = params or {}
+        headers = headers or {}
+        self.calls.append((dict(params), dict(headers)))
+        page = params.get("page", 1)
+        if self.etag and headers.get("If-None-Match") == self.etag:
+            return make_response(304)
+        status = self.statuses.get(page, 200)
+        return make_response(status, self.pages[page - 1] if status == 200 else None,
+                             self.total_pages, self.etag if page == 1 else None)
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return tmp_path / "existing_posts.json"
+
+
+@pytest.fixture
+def make_migrator(tmp_path, cache_file):
+    def factory(session, journal_file=None, **kwargs):
+        migrator = EnhancedGrideaMigrator(
+            WP_URL, "user", "password",
+            journal_file=journal_file, posts_cache_file=str(cache_file), fetch_workers=3, **kwargs
+        )
+        migrator.session = session
+        return migrator
+    return factory
+
+
+def write_cache(cache_file, posts, etag=None, max_modified=None):
+    cache_file.write_text(json.dumps({
+        "wp_url": WP_URL,
+        "etag": etag,
+        "max_modified": max_modified,
+        "posts": posts,
+    }), encoding="utf-8")
+
+
+class TestExistingPostsPrefetch:
+    """测试EnhancedGrideaMigrator.load_existing_posts"""
+
+    def test_all_pages_fetched_concurrently(self, make_migrator, cache_file):
+        """测试按X-WP-TotalPages获取全部分页并写入本地缓存"""
+        pages = [[make_post(i) for i in range(start, start + 2)] for start in (1, 3, 5, 7)]
+        session = FakeSession(pages, etag='"v1"')
+        migrator = make_migrator(session)
+
+        migrator.load_existing_posts()
+
+        assert sorted(call[0]["page"] for call in session.calls) == [1, 2, 3, 4]
+        assert len(migrator.existing_posts) == 8
+        cache = json.loads(cache_file.read_text(encoding="utf-8"))
+        assert cache["etag"] == '"v1"'
+        assert len(cache["posts"]) == 8
+
+    def test_failed_page_raises_instead_of_partial_index(self, make_migrator, cache_file):
+        """测试任一分页失败时抛出异常，不写入不完整的缓存"""
+        pages = [[make_post(1)], [make_post(2)], [make_post(3)]]
+        migrator = make_migrator(FakeSession(pages, statuses={3: 500}))
+
+        with pytest.raises(RuntimeError, match="page 3"):
+            migrator.load_existing_posts()
+
+        assert not migrator._existing_loaded
+        assert not cache_file.exists()
+
+    def test_not_modified_reuses_cached_index(self, make_migrator, cache_file):
+        """测试服务器返回304时直接使用缓存的索引"""
+        write_cache(cache_file, {"cached-post": {"id": 9, "title": "缓存文章", "modified": ""}}, etag='"v1"')
+        session = FakeSession([[make_post(1)]], etag='"v1"')
+        migrator = make_migrator(session)
+
+        migrator.load_existing_posts()
+
+        assert len(session.calls) == 1
+        assert session.calls[0][1] == {"If-None-Match": '"v1"'}
+        assert migrator.find_existing_post("cached-post", "") == 9
+        assert "post-1" not in migrator.existing_posts
+
+    def test_modified_after_refresh_merges_changes(self, make_migrator, cache_file):
+        """测试有缓存时只获取更新过的文章，不携带整表的ETag"""
+        write_cache(cache_file, {
+            "post-1": {"id": 1, "title": "旧标题", "modified": "2024-01-01T00:00:00"},
+            "post-2": {"id": 2, "title": "文章 2", "modified": "2024-01-02T00:00:00"},
+        }, etag='"v1"', max_modified="2024-01-02T00:00:00")
+        session = FakeSession([[make_post(1, title="新标题", modified="2024-02-01T00:00:00"), make_post(3)]])
+        migrator = make_migrator(session)
+
+        migrator.load_existing_posts()
+
+        params, headers = session.calls[0]
+        assert params["modified_after"] == "2024-01-02T00:00:00"
+        assert headers == {}
+        assert migrator.existing_posts["post-1"]["title"] == "新标题"
+        assert set(migrator.existing_posts) == {"post-1", "post-2", "post-3"}
+        cache = json.loads(cache_file.read_text(encoding="utf-8"))
+        assert cache["etag"] is None
+        assert cache["max_modified"] == "2024-02-01T00:00:00"
+
+    def test_duplicates_found_by_slug_or_title(self, make_migrator):
+        """测试按slug或（HTML转义、空白归一后的）标题识别重复文章"""
+        session = FakeSession([[make_post(5, slug="vps-guide", title="VPS &amp; 域名  入门")]])
+        migrator = make_migrator(session, dry_run=True)
+
+        migrator.load_existing_posts()
+
+        assert migrator.find_existing_post("vps-guide", "其他标题") == 5
+        assert migrator.find_existing_post("other-slug", "vps & 域名 入门") == 5
+        assert migrator.find_existing_post("other-slug", "全新文章") is None
+        assert migrator.find_existing_post("other-slug", "") is None
+
+
+
+@pytest.fixture
+def source_dir(tmp_path, monkeypatch):
+    # 迁移汇总写入当前目录
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "post"
+    for folder in ("old-post", "new-post"):
+        (source / folder).mkdir(parents=True)
+        (source / folder / "index.html").write_text(f"<h1>{folder}</h1>", encoding="utf-8")
+    return source
+
+
+def extract_post(html_path):
+    folder = html_path.parent.name
+    return {"folder": folder, "title": "旧文章" if folder == "old-post" else "新文章"}
+
+
+class TestMigrateAll:
+    """测试EnhancedGrideaMigrator.migrate_all的日志记录和中止"""
+
+    def test_existing_post_journaled_and_skipped_next_run(self, make_migrator, source_dir, tmp_path):
+        """测试已存在的文章以其ID记为已迁移，下次运行不再请求文章列表"""
+        journal_file = str(tmp_path / "journal.jsonl")
+        migrator = make_migrator(FakeSession([[make_post(5, title="旧文章")]]), journal_file=journal_file)
+        migrator.extract_post = MagicMock(side_effect=extract_post)
+
+        migrator.migrate_all(str(source_dir), exclude=["new-post"])
+
+        assert migrator.results[0].success and migrator.results[0].skipped
+        assert migrator.results[0].wp_id == 5
+        entry = migrator.journal.get("old-post")
+        assert entry["status"] == "migrated" and entry["wp_id"] == 5
+
+        session = FakeSession([[]], statuses={1: 500})
+        rerun = make_migrator(session, journal_file=journal_file)
+        rerun.migrate_all(str(source_dir), exclude=["new-post"])
+
+        assert session.calls == []
+        assert rerun.results[0].skipped and rerun.results[0].wp_id == 5
+
+    def test_listing_failure_aborts_cleanly(self, make_migrator, source_dir, caplog):
+        """测试文章列表获取失败时记录错误并结束运行，不抛出异常"""
+        migrator = make_migrator(FakeSession([[]], statuses={1: 500}))
+        migrator.extract_post = MagicMock(side_effect=extract_post)
+        migrator.migrate_post = MagicMock()
+
+        migrator.migrate_all(str(source_dir))
+
+        assert "Cannot verify existing posts, aborting" in caplog.text
+        migrator.migrate_post.assert_not_called()
+        assert migrator.results == []
+        assert (source_dir.parent / "batch_migration_results.json").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
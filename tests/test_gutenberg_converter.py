@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+测试Gutenberg转换器的lxml后端与html.parser后端输出一致
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import frontmatter
+import markdown
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.tools.wordpress_migration import gutenberg_converter
+from scripts.tools.wordpress_migration.gutenberg_converter import ConversionOptions, GutenbergConverter
+
+# 覆盖转换器各分支的HTML片段（html.parser后端的输出即为黄金结果）
+GOLDEN_CASES = [
+    'Orphan text <b>bold</b> tail<p>para</p> after',
+    '<p>a &lt; b &amp; c &nbsp;d <!-- note --> <em>x &amp; y</em></p>',
+    '<p>Intro<!--more-->Rest</p>',
+    '<!--more--><p>x</p>',
+    '<h2 id="t">Title <code>x</code></h2>\n<h3>Sub</h3>',
+    '<pre><code class="language-python">def f():\n    return a < b &amp;&amp; c\n</code></pre>',
+    '<pre class="language-js"><code>x</code></pre><pre>plain <b>text</b></pre>',
+    '<pre><code class="bash">ls</code></pre>',
+    '<div class="codehilite"><pre><span class="k">def</span> f(): pass\n</pre></div>',
+    '<div class="video-container" style="x"><iframe src="https://y" allowfullscreen></iframe></div>',
+    '<div style="font-family: monospace">art</div>',
+    '<div><p>in div</p>loose text<h2>H</h2><!-- c --><div><p>nested</p></div></div>',
+    '<ul>\n<li>a</li>\n<li>b<ul><li>c</li></ul></li>\n</ul><ol><li>1</li></ol>',
+    '<table style="width:100%"><thead><tr><th style="x">H</th></tr></thead>'
+    '<tbody><tr><td style="y">C</td></tr></tbody></table>',
+    '<img src="a.png" alt=\'say "hi"\' class=" a  b " style="s" style="t">',
+    '<figure><img src="x.png"><figcaption>cap</figcaption></figure><figure><blockquote>q</blockquote></figure>',
+    '<blockquote>\n<p>quoted <a href="?a=1&amp;b=2" title="it\'s &quot;q&quot;">link</a></p>\n</blockquote>',
+    '<hr><hr/>',
+    '<script>if (a<b) { x(); }</script><style>p > a { color: red; }</style>',
+    '<script type="text/x-mathjax-config">MathJax.Hub.Config({});</script><p>$x$</p>',
+    '<p><audio controls><source src="a.mp3" type="audio/mpeg">Fallback &amp; text</audio></p>',
+    '<p>line<br>break<wbr>x</p><p>   </p>',
+    '<p><strong>A:</strong> \n<strong>B</strong>\n   <code>c</code></p>',
+    '<p>中文内容，<a href="https://例子.测试/路径?q=1">链接</a>。</p>',
+    # libxml2会修复的错误嵌套，交给html.parser处理
+    '<p><pre>x</pre></p>',
+    # 手写HTML中libxml2与html.parser解析不同的写法，交给html.parser处理
+    '<p>a<p>b',
+    '<ul><li>a<li>b</ul>',
+    '<dl><dt>a<dd>b</dl><table><tr><td>a<td>b</table>',
+    '<p><input type="checkbox" checked> done</p><form><input disabled/></form>',
+    '<select><option selected>a</option></select>',
+    '<select><option>a<option>b</select>',
+    '<p>&unknown; &notit; &amp;</p>',
+    '<textarea><b>x</b> &amp; y < z</textarea>',
+]
+
+
+def convert(html: str, backend: str):
+    return GutenbergConverter(ConversionOptions(backend=backend)).convert(html)
+
+
+def render_post(post_path: Path) -> str:
+    """按jekyll_to_wp的方式将文章渲染为HTML（Markdown扩展和图片样式）"""
+    html = markdown.markdown(frontmatter.load(post_path).content,
+                             extensions=['tables', 'fenced_code', 'toc'])
+    return re.sub(r'<img\s+([^>]*?)(/?)>', r'<img \1 style="max-width: 100%; height: auto;" \2>', html)
+
+
+class TestLxmlBackend:
+    """测试lxml后端与html.parser后端的一致性"""
+
+    @pytest.fixture(autouse=True)
+    def require_lxml(self):
+        pytest.importorskip("lxml")
+
+    @pytest.mark.parametrize("html", GOLDEN_CASES)
+    def test_golden_cases_match(self, html):
+        """测试黄金片段在两个后端的输出和统计一致"""
+        assert convert(html, 'lxml') == convert(html, 'html.parser')
+
+    @pytest.mark.parametrize("post_path", sorted((project_root / "_posts").glob("*.md")), ids=lambda p: p.stem)
+    def test_posts_corpus_matches(self, post_path):
+        """测试_posts语料在两个后端的输出一致"""
+        html = render_post(post_path)
+        assert convert(html, 'lxml') == convert(html, 'html.parser')
+
+
+    @pytest.mark.parametrize("html", [
+        '<p>a<p>b', '<td nowrap>x</td>', '<textarea>x</textarea>', '<p>&unknown;</p>', '<b><i>x</b></i>',
+    ])
+    def test_divergent_markup_left_to_html_parser(self, html):
+        """测试libxml2解析不同或报错的文档不由lxml后端输出"""
+        converter = GutenbergConverter(ConversionOptions(backend='lxml'))
+        assert gutenberg_converter._LxmlBlockEmitter(converter).emit(html) is None
+
+    def test_well_formed_markup_uses_lxml(self):
+        """测试规范的文档仍由lxml后端输出"""
+        converter = GutenbergConverter(ConversionOptions(backend='lxml'))
+        html = '<p>a &amp; b &nbsp;</p><ul><li>x</li></ul><input disabled="disabled">'
+        assert gutenberg_converter._LxmlBlockEmitter(converter).emit(html) is not None
+
+
+class TestBackendSelection:
+    """测试后端选择"""
+
+    def test_unknown_backend_rejected(self):
+        """测试未知后端抛出异常"""
+        with pytest.raises(ValueError):
+            GutenbergConverter(ConversionOptions(backend='html5lib'))
+
+    def test_missing_lxml_falls_back(self, monkeypatch):
+        """测试未安装lxml时回退到html.parser"""
+        monkeypatch.setattr(gutenberg_converter, "LXML_AVAILABLE", False)
+        converter = GutenbergConverter(ConversionOptions(backend='lxml'))
+
+        assert converter.backend == 'html.parser'
+        result, stats = converter.convert('<h2>T</h2><p>x</p>')
+        assert stats.headings == 1 and stats.paragraphs == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+测试Jekyll到WordPress的并发迁移：分类/标签预取、共享缓存和结果汇总
+"""
+
+import threading
+import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def make_response(status_code=200, data=None, total_pages=1):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data if data is not None else []
+    response.headers = {"X-WP-TotalPages": str(total_pages)}
+    return response
+
+
+class FakeSession:
+    """模拟WordPress REST接口：分页返回已有分类/标签，创建请求分配新ID"""
+
+    def __init__(self, categories=(), tags=(), per_page=2, delay=0.0):
+        self.terms = {"categories": list(categories), "tags": list(tags)}
+        self.per_page = per_page
+        self.delay = delay
+        self.gets = []
+        self.posts = []
+        self._lock = threading.Lock()
+        self._next_id = 1000
+
+    def get(self, url, params=None, timeout=None):
+        taxonomy = url.rsplit("/", 1)[-1]
+        params = params or {}
+        with self._lock:
+            self.gets.append((taxonomy, dict(params)))
+        terms = self.terms[taxonomy]
+        if "page" in params:
+            page = params["page"]
+            total_pages = max(1, -(-len(terms) // self.per_page))
+            chunk = terms[(page - 1) * self.per_page:page * self.per_page]
+            return make_response(data=chunk, total_pages=total_pages)
+        if "slug" in params:
+            found = [t for t in terms if t["slug"] == params["slug"]]
+        else:
+            found = [t for t in terms if params["search"].lower() in t["name"].lower()]
+        # 查询结果返回前留出竞争窗口，模拟网络延迟
+        time.sleep(self.delay)
+        return make_response(data=found)
+
+    def post(self, url, json=None, timeout=None):
+        taxonomy = url.rsplit("/", 1)[-1]
+        with self._lock:
+            self.posts.append((taxonomy, dict(json or {})))
+            self._next_id += 1
+            term = {"id": self._next_id, "name": json["name"], "slug": json.get("slug", json["name"].lower())}
+            self.terms[taxonomy].append(term)
+        return make_response(201, term)
+
+
+@pytest.fixture
+def make_migrator(tmp_path, monkeypatch):
+    # 迁移脚本导入时会在当前目录创建migration.log，汇总结果也写入当前目录
+    monkeypatch.chdir(tmp_path)
+    from scripts.tools.wordpress_migration.jekyll_to_wp import JekyllToWordPress, MigrationConfig
+
+    def factory(session=None, workers=4):
+        migrator = JekyllToWordPress(MigrationConfig(wp_url="https://example.com", workers=workers,
+                                                     journal_file=None))
+        if session is not None:
+            migrator.session = session
+        return migrator
+    return factory
+
+
+class TestTermCache:
+    """测试分类和标签的预取与共享缓存"""
+
+    def test_prefetch_follows_total_pages(self, make_migrator):
+        """测试按X-WP-TotalPages获取全部分类和标签，只预取一次"""
+        session = FakeSession(
+            categories=[{"id": i, "name": f"分类{i}", "slug": f"cat-{i}"} for i in range(1, 6)],
+            tags=[{"id": 10 + i, "name": f"Tag{i}", "slug": f"tag-{i}"} for i in range(1, 4)],
+        )
+        migrator = make_migrator(session)
+
+        migrator.prefetch_terms()
+        migrator.prefetch_terms()
+
+        assert [params["page"] for taxonomy, params in session.gets if taxonomy == "categories"] == [1, 2, 3]
+        assert [params["page"] for taxonomy, params in session.gets if taxonomy == "tags"] == [1, 2]
+        assert len(migrator._category_by_slug) == 5
+        assert migrator._tag_by_name["tag3"] == 13
+
+    def test_cache_hit_makes_no_rest_call(self, make_migrator):
+        """测试预取命中的分类和标签（标签不区分大小写）不再调用REST接口"""
+        session = FakeSession(
+            categories=[{"id": 3, "name": "投资理财", "slug": "investment-finance"}],
+            tags=[{"id": 7, "name": "Python", "slug": "python"}],
+        )
+        migrator = make_migrator(session)
+        migrator.prefetch_terms()
+        requests_after_prefetch = len(session.gets)
+
+        assert migrator.get_or_create_category("投资理财") == 3
+        assert migrator.get_or_create_tag("python") == 7
+        assert migrator.get_or_create_tag("python") == 7
+
+        assert len(session.gets) == requests_after_prefetch
+        assert session.posts == []
+
+    def test_concurrent_workers_create_term_once(self, make_migrator):
+        """测试多个线程同时遇到缺失的分类/标签时只创建一次"""
+        session = FakeSession(delay=0.01)
+        migrator = make_migrator(session)
+        start = threading.Barrier(8)
+
+        def lookup(_):
+            start.wait()
+            return migrator.get_or_create_category("新分类"), migrator.get_or_create_tag("新标签")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lookup, range(8)))
+
+        assert len(set(results)) == 1
+        assert sorted(taxonomy for taxonomy, _ in session.posts) == ["categories", "tags"]
+
+
+class TestMigrateAll:
+    """测试并发迁移的结果汇总"""
+
+    def test_results_and_stats_aggregated(self, make_migrator, tmp_path):
+        """测试成功、失败、解析失败和意外异常的文章分别计入统计"""
+        posts_dir = tmp_path / "_posts"
+        posts_dir.mkdir()
+        for name in ("ok-1", "ok-2", "ok-3", "rejected", "crash"):
+            (posts_dir / f"2024-01-01-{name}.md").write_text(
+                f"---\ntitle: {name}\ndate: 2024-01-01\n---\n正文\n", encoding="utf-8")
+        (posts_dir / "2024-01-01-broken.md").write_text("---\ntitle: [未闭合\n---\n正文\n", encoding="utf-8")
+
+        def create_wp_post(post, existing_wp_id=None, media_ids=None):
+            if post.title == "crash":
+                raise RuntimeError("连接中断")
+            if post.title == "rejected":
+                return {"success": False, "error": "HTTP 500", "jekyll_file": str(post.file_path)}
+            return {"success": True, "wp_id": len(post.title), "jekyll_file": str(post.file_path)}
+
+        migrator = make_migrator()
+        migrator.prefetch_terms = MagicMock()
+        migrator.create_wp_post = MagicMock(side_effect=create_wp_post)
+
+        migrator.migrate_all(str(posts_dir))
+
+        assert migrator.stats == {"total": 6, "success": 3, "failed": 3, "skipped": 0}
+        assert migrator.create_wp_post.call_count == 5
+        assert len(migrator.results) == 5
+        errors = sorted(result["error"] for result in migrator.results if not result["success"])
+        assert errors == ["HTTP 500", "连接中断"]
+        assert (tmp_path / "migration_results.json").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+测试WordPress迁移的断点日志：记录、压缩和断点续传
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.tools.wordpress_migration.migration_journal import MigrationJournal
+
+POST = """---
+title: 测试文章
+date: 2024-01-05
+---
+正文内容
+"""
+
+
+@pytest.fixture
+def journal_file(tmp_path):
+    return tmp_path / "journal.jsonl"
+
+
+def journal_lines(journal_file):
+    return [json.loads(line) for line in journal_file.read_text(encoding="utf-8").splitlines()]
+
+
+class TestMigrationJournal:
+    """测试MigrationJournal"""
+
+    def test_record_flushed_and_replayed(self, journal_file):
+        """测试每条记录立即写入磁盘，新实例按最后一条恢复状态"""
+        journal = MigrationJournal(str(journal_file))
+        journal.record("a.md", "hash-1", "failed", error="timeout")
+        journal.record("a.md", "hash-1", "migrated", wp_id=12, media_ids={"img.png": 5})
+
+        assert len(journal_lines(journal_file)) == 2
+        resumed = MigrationJournal(str(journal_file))
+        assert resumed.get("a.md")["wp_id"] == 12
+        assert resumed.is_unchanged("a.md", "hash-1")
+        assert not resumed.is_unchanged("a.md", "hash-2")
+        assert resumed.get("b.md") is None
+
+    def test_failure_keeps_known_ids(self, journal_file):
+        """测试后续失败不丢失已知的文章和媒体ID"""
+        journal = MigrationJournal(str(journal_file))
+        journal.record("a.md", "hash-1", "migrated", wp_id=12, media_ids={"img.png": 5})
+        journal.record("a.md", "hash-2", "failed", error="x" * 500)
+
+        entry = MigrationJournal(str(journal_file)).get("a.md")
+        assert (entry["status"], entry["wp_id"], entry["media_ids"]) == ("failed", 12, {"img.png": 5})
+        assert len(entry["error"]) == 200
+        assert not MigrationJournal(str(journal_file)).is_unchanged("a.md", "hash-2")
+
+    def test_torn_last_line_ignored(self, journal_file):
+        """测试中断时写了一半的最后一行被忽略"""
+        MigrationJournal(str(journal_file)).record("a.md", "hash-1", "migrated", wp_id=1)
+        with open(journal_file, "a", encoding="utf-8") as f:
+            f.write('{"source": "b.md", "content_ha')
+
+        resumed = MigrationJournal(str(journal_file))
+        assert list(resumed.entries) == ["a.md"]
+
+    def test_compact_keeps_latest_entry(self, journal_file):
+        """测试压缩后每个来源只保留最后一条记录"""
+        journal = MigrationJournal(str(journal_file))
+        journal.record("a.md", "hash-1", "failed", error="timeout")
+        journal.record("b.md", "hash-2", "migrated", wp_id=2)
+        journal.record("a.md", "hash-1", "migrated", wp_id=1)
+
+        journal.compact()
+
+        lines = journal_lines(journal_file)
+        assert [(line["source"], line["status"]) for line in lines] == [("a.md", "migrated"), ("b.md", "migrated")]
+        assert MigrationJournal(str(journal_file)).entries == journal.entries
+        assert not list(journal_file.parent.glob(".*.tmp"))
+
+    def test_hash_file(self, tmp_path):
+        path = tmp_path / "post.md"
+        path.write_text(POST, encoding="utf-8")
+        before = MigrationJournal.hash_file(path)
+        path.write_text(POST + "更新", encoding="utf-8")
+
+        assert MigrationJournal.hash_file(path) != before
+
+
+class TestJekyllResume:
+    """测试Jekyll迁移按断点日志跳过或更新文章"""
+
+    @pytest.fixture
+    def migrator(self, tmp_path, monkeypatch, journal_file):
+        # 迁移脚本导入时会在当前目录创建migration.log
+        monkeypatch.chdir(tmp_path)
+        from scripts.tools.wordpress_migration.jekyll_to_wp import JekyllToWordPress, MigrationConfig
+
+        migrator = JekyllToWordPress(MigrationConfig(journal_file=str(journal_file)))
+        migrator.prefetch_terms = MagicMock()
+        migrator.create_wp_post = MagicMock(return_value={"success": True, "wp_id": 42, "media_ids": {}})
+        return migrator
+
+    @pytest.fixture
+    def post_path(self, tmp_path):
+        posts = tmp_path / "_posts"
+        posts.mkdir()
+        path = posts / "2024-01-05-test.md"
+        path.write_text(POST, encoding="utf-8")
+        return path
+
+    def test_relative_and_absolute_paths_share_entry(self, migrator, post_path, journal_file):
+        """测试相对路径和绝对路径使用同一条日志记录"""
+        migrator.migrate_post(Path("_posts") / post_path.name)
+
+        result = migrator.migrate_post(post_path)
+
+        assert result["skipped"] and result["wp_id"] == 42
+        assert migrator.create_wp_post.call_count == 1
+        assert list(MigrationJournal(str(journal_file)).entries) == [str(post_path.resolve())]
+
+    def test_changed_post_updates_journaled_id(self, migrator, post_path):
+        """测试内容变化的文章更新日志中记录的WordPress文章"""
+        migrator.journal.record(str(post_path.resolve()), "old-hash", "migrated", wp_id=7, media_ids={"a.png": 3})
+
+        migrator.migrate_post(post_path)
+
+        assert migrator.create_wp_post.call_args.kwargs == {"existing_wp_id": 7, "media_ids": {"a.png": 3}}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+测试文章图片处理：并发上传OneDrive、批量写入索引、上传前按哈希去重和原子更新文章链接
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.tools.mixed_image_manager import MixedImageManager
+from scripts.tools.onedrive_blog_images import MarkdownImageProcessor
+from scripts.tools.onedrive_image_index import STORAGE_ENV_VAR, OneDriveImageIndex
+
+CONFIG = {
+    "onedrive": {
+        "base_folder": "blog",
+        "folder_structure": "{year}/{month:02d}",
+        "filename_format": "{date}_{article_title}_{index:02d}.{ext}",
+    },
+    "processing": {
+        "max_concurrent_uploads": 4,
+        "delete_local_after_upload": False,
+    },
+}
+
+
+class FakeUploader:
+    """模拟OneDrive上传：越靠前的图片完成得越晚，记录同时进行的上传数"""
+
+    def __init__(self, failing=(), delays=None):
+        self.failing = set(failing)
+        self.delays = delays or {}
+        self.uploaded = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def upload_file(self, local_path, remote_path):
+        name = Path(local_path).name
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delays.get(name, 0))
+            if name in self.failing:
+                raise RuntimeError(f"upload failed: {name}")
+            with self._lock:
+                self.uploaded.append(name)
+            return {"id": f"id-{name}"}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def get_direct_image_url(self, item_id):
+        return f"https://onedrive.example/{item_id}"
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.delenv(STORAGE_ENV_VAR, raising=False)
+    return OneDriveImageIndex(str(tmp_path / "_data" / "index.json"), storage="json")
+
+
+@pytest.fixture
+def make_processor(tmp_path, monkeypatch, index):
+    # 文章和图片都放在临时项目目录内，上传后不做外部文件备份
+    monkeypatch.chdir(tmp_path)
+
+    def factory(uploader):
+        processor = MarkdownImageProcessor(uploader, CONFIG)
+        processor.index = index
+        return processor
+    return factory
+
+
+@pytest.fixture
+def article(tmp_path):
+    drafts = tmp_path / "_drafts"
+    drafts.mkdir()
+    for i in range(1, 5):
+        (drafts / f"img{i}.png").write_bytes(f"image {i}".encode() * 20)
+    path = drafts / "2024-05-01-test.md"
+    path.write_text(
+        "---\ntitle: 测试文章\n---\n"
+        + "".join(f"段落{i}\n![图{i}](./img{i}.png)\n" for i in range(1, 5)),
+        encoding="utf-8",
+    )
+    return path
+
+
+class TestProcessArticle:
+    """测试MarkdownImageProcessor.process_article"""
+
+    def test_parallel_uploads_keep_article_order(self, make_processor, article, index):
+        """测试并发上传后链接和索引按文章顺序记录，单张失败不影响其他图片"""
+        uploader = FakeUploader(failing={"img3.png"},
+                                delays={"img1.png": 0.15, "img2.png": 0.1, "img3.png": 0.05})
+        processor = make_processor(uploader)
+
+        result = processor.process_article(str(article))
+
+        assert result["success"]
+        assert result["images_found"] == 4
+        assert result["images_processed"] == 3
+        assert uploader.peak > 1
+        assert list(result["replacements"]) == ["![图1](./img1.png)", "![图2](./img2.png)", "![图4](./img4.png)"]
+
+        content = article.read_text(encoding="utf-8")
+        assert "![图1](https://onedrive.example/id-img1.png)" in content
+        assert "![图3](./img3.png)" in content
+        assert content.index("id-img1.png") < content.index("id-img2.png") < content.index("id-img4.png")
+        assert not list(article.parent.glob(".*.tmp"))
+
+        records = sorted(index.find_by_article(str(article)), key=lambda record: record.image_index)
+        assert [(record.image_index, record.filename) for record in records] == [
+            (1, "img1.png"), (2, "img2.png"), (4, "img4.png")]
+        assert records[2].onedrive_file_id == "id-img4.png"
+        assert records[2].onedrive_path.endswith("_04.png")
+        # 批量结束时一次写入磁盘
+        reloaded = OneDriveImageIndex(str(index.index_file), storage="json")
+        assert len(reloaded.find_by_article(str(article))) == 3
+
+
+def index_existing_upload(index, image_path, name):
+    """把内容相同的图片记录为此前已上传过"""
+    index.add_record(str(image_path), f"blog/2024/01/{name}", f"https://share/{name}",
+                     f"https://onedrive.example/reused-{name}", "_posts/2024-01-01-old.md",
+                     "旧文章", f"id-{name}", image_index=1)
+
+
+class TestPreUploadDedup:
+    """测试上传前按文件哈希复用已上传的图片"""
+
+    def test_indexed_images_not_uploaded_again(self, make_processor, article, index, tmp_path):
+        """测试索引中已有相同内容的图片不再上传，文章直接替换为已有链接"""
+        with index.batch():
+            for i in range(1, 5):
+                old_copy = tmp_path / f"old{i}.png"
+                old_copy.write_bytes((article.parent / f"img{i}.png").read_bytes())
+                index_existing_upload(index, old_copy, f"old{i}.png")
+        uploader = MagicMock()
+        processor = make_processor(uploader)
+
+        result = processor.process_article(str(article))
+
+        assert result["images_processed"] == 4
+        uploader.upload_file.assert_not_called()
+        uploader.get_direct_image_url.assert_not_called()
+        content = article.read_text(encoding="utf-8")
+        assert "![图2](https://onedrive.example/reused-old2.png)" in content
+        assert "./img" not in content
+        # 复用的图片不重复写入索引
+        assert index.find_by_article(str(article)) == []
+
+    def test_repeated_image_in_article_uploaded_once(self, make_processor, article):
+        """测试同一文章内内容相同的图片只上传一次"""
+        (article.parent / "img4.png").write_bytes((article.parent / "img1.png").read_bytes())
+        uploader = FakeUploader()
+        processor = make_processor(uploader)
+
+        result = processor.process_article(str(article))
+
+        assert result["images_processed"] == 4
+        assert sorted(uploader.uploaded) == ["img1.png", "img2.png", "img3.png"]
+        assert "![图4](https://onedrive.example/id-img1.png)" in article.read_text(encoding="utf-8")
+
+    def test_mixed_manager_reuses_indexed_image(self, make_processor, article, index, tmp_path):
+        """测试混合工作流上传缓存图片前按哈希查重，命中时不调用上传接口"""
+        cache_path = article.parent / "img1.png"
+        old_copy = tmp_path / "old.png"
+        old_copy.write_bytes(cache_path.read_bytes())
+        index_existing_upload(index, old_copy, "old.png")
+        uploader = MagicMock()
+        session_dir = tmp_path / "pending" / "session-1"
+        session_dir.mkdir(parents=True)
+        (session_dir / "session_metadata.json").write_text(json.dumps({
+            "cached_images": [{"cache_path": str(cache_path), "original_markdown": "![图1](./img1.png)"}],
+        }), encoding="utf-8")
+        manager = MixedImageManager.__new__(MixedImageManager)
+        manager.onedrive_manager = MagicMock(processor=make_processor(uploader))
+        manager.dir_manager = MagicMock(pending_dir=tmp_path / "pending")
+
+        result = manager._stage2_upload_to_cloud("session-1", str(article), dry_run=False)
+
+        assert result["images_processed"] == 1
+        assert result["replacements"] == {"![图1](./img1.png)": "![图1](https://onedrive.example/reused-old.png)"}
+        uploader.upload_file.assert_not_called()
+        uploader.get_direct_image_url.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+测试OneDrive图片索引的JSON/SQLite存储一致性、迁移和存储模式选择
+"""
+
+import sqlite3
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.tools import onedrive_image_index
+from scripts.tools.onedrive_image_index import STORAGE_ENV_VAR, OneDriveImageIndex
+
+ARTICLES = {
+    "_posts/2024-01-05-first.md": ["a.png", "b.png"],
+    "_posts/2024-03-10-second.md": ["c.png"],
+    "_posts/2024-06-20-third.md": ["d.png", "e.png"],
+}
+
+
+@pytest.fixture(autouse=True)
+def no_storage_env(monkeypatch):
+    monkeypatch.delenv(STORAGE_ENV_VAR, raising=False)
+
+
+@pytest.fixture
+def images(tmp_path):
+    """每个文章的本地图片（内容各不相同）"""
+    image_dir = tmp_path / "images"
+    image_dir.mkdir()
+    paths = {}
+    for article, names in ARTICLES.items():
+        for name in names:
+            path = image_dir / name
+            path.write_bytes(f"image {name}".encode() * 10)
+            paths[name] = path
+    return paths
+
+
+@pytest.fixture
+def json_index(tmp_path, images):
+    """已写入记录的JSON索引"""
+    index = OneDriveImageIndex(str(tmp_path / "index.json"), storage="json")
+    with index.batch():
+        for article, names in ARTICLES.items():
+            for i, name in enumerate(names, 1):
+                index.add_record(str(images[name]), f"blog/{name}", f"https://share/{name}",
+                                 f"https://embed/{name}", article, Path(article).stem, f"id-{name}",
+                                 image_index=i)
+    return index
+
+
+def db_rows(index):
+    return sqlite3.connect(index.db_file).execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+
+class TestStorageParity:
+    """测试JSON和SQLite存储的查询结果一致"""
+
+    def test_lookups_match(self, json_index, images, tmp_path):
+        """测试从JSON迁移后的SQLite索引返回相同的查询结果"""
+        sqlite_index = OneDriveImageIndex(str(tmp_path / "index.json"), storage="sqlite")
+
+        assert sqlite_index.records == json_index.records
+        for name, path in images.items():
+            assert sqlite_index.lookup_file(str(path)) == json_index.lookup_file(str(path))
+        for article in ARTICLES:
+            assert sqlite_index.find_by_article(article) == json_index.find_by_article(article)
+            assert (sqlite_index.export_urls_for_article(article)
+                    == json_index.export_urls_for_article(article))
+        assert ([asdict(r) for r in sqlite_index.find_by_date_range("2024-02-01", "2024-06-30")]
+                == [asdict(r) for r in json_index.find_by_date_range("2024-02-01", "2024-06-30")])
+        assert sqlite_index.get_statistics() == json_index.get_statistics()
+
+    def test_sqlite_writes_persist(self, tmp_path, images):
+        """测试SQLite模式新增的记录在重新打开后可查到"""
+        index = OneDriveImageIndex(str(tmp_path / "index.json"), storage="sqlite")
+        index.add_record(str(images["a.png"]), "blog/a.png", "https://share/a", "https://embed/a",
+                         "_posts/2024-01-05-first.md", "first", "id-a")
+
+        reopened = OneDriveImageIndex(str(tmp_path / "index.json"), storage="sqlite")
+        assert reopened.lookup_file(str(images["a.png"]))[1] == index.find_by_article("_posts/2024-01-05-first.md")[0]
+        assert not (tmp_path / "index.json").exists()
+
+
+class TestMigration:
+    """测试JSON到SQLite的迁移"""
+
+    def test_migrate_twice_no_duplicates(self, json_index, tmp_path):
+        """测试重复迁移不会产生重复记录"""
+        sqlite_index = OneDriveImageIndex(str(tmp_path / "index.json"), storage="sqlite")
+        total = len(json_index.records)
+        assert db_rows(sqlite_index) == total
+
+        assert sqlite_index.migrate_from_json() == total
+        assert db_rows(sqlite_index) == total
+        assert len(sqlite_index.find_by_article("_posts/2024-01-05-first.md")) == 2
+
+        reopened = OneDriveImageIndex(str(tmp_path / "index.json"), storage="sqlite")
+        assert len(reopened.records) == total
+
+    def test_migrate_requires_sqlite(self, json_index):
+        """测试JSON模式下调用迁移报错"""
+        with pytest.raises(ValueError):
+            json_index.migrate_from_json()
+
+    def test_cli_migrates_once(self, tmp_path, images, monkeypatch, capsys):
+        """测试 --migrate-sqlite 只迁移一次，不与构造时的自动导入重复"""
+        monkeypatch.chdir(tmp_path)
+        index = OneDriveImageIndex(storage="json")
+        index.add_record(str(images["a.png"]), "blog/a.png", "https://share/a", "https://embed/a",
+                         "_posts/2024-01-05-first.md", "first", "id-a")
+        capsys.readouterr()
+        monkeypatch.setattr(sys, "argv", ["onedrive_image_index.py", "--migrate-sqlite"])
+
+        onedrive_image_index.main()
+
+        assert capsys.readouterr().out.count("已迁移") == 1
+        assert db_rows(OneDriveImageIndex(storage="sqlite")) == 1
+
+
+class TestStorageSelection:
+    """测试存储模式选择"""
+
+    def test_default_is_json(self, tmp_path):
+        index = OneDriveImageIndex(str(tmp_path / "index.json"))
+
+        assert index.storage == "json"
+        assert not index.db_file.exists()
+
+    def test_env_var_selects_sqlite(self, tmp_path, monkeypatch):
+        """测试环境变量选择SQLite存储"""
+        monkeypatch.setenv(STORAGE_ENV_VAR, " SQLite ")
+        index = OneDriveImageIndex(str(tmp_path / "index.json"))
+
+        assert index.storage == "sqlite"
+        assert index.db_file.exists()
+
+    def test_explicit_storage_overrides_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(STORAGE_ENV_VAR, "sqlite")
+
+        assert OneDriveImageIndex(str(tmp_path / "index.json"), storage="json").storage == "json"
+
+    def test_unknown_storage_rejected(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(STORAGE_ENV_VAR, "redis")
+
+        with pytest.raises(ValueError):
+            OneDriveImageIndex(str(tmp_path / "index.json"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
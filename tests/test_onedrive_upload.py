@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+测试OneDrive大文件分块上传的会话持久化、断点续传和会话失效恢复
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.tools import onedrive_blog_images
+from scripts.tools.onedrive_blog_images import OneDriveAuthManager, OneDriveUploadManager, UploadSessionStore
+
+CHUNK = OneDriveUploadManager.CHUNK_ALIGNMENT
+FILE_SIZE = 3 * CHUNK
+
+
+def make_response(status_code, payload=None):
+    """构造Graph API响应"""
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload or {}
+    response.text = json.dumps(payload or {})
+    return response
+
+
+def accepted(next_offset):
+    """分块已接收，等待下一块"""
+    return make_response(202, {"nextExpectedRanges": [f"{next_offset}-"]})
+
+
+def content_ranges(session):
+    """每次PUT的Content-Range头"""
+    return [c.kwargs["headers"]["Content-Range"] for c in session.put.call_args_list]
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return tmp_path / "upload_sessions.json"
+
+
+@pytest.fixture
+def local_file(tmp_path):
+    path = tmp_path / "large.png"
+    path.write_bytes(b"x" * FILE_SIZE)
+    return path
+
+
+@pytest.fixture
+def manager(state_file):
+    config = {
+        "processing": {
+            "upload_session_state_file": str(state_file),
+            "upload_chunk_size_mb": CHUNK / (1024 * 1024),
+            "upload_max_retries": 2,
+            "upload_max_session_restarts": 1,
+        }
+    }
+    manager = OneDriveUploadManager(MagicMock(), config)
+    manager.session = MagicMock()
+    manager._create_upload_session = MagicMock(side_effect=[
+        {"uploadUrl": "https://upload/session-1", "expirationDateTime": "2030-01-01T00:00:00Z"},
+        {"uploadUrl": "https://upload/session-2", "expirationDateTime": "2030-01-01T00:00:00Z"},
+    ])
+    return manager
+
+
+def save_session(state_file, local_file, offset):
+    """保存一个与本地文件匹配的未完成会话"""
+    store = UploadSessionStore(str(state_file))
+    key = UploadSessionStore.make_key(str(local_file), "blog/large.png")
+    store.put(key, {
+        "upload_url": "https://upload/saved",
+        "remote_path": "blog/large.png",
+        "file_size": FILE_SIZE,
+        "file_mtime": local_file.stat().st_mtime,
+        "offset": offset,
+    })
+    return key
+
+
+class TestUploadSessionStore:
+    """测试上传会话状态的持久化"""
+
+    def test_put_and_remove_persisted(self, state_file, tmp_path):
+        """测试写入和删除的会话在新实例中可见"""
+        key = UploadSessionStore.make_key(str(tmp_path / "a.png"), "blog/a.png")
+        UploadSessionStore(str(state_file)).put(key, {"upload_url": "https://upload/a", "offset": 0})
+
+        reloaded = UploadSessionStore(str(state_file))
+        assert reloaded.get(key) == {"upload_url": "https://upload/a", "offset": 0}
+
+        reloaded.remove(key)
+        assert UploadSessionStore(str(state_file)).get(key) is None
+        assert not state_file.with_suffix(".tmp").exists()
+
+    def test_corrupt_state_file_ignored(self, state_file):
+        """测试状态文件损坏时从空状态开始"""
+        state_file.write_text("{broken", encoding="utf-8")
+
+        assert UploadSessionStore(str(state_file)).sessions == {}
+
+
+class TestChunkedUpload:
+    """测试分块上传"""
+
+    def test_upload_in_chunks_and_cleanup(self, manager, local_file, state_file):
+        """测试按nextExpectedRanges逐块上传，完成后清除保存的会话"""
+        manager.session.put.side_effect = [accepted(CHUNK), accepted(2 * CHUNK),
+                                           make_response(201, {"id": "item-1"})]
+        progress = MagicMock()
+
+        result = manager._upload_large_file(local_file, "blog/large.png", FILE_SIZE, progress)
+
+        assert result == {"id": "item-1"}
+        assert content_ranges(manager.session) == [
+            f"bytes 0-{CHUNK - 1}/{FILE_SIZE}",
+            f"bytes {CHUNK}-{2 * CHUNK - 1}/{FILE_SIZE}",
+            f"bytes {2 * CHUNK}-{FILE_SIZE - 1}/{FILE_SIZE}",
+        ]
+        assert progress.call_args_list[-1].args == (FILE_SIZE, FILE_SIZE)
+        assert manager.session_store.sessions == {}
+        assert json.loads(state_file.read_text(encoding="utf-8")) == {}
+
+    def test_resume_from_next_expected_ranges(self, manager, local_file, state_file):
+        """测试恢复保存的会话，从服务器确认的位置继续上传"""
+        save_session(state_file, local_file, offset=0)
+        manager.session_store = UploadSessionStore(str(state_file))
+        manager.session.get.return_value = make_response(
+            200, {"nextExpectedRanges": [f"{2 * CHUNK}-{FILE_SIZE - 1}"]})
+        manager.session.put.return_value = make_response(201, {"id": "item-1"})
+
+        result = manager._upload_large_file(local_file, "blog/large.png", FILE_SIZE)
+
+        assert result == {"id": "item-1"}
+        manager._create_upload_session.assert_not_called()
+        assert manager.session.put.call_args.args[0] == "https://upload/saved"
+        assert content_ranges(manager.session) == [f"bytes {2 * CHUNK}-{FILE_SIZE - 1}/{FILE_SIZE}"]
+        assert manager.session_store.sessions == {}
+
+    def test_modified_file_not_resumed(self, manager, local_file, state_file):
+        """测试本地文件大小变化后不恢复旧会话"""
+        key = save_session(state_file, local_file, offset=CHUNK)
+        manager.session_store = UploadSessionStore(str(state_file))
+        manager.session_store.sessions[key]["file_size"] = FILE_SIZE - 1
+        manager.session.put.side_effect = [accepted(CHUNK), accepted(2 * CHUNK),
+                                           make_response(201, {"id": "item-1"})]
+
+        manager._upload_large_file(local_file, "blog/large.png", FILE_SIZE)
+
+        manager.session.get.assert_not_called()
+        assert manager._create_upload_session.call_count == 1
+        assert content_ranges(manager.session)[0] == f"bytes 0-{CHUNK - 1}/{FILE_SIZE}"
+
+    def test_expired_saved_session_recreated(self, manager, local_file, state_file):
+        """测试保存的会话已失效（404）时创建新会话并从头上传"""
+        save_session(state_file, local_file, offset=CHUNK)
+        manager.session_store = UploadSessionStore(str(state_file))
+        manager.session.get.return_value = make_response(404)
+        manager.session.put.side_effect = [accepted(CHUNK), accepted(2 * CHUNK),
+                                           make_response(201, {"id": "item-1"})]
+
+        manager._upload_large_file(local_file, "blog/large.png", FILE_SIZE)
+
+        assert manager._create_upload_session.call_count == 1
+        assert manager.session.put.call_args.args[0] == "https://upload/session-1"
+        assert content_ranges(manager.session)[0] == f"bytes 0-{CHUNK - 1}/{FILE_SIZE}"
+
+    def test_session_expired_mid_upload_restarts(self, manager, local_file):
+        """测试上传过程中会话失效时重新创建会话"""
+        manager.session.put.side_effect = [accepted(CHUNK), make_response(404),
+                                           accepted(CHUNK), accepted(2 * CHUNK),
+                                           make_response(201, {"id": "item-1"})]
+        manager.session.get.return_value = make_response(404)
+
+        with patch.object(onedrive_blog_images.time, "sleep"):
+            result = manager._upload_large_file(local_file, "blog/large.png", FILE_SIZE)
+
+        assert result == {"id": "item-1"}
+        assert manager._create_upload_session.call_count == 2
+        assert manager.session.put.call_args.args[0] == "https://upload/session-2"
+        assert manager.session_store.sessions == {}
+
+    def test_session_restart_limit(self, manager, local_file):
+        """测试会话反复失效超过重建次数时放弃上传"""
+        manager.session.put.return_value = make_response(404)
+        manager.session.get.return_value = make_response(404)
+
+        with patch.object(onedrive_blog_images.time, "sleep"):
+            with pytest.raises(Exception, match="expired 2 times"):
+                manager._upload_large_file(local_file, "blog/large.png", FILE_SIZE)
+
+        assert manager._create_upload_session.call_count == 2
+        assert manager.session_store.sessions == {}
+
+    def test_transient_failure_retries_at_confirmed_offset(self, manager, local_file):
+        """测试分块上传失败后按服务器确认的位置重试"""
+        manager.session.put.side_effect = [accepted(CHUNK), make_response(500),
+                                           accepted(2 * CHUNK), make_response(201, {"id": "item-1"})]
+        manager.session.get.return_value = make_response(200, {"nextExpectedRanges": [f"{CHUNK}-"]})
+
+        with patch.object(onedrive_blog_images.time, "sleep"):
+            manager._upload_large_file(local_file, "blog/large.png", FILE_SIZE)
+
+        ranges = content_ranges(manager.session)
+        assert ranges[1] == ranges[2] == f"bytes {CHUNK}-{2 * CHUNK - 1}/{FILE_SIZE}"
+        assert manager._create_upload_session.call_count == 1
+
+
+
+class TestTokenRefresh:
+    """测试并发请求收到401时的令牌刷新"""
+
+    def test_concurrent_401_refreshes_once(self, state_file):
+        """测试多个线程同时收到401时只刷新一次令牌，其余线程使用刷新后的令牌重试"""
+        auth = OneDriveAuthManager.__new__(OneDriveAuthManager)
+        auth.tokens = {"access_token": "old", "refresh_token": "r", "expires_at": time.time() + 3600}
+        auth._token_lock = threading.Lock()
+
+        def refresh():
+            time.sleep(0.05)
+            auth.tokens = dict(auth.tokens, access_token="new")
+            return "new"
+
+        auth.refresh_access_token = MagicMock(side_effect=refresh)
+        manager = OneDriveUploadManager(auth, {"processing": {"upload_session_state_file": str(state_file)}})
+        rejected = threading.Barrier(8)
+
+        def request(method, url, headers=None, **kwargs):
+            if headers["Authorization"] == "Bearer old":
+                rejected.wait()
+                return make_response(401)
+            return make_response(200)
+
+        manager.session = MagicMock()
+        manager.session.request.side_effect = request
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(lambda _: manager._make_request("GET", "/me/drive"), range(8)))
+
+        assert [response.status_code for response in responses] == [200] * 8
+        assert auth.refresh_access_token.call_count == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+测试内容包创建器的PDF渲染缓存、图片并发下载和ZIP打包
+"""
+
+import sys
+import threading
+import time
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import requests
+
+import frontmatter
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from scripts.utils import package_creator as package_creator_module
+    from scripts.utils.package_creator import PackageCreator
+except (ImportError, OSError) as e:  # weasyprint需要系统的pango库
+    pytest.skip(f"weasyprint不可用: {e}", allow_module_level=True)
+
+
+@pytest.fixture
+def creator(tmp_path):
+    creator = PackageCreator()
+    creator.pdf_cache_dir = tmp_path / "pdf_cache"
+    creator.pdf_cache_dir.mkdir()
+    creator.pdf_cache_index_file = creator.pdf_cache_dir / "index.json"
+    creator._pdf_cache_index = {}
+    return creator
+
+
+def make_post(content="正文内容", **metadata):
+    return frontmatter.Post(content, title="测试文章", date="2025-01-01", **metadata)
+
+
+class FakeDownloads:
+    """模拟图片下载：记录每个主机的最大并发数，可按URL指定失败"""
+
+    def __init__(self, delay=0.05, failures=None):
+        self.delay = delay
+        self.failures = failures or {}
+        self.active = {}
+        self.max_active = {}
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        failure = self.failures.get(url)
+        if isinstance(failure, Exception):
+            raise failure
+        host = url.split("/")[2]
+        downloads = self
+
+        class Response:
+            status_code = failure or 200
+            headers = {"content-type": "image/png"}
+
+            def __enter__(self):
+                with downloads.lock:
+                    downloads.active[host] = downloads.active.get(host, 0) + 1
+                    downloads.max_active[host] = max(downloads.max_active.get(host, 0), downloads.active[host])
+                return self
+
+            def __exit__(self, *exc):
+                with downloads.lock:
+                    downloads.active[host] -= 1
+
+            def iter_content(self, chunk_size):
+                time.sleep(downloads.delay)
+                yield url.encode()
+                yield b"-data"
+
+        return Response()
+
+
+class TestPdfCache:
+    """测试PDF渲染缓存"""
+
+    def test_unchanged_article_reuses_pdf(self, creator, monkeypatch):
+        """测试文章未修改时直接返回缓存的PDF"""
+        success, first = creator._create_pdf(make_post(), "测试文章")
+        assert success and first.exists()
+
+        def fail_render(*args, **kwargs):
+            raise AssertionError("不应重新渲染")
+        monkeypatch.setattr(package_creator_module, "HTML", fail_render)
+
+        assert creator._create_pdf(make_post(), "测试文章") == (True, first)
+
+    def test_changed_article_invalidates_cache(self, creator):
+        """测试文章内容或图片变化后重新渲染并删除旧PDF"""
+        _, first = creator._create_pdf(make_post(), "测试文章")
+        _, second = creator._create_pdf(make_post("正文内容\n![图](https://example.com/a.png)"), "测试文章")
+
+        assert second != first
+        assert second.exists() and not first.exists()
+        assert creator._pdf_cache_index == {creator._safe_filename("测试文章"): second.stem}
+
+    def test_template_version_changes_key(self, creator, monkeypatch):
+        """测试模板版本变化时缓存键改变"""
+        key = creator._pdf_cache_key(make_post(), "测试文章")
+        monkeypatch.setattr(package_creator_module, "PDF_TEMPLATE_VERSION",
+                            package_creator_module.PDF_TEMPLATE_VERSION + 1)
+
+        assert creator._pdf_cache_key(make_post(), "测试文章") != key
+
+    def test_stylesheet_shared_across_renders(self, creator):
+        """测试多篇文章共享同一字体配置和样式表"""
+        creator._create_pdf(make_post("第一篇"), "文章一")
+        stylesheet, font_config = creator._stylesheet, creator._font_config
+        creator._create_pdf(make_post("第二篇"), "文章二")
+
+        assert creator._stylesheet is stylesheet
+        assert creator._font_config is font_config
+
+
+
+class TestImageDownloads:
+    """测试图片并发下载"""
+
+    @pytest.fixture
+    def downloads(self, creator):
+        downloads = FakeDownloads()
+        creator.session = MagicMock()
+        creator.session.get.side_effect = downloads.get
+        return downloads
+
+    def test_per_host_concurrency_limited(self, creator, downloads, tmp_path):
+        """测试同一主机的并发下载数不超过限制，不同主机互不影响"""
+        creator.per_host_limit = 2
+        content = "\n".join([f"![a{i}](https://a.example.com/{i}.png)" for i in range(6)]
+                            + [f"![b{i}](https://b.example.com/{i}.png)" for i in range(2)])
+
+        images = creator._collect_images(content, tmp_path)
+
+        assert len(images) == 8
+        assert downloads.max_active["a.example.com"] == 2
+        assert downloads.max_active["b.example.com"] == 2
+
+    def test_failures_skipped_and_order_kept(self, creator, downloads, tmp_path):
+        """测试下载失败的图片被跳过，其余按文章中的顺序返回且不留下临时文件"""
+        downloads.failures = {
+            "https://a.example.com/2.png": 404,
+            "https://b.example.com/3.png": requests.ConnectionError("断开"),
+        }
+        content = ("![一](https://a.example.com/1.png)\n![二](https://a.example.com/2.png)\n"
+                   "![三](https://b.example.com/3.png)\n![本地](/assets/local.png)\n"
+                   "![五](https://b.example.com/5.png)")
+
+        images = creator._collect_images(content, tmp_path)
+
+        assert [img["filename"] for img in images] == ["image_01.png", "image_05.png"]
+        assert [img["alt_text"] for img in images] == ["一", "五"]
+        assert Path(images[1]["local_path"]).read_bytes() == b"https://b.example.com/5.png-data"
+        assert sorted(p.name for p in (tmp_path / "images").iterdir()) == ["image_01.png", "image_05.png"]
+
+    def test_cancel_before_download(self, creator, downloads, tmp_path):
+        """测试已取消时不再发起下载"""
+        cancel = threading.Event()
+        cancel.set()
+
+        assert creator._download_image(1, "", "https://a.example.com/1.png", tmp_path, cancel) is None
+        creator.session.get.assert_not_called()
+
+    def test_cancel_during_download_removes_part_file(self, creator, downloads, tmp_path):
+        """测试下载过程中取消时删除未完成的临时文件"""
+        cancel = threading.Event()
+        downloads.delay = 0
+        original_get = downloads.get
+
+        def get_and_cancel(url, **kwargs):
+            response = original_get(url, **kwargs)
+            cancel.set()
+            return response
+
+        creator.session.get.side_effect = get_and_cancel
+        images_dir = tmp_path / "images"
+        images_dir.mkdir()
+
+        assert creator._download_image(1, "", "https://a.example.com/1.png", images_dir, cancel) is None
+        assert list(images_dir.iterdir()) == []
+
+    def test_pdf_failure_cancels_downloads(self, creator, tmp_path):
+        """测试PDF生成失败时取消后台图片下载"""
+        article = tmp_path / "article.md"
+        article.write_text("---\ntitle: 测试文章\n---\n![图](https://a.example.com/1.png)", encoding="utf-8")
+        cancelled = threading.Event()
+
+        def collect(content, temp_path, cancel_event):
+            if cancel_event.wait(5):
+                cancelled.set()
+            return []
+
+        creator._collect_images = collect
+        creator._create_pdf = MagicMock(return_value=(False, None))
+
+        success, result = creator.create_package(str(article))
+
+        assert not success and result == {"error": "PDF生成失败"}
+        assert cancelled.is_set()
+
+
+class TestZipPackage:
+    """测试ZIP打包"""
+
+    def test_contents_and_order(self, creator, tmp_path):
+        """测试ZIP按传入顺序包含文件和文本，图片不再压缩"""
+        creator.output_dir = tmp_path / "packages"
+        creator.output_dir.mkdir()
+        pdf = tmp_path / "article.pdf"
+        pdf.write_bytes(b"%PDF" * 100)
+        images = []
+        for name in ("image_02.png", "image_01.jpg"):
+            path = tmp_path / name
+            path.write_bytes(name.encode() * 10)
+            images.append((f"images/{name}", path))
+        text_files = {"链接汇总.txt": "链接", "资料清单.md": "# 清单"}
+
+        success, zip_path = creator._create_zip_package(
+            [("测试文章.pdf", pdf)] + images, text_files, "测试文章", "2025-01-01")
+
+        assert success and zip_path.parent == creator.output_dir
+        with zipfile.ZipFile(zip_path) as zipf:
+            assert zipf.namelist() == ["测试文章.pdf", "images/image_02.png", "images/image_01.jpg",
+                                       "链接汇总.txt", "资料清单.md"]
+            assert zipf.getinfo("测试文章.pdf").compress_type == zipfile.ZIP_DEFLATED
+            assert zipf.getinfo("images/image_02.png").compress_type == zipfile.ZIP_STORED
+            assert zipf.read("images/image_01.jpg") == b"image_01.jpg" * 10
+            assert zipf.read("资料清单.md").decode("utf-8") == "# 清单"
+        assert creator.get_package_info(str(zip_path))["files"] == {"total": 5, "pdf": 1, "images": 2, "docs": 2}
+
+    def test_failure_leaves_no_partial_zip(self, creator, tmp_path):
+        """测试打包失败时不留下不完整的ZIP"""
+        creator.output_dir = tmp_path / "packages"
+        creator.output_dir.mkdir()
+
+        success, zip_path = creator._create_zip_package(
+            [("missing.pdf", tmp_path / "missing.pdf")], {}, "测试文章", "2025-01-01")
+
+        assert (success, zip_path) == (False, None)
+        assert list(creator.output_dir.iterdir()) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
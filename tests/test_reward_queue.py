@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+测试奖励请求队列的领取/确认、租约过期和JSON迁移
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.utils.reward_queue import RewardRequestQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = RewardRequestQueue(tmp_path / "reward_requests.db")
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def legacy_files(tmp_path):
+    """旧版JSON请求文件（1条待处理，1条已处理）"""
+    pending_file = tmp_path / "pending.json"
+    processed_file = tmp_path / "processed.json"
+    pending_file.write_text(json.dumps([
+        {"id": "0001", "user_email": "a@test", "article_title": "A",
+         "created_at": "2025-01-02T00:00:00", "status": "pending"},
+        {"id": "0002", "user_email": "b@test", "article_title": "B",
+         "created_at": "2025-01-01T00:00:00", "status": "processed"},
+    ]), encoding="utf-8")
+    processed_file.write_text(json.dumps([
+        {"user_email": "b@test", "article_title": "B", "download_url": "https://x",
+         "success": True, "message": "", "processed_at": "2025-01-01T00:01:00"},
+    ]), encoding="utf-8")
+    return pending_file, processed_file
+
+
+class TestRewardRequestQueue:
+    """测试RewardRequestQueue"""
+
+    def test_claim_in_order_and_ack(self, queue):
+        """测试按创建顺序领取并确认"""
+        ids = [queue.enqueue(f"u{i}@test", "文章") for i in range(3)]
+
+        claimed = queue.claim(2)
+        assert [r["id"] for r in claimed] == ids[:2]
+        assert all(r["status"] == "processing" for r in claimed)
+
+        queue.ack([(claimed[0]["id"], True, "ok", "https://x"),
+                   (claimed[1]["id"], False, "fail", None)])
+        assert queue.count_by_status() == {"pending": 1, "processed": 1, "failed": 1}
+
+    def test_concurrent_claims_do_not_overlap(self, queue, tmp_path):
+        """测试两个队列实例不会领取同一请求"""
+        for i in range(5):
+            queue.enqueue(f"u{i}@test", "文章")
+        other = RewardRequestQueue(tmp_path / "reward_requests.db")
+        try:
+            first = {r["id"] for r in queue.claim(3)}
+            second = {r["id"] for r in other.claim(3)}
+        finally:
+            other.close()
+
+        assert len(first) == 3 and len(second) == 2
+        assert not first & second
+
+    def test_expired_lease_is_reclaimed(self, queue):
+        """测试租约过期的请求重新可被领取"""
+        queue.enqueue("a@test", "文章")
+        queue.lease_seconds = 0
+        first = queue.claim(1)
+        time.sleep(0.01)
+
+        second = queue.claim(1)
+        assert [r["id"] for r in second] == [first[0]["id"]]
+        assert second[0]["attempts"] == 2
+
+    def test_release_returns_to_pending(self, queue):
+        """测试释放领取的请求"""
+        queue.enqueue("a@test", "文章")
+        claimed = queue.claim(1)
+
+        queue.release([claimed[0]["id"]])
+        assert queue.count("pending") == 1
+
+    def test_migrate_from_json(self, queue, legacy_files):
+        """测试从旧版JSON文件导入"""
+        assert queue.migrate_from_json(*legacy_files) == 2
+        assert queue.count_by_status() == {"pending": 1, "processed": 1}
+        assert queue.claim(5)[0]["user_email"] == "a@test"
+
+    def test_migrate_only_if_empty(self, queue, legacy_files):
+        """测试队列非空时不重复导入"""
+        assert queue.migrate_from_json(*legacy_files, only_if_empty=True) == 2
+        assert queue.migrate_from_json(*legacy_files, only_if_empty=True) == 0
+        assert queue.count_by_status() == {"pending": 1, "processed": 1}
+
+    def test_concurrent_first_start_migrates_once(self, tmp_path, legacy_files):
+        """测试多个实例同时首次启动时只导入一次"""
+        barrier = threading.Barrier(4)
+        imported = []
+
+        def start():
+            with RewardRequestQueue(tmp_path / "reward_requests.db") as q:
+                barrier.wait()
+                imported.append(q.migrate_from_json(*legacy_files, only_if_empty=True))
+
+        threads = [threading.Thread(target=start) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(imported) == [0, 0, 0, 2]
+        with RewardRequestQueue(tmp_path / "reward_requests.db") as q:
+            assert q.count_by_status() == {"pending": 1, "processed": 1}
+
+    def test_context_manager_closes_connection(self, tmp_path):
+        """测试with语句退出时关闭数据库连接"""
+        with RewardRequestQueue(tmp_path / "reward_requests.db") as q:
+            q.enqueue("a@test", "文章")
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            q.count("pending")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
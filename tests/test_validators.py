@@ -6,6 +6,7 @@ from unittest.mock import Mock, patch
 from pathlib import Path
 import tempfile
 import os
+import json
 
 # 添加项目根目录到Python路径
 import sys
@@ -21,8 +22,13 @@ from scripts.core.validators import (
     StructureValidator,
     QualityValidator,
     validator_registry,
-    ValidationSummary
+    ValidationSummary,
+    ValidatorRegistry,
+    SiteValidator,
+    analyze_text,
+    parse_document
 )
+from scripts.core.validators import site_validator, text_analysis
 
 
 class TestValidationResult(unittest.TestCase):
@@ -515,5 +521,165 @@ This is test content for file validation.""")
             os.unlink(temp_file.name)
 
 
+class TestSiteValidator(unittest.TestCase):
+    """测试全站验证"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.posts = self.root / "_posts"
+        self.posts.mkdir()
+        (self.posts / "good.md").write_text("""---
+title: "Good Post"
+date: 2023-01-01
+---
+
+Content of the good post.""", encoding='utf-8')
+        (self.posts / "bad.md").write_text("No front matter here.", encoding='utf-8')
+        self.cache_file = self.root / "cache.json"
+        self.registry = ValidatorRegistry()
+        self.registry.register("frontmatter", FrontMatterValidator())
+        self.registry.register("structure", StructureValidator())
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def _validate(self, workers=1):
+        validator = SiteValidator(self.registry, cache_file=str(self.cache_file), workers=workers)
+        return validator.validate([str(self.posts)])
+    
+    def test_report_is_machine_readable(self):
+        """测试报告可序列化并标记错误文件"""
+        report = self._validate()
+        
+        self.assertEqual(report["files"], 2)
+        self.assertTrue(report["has_errors"])
+        bad_rules = [r["rule"] for r in report["results"][(self.posts / "bad.md").as_posix()]]
+        self.assertIn("frontmatter_exists", bad_rules)
+        json.dumps(report, ensure_ascii=False)
+    
+    def test_unchanged_files_skipped(self):
+        """测试内容和验证器版本未变化的文件复用上次结果"""
+        first = self._validate()
+        (self.posts / "good.md").write_text("Changed without front matter.", encoding='utf-8')
+        second = self._validate()
+        
+        self.assertEqual((second["validated"], second["skipped"]), (1, 1))
+        self.assertEqual(second["results"][(self.posts / "bad.md").as_posix()],
+                         first["results"][(self.posts / "bad.md").as_posix()])
+    
+    def test_validator_version_change_revalidates(self):
+        """测试禁用规则后验证器版本变化，所有文件重新验证"""
+        self._validate()
+        self.registry.get("structure").disable_rule("more_tag")
+        
+        self.assertEqual(self._validate()["validated"], 2)
+    
+    def test_local_image_change_revalidates(self):
+        """测试引用的本地图片新增或变化后重新验证"""
+        self.registry.register("image", ImageValidator(project_root=self.root))
+        post = self.posts / "image.md"
+        post.write_text("""---
+title: "Image Post"
+date: 2023-01-01
+---
+
+![封面图片](assets/cover.png)""", encoding='utf-8')
+        path = post.as_posix()
+        
+        first = self._validate()
+        self.assertIn("image_exists", [r["rule"] for r in first["results"][path]])
+        self.assertEqual(self._validate()["validated"], 0)
+        
+        image = self.root / "assets" / "cover.png"
+        image.parent.mkdir()
+        image.write_bytes(b"png")
+        second = self._validate()
+        
+        self.assertEqual(second["validated"], 1)
+        self.assertNotIn("image_exists", [r["rule"] for r in second["results"].get(path, [])])
+        
+        image.write_bytes(b"x" * (3 * 1024 * 1024))
+        third = self._validate()
+        self.assertEqual(third["validated"], 1)
+        self.assertIn("image_size", [r["rule"] for r in third["results"][path]])
+    
+    def test_process_pool_matches_serial(self):
+        """测试进程池验证结果与串行验证一致"""
+        serial = SiteValidator(self.registry, cache_file=None, workers=1).validate([str(self.posts)])
+        parallel = SiteValidator(self.registry, cache_file=None, workers=2).validate([str(self.posts)])
+        
+        self.assertEqual(parallel["results"], serial["results"])
+    
+    def test_main_exit_code_and_output(self):
+        """测试命令行有错误时返回1并写入JSON报告"""
+        output = self.root / "report.json"
+        with patch.object(site_validator, "DEFAULT_CACHE_FILE", str(self.cache_file)):
+            code = site_validator.main([str(self.posts), "--workers", "1", "--output", str(output)])
+        
+        self.assertEqual(code, 1)
+        self.assertEqual(json.loads(output.read_text(encoding='utf-8'))["files"], 2)
+    
+    def test_parse_document_shared(self):
+        """测试同一内容只解析一次"""
+        content = "---\ntitle: Shared\n---\nBody"
+        document = parse_document(content)
+        
+        self.assertIs(parse_document(content), document)
+        self.assertEqual((document.frontmatter, document.body), ({"title": "Shared"}, "Body"))
+
+
+
+class TestTextAnalysis(unittest.TestCase):
+    """测试正文分析模型"""
+    
+    BODY = """# 标题
+
+## API设计
+
+- 第一项
+* 第二项
+1.第三项
+
+> 引用内容
+>缺少空格
+
+| a | b |
+a | b | c
+
+使用`code`调用 HTTP 接口和 JavaScript。这是第二句！[链接](https://example.com)"""
+    
+    def test_line_structure(self):
+        """测试一次逐行扫描得到标题、列表、引用和表格行"""
+        text = analyze_text(self.BODY)
+        
+        self.assertEqual(text.headings, [(1, "标题", 1), (2, "API设计", 3)])
+        self.assertEqual([(n, ordered) for n, _, ordered in text.list_items], [(5, False), (6, False), (7, True)])
+        self.assertEqual([n for n, _ in text.quote_lines], [9, 10])
+        self.assertEqual([n for n, _ in text.table_rows], [12, 13])
+        self.assertEqual(text.list_markers, ["-", "*"])
+    
+    def test_inline_elements_and_tokens(self):
+        """测试链接、代码标记、句子和中英文词数统计"""
+        text = analyze_text(self.BODY)
+        
+        self.assertEqual(text.links, [("链接", "https://example.com")])
+        self.assertEqual(text.code_marks, {'fences': 0, 'backticks': 2, 'inline_codes': 1})
+        self.assertEqual(text.tech_terms, ["HTTP", "JavaScript"])
+        self.assertIn("javascript", text.word_tokens)
+        self.assertEqual(text.word_stats['english_words'], 7)
+        self.assertIs(analyze_text(self.BODY), text)
+    
+    def test_validators_share_model(self):
+        """测试质量和结构验证器共用同一正文模型"""
+        content = "---\ntitle: Test\n---\n" + self.BODY
+        with patch.object(text_analysis, "TextModel", wraps=text_analysis.TextModel) as model:
+            analyze_text.cache_clear()
+            QualityValidator().validate_content(content)
+            StructureValidator().validate_content(content)
+        
+        self.assertEqual(model.call_count, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -3,54 +3,62 @@
 测试微信草稿保存功能
 """
 import os
+import shutil
 import sys
 from pathlib import Path
 
+import pytest
+
 # 添加项目根目录到 Python 路径
-project_root = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, project_root)
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
 
 from scripts.core.content_pipeline import ContentPipeline
 
-def test_wechat_draft():
-    """测试微信草稿保存功能"""
-    
-    # 初始化内容管道
-    pipeline = ContentPipeline("config/pipeline_config.yml", verbose=True)
-    
-    # 选择已发布的文章进行重新发布测试
-    post_path = Path("_posts/2025-07-14-self-talk-unconscious-magic.md")
-    
+POST_NAME = "2025-07-14-self-talk-unconscious-magic.md"
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """在临时目录中运行管道，草稿、日志和缓存都不写入工作区"""
+    post_path = project_root / "_posts" / POST_NAME
     if not post_path.exists():
-        print(f"❌ 测试文件不存在: {post_path}")
-        return False
-    
-    print(f"📄 测试文章: {post_path}")
-    
-    # 复制到草稿目录
-    draft_path = pipeline.copy_post_to_draft(post_path)
-    if not draft_path:
-        print("❌ 复制文章到草稿失败")
-        return False
-    
-    print(f"📝 草稿文件: {draft_path}")
-    
+        pytest.skip(f"测试文件不存在: {post_path}")
+    shutil.copytree(project_root / "config", tmp_path / "config")
+    (tmp_path / "_posts").mkdir()
+    (tmp_path / "_drafts").mkdir()
+    shutil.copy2(post_path, tmp_path / "_posts" / POST_NAME)
+    monkeypatch.chdir(tmp_path)
+
+    pipeline = ContentPipeline("config/pipeline_config.yml", verbose=True)
+    pipeline.project_root = tmp_path
+    return pipeline
+
+
+def test_copy_post_to_draft(pipeline, tmp_path):
+    """测试已发布文章复制到临时草稿目录"""
+    draft_path = pipeline.copy_post_to_draft(Path("_posts") / POST_NAME)
+
+    assert draft_path is not None
+    assert (tmp_path / draft_path).resolve() == (tmp_path / "_drafts" / POST_NAME).resolve()
+    assert (tmp_path / ".build" / "logs" / "pipeline.log").exists()
+
+
+def test_wechat_draft(pipeline):
+    """测试微信草稿保存功能（需要配置微信公众号凭据）"""
+    if not (os.getenv("WECHAT_APPID") and os.getenv("WECHAT_APPSECRET")):
+        pytest.skip("未配置 WECHAT_APPID/WECHAT_APPSECRET")
+
+    draft_path = pipeline.copy_post_to_draft(Path("_posts") / POST_NAME)
+    assert draft_path is not None
+
     # 读取文章内容
     with open(draft_path, 'r', encoding='utf-8') as f:
         content = f.read()
-    
-    print("🔄 开始测试微信草稿保存...")
-    
+
     # 直接测试微信发布功能
-    success = pipeline._publish_to_wechat(content)
-    
-    if success:
-        print("✅ 微信草稿保存测试成功！")
-        print("📱 请登录微信公众号后台查看草稿箱")
-    else:
-        print("❌ 微信草稿保存测试失败")
-    
-    return success
+    assert pipeline._publish_to_wechat(content)
+
 
 if __name__ == "__main__":
-    test_wechat_draft()
\ No newline at end of file
+    pytest.main([__file__, "-v"])
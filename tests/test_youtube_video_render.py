@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+测试YouTube播客静态图片视频渲染
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+@pytest.fixture
+def generator(tmp_path):
+    from scripts.core.youtube_podcast_generator import YouTubePodcastGenerator
+    # TTS缓存写入临时目录，不污染 .build/cache
+    config = {'GEMINI_API_KEY': 'test', 'ELEVENLABS_API_KEY': 'test',
+              'tts_cache': {'dir': str(tmp_path / 'tts_cache')}}
+    return YouTubePodcastGenerator(config)
+
+
+class TestStillImageVideoRender:
+    """测试单次ffmpeg调用的静态图片视频渲染"""
+
+    def test_render_cmd_single_pass(self, generator):
+        """测试渲染命令在一次调用中完成音频处理和静态图片编码"""
+        cmd = generator._build_still_image_video_cmd("episode.wav", "cover.png", "episode.mp4", "fast")
+
+        assert cmd.count('-i') == 2
+        assert cmd[cmd.index('-tune') + 1] == 'stillimage'
+        assert cmd[cmd.index('-preset') + 1] == 'ultrafast'
+        assert cmd[cmd.index('-r') + 1] == '1'
+        assert cmd[cmd.index('-c:a') + 1] == 'aac'
+        assert '-af' in cmd
+        assert cmd[-1] == 'episode.mp4'
+
+    def test_unknown_preset_falls_back_to_balanced(self, generator):
+        """测试未知预设回退到balanced"""
+        cmd = generator._build_still_image_video_cmd("a.wav", "c.png", "o.mp4", "turbo")
+        assert cmd[cmd.index('-preset') + 1] == 'veryfast'
+
+    def test_parse_ffmpeg_progress(self, generator):
+        """测试解析 -progress 输出"""
+        assert generator._parse_ffmpeg_progress("out_time_us=30000000\n", 120.0) == 0.25
+        assert generator._parse_ffmpeg_progress("out_time_ms=120000000\n", 120.0) == 1.0
+        assert generator._parse_ffmpeg_progress("out_time_us=N/A\n", 120.0) is None
+        assert generator._parse_ffmpeg_progress("out_time_us=30000000\n", None) is None
+        assert generator._parse_ffmpeg_progress("frame=10\n", 120.0) is None
+        assert generator._parse_ffmpeg_progress("progress=end\n", None) == 1.0
+
+    def test_run_with_progress_reports_callback(self, generator):
+        """测试执行命令时回调进度"""
+        script = "print('out_time_us=5000000'); print('progress=continue'); print('progress=end')"
+        progress = []
+
+        returncode, _ = generator._run_ffmpeg_with_progress(
+            [sys.executable, '-c', script], 10.0, timeout=30, progress_callback=progress.append
+        )
+
+        assert returncode == 0
+        assert progress == [0.5, 1.0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])